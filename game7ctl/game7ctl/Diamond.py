@@ -2,15 +2,14 @@
 # Moonworm version : 0.5.3
 
 import argparse
-import json
 import os
-from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
-from brownie import Contract, network, project
+from brownie import Contract, network
 from brownie.network.contract import ContractContainer
 from eth_typing.evm import ChecksumAddress
 
+from . import artifacts
 
 PROJECT_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 BUILD_DIRECTORY = os.path.join(PROJECT_DIRECTORY, "build", "contracts")
@@ -35,38 +34,19 @@ def bytes_argument_type(raw_value: str) -> str:
 
 
 def get_abi_json(abi_name: str) -> List[Dict[str, Any]]:
-    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
-    if not os.path.isfile(abi_full_path):
-        raise IOError(
-            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
-        )
-
-    with open(abi_full_path, "r") as ifp:
-        build = json.load(ifp)
-
-    abi_json = build.get("abi")
-    if abi_json is None:
-        raise ValueError(f"Could not find ABI definition in: {abi_full_path}")
-
-    return abi_json
+    return artifacts.get_abi(BUILD_DIRECTORY, abi_name)
 
 
 def contract_from_build(abi_name: str) -> ContractContainer:
     # This is workaround because brownie currently doesn't support loading the same project multiple
     # times. This causes problems when using multiple contracts from the same project in the same
-    # python project.
-    PROJECT = project.main.Project("moonworm", Path(PROJECT_DIRECTORY))
-
-    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
-    if not os.path.isfile(abi_full_path):
-        raise IOError(
-            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
-        )
+    # python project. The project is created on first use and shared for the rest of the process.
+    PROJECT = artifacts.get_project(PROJECT_DIRECTORY)
 
-    with open(abi_full_path, "r") as ifp:
-        build = json.load(ifp)
+    # The cached build object is shared, so brownie gets its own copy.
+    build = artifacts.get_build(BUILD_DIRECTORY, abi_name)
 
-    return ContractContainer(PROJECT, build)
+    return ContractContainer(PROJECT, dict(build))
 
 
 class Diamond:
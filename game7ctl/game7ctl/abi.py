@@ -2,13 +2,14 @@
 ABI utilities, because web3 doesn't do selectors well.
 """
 
-import glob
-import json
 import os
+import re
 from typing import Any, Dict, List, Optional
 
 from web3 import Web3
 
+from . import artifacts
+
 
 def abi_input_signature(input_abi: Dict[str, Any]) -> str:
     """
@@ -24,6 +25,13 @@ def abi_input_signature(input_abi: Dict[str, Any]) -> str:
     return input_type
 
 
+def camel_to_snake(name: str) -> str:
+    """
+    Converts a contract method name to the name of its wrapper method, e.g. getSlotURI -> get_slot_uri.
+    """
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "_", name).lower()
+
+
 def abi_function_signature(function_abi: Dict[str, Any]) -> str:
     """
     Stringifies a function ABI according to the ABI specification:
@@ -53,26 +61,31 @@ def encode_function_signature(function_abi: Dict[str, Any]) -> Optional[str]:
     return encoded_signature.hex()
 
 
+def encode_event_topic(event_abi: Dict[str, Any]) -> Optional[str]:
+    """
+    Encodes the given event (from ABI) into its topic (the first topic on every log the event emits) by
+    calculating:
+    keccak256("<event_name>(<arg_1_type>,...,<arg_n_type>")
+
+    If event_abi is not actually an event ABI (detected by checking if event_abi["type"] == "event"),
+    returns None.
+    """
+    if event_abi["type"] != "event":
+        return None
+    event_signature = abi_function_signature(event_abi)
+    return Web3.keccak(text=event_signature).hex()
+
+
 def project_abis(project_dir: str) -> Dict[str, List[Dict[str, Any]]]:
     """
     Load all ABIs for project contracts and return then in a dictionary keyed by contract name.
 
+    ABIs are served from the process-wide artifact cache (see game7ctl.artifacts), which extracts them
+    from the build artifacts without parsing the rest of the build.
+
     Inputs:
     - project_dir
       Path to brownie project
     """
     build_dir = os.path.join(project_dir, "build", "contracts")
-    build_files = glob.glob(os.path.join(build_dir, "*.json"))
-
-    abis: Dict[str, List[Dict[str, Any]]] = {}
-
-    for filepath in build_files:
-        contract_name, _ = os.path.splitext(os.path.basename(filepath))
-        with open(filepath, "r") as ifp:
-            contract_artifact = json.load(ifp)
-
-        contract_abi = contract_artifact.get("abi", [])
-
-        abis[contract_name] = contract_abi
-
-    return abis
+    return artifacts.CACHE.abis(build_dir)
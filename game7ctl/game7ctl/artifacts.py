@@ -0,0 +1,323 @@
+"""
+Process-wide cache for brownie build artifacts (build/contracts/<ContractName>.json).
+
+The generated contract interfaces and the ABI utilities in this package load artifacts through this
+module, so that each artifact is read and parsed at most once per process for as long as it does not
+change on disk. Cache entries are keyed on the artifact path together with its modification time and
+size - recompiling the contracts invalidates the affected entries automatically.
+
+Build artifacts carry bytecode, source maps, ASTs and sources in addition to the ABI. Lookups which only
+need some top-level keys (e.g. the ABI) are served by load_keys, which scans the artifact without
+materializing any of the values it was not asked for.
+
+Objects returned from the cache are shared between all callers. Do not mutate them.
+
+The module also manages the brownie Project that contract deployments and verifications are built
+against. brownie does not support loading the same project more than once, so it is created lazily on
+first use and reused for the rest of the process.
+"""
+
+import glob
+import json
+import mmap
+import os
+import re
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from brownie.project.main import Project
+
+# (path, mtime in nanoseconds, size in bytes)
+ArtifactKey = Tuple[str, int, int]
+
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+# Remainder of a JSON string after its opening quote, up to and including the closing quote.
+_STRING_TAIL = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# Everything up to and including the next bracket which is not inside a string.
+_NEXT_BRACKET = re.compile(
+    rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*([\[\]{}])', re.DOTALL
+)
+_SCALAR_END = re.compile(rb"[,}\]\s]")
+
+
+def _skip_whitespace(buffer: Any, position: int) -> int:
+    return _WHITESPACE.match(buffer, position).end()
+
+
+def _skip_string(buffer: Any, position: int) -> int:
+    match = _STRING_TAIL.match(buffer, position + 1)
+    if match is None:
+        raise ValueError(f"Unterminated string at position {position}")
+    return match.end()
+
+
+def _skip_value(buffer: Any, position: int) -> int:
+    """
+    Returns the position just past the JSON value starting at the given position, without parsing it.
+    """
+    first = buffer[position : position + 1]
+    if first == b'"':
+        return _skip_string(buffer, position)
+
+    if first in (b"{", b"["):
+        depth = 0
+        for match in _NEXT_BRACKET.finditer(buffer, position):
+            depth += 1 if match.group(1) in (b"{", b"[") else -1
+            if depth == 0:
+                return match.end()
+        raise ValueError(f"Unterminated value at position {position}")
+
+    match = _SCALAR_END.search(buffer, position)
+    return len(buffer) if match is None else match.start()
+
+
+def _extract_keys(buffer: Any, keys: Iterable[str]) -> Dict[str, Any]:
+    wanted = set(keys)
+    result: Dict[str, Any] = {}
+
+    position = _skip_whitespace(buffer, 0)
+    if buffer[position : position + 1] != b"{":
+        raise ValueError("Build artifact is not a JSON object")
+    position = _skip_whitespace(buffer, position + 1)
+    if buffer[position : position + 1] == b"}":
+        return result
+
+    while True:
+        if buffer[position : position + 1] != b'"':
+            raise ValueError(f"Expected object key at position {position}")
+        key_end = _skip_string(buffer, position)
+        key = json.loads(buffer[position:key_end])
+
+        position = _skip_whitespace(buffer, key_end)
+        if buffer[position : position + 1] != b":":
+            raise ValueError(f"Expected ':' at position {position}")
+        position = _skip_whitespace(buffer, position + 1)
+
+        value_end = _skip_value(buffer, position)
+        if key in wanted:
+            result[key] = json.loads(buffer[position:value_end])
+            if len(result) == len(wanted):
+                return result
+
+        position = _skip_whitespace(buffer, value_end)
+        delimiter = buffer[position : position + 1]
+        if delimiter == b"}":
+            return result
+        if delimiter != b",":
+            raise ValueError(f"Expected ',' or '}}' at position {position}")
+        position = _skip_whitespace(buffer, position + 1)
+
+
+def load_keys(path: str, keys: Iterable[str]) -> Dict[str, Any]:
+    """
+    Loads only the given top-level keys from the JSON object stored at the given path. Keys which are
+    not present in the object are not present in the result.
+
+    The file is memory-mapped and scanned in place: values for all other keys are skipped over without
+    being decoded, and the scan stops as soon as every requested key has been found.
+    """
+    with open(path, "rb") as ifp:
+        if os.fstat(ifp.fileno()).st_size == 0:
+            raise ValueError(f"Build artifact is empty: {path}")
+        with mmap.mmap(ifp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _extract_keys(buffer, keys)
+
+
+def load_build_directory(
+    build_directory: str, keys: Iterable[str] = ("abi",)
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Loads the given top-level keys from every build artifact in the given directory. Returns a
+    dictionary keyed by contract name.
+    """
+    keys = list(keys)
+    result: Dict[str, Dict[str, Any]] = {}
+    for path in glob.glob(os.path.join(build_directory, "*.json")):
+        contract_name, _ = os.path.splitext(os.path.basename(path))
+        result[contract_name] = load_keys(path, keys)
+    return result
+
+
+class ArtifactCache:
+    """
+    Thread-safe cache of parsed build artifacts.
+
+    For every artifact, the cache can hold the fully parsed build object as well as its ABI and its
+    bytecode. The ABI and bytecode are extracted with load_keys unless the full build object has
+    already been parsed. hits and misses count lookups which were (respectively, were not) served from
+    memory.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Tuple[ArtifactKey, Dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, path: str) -> ArtifactKey:
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def _entry(self, path: str) -> Dict[str, Any]:
+        """
+        Returns the (possibly empty) entry for the given path, discarding it first if the file on disk
+        has changed since it was cached. Must be called with self._lock held.
+        """
+        path = os.path.abspath(path)
+        key = self._key(path)
+        cached = self._entries.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, {})
+            self._entries[path] = cached
+        return cached[1]
+
+    def _get(self, path: str, part: str) -> Any:
+        with self._lock:
+            entry = self._entry(path)
+            if part in entry:
+                self.hits += 1
+                return entry[part]
+
+            self.misses += 1
+            if part == "build":
+                with open(path, "r") as ifp:
+                    build = json.load(ifp)
+                entry["build"] = build
+                entry["abi"] = build.get("abi")
+                entry["bytecode"] = build.get("bytecode")
+            elif "build" in entry:
+                entry[part] = entry["build"].get(part)
+            else:
+                entry[part] = load_keys(path, [part]).get(part)
+            return entry[part]
+
+    def build(self, path: str) -> Dict[str, Any]:
+        """
+        Returns the fully parsed build artifact at the given path.
+        """
+        return self._get(path, "build")
+
+    def abi(self, path: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the ABI from the build artifact at the given path, or None if the artifact does not
+        define one.
+        """
+        return self._get(path, "abi")
+
+    def bytecode(self, path: str) -> Optional[str]:
+        """
+        Returns the deployment bytecode from the build artifact at the given path, or None if the artifact
+        does not define any.
+        """
+        return self._get(path, "bytecode")
+
+    def abis(self, build_directory: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Returns the ABIs of all build artifacts in the given directory, keyed by contract name.
+        Artifacts which do not define an ABI are assigned an empty one.
+        """
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for path in glob.glob(os.path.join(build_directory, "*.json")):
+            contract_name, _ = os.path.splitext(os.path.basename(path))
+            contract_abi = self.abi(path)
+            result[contract_name] = [] if contract_abi is None else contract_abi
+        return result
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Drops the cached entry for the given artifact path. If no path is given, drops all entries.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+CACHE = ArtifactCache()
+
+
+def artifact_path(build_directory: str, contract_name: str) -> str:
+    """
+    Returns the path to the build artifact for the given contract, raising an IOError if the artifact
+    does not exist.
+    """
+    path = os.path.join(build_directory, f"{contract_name}.json")
+    if not os.path.isfile(path):
+        raise IOError(
+            f"File does not exist: {path}. Maybe you have to compile the smart contracts?"
+        )
+    return path
+
+
+def get_build(build_directory: str, contract_name: str) -> Dict[str, Any]:
+    return CACHE.build(artifact_path(build_directory, contract_name))
+
+
+def get_abi(build_directory: str, contract_name: str) -> List[Dict[str, Any]]:
+    path = artifact_path(build_directory, contract_name)
+    contract_abi = CACHE.abi(path)
+    if contract_abi is None:
+        raise ValueError(f"Could not find ABI definition in: {path}")
+    return contract_abi
+
+
+def get_bytecode(build_directory: str, contract_name: str) -> str:
+    path = artifact_path(build_directory, contract_name)
+    bytecode = CACHE.bytecode(path)
+    if bytecode is None:
+        raise ValueError(f"Could not find bytecode in: {path}")
+    return bytecode
+
+
+def invalidate(path: Optional[str] = None) -> None:
+    CACHE.invalidate(path)
+
+
+def cache_stats() -> Dict[str, int]:
+    return CACHE.stats()
+
+
+_PROJECTS: Dict[str, "Project"] = {}
+_PROJECTS_LOCK = threading.Lock()
+
+
+def get_project(project_directory: str) -> "Project":
+    """
+    Returns the brownie Project for the given directory, creating it on first use.
+
+    Creating a Project scans the project sources and build directory, which is slow. It also cannot be
+    done through brownie.project.load more than once per project, which is why the generated interfaces
+    instantiate brownie.project.main.Project directly under the name "moonworm". This function keeps that
+    workaround but guarantees that it runs once per directory per process.
+    """
+    project_directory = os.path.abspath(project_directory)
+    with _PROJECTS_LOCK:
+        project = _PROJECTS.get(project_directory)
+        if project is None:
+            # Imported here so that loading artifacts does not require importing brownie.
+            from brownie.project.main import Project
+
+            project = Project("moonworm", Path(project_directory))
+            _PROJECTS[project_directory] = project
+        return project
+
+
+def reset_projects() -> None:
+    """
+    Forgets all projects created by get_project, so that the next call creates a fresh one (e.g. after
+    the contracts have been recompiled).
+    """
+    with _PROJECTS_LOCK:
+        _PROJECTS.clear()
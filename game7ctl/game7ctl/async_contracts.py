@@ -0,0 +1,338 @@
+"""
+Asyncio variants of the generated contract wrappers.
+
+AsyncInventoryFacet, AsyncTerminusFacet, AsyncMockERC721, AsyncMockERC20 and AsyncDiamondLoupeFacet have
+the same methods as the wrappers they are built from, as coroutines:
+- read methods (the ones which take a block_number) are encoded and decoded from the contract ABI and
+  sent through an AsyncJSONRPCClient, which keeps a pool of keep-alive HTTP connections to the node and
+  bounds the number of requests in flight
+- write methods (the ones which take a transaction_config), deploy and verify_contract run the
+  synchronous wrapper in a worker thread, as they need brownie to sign and track transactions
+
+Usage:
+    async with AsyncJSONRPCClient(endpoint_uri, max_concurrency=64) as client:
+        inventory = AsyncInventoryFacet(address, client)
+        items = await asyncio.gather(
+            *[inventory.get_equipped_item(token_id, slot) for token_id in token_ids]
+        )
+
+Requires aiohttp: pip install "game7ctl[async]"
+"""
+
+import asyncio
+import functools
+import inspect
+import itertools
+import sys
+from typing import Any, Dict, List, Optional, Type, Union
+
+from eth_utils import to_checksum_address
+
+from . import (
+    DiamondLoupeFacet,
+    InventoryFacet,
+    MockERC20,
+    MockERC721,
+    TerminusFacet,
+    abi,
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # type: ignore
+
+try:
+    from eth_abi import decode as decode_abi, encode as encode_abi
+except ImportError:
+    # eth-abi<4
+    from eth_abi import decode_abi, encode_abi  # type: ignore
+
+DEFAULT_MAX_CONCURRENCY = 64
+
+
+class JSONRPCError(Exception):
+    def __init__(self, error: Dict[str, Any]) -> None:
+        super().__init__(error.get("message", str(error)))
+        self.error = error
+
+
+class AsyncJSONRPCClient:
+    def __init__(
+        self,
+        endpoint_uri: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = 30.0,
+    ) -> None:
+        """
+        At most max_concurrency requests are in flight at once, over at most as many keep-alive
+        connections. Further requests wait for one of them to finish.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                'The async contract wrappers require aiohttp: pip install "game7ctl[async]"'
+            )
+        self.endpoint_uri = endpoint_uri
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._ids = itertools.count()
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def for_active_network(cls, **kwargs: Any) -> "AsyncJSONRPCClient":
+        """
+        Creates a client for the node of the brownie network which is currently connected.
+        """
+        from brownie import web3
+
+        return cls(web3.provider.endpoint_uri, **kwargs)
+
+    async def __aenter__(self) -> "AsyncJSONRPCClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def session(self) -> "aiohttp.ClientSession":
+        # The session is created on first use so that it belongs to the running event loop.
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency, keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, method: str, params: List[Any]) -> Any:
+        session = self.session()
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+            "id": next(self._ids),
+        }
+        assert self._semaphore is not None
+        async with self._semaphore:
+            async with session.post(self.endpoint_uri, json=payload) as response:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+        if "error" in body:
+            raise JSONRPCError(body["error"])
+        return body["result"]
+
+    async def eth_call(
+        self, transaction: Dict[str, Any], block_number: Union[str, int] = "latest"
+    ) -> bytes:
+        block_identifier = (
+            hex(block_number) if isinstance(block_number, int) else block_number
+        )
+        result = await self.request("eth_call", [transaction, block_identifier])
+        return bytes.fromhex(result[2:])
+
+
+def function_abis_by_method(
+    contract_abi: List[Dict[str, Any]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Maps wrapper method names to the ABIs of the contract methods they call. Like the wrappers,
+    overloaded contract methods get their selector appended to their names.
+    """
+    functions: Dict[str, List[Dict[str, Any]]] = {}
+    for item in contract_abi:
+        if item["type"] == "function":
+            functions.setdefault(abi.camel_to_snake(item["name"]), []).append(item)
+
+    methods: Dict[str, Dict[str, Any]] = {}
+    for name, overloads in functions.items():
+        if len(overloads) == 1:
+            methods[name] = overloads[0]
+            continue
+        for item in overloads:
+            selector = abi.encode_function_signature(item)
+            assert selector is not None
+            methods[f"{name}_0x{selector.replace('0x', '')}"] = item
+    return methods
+
+
+def element_abi(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {**item, "type": item["type"][: item["type"].rindex("[")]}
+
+
+def format_input(item: Dict[str, Any], value: Any) -> Any:
+    """
+    Converts an argument as the wrappers accept it (e.g. bytes as hex strings) to what the ABI encoder
+    expects.
+    """
+    abi_type = item["type"]
+    if abi_type.endswith("]"):
+        return [format_input(element_abi(item), element) for element in value]
+    if abi_type.startswith("tuple"):
+        return tuple(
+            format_input(component, element)
+            for component, element in zip(item["components"], value)
+        )
+    if abi_type.startswith("bytes") and isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    return value
+
+
+def format_output(item: Dict[str, Any], value: Any) -> Any:
+    """
+    Formats a decoded return value like brownie does: structs as tuples and addresses checksummed.
+    """
+    abi_type = item["type"]
+    if abi_type.endswith("]"):
+        return [format_output(element_abi(item), element) for element in value]
+    if abi_type.startswith("tuple"):
+        return tuple(
+            format_output(component, element)
+            for component, element in zip(item["components"], value)
+        )
+    if abi_type == "address":
+        return to_checksum_address(value)
+    return value
+
+
+class AsyncContractWrapper:
+    # The synchronous wrapper class this class mirrors - set by async_wrapper_class.
+    sync_class: Type[Any]
+
+    _function_abis: Dict[Type[Any], Dict[str, Dict[str, Any]]] = {}
+
+    def __init__(
+        self, contract_address: Optional[str], client: AsyncJSONRPCClient
+    ) -> None:
+        self.contract_name = self.sync_class.__name__
+        self.address = contract_address
+        self.client = client
+        sync_module = sys.modules[self.sync_class.__module__]
+        self.abi = sync_module.get_abi_json(self.contract_name)
+        if self.sync_class not in self._function_abis:
+            self._function_abis[self.sync_class] = function_abis_by_method(self.abi)
+        self._sync_contract: Optional[Any] = None
+
+    def assert_contract_is_instantiated(self) -> None:
+        if self.address is None:
+            raise Exception("contract has not been instantiated")
+
+    def sync_contract(self) -> Any:
+        """
+        The synchronous wrapper for the same contract, which is used to send transactions.
+        """
+        if self._sync_contract is None or self._sync_contract.address != self.address:
+            self._sync_contract = self.sync_class(self.address)
+        return self._sync_contract
+
+    async def run_sync(self, method_name: str, *args: Any, **kwargs: Any) -> Any:
+        method = getattr(self.sync_contract(), method_name)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(method, *args, **kwargs)
+        )
+
+    async def call(
+        self,
+        method_name: str,
+        args: List[Any],
+        block_number: Union[str, int] = "latest",
+    ) -> Any:
+        self.assert_contract_is_instantiated()
+        function_abi = self._function_abis[self.sync_class][method_name]
+        inputs = function_abi["inputs"]
+        input_types = [abi.abi_input_signature(item) for item in inputs]
+        selector = abi.encode_function_signature(function_abi)
+        assert selector is not None
+        data = "0x" + selector.replace("0x", "")
+        data += encode_abi(
+            input_types,
+            [format_input(item, value) for item, value in zip(inputs, args)],
+        ).hex()
+
+        return_data = await self.client.eth_call(
+            {"to": self.address, "data": data}, block_number
+        )
+
+        outputs = function_abi["outputs"]
+        output_types = [abi.abi_input_signature(item) for item in outputs]
+        values = decode_abi(output_types, return_data)
+        result = tuple(
+            format_output(item, value) for item, value in zip(outputs, values)
+        )
+        return result[0] if len(result) == 1 else result
+
+    async def verify_contract(self) -> Any:
+        return await self.run_sync("verify_contract")
+
+
+def async_read_method(name: str, sync_method: Any) -> Any:
+    signature = inspect.signature(sync_method)
+
+    async def method(self: AsyncContractWrapper, *args: Any, **kwargs: Any) -> Any:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        del arguments["self"]
+        block_number = arguments.pop("block_number")
+        return await self.call(name, list(arguments.values()), block_number)
+
+    method.__name__ = name
+    method.__signature__ = signature  # type: ignore
+    return method
+
+
+def async_write_method(name: str, sync_method: Any) -> Any:
+    async def method(self: AsyncContractWrapper, *args: Any, **kwargs: Any) -> Any:
+        return await self.run_sync(name, *args, **kwargs)
+
+    method.__name__ = name
+    method.__signature__ = inspect.signature(sync_method)  # type: ignore
+    return method
+
+
+def async_deploy_method(sync_method: Any) -> Any:
+    async def deploy(self: AsyncContractWrapper, *args: Any, **kwargs: Any) -> Any:
+        sync_contract = self.sync_contract()
+        result = await self.run_sync("deploy", *args, **kwargs)
+        # The synchronous wrapper points itself at the contract it deployed.
+        self.address = sync_contract.address
+        return result
+
+    deploy.__signature__ = inspect.signature(sync_method)  # type: ignore
+    return deploy
+
+
+def async_wrapper_class(sync_class: Type[Any]) -> Type[AsyncContractWrapper]:
+    """
+    Builds the asyncio variant of a generated wrapper class.
+    """
+    attributes: Dict[str, Any] = {
+        "sync_class": sync_class,
+        "__doc__": f"Asyncio variant of {sync_class.__module__}.{sync_class.__name__}",
+    }
+    for name, member in inspect.getmembers(sync_class, inspect.isfunction):
+        if name.startswith("_") or hasattr(AsyncContractWrapper, name):
+            continue
+        parameters = inspect.signature(member).parameters
+        if name == "deploy":
+            attributes[name] = async_deploy_method(member)
+        elif "block_number" in parameters:
+            attributes[name] = async_read_method(name, member)
+        elif "transaction_config" in parameters:
+            attributes[name] = async_write_method(name, member)
+    return type(f"Async{sync_class.__name__}", (AsyncContractWrapper,), attributes)
+
+
+AsyncInventoryFacet = async_wrapper_class(InventoryFacet.InventoryFacet)
+AsyncTerminusFacet = async_wrapper_class(TerminusFacet.TerminusFacet)
+AsyncMockERC721 = async_wrapper_class(MockERC721.MockERC721)
+AsyncMockERC20 = async_wrapper_class(MockERC20.MockERC20)
+AsyncDiamondLoupeFacet = async_wrapper_class(DiamondLoupeFacet.DiamondLoupeFacet)
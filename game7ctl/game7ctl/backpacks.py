@@ -0,0 +1,159 @@
+"""
+Bulk allocation of backpacks (subject token slots) to many subject tokens.
+
+addBackpackToSubject adds slots to a single subject token per transaction. allocate_backpacks gives the
+same backpack (slot_qty slots of slot_type with slot_uri) to every subject token in a list:
+- the slots each subject token already has are read in batches (see multicall.bulk_subject_token_slots).
+  Subject tokens which already have slot_qty slots of the backpack's slot type are skipped, and
+  subject tokens with fewer only get the missing ones, so running an allocation again is harmless.
+- the transactions are submitted through a TransactionPipeline, which keeps many of them pending at
+  once instead of waiting for each one to be mined before submitting the next.
+
+Every subject token gets a record, which the command line appends to a checkpoint file as soon as it
+is final. A run which is resumed with the same checkpoint file leaves out the subject tokens which it
+records as allocated or skipped.
+
+From the command line:
+    game7ctl inventory allocate-backpacks --network <network> --address <inventory> --sender <keystore> \\
+        --multicall-address <multicall> --token-range 1:20000 --slot-qty 4 --slot-type 1 --slot-uri <uri> \\
+        --checkpoint backpacks.jsonl
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, Iterator, List, Sequence, Set, Tuple
+
+from . import InventoryFacet, Multicall2, defaults, multicall, transactions
+from .transactions import TransactionPipeline
+
+DEFAULT_BATCH_SIZE = defaults.BACKPACK_BATCH_SIZE
+
+
+def completed_subject_tokens(checkpoint_path: str) -> Set[int]:
+    """
+    Returns the subject tokens which the given checkpoint file records as allocated or skipped.
+    """
+    subject_token_ids: Set[int] = set()
+    if not os.path.exists(checkpoint_path):
+        return subject_token_ids
+    with open(checkpoint_path, "r") as ifp:
+        for raw_line in ifp:
+            try:
+                record = json.loads(raw_line)
+            except json.JSONDecodeError:
+                # A run which was killed in the middle of writing a record leaves a partial line.
+                continue
+            if record.get("status") in ("ok", "skipped"):
+                subject_token_ids.add(record["subject_token_id"])
+    return subject_token_ids
+
+
+def backpack_slots(slots: Sequence[Dict[str, Any]], slot_type: int) -> int:
+    """
+    Counts the slots of the given type among the slots of a subject token (as slot_record returns them).
+    """
+    return sum(1 for slot in slots if slot["slot_type"] == slot_type)
+
+
+def allocate_backpacks(
+    inventory_contract: InventoryFacet.InventoryFacet,
+    multicall_contract: Multicall2.Multicall2,
+    pipeline: TransactionPipeline,
+    subject_token_ids: Sequence[int],
+    slot_qty: int,
+    slot_type: int,
+    slot_uri: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Gives each of the given subject tokens slot_qty slots of slot_type, and yields a record for each of
+    them once it is final:
+        {"subject_token_id": ..., "status": "ok" | "skipped" | "error", "existing_slots": ..., ...}
+
+    Allocations add "slots_added" and their receipt (see transactions.receipt_record), and failures add
+    their "error". Skipped subject tokens and subject tokens whose slots could not be read are yielded
+    right away, and allocations in the order they were submitted in as their transactions are mined.
+    """
+    if slot_qty < 1:
+        raise ValueError("Backpacks must have at least 1 slot")
+    pending: Deque[Tuple[Dict[str, Any], Future]] = deque()
+    for start in range(0, len(subject_token_ids), batch_size):
+        batch = subject_token_ids[start : start + batch_size]
+        for slots_record in multicall.bulk_subject_token_slots(
+            inventory_contract, multicall_contract, batch
+        ):
+            subject_token_id = slots_record["subject_token_id"]
+            record: Dict[str, Any] = {"subject_token_id": subject_token_id}
+            if "error" in slots_record:
+                record["status"] = "error"
+                record["error"] = f"Could not read slots: {slots_record['error']}"
+                yield record
+                continue
+
+            existing_slots = backpack_slots(slots_record["slots"], slot_type)
+            record["existing_slots"] = existing_slots
+            if existing_slots >= slot_qty:
+                record["status"] = "skipped"
+                yield record
+                continue
+
+            record["slots_added"] = slot_qty - existing_slots
+            # Blocks while the pipeline is full, which is where the allocation waits for the chain.
+            future = pipeline.submit(
+                inventory_contract.add_backpack_to_subject,
+                record["slots_added"],
+                subject_token_id,
+                slot_type,
+                slot_uri,
+            )
+            pending.append((record, future))
+            yield from transactions.settled_writes(pending)
+
+    pipeline.drain()
+    yield from transactions.settled_writes(pending)
+
+
+class AllocationStats:
+    def __init__(self) -> None:
+        self.counts = {"ok": 0, "skipped": 0, "error": 0}
+        self.transactions = 0
+        self.gas_used = 0
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.counts[record["status"]] += 1
+        if "tx_hash" in record:
+            self.transactions += 1
+            self.gas_used += record.get("gas_used") or 0
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Returns the totals of the allocation, and its throughput over the given number of seconds.
+        """
+        num_records = sum(self.counts.values())
+        return {
+            "allocated": self.counts["ok"],
+            "skipped": self.counts["skipped"],
+            "failed": self.counts["error"],
+            "transactions": self.transactions,
+            "gas_used": self.gas_used,
+            "average_gas_used": (
+                self.gas_used // self.transactions if self.transactions else 0
+            ),
+            "elapsed_seconds": round(elapsed, 3),
+            "subject_tokens_per_second": (
+                round(num_records / elapsed, 3) if elapsed > 0 else None
+            ),
+            "transactions_per_second": (
+                round(self.transactions / elapsed, 3) if elapsed > 0 else None
+            ),
+        }
+
+
+def read_subject_token_ids(path: str) -> List[int]:
+    """
+    Reads subject token IDs from a file with one ID per line.
+    """
+    with open(path, "r") as ifp:
+        return [int(line) for line in ifp if line.strip()]
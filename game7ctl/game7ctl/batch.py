@@ -0,0 +1,253 @@
+"""
+Batches of InventoryFacet operations read from JSONL manifests.
+
+Each line of a manifest is an operation of the form {"op": "create_slot", "args": {...}}. read_manifest
+validates a whole manifest before anything is run, and run_batch runs its operations in one process,
+with a single connection and signer, writing through a TransactionPipeline if one is given.
+
+From the command line:
+    game7ctl inventory run-batch --network <network> --address <inventory> --sender <keystore> \\
+        --file manifest.jsonl
+"""
+
+import inspect
+import json
+import os
+from collections import deque
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from . import InventoryFacet
+from .transactions import (
+    TransactionPipeline,
+    receipt_record,
+    record_failure,
+    settled_writes,
+)
+
+# InventoryFacet methods which are not contract operations and so cannot appear in a batch manifest.
+NON_OPERATIONS = ["deploy", "verify_contract", "assert_contract_is_instantiated"]
+
+READ = "read"
+WRITE = "write"
+
+
+def operation_kinds() -> Dict[str, str]:
+    """
+    Maps the name of every InventoryFacet wrapper method that can be used in a batch manifest to
+    whether it is a read (takes a block_number) or a write (takes a transaction_config).
+    """
+    kinds: Dict[str, str] = {}
+    for name, method in inspect.getmembers(
+        InventoryFacet.InventoryFacet, inspect.isfunction
+    ):
+        if name.startswith("_") or name in NON_OPERATIONS:
+            continue
+        parameters = inspect.signature(method).parameters
+        if "transaction_config" in parameters:
+            kinds[name] = WRITE
+        elif "block_number" in parameters:
+            kinds[name] = READ
+    return kinds
+
+
+OPERATION_KINDS = operation_kinds()
+
+
+class BatchOperation(NamedTuple):
+    line: int
+    op: str
+    args: Dict[str, Any]
+    address: Optional[str] = None
+    block_number: Optional[int] = None
+
+    @property
+    def kind(self) -> str:
+        return OPERATION_KINDS[self.op]
+
+
+def parse_operation(line_number: int, raw_line: str) -> BatchOperation:
+    """
+    Parses a single manifest line of the form:
+        {"op": "create_slot", "args": {"unequippable": false, "slot_type": 1, "slot_uri": "..."}}
+
+    "op" is the name of an InventoryFacet wrapper method (the subcommand name, e.g. "create-slot", is
+    also accepted) and "args" are its keyword arguments. Lines may also set "address" to target a
+    contract other than the default one and, for reads, "block_number".
+    """
+    try:
+        spec = json.loads(raw_line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Line {line_number}: invalid JSON: {e}")
+    if not isinstance(spec, dict) or "op" not in spec:
+        raise ValueError(f'Line {line_number}: expected an object with an "op" key')
+
+    op = str(spec["op"]).replace("-", "_")
+    if op not in OPERATION_KINDS:
+        raise ValueError(f"Line {line_number}: unknown operation: {spec['op']}")
+    args = spec.get("args", {})
+    if not isinstance(args, dict):
+        raise ValueError(f'Line {line_number}: "args" must be an object')
+
+    operation = BatchOperation(
+        line=line_number,
+        op=op,
+        args=args,
+        address=spec.get("address"),
+        block_number=spec.get("block_number"),
+    )
+    if operation.kind == WRITE and operation.block_number is not None:
+        raise ValueError(f"Line {line_number}: block_number can only be set on reads")
+
+    # Check the arguments against the wrapper method now, so that a typo late in the manifest is
+    # reported before any transactions are submitted.
+    method = getattr(InventoryFacet.InventoryFacet, op)
+    extra = {"transaction_config": None} if operation.kind == WRITE else {}
+    try:
+        inspect.signature(method).bind(None, **args, **extra)
+    except TypeError as e:
+        raise ValueError(f"Line {line_number}: invalid arguments for {op}: {e}")
+
+    return operation
+
+
+def read_manifest(
+    lines: Iterable[str],
+    start_line: int = 1,
+    skip_lines: Optional[Set[int]] = None,
+) -> List[BatchOperation]:
+    """
+    Parses a JSONL batch manifest, skipping blank lines, every line before start_line (line numbers
+    start at 1) and the lines in skip_lines. The whole manifest is validated before it is returned.
+    """
+    operations: List[BatchOperation] = []
+    for line_number, raw_line in enumerate(lines, start=1):
+        if line_number < start_line or not raw_line.strip():
+            continue
+        if skip_lines is not None and line_number in skip_lines:
+            continue
+        operations.append(parse_operation(line_number, raw_line))
+    return operations
+
+
+def completed_lines(results_path: str) -> Set[int]:
+    """
+    Returns the manifest lines of the successful operations recorded in the given results file.
+
+    Resuming a batch skips exactly these lines rather than restarting from a single line: when writes
+    are pipelined, operations after a failed one may already have gone through.
+    """
+    lines: Set[int] = set()
+    if not os.path.exists(results_path):
+        return lines
+    with open(results_path, "r") as ifp:
+        for raw_line in ifp:
+            try:
+                record = json.loads(raw_line)
+            except json.JSONDecodeError:
+                # A run which was killed in the middle of writing a record leaves a partial line.
+                continue
+            if record.get("status") == "ok":
+                lines.add(record["line"])
+    return lines
+
+
+def run_operation(
+    contract: InventoryFacet.InventoryFacet,
+    operation: BatchOperation,
+    transaction_config: Dict[str, Any],
+) -> Dict[str, Any]:
+    method: Callable = getattr(contract, operation.op)
+    if operation.kind == WRITE:
+        receipt = method(**operation.args, transaction_config=transaction_config)
+        return receipt_record(receipt)
+
+    block_number = (
+        "latest" if operation.block_number is None else operation.block_number
+    )
+    return {"result": method(**operation.args, block_number=block_number)}
+
+
+def run_batch(
+    operations: Iterable[BatchOperation],
+    transaction_config: Dict[str, Any],
+    default_address: Optional[str] = None,
+    continue_on_error: bool = False,
+    pipeline: Optional[TransactionPipeline] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Runs the given operations in order and yields one result record per operation, in manifest order:
+        {"line": ..., "op": ..., "status": "ok" | "error", ...}
+
+    Reads add their "result", writes add their receipt (transaction hash, block number, nonce, gas used,
+    status and decoded events) and failures add their "error". Unless continue_on_error is set, the batch
+    stops after the first failure.
+
+    All operations use the same signer. Without a pipeline, every write waits for its confirmation and, if
+    transaction_config fixes a nonce, it is used for the first write and incremented for each subsequent
+    one. With a pipeline, writes are submitted through it and only reads wait for the writes before them
+    to be mined, so that they observe their effects. Writes which were already submitted when a failure
+    is detected are still seen through and recorded.
+    """
+    transaction_config = dict(transaction_config)
+    contracts: Dict[str, InventoryFacet.InventoryFacet] = {}
+    pending: Deque[Tuple[Dict[str, Any], Future]] = deque()
+    stopped = False
+
+    for operation in operations:
+        if pipeline is not None and operation.kind == READ:
+            pipeline.drain()
+        for record in settled_writes(pending):
+            yield record
+            stopped = stopped or (record["status"] == "error" and not continue_on_error)
+        if stopped:
+            break
+
+        record = {"line": operation.line, "op": operation.op}
+        address = operation.address or default_address
+        try:
+            if address is None:
+                raise ValueError('No contract address: set --address or "address"')
+            if address not in contracts:
+                contracts[address] = InventoryFacet.InventoryFacet(address)
+            if pipeline is not None and operation.kind == WRITE:
+                method = getattr(contracts[address], operation.op)
+                pending.append((record, pipeline.submit(method, **operation.args)))
+                continue
+            record.update(
+                run_operation(contracts[address], operation, transaction_config)
+            )
+            record["status"] = "ok"
+        except Exception as e:
+            record_failure(record, e)
+
+        # Every submitted transaction uses up its nonce, whether or not it succeeded.
+        if "nonce" in transaction_config and "tx_hash" in record:
+            transaction_config["nonce"] += 1
+
+        if pending:
+            # Keep records in manifest order behind the pipelined writes before this one.
+            failed: Future = Future()
+            failed.set_exception(RuntimeError(record["error"]))
+            pending.append((record, failed))
+            continue
+
+        yield record
+        if record["status"] == "error" and not continue_on_error:
+            break
+
+    if pipeline is not None:
+        pipeline.drain()
+    yield from settled_writes(pending)
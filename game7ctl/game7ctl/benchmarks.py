@@ -0,0 +1,813 @@
+"""
+Benchmarks for game7ctl.
+
+Each benchmark returns a JSON-serializable dictionary so that results from different versions of
+game7ctl can be stored and compared.
+
+Benchmarks which talk to a chain expect a local development node. For the latency benchmarks, the node
+must outlive the benchmark processes: start ganache or anvil on the port of the brownie network you
+benchmark against, so that every process attaches to the same chain instead of launching its own.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from brownie import network
+from brownie.network.contract import ContractContainer
+from brownie.project.main import Project
+
+from . import (
+    InventoryFacet,
+    MockERC20,
+    MockERC721,
+    MockTerminus,
+    OwnershipFacet,
+    artifacts,
+    cli,
+)
+from .dao import systems
+from .transactions import TransactionPipeline
+from .version import VERSION
+
+
+def deploy_benchmark(
+    iterations: int, transaction_config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Deploys OwnershipFacet (which has no constructor arguments) repeatedly, first creating a fresh
+    brownie Project for every deployment (the behavior of contract_from_build before projects were
+    shared) and then through the shared project that contract_from_build uses now.
+    """
+    build = artifacts.get_build(OwnershipFacet.BUILD_DIRECTORY, "OwnershipFacet")
+
+    fresh_start = time.perf_counter()
+    for _ in range(iterations):
+        project = Project("moonworm", Path(OwnershipFacet.PROJECT_DIRECTORY))
+        ContractContainer(project, dict(build)).deploy(transaction_config)
+    fresh_seconds = time.perf_counter() - fresh_start
+
+    artifacts.reset_projects()
+    shared_start = time.perf_counter()
+    for _ in range(iterations):
+        OwnershipFacet.OwnershipFacet(None).deploy(transaction_config)
+    shared_seconds = time.perf_counter() - shared_start
+
+    return {
+        "benchmark": "deploy",
+        "version": VERSION,
+        "iterations": iterations,
+        "fresh_project": {
+            "total_seconds": fresh_seconds,
+            "seconds_per_deploy": fresh_seconds / iterations,
+        },
+        "shared_project": {
+            "total_seconds": shared_seconds,
+            "seconds_per_deploy": shared_seconds / iterations,
+        },
+        "speedup": fresh_seconds / shared_seconds if shared_seconds > 0 else None,
+    }
+
+
+# Runs in a fresh interpreter so that peak RSS reflects a single loading strategy.
+ARTIFACT_LOADING_SCRIPT = """
+import glob, json, os, resource, sys, time
+from game7ctl import artifacts
+
+mode, build_directory = sys.argv[1], sys.argv[2]
+start = time.perf_counter()
+if mode == "full":
+    abis = {}
+    for path in glob.glob(os.path.join(build_directory, "*.json")):
+        with open(path, "r") as ifp:
+            abis[path] = json.load(ifp).get("abi", [])
+elif mode == "keys":
+    abis = artifacts.load_build_directory(build_directory, ["abi"])
+seconds = time.perf_counter() - start
+max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+json.dump({"seconds": seconds, "max_rss_kb": max_rss_kb}, sys.stdout)
+"""
+
+
+def artifact_loading_benchmark(build_directory: str, iterations: int) -> Dict[str, Any]:
+    """
+    Compares loading the ABIs of all build artifacts by parsing each artifact in full (what
+    abi.project_abis used to do) against extracting only the ABIs with artifacts.load_build_directory.
+
+    Each measurement runs in its own interpreter. The "baseline" mode imports the same modules but
+    loads nothing, so that its peak RSS can be subtracted from the others.
+    """
+    result: Dict[str, Any] = {
+        "benchmark": "artifacts",
+        "version": VERSION,
+        "build_directory": build_directory,
+        "iterations": iterations,
+    }
+    for mode in ["baseline", "full", "keys"]:
+        runs = []
+        for _ in range(iterations):
+            output = subprocess.run(
+                [sys.executable, "-c", ARTIFACT_LOADING_SCRIPT, mode, build_directory],
+                check=True,
+                capture_output=True,
+            ).stdout
+            runs.append(json.loads(output))
+        result[mode] = {
+            "min_seconds": min(run["seconds"] for run in runs),
+            "max_rss_kb": max(run["max_rss_kb"] for run in runs),
+        }
+    return result
+
+
+# Representative game7ctl commands, described by the InventoryFacet method their handler calls.
+# Token 1 and slot 1 exist on the chain prepared by deploy_inventory_fixture.
+COMMANDS: Dict[str, Dict[str, Any]] = {
+    "inventory num-slots": {
+        "method": "num_slots",
+        "arguments": {},
+        "transact": False,
+    },
+    "inventory get-equipped-item": {
+        "method": "get_equipped_item",
+        "arguments": {"subject_token_id": 1, "slot": 1},
+        "transact": False,
+    },
+    "inventory create-slot": {
+        "method": "create_slot",
+        "arguments": {"unequippable": False, "slot_type": 1, "slot_uri": "benchmark"},
+        "transact": True,
+    },
+}
+
+PHASES = ["import", "connect", "keystore", "abi", "rpc"]
+
+# Measures the phases of a single command in a fresh interpreter. Reads its specification as JSON from
+# stdin (so that keystore passwords do not appear in process listings) and writes timings to stdout.
+COLD_COMMAND_SCRIPT = """
+import json, sys, time
+
+start = time.perf_counter()
+from game7ctl import benchmarks
+import_seconds = time.perf_counter() - start
+
+spec = json.load(sys.stdin)
+timings = benchmarks.command_phases(spec, connect=True)
+timings["import"] = import_seconds
+json.dump(timings, sys.stdout)
+"""
+
+
+def deploy_inventory_fixture(owner: Any) -> str:
+    """
+    Deploys an Inventory Diamond administered by the owner account, mints subject token 1 to the owner,
+    and creates slot 1. Returns the address of the Diamond.
+    """
+    transaction_config = {"from": owner}
+
+    subject = MockERC721.MockERC721(None)
+    subject.deploy(transaction_config)
+
+    payment_token = MockERC20.MockERC20(None)
+    payment_token.deploy("benchmark", "benchmark", transaction_config)
+
+    terminus = MockTerminus.MockTerminus(None)
+    terminus.deploy(transaction_config)
+    terminus.set_payment_token(payment_token.address, transaction_config)
+    terminus.set_pool_base_price(1, transaction_config)
+    payment_token.mint(owner.address, 999999, transaction_config)
+    payment_token.approve(terminus.address, 2**256 - 1, transaction_config)
+    terminus.create_pool_v1(1, False, True, transaction_config)
+    admin_pool_id = terminus.total_pools()
+    terminus.mint(owner.address, admin_pool_id, 1, "", transaction_config)
+
+    deployment = systems(
+        terminus.address, admin_pool_id, subject.address, transaction_config
+    )
+    diamond_address = deployment["contracts"]["Diamond"]
+
+    subject.mint(owner.address, 1, transaction_config)
+    inventory = InventoryFacet.InventoryFacet(diamond_address)
+    inventory.create_slot(False, 1, "benchmark", transaction_config)
+
+    return diamond_address
+
+
+def command_phases(spec: Dict[str, Any], connect: bool) -> Dict[str, Optional[float]]:
+    """
+    Runs a single command the way its game7ctl handler does, timing each phase. The keystore phase is
+    None for read commands and for commands signed by an unlocked development account.
+    """
+    command = COMMANDS[spec["command"]]
+    timings: Dict[str, Optional[float]] = {phase: None for phase in PHASES}
+
+    if connect:
+        start = time.perf_counter()
+        network.connect(spec["network"])
+        timings["connect"] = time.perf_counter() - start
+
+    transaction_config = None
+    if command["transact"]:
+        if spec.get("sender") is None:
+            transaction_config = {"from": network.accounts[0]}
+        else:
+            start = time.perf_counter()
+            signer = network.accounts.load(spec["sender"], spec.get("password"))
+            timings["keystore"] = time.perf_counter() - start
+            transaction_config = {"from": signer}
+
+    start = time.perf_counter()
+    contract = InventoryFacet.InventoryFacet(spec["address"])
+    timings["abi"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    method = getattr(contract, command["method"])
+    if transaction_config is None:
+        method(**command["arguments"])
+    else:
+        method(**command["arguments"], transaction_config=transaction_config)
+    timings["rpc"] = time.perf_counter() - start
+
+    return timings
+
+
+def summarize(runs: List[Dict[str, Optional[float]]]) -> Dict[str, Optional[float]]:
+    """
+    Returns the median of each timing over the given runs (None if a timing was never measured).
+    """
+    summary: Dict[str, Optional[float]] = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs if run[key] is not None]
+        summary[key] = statistics.median(values) if values else None
+    return summary
+
+
+def package_environment() -> Dict[str, str]:
+    """
+    Environment for child processes, making sure they import this copy of game7ctl.
+    """
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment = dict(os.environ)
+    python_path = [package_parent]
+    if environment.get("PYTHONPATH"):
+        python_path.append(environment["PYTHONPATH"])
+    environment["PYTHONPATH"] = os.pathsep.join(python_path)
+    return environment
+
+
+def timed_run(argv: List[str], stdin: Optional[bytes] = None) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        argv,
+        input=stdin,
+        check=True,
+        capture_output=True,
+        env=package_environment(),
+    )
+    return time.perf_counter() - start
+
+
+def startup_benchmark(iterations: int) -> Dict[str, Any]:
+    """
+    Measures how long it takes to get to the point where game7ctl can dispatch a command.
+
+    Cold timings are wall-clock times of fresh processes (with the bare interpreter startup reported
+    separately). Warm timings repeat argument parsing in this process, with all modules imported.
+    """
+    cold_commands = {
+        "interpreter": [sys.executable, "-c", "pass"],
+        "game7ctl --help": [sys.executable, "-m", "game7ctl.cli", "--help"],
+        "game7ctl inventory --help": [
+            sys.executable,
+            "-m",
+            "game7ctl.cli",
+            "inventory",
+            "--help",
+        ],
+    }
+    cold = {
+        name: statistics.median(timed_run(argv) for _ in range(iterations))
+        for name, argv in cold_commands.items()
+    }
+
+    warm: Dict[str, float] = {}
+    for argv in [["--help"], ["inventory", "num-slots", "--network", "development"]]:
+        cli.generate_cli(argv)
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            parser = cli.generate_cli(argv)
+            if argv == ["--help"]:
+                parser.format_help()
+            else:
+                parser.parse_args(argv)
+            timings.append(time.perf_counter() - start)
+        warm[" ".join(["game7ctl"] + argv[:2])] = statistics.median(timings)
+
+    return {"cold_seconds": cold, "warm_seconds": warm}
+
+
+def commands_benchmark(
+    network_name: str,
+    address: str,
+    iterations: int,
+    sender: Optional[str] = None,
+    password: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Measures representative read and write commands against a deployed Inventory.
+
+    Cold runs execute each command in a fresh process and break its time down into PHASES, along with
+    the end-to-end wall-clock time of the equivalent game7ctl invocation for read commands. Warm runs
+    repeat the command in this process on an established connection.
+    """
+    results: Dict[str, Any] = {}
+    for name, command in COMMANDS.items():
+        spec = {
+            "command": name,
+            "network": network_name,
+            "address": address,
+            "sender": sender,
+            "password": password,
+        }
+
+        cold_runs = []
+        for _ in range(iterations):
+            output = subprocess.run(
+                [sys.executable, "-c", COLD_COMMAND_SCRIPT],
+                input=json.dumps(spec).encode(),
+                check=True,
+                capture_output=True,
+                env=package_environment(),
+            ).stdout
+            cold_runs.append(json.loads(output))
+
+        end_to_end = None
+        if not command["transact"]:
+            argv = [sys.executable, "-m", "game7ctl.cli", *name.split()]
+            argv += ["--network", network_name, "--address", address]
+            for argument, value in command["arguments"].items():
+                argv += [f"--{argument.replace('_', '-')}", str(value)]
+            end_to_end = statistics.median(timed_run(argv) for _ in range(iterations))
+
+        warm_runs = [command_phases(spec, connect=False) for _ in range(iterations)]
+
+        results[name] = {
+            "cold": {"phases": summarize(cold_runs), "end_to_end_seconds": end_to_end},
+            "warm": {"phases": summarize(warm_runs)},
+        }
+    return results
+
+
+def latency_benchmark(
+    network_name: str,
+    iterations: int,
+    address: Optional[str] = None,
+    sender: Optional[str] = None,
+    password: Optional[str] = None,
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "benchmark": "latency",
+        "version": VERSION,
+        "python": platform.python_version(),
+        "network": network_name,
+        "iterations": iterations,
+        "startup": startup_benchmark(iterations),
+    }
+
+    network.connect(network_name)
+    if address is None:
+        if sender is None:
+            owner = network.accounts[0]
+        else:
+            owner = network.accounts.load(sender, password)
+        address = deploy_inventory_fixture(owner)
+    result["address"] = address
+    result["commands"] = commands_benchmark(
+        network_name, address, iterations, sender, password
+    )
+    return result
+
+
+def pipeline_benchmark(
+    count: int, windows: List[int], transaction_config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Submits count create_slot transactions to a fresh Inventory Diamond, first one at a time through
+    the wrapper (waiting for each confirmation) and then through a TransactionPipeline for each of the
+    given numbers of transactions in flight.
+    """
+    owner = transaction_config["from"]
+    inventory = InventoryFacet.InventoryFacet(deploy_inventory_fixture(owner))
+    sequential_config = {**transaction_config, "silent": True}
+
+    start = time.perf_counter()
+    for i in range(count):
+        inventory.create_slot(False, 1, f"sequential_{i}", sequential_config)
+    sequential_seconds = time.perf_counter() - start
+
+    result: Dict[str, Any] = {
+        "benchmark": "pipeline",
+        "version": VERSION,
+        "network": network.show_active(),
+        "transactions": count,
+        "sequential": {
+            "seconds": sequential_seconds,
+            "transactions_per_second": count / sequential_seconds,
+        },
+        "pipelined": {},
+    }
+    for window in windows:
+        start = time.perf_counter()
+        with TransactionPipeline(
+            owner, max_in_flight=window, transaction_config=transaction_config
+        ) as pipeline:
+            futures = [
+                pipeline.submit(inventory.create_slot, False, 1, f"pipelined_{i}")
+                for i in range(count)
+            ]
+        seconds = time.perf_counter() - start
+        result["pipelined"][str(window)] = {
+            "seconds": seconds,
+            "transactions_per_second": count / seconds,
+            "failed": sum(1 for future in futures if future.exception() is not None),
+            "stats": pipeline.stats,
+        }
+    return result
+
+
+def async_reads_benchmark(
+    count: int, concurrencies: List[int], transaction_config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Makes count get_equipped_item reads against a fresh Inventory Diamond: one at a time through the
+    synchronous wrapper, from a pool of threads through the synchronous wrapper, and through
+    AsyncInventoryFacet for each of the given concurrency limits.
+    """
+    import asyncio
+
+    from .async_contracts import AsyncInventoryFacet, AsyncJSONRPCClient
+
+    owner = transaction_config["from"]
+    address = deploy_inventory_fixture(owner)
+    inventory = InventoryFacet.InventoryFacet(address)
+
+    def rate(seconds: float) -> Dict[str, float]:
+        return {"seconds": seconds, "calls_per_second": count / seconds}
+
+    start = time.perf_counter()
+    for _ in range(count):
+        inventory.get_equipped_item(1, 1)
+    sequential_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(concurrencies)) as executor:
+        list(executor.map(lambda _: inventory.get_equipped_item(1, 1), range(count)))
+    threaded_seconds = time.perf_counter() - start
+
+    async def gather_reads(max_concurrency: int) -> float:
+        async with AsyncJSONRPCClient.for_active_network(
+            max_concurrency=max_concurrency
+        ) as client:
+            async_inventory = AsyncInventoryFacet(address, client)
+            # The first call opens the session, which is not what is being measured.
+            await async_inventory.get_equipped_item(1, 1)
+            start = time.perf_counter()
+            await asyncio.gather(
+                *[async_inventory.get_equipped_item(1, 1) for _ in range(count)]
+            )
+            return time.perf_counter() - start
+
+    result: Dict[str, Any] = {
+        "benchmark": "async-reads",
+        "version": VERSION,
+        "network": network.show_active(),
+        "calls": count,
+        "sync_sequential": rate(sequential_seconds),
+        "sync_threaded": {"threads": max(concurrencies), **rate(threaded_seconds)},
+        "async": {},
+    }
+    for max_concurrency in concurrencies:
+        seconds = asyncio.run(gather_reads(max_concurrency))
+        result["async"][str(max_concurrency)] = rate(seconds)
+    return result
+
+
+def synthetic_item_logs(count: int) -> List[Dict[str, Any]]:
+    """
+    Builds count raw ItemEquipped logs, in the form eth_getLogs returns them, with random arguments.
+    """
+    try:
+        from eth_abi import encode as encode_abi
+    except ImportError:
+        # eth-abi<4
+        from eth_abi import encode_abi  # type: ignore
+    from hexbytes import HexBytes
+
+    from . import inventory_events, logs
+
+    topic = HexBytes(logs.event_topic(inventory_events.ITEM_EQUIPPED_ABI))
+    rng = random.Random(0)
+    raw_logs = []
+    for i in range(count):
+        item_address = "0x" + rng.getrandbits(160).to_bytes(20, "big").hex()
+        raw_logs.append(
+            {
+                "address": "0x" + "11" * 20,
+                "topics": [
+                    topic,
+                    HexBytes(encode_abi(["uint256"], [rng.getrandbits(64)])),
+                    HexBytes(encode_abi(["uint256"], [rng.randint(1, 100)])),
+                    HexBytes(encode_abi(["address"], [item_address])),
+                ],
+                "data": HexBytes(
+                    encode_abi(
+                        ["uint256", "uint256", "uint256", "address"],
+                        [20, 0, rng.getrandbits(80), item_address],
+                    )
+                ),
+                "blockNumber": i // 10,
+                "blockHash": HexBytes(rng.getrandbits(256).to_bytes(32, "big")),
+                "transactionHash": HexBytes(rng.getrandbits(256).to_bytes(32, "big")),
+                "transactionIndex": i % 10,
+                "logIndex": i % 10,
+                "removed": False,
+            }
+        )
+    return raw_logs
+
+
+def decode_logs_benchmark(count: int, batch_size: int) -> Dict[str, Any]:
+    """
+    Decodes count synthetic ItemEquipped logs with web3's ContractEvent.process_log, with
+    logs.decode_log, and in batches of batch_size logs with log_columns.decode_logs, and reports the
+    cost per log of each.
+    """
+    from web3 import Web3
+
+    from . import inventory_events, log_columns, logs
+
+    raw_logs = synthetic_item_logs(count)
+    event_abi = inventory_events.ITEM_EQUIPPED_ABI
+    item_equipped = Web3().eth.contract(abi=[event_abi]).events.ItemEquipped()
+
+    def rate(seconds: float) -> Dict[str, float]:
+        return {
+            "seconds": seconds,
+            "microseconds_per_log": seconds / count * 1e6,
+            "logs_per_second": count / seconds,
+        }
+
+    start = time.perf_counter()
+    for log in raw_logs:
+        item_equipped.process_log(log)
+    web3_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for log in raw_logs:
+        logs.decode_log(event_abi, log)
+    decode_log_seconds = time.perf_counter() - start
+
+    layout = log_columns.event_layout(event_abi)
+    start = time.perf_counter()
+    for batch_start in range(0, count, batch_size):
+        log_columns.decode_logs(
+            layout, raw_logs[batch_start : batch_start + batch_size]
+        )
+    columns_seconds = time.perf_counter() - start
+
+    return {
+        "benchmark": "decode-logs",
+        "version": VERSION,
+        "event": event_abi["name"],
+        "logs": count,
+        "batch_size": batch_size,
+        "web3_process_log": rate(web3_seconds),
+        "decode_log": rate(decode_log_seconds),
+        "log_columns": rate(columns_seconds),
+        "speedup_over_web3": web3_seconds / columns_seconds,
+    }
+
+
+def transaction_config_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Benchmarks run against development chains, so they default to the first unlocked account if no
+    keystore is provided.
+    """
+    if args.sender is None:
+        return {"from": network.accounts[0]}
+    return {"from": network.accounts.load(args.sender, args.password)}
+
+
+def write_result(result: Dict[str, Any], args: argparse.Namespace) -> None:
+    if args.outfile is not None:
+        with args.outfile:
+            json.dump(result, args.outfile)
+    json.dump(result, sys.stdout, indent=4)
+
+
+def handle_deploy(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    transaction_config = transaction_config_from_args(args)
+    result = deploy_benchmark(args.iterations, transaction_config)
+    write_result(result, args)
+
+
+def handle_artifacts(args: argparse.Namespace) -> None:
+    result = artifact_loading_benchmark(args.build_directory, args.iterations)
+    write_result(result, args)
+
+
+def handle_latency(args: argparse.Namespace) -> None:
+    result = latency_benchmark(
+        args.network, args.iterations, args.address, args.sender, args.password
+    )
+    write_result(result, args)
+
+
+def handle_pipeline(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    transaction_config = transaction_config_from_args(args)
+    result = pipeline_benchmark(
+        args.transactions, args.max_in_flight, transaction_config
+    )
+    write_result(result, args)
+
+
+def handle_async_reads(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    transaction_config = transaction_config_from_args(args)
+    result = async_reads_benchmark(args.calls, args.max_concurrency, transaction_config)
+    write_result(result, args)
+
+
+def handle_decode_logs(args: argparse.Namespace) -> None:
+    result = decode_logs_benchmark(args.logs, args.batch_size)
+    write_result(result, args)
+
+
+def add_output_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-o",
+        "--outfile",
+        type=argparse.FileType("w"),
+        default=None,
+        help="(Optional) file to write benchmark results to",
+    )
+
+
+def add_benchmark_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--network",
+        default="development",
+        help="Name of brownie network to run the benchmark against (default: development)",
+    )
+    parser.add_argument(
+        "--sender",
+        required=False,
+        default=None,
+        help="Path to keystore file for transaction sender (default: first unlocked account on the network)",
+    )
+    parser.add_argument(
+        "--password",
+        required=False,
+        help="Password to keystore file (if you do not provide it, you will be prompted for it)",
+    )
+    add_output_argument(parser)
+
+
+def generate_cli() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks for game7ctl")
+    parser.set_defaults(func=lambda _: parser.print_help())
+    subcommands = parser.add_subparsers()
+
+    deploy_parser = subcommands.add_parser(
+        "deploy",
+        help="Measure deployment throughput through contract_from_build",
+        description="Measure deployment throughput through contract_from_build",
+    )
+    add_benchmark_arguments(deploy_parser)
+    deploy_parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=10,
+        help="Number of deployments to make in each configuration (default: 10)",
+    )
+    deploy_parser.set_defaults(func=handle_deploy)
+
+    artifacts_parser = subcommands.add_parser(
+        "artifacts",
+        help="Measure time and peak memory of loading ABIs from build artifacts",
+        description="Measure time and peak memory of loading ABIs from build artifacts",
+    )
+    artifacts_parser.add_argument(
+        "--build-directory",
+        default=OwnershipFacet.BUILD_DIRECTORY,
+        help=f"Directory containing brownie build artifacts (default: {OwnershipFacet.BUILD_DIRECTORY})",
+    )
+    artifacts_parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=5,
+        help="Number of runs for each loading strategy (default: 5)",
+    )
+    add_output_argument(artifacts_parser)
+    artifacts_parser.set_defaults(func=handle_artifacts)
+
+    latency_parser = subcommands.add_parser(
+        "latency",
+        help="Measure startup and per-command latency of game7ctl",
+        description="Measure cold and warm startup of game7ctl and the latency of representative read and write commands, broken down into import, connection, keystore, ABI and RPC time",
+    )
+    add_benchmark_arguments(latency_parser)
+    latency_parser.add_argument(
+        "--address",
+        required=False,
+        default=None,
+        help="Address of an Inventory Diamond with subject token 1 and slot 1, administered by the sender (default: deploy a fresh one)",
+    )
+    latency_parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=5,
+        help="Number of runs per measurement (default: 5)",
+    )
+    latency_parser.set_defaults(func=handle_latency)
+
+    pipeline_parser = subcommands.add_parser(
+        "pipeline",
+        help="Measure transaction throughput with and without pipelined submission",
+        description="Measure transaction throughput of sequential submission through the contract wrappers against pipelined submission with a local nonce manager",
+    )
+    add_benchmark_arguments(pipeline_parser)
+    pipeline_parser.add_argument(
+        "-n",
+        "--transactions",
+        type=int,
+        default=100,
+        help="Number of transactions to submit in each configuration (default: 100)",
+    )
+    pipeline_parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        nargs="+",
+        default=[4, 16, 64],
+        help="Numbers of pending transactions to benchmark the pipeline with (default: 4 16 64)",
+    )
+    pipeline_parser.set_defaults(func=handle_pipeline)
+
+    async_reads_parser = subcommands.add_parser(
+        "async-reads",
+        help="Measure read throughput of the synchronous and asyncio contract wrappers",
+        description="Measure read throughput of the synchronous contract wrappers, sequentially and from a pool of threads, against the asyncio wrappers. Requires aiohttp.",
+    )
+    add_benchmark_arguments(async_reads_parser)
+    async_reads_parser.add_argument(
+        "-n",
+        "--calls",
+        type=int,
+        default=1000,
+        help="Number of reads to make in each configuration (default: 1000)",
+    )
+    async_reads_parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        nargs="+",
+        default=[16, 64, 256],
+        help="Concurrency limits to benchmark the asyncio wrappers with (default: 16 64 256)",
+    )
+    async_reads_parser.set_defaults(func=handle_async_reads)
+
+    decode_logs_parser = subcommands.add_parser(
+        "decode-logs",
+        help="Measure the cost per log of decoding Inventory event logs",
+        description="Measure the cost per log of decoding synthetic ItemEquipped logs with web3's process_log, with logs.decode_log and in bulk with log_columns.decode_logs. Does not need a chain. Requires numpy.",
+    )
+    decode_logs_parser.add_argument(
+        "-n",
+        "--logs",
+        type=int,
+        default=100000,
+        help="Number of logs to decode (default: 100000)",
+    )
+    decode_logs_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10000,
+        help="Number of logs per log_columns.decode_logs call (default: 10000)",
+    )
+    add_output_argument(decode_logs_parser)
+    decode_logs_parser.set_defaults(func=handle_decode_logs)
+
+    return parser
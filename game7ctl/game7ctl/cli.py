@@ -1,24 +1,57 @@
 import argparse
-from typing import Callable
-
-from .dao import generate_cli as core_generate_cli
-from .InventoryFacet import generate_cli as inventory_generate_cli
-from .DiamondLoupeFacet import generate_cli as dloupe_generate_cli
-from .DiamondCutFacet import generate_cli as dcut_generate_cli
-from .MockERC721 import generate_cli as erc721_generate_cli
-from .OwnershipFacet import generate_cli as own_generate_cli
-from .TerminusFacet import generate_cli as terminus_generate_cli
+import importlib
+import sys
+from typing import Callable, Dict, List, Optional
+
 from .version import VERSION
 
+# Maps each game7ctl subcommand to the module (relative to this package) which defines its command-line
+# interface through a generate_cli function ("module:function" if the function has a different name).
+# Modules are only imported when their subcommand is selected - importing them pulls in brownie and the
+# contract interfaces, which makes up most of the startup time of the tool.
+SUBCOMMANDS: Dict[str, str] = {
+    "dao": "dao",
+    "inventory": "inventory",
+    "diamond-loupe": "DiamondLoupeFacet",
+    "diamond-cut": "DiamondCutFacet",
+    "ownership": "OwnershipFacet",
+    "erc721": "MockERC721",
+    "terminus": "TerminusFacet",
+    "multicall": "Multicall2",
+    "benchmark": "benchmarks",
+    "shell": "session:generate_shell_cli",
+    "serve": "session:generate_serve_cli",
+}
+
 
 def add_subparser(cmd_name: str, subparser: argparse.ArgumentParser, cli_gen: Callable):
     subcommand = cli_gen()
     subparser.add_parser(cmd_name, parents=[subcommand], add_help=False)
 
 
-def generate_cli() -> argparse.ArgumentParser:
+def selected_subcommand(argv: List[str]) -> Optional[str]:
+    """
+    Returns the game7ctl subcommand selected by the given command-line arguments, if any. The top-level
+    parser only has flags which take no values, so the subcommand is the first positional argument.
+    """
+    for arg in argv:
+        if not arg.startswith("-"):
+            return arg if arg in SUBCOMMANDS else None
+    return None
+
+
+def load_subcommand_cli(cmd_name: str) -> Callable[[], argparse.ArgumentParser]:
+    module_name, _, function_name = SUBCOMMANDS[cmd_name].partition(":")
+    module = importlib.import_module(f".{module_name}", __package__)
+    return getattr(module, function_name or "generate_cli")
+
+
+def generate_cli(argv: Optional[List[str]] = None) -> argparse.ArgumentParser:
     """
     Generates the argument parsers for the game7ctl command-line tool.
+
+    If argv is given, only the subcommand it selects is fully loaded and every other subcommand is
+    registered by name alone. Otherwise, all subcommands are loaded.
     """
     parser = argparse.ArgumentParser(
         description="Development tools for Game7 smart contracts"
@@ -30,17 +63,12 @@ def generate_cli() -> argparse.ArgumentParser:
 
     subparsers = parser.add_subparsers()
 
-    add_subparser(
-        "dao",
-        subparsers,
-        core_generate_cli,
-    )
-    add_subparser("inventory", subparsers, inventory_generate_cli)
-    add_subparser("diamond-loupe", subparsers, dloupe_generate_cli)
-    add_subparser("diamond-cut", subparsers, dcut_generate_cli)
-    add_subparser("ownership", subparsers, own_generate_cli)
-    add_subparser("erc721", subparsers, erc721_generate_cli)
-    add_subparser("terminus", subparsers, terminus_generate_cli)
+    selected = None if argv is None else selected_subcommand(argv)
+    for cmd_name in SUBCOMMANDS:
+        if argv is None or cmd_name == selected:
+            add_subparser(cmd_name, subparsers, load_subcommand_cli(cmd_name))
+        else:
+            subparsers.add_parser(cmd_name, add_help=False)
 
     return parser
 
@@ -49,8 +77,9 @@ def main() -> None:
     """
     Executes the game7ctl command line tool
     """
-    parser = generate_cli()
-    args = parser.parse_args()
+    argv = sys.argv[1:]
+    parser = generate_cli(argv)
+    args = parser.parse_args(argv)
     args.func(args)
 
 
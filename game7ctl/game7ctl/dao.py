@@ -13,7 +13,7 @@ from . import (
     DiamondLoupeFacet,
     InventoryFacet,
     OwnershipFacet,
-    abi,
+    selector_index,
 )
 
 FACETS: Dict[str, Any] = {
@@ -66,33 +66,21 @@ FACET_ACTIONS: Dict[str, int] = {"add": 0, "replace": 1, "remove": 2}
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
 
-def facet_cut(
-    diamond_address: str,
+def facet_selectors(
     facet_name: str,
-    facet_address: str,
-    action: str,
-    transaction_config: Dict[str, Any],
-    initializer_address: str = ZERO_ADDRESS,
     ignore_methods: Optional[List[str]] = None,
     ignore_selectors: Optional[List[str]] = None,
     methods: Optional[List[str]] = None,
     selectors: Optional[List[str]] = None,
     feature: Optional[EngineFeatures] = None,
-    initializer_args: Optional[List[Any]] = None,
-) -> Any:
+    project_dir: Optional[str] = None,
+) -> List[str]:
     """
-    Cuts the given facet onto the given Diamond contract.
+    Returns the selectors of the given facet which facet_cut cuts onto a Diamond contract.
 
     Resolves selectors in the precedence order defined by FACET_PRECEDENCE (highest precedence first).
+    Selectors are read from the project's persistent selector index (see game7ctl.selector_index).
     """
-    assert (
-        facet_name in FACETS
-    ), f"Invalid facet: {facet_name}. Choices: {','.join(FACETS)}."
-
-    assert (
-        action in FACET_ACTIONS
-    ), f"Invalid cut action: {action}. Choices: {','.join(FACET_ACTIONS)}."
-
     facet_precedence = FACET_PRECEDENCE
     if feature is not None:
         facet_precedence = DIAMOND_FACET_PRECEDENCE + FEATURE_FACETS[feature]
@@ -106,36 +94,34 @@ def facet_cut(
     if selectors is None:
         selectors = []
 
-    project_dir = os.path.abspath(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    )
-    abis = abi.project_abis(project_dir)
+    if project_dir is None:
+        project_dir = os.path.abspath(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        )
+    index = selector_index.load(project_dir)
 
     reserved_selectors: Set[str] = set()
     for facet in facet_precedence:
-        facet_abi = abis.get(facet, [])
+        facet_functions = index.functions(facet)
         if facet == facet_name:
             # Add feature ignores to reserved_selectors then break out of facet iteration
             if feature is not None:
                 feature_ignores = FEATURE_IGNORES[feature]
-                for item in facet_abi:
+                for signature, selector in facet_functions.items():
                     if (
-                        item["type"] == "function"
-                        and item["name"] in feature_ignores["methods"]
+                        selector_index.function_name(signature)
+                        in feature_ignores["methods"]
                     ):
-                        reserved_selectors.add(abi.encode_function_signature(item))
+                        reserved_selectors.add(selector)
 
                 for selector in feature_ignores["selectors"]:
                     reserved_selectors.add(selector)
 
             break
 
-        for item in facet_abi:
-            if item["type"] == "function":
-                reserved_selectors.add(abi.encode_function_signature(item))
+        reserved_selectors.update(facet_functions.values())
 
     facet_function_selectors: List[str] = []
-    facet_abi = abis.get(facet_name, [])
 
     logical_operator = all
     method_predicate = lambda method: method not in ignore_methods
@@ -149,13 +135,52 @@ def facet_cut(
         method_predicate = lambda method: method in methods
         selector_predicate = lambda selector: selector in selectors
 
-    for item in facet_abi:
-        if item["type"] == "function":
-            item_selector = abi.encode_function_signature(item)
-            if logical_operator(
-                [method_predicate(item["name"]), selector_predicate(item_selector)]
-            ):
-                facet_function_selectors.append(item_selector)
+    for signature, item_selector in index.functions(facet_name).items():
+        if logical_operator(
+            [
+                method_predicate(selector_index.function_name(signature)),
+                selector_predicate(item_selector),
+            ]
+        ):
+            facet_function_selectors.append(item_selector)
+
+    return facet_function_selectors
+
+
+def facet_cut(
+    diamond_address: str,
+    facet_name: str,
+    facet_address: str,
+    action: str,
+    transaction_config: Dict[str, Any],
+    initializer_address: str = ZERO_ADDRESS,
+    ignore_methods: Optional[List[str]] = None,
+    ignore_selectors: Optional[List[str]] = None,
+    methods: Optional[List[str]] = None,
+    selectors: Optional[List[str]] = None,
+    feature: Optional[EngineFeatures] = None,
+    initializer_args: Optional[List[Any]] = None,
+) -> Any:
+    """
+    Cuts the given facet onto the given Diamond contract, with the selectors which facet_selectors
+    resolves for the given arguments.
+    """
+    assert (
+        facet_name in FACETS
+    ), f"Invalid facet: {facet_name}. Choices: {','.join(FACETS)}."
+
+    assert (
+        action in FACET_ACTIONS
+    ), f"Invalid cut action: {action}. Choices: {','.join(FACET_ACTIONS)}."
+
+    facet_function_selectors = facet_selectors(
+        facet_name,
+        ignore_methods=ignore_methods,
+        ignore_selectors=ignore_selectors,
+        methods=methods,
+        selectors=selectors,
+        feature=feature,
+    )
 
     target_address = facet_address
     if FACET_ACTIONS[action] == 2:
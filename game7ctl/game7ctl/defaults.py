@@ -0,0 +1,36 @@
+"""
+Defaults of the tunable parameters of the inventory subcommands.
+
+They are defined here rather than in the modules which implement the subcommands so that
+inventory.generate_cli can show them in its help without importing those modules, which pull in
+numpy, yaml, websockets and sqlite3. Each module re-exports the defaults it uses under its own name
+(e.g. indexer.DEFAULT_REORG_DEPTH).
+"""
+
+# Number of calls to aggregate into each Multicall2 eth_call (multicall.DEFAULT_BATCH_SIZE).
+MULTICALL_BATCH_SIZE = 500
+
+# Number of subject tokens to read the slots of at a time when allocating backpacks
+# (backpacks.DEFAULT_BATCH_SIZE).
+BACKPACK_BATCH_SIZE = 500
+
+# Number of blocks per eth_getLogs request when reading logs in fixed ranges (logs.DEFAULT_CHUNK_SIZE).
+LOGS_CHUNK_SIZE = 2000
+
+# Bounds and target of the adaptive eth_getLogs ranges of the indexer (indexer.DEFAULT_*_CHUNK_SIZE,
+# indexer.DEFAULT_TARGET_LOGS).
+INDEXER_INITIAL_CHUNK_SIZE = 2000
+INDEXER_MAX_CHUNK_SIZE = 100000
+INDEXER_TARGET_LOGS = 5000
+
+# Number of most recently indexed blocks to keep block hashes for (indexer.DEFAULT_REORG_DEPTH).
+REORG_DEPTH = 64
+
+# Number of blocks between equipment history checkpoints (history.DEFAULT_CHECKPOINT_INTERVAL).
+CHECKPOINT_INTERVAL = 10000
+
+# Backpressure policies of the watch queue, and its defaults (watch.POLICIES, watch.DEFAULT_*).
+WATCH_POLICIES = ["block", "drop", "spill"]
+WATCH_QUEUE_SIZE = 10000
+WATCH_MIN_INTERVAL = 0.5
+WATCH_MAX_INTERVAL = 5.0
@@ -0,0 +1,357 @@
+"""
+Materialized view of the items equipped on subject tokens, built from indexed Inventory events.
+
+Reading what is equipped on a subject token from the chain takes a getEquippedItem call per slot.
+EquippedView keeps a table of equipped items keyed by (subject token, slot) in the same SQLite
+database as the indexer's EventStore (see indexer), and answers those questions from it. update
+applies the ItemEquipped and ItemUnequipped events indexed since the last update, with the same
+semantics as the EquippedItems mapping in LibInventory (see inventory_events.fold_item_event).
+
+verify spot-checks the view against getAllEquippedItems on the chain.
+
+Every change to the table is journaled with the row it replaced, for as long as the store keeps block
+hashes to detect reorgs with. When the store rolls back the events of a reorganized block range, the view
+undoes the changes those events made from the journal, instead of being rebuilt from scratch.
+
+uint256 values (token IDs, amounts) do not fit into SQLite integers, so they are stored as decimal
+strings and converted back to ints on the way out.
+"""
+
+import json
+import random
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from eth_utils import to_checksum_address
+
+from . import InventoryFacet, Multicall2, multicall, rpc_batch
+from .indexer import EventStore
+from .inventory_events import ITEM_EVENTS, fold_item_event
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS equipped_items (
+    address TEXT NOT NULL,
+    subject_token_id TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    item_type INTEGER NOT NULL,
+    item_address TEXT NOT NULL,
+    item_token_id TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    PRIMARY KEY (address, subject_token_id, slot)
+);
+CREATE INDEX IF NOT EXISTS equipped_items_by_item
+    ON equipped_items (address, item_address, item_token_id);
+CREATE TABLE IF NOT EXISTS equipped_items_journal (
+    address TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    subject_token_id TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    previous TEXT
+);
+CREATE INDEX IF NOT EXISTS equipped_items_journal_by_block
+    ON equipped_items_journal (address, block_number, log_index);
+CREATE TABLE IF NOT EXISTS view_cursors (
+    view TEXT NOT NULL,
+    address TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (view, address)
+);
+"""
+
+VIEW_NAME = "equipped_items"
+
+
+def equipped_record(row: Tuple[str, int, str, str, str]) -> Dict[str, Any]:
+    # Rows are (slot, item_type, item_address, item_token_id, amount).
+    item_type, item_address, item_token_id, amount = row[1:]
+    return {
+        "item_type": item_type,
+        "item_address": item_address,
+        "item_token_id": int(item_token_id),
+        "amount": int(amount),
+    }
+
+
+class EquippedView:
+    def __init__(self, store: EventStore) -> None:
+        self.store = store
+        with self.store.lock:
+            self.store.connection.executescript(SCHEMA)
+        self.store.add_rollback_hook(self.rollback)
+
+    def cursor(self, address: str) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (block number, log index) of the last event applied to the view for the given
+        contract, or None if no event has been applied.
+        """
+        with self.store.lock:
+            row = self.store.connection.execute(
+                "SELECT block_number, log_index FROM view_cursors WHERE view = ? AND address = ?",
+                (VIEW_NAME, address.lower()),
+            ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def apply_event(self, address: str, event: Dict[str, Any]) -> None:
+        """
+        Applies a decoded ItemEquipped or ItemUnequipped event. Must be called in a transaction on the
+        store's connection.
+        """
+        args = event["args"]
+        key = (address.lower(), str(args["subjectTokenId"]), str(args["slot"]))
+        connection = self.store.connection
+        previous = connection.execute(
+            "SELECT item_type, item_address, item_token_id, amount, block_number"
+            " FROM equipped_items WHERE address = ? AND subject_token_id = ? AND slot = ?",
+            key,
+        ).fetchone()
+        connection.execute(
+            "INSERT INTO equipped_items_journal VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key[0],
+                event["blockNumber"],
+                event["logIndex"],
+                key[1],
+                key[2],
+                None if previous is None else json.dumps(previous),
+            ),
+        )
+        item = fold_item_event(
+            None if previous is None else equipped_record((key[2],) + previous[:4]),
+            event,
+        )
+        if item is None:
+            connection.execute(
+                "DELETE FROM equipped_items"
+                " WHERE address = ? AND subject_token_id = ? AND slot = ?",
+                key,
+            )
+        else:
+            connection.execute(
+                "INSERT OR REPLACE INTO equipped_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key
+                + (
+                    item["item_type"],
+                    item["item_address"],
+                    str(item["item_token_id"]),
+                    str(item["amount"]),
+                    event["blockNumber"],
+                ),
+            )
+
+    def update(self, address: str) -> int:
+        """
+        Applies the events indexed for the given contract since the last update. Returns the number of
+        events applied.
+        """
+        cursor = self.cursor(address)
+        from_block = None if cursor is None else cursor[0]
+        events = [
+            event
+            for event in self.store.events(address, ITEM_EVENTS, from_block=from_block)
+            if cursor is None or (event["blockNumber"], event["logIndex"]) > cursor
+        ]
+        if not events:
+            return 0
+        last = events[-1]
+        with self.store.lock, self.store.connection:
+            for event in events:
+                self.apply_event(address, event)
+            self.store.connection.execute(
+                "INSERT OR REPLACE INTO view_cursors VALUES (?, ?, ?, ?)",
+                (VIEW_NAME, address.lower(), last["blockNumber"], last["logIndex"]),
+            )
+            # Changes from before the oldest block hash the store keeps can no longer be rolled back.
+            block_hashes = self.store.block_hashes(address)
+            self.store.connection.execute(
+                "DELETE FROM equipped_items_journal WHERE address = ? AND block_number < ?",
+                (
+                    address.lower(),
+                    block_hashes[-1][0] if block_hashes else last["blockNumber"] + 1,
+                ),
+            )
+        return len(events)
+
+    def rollback(self, address: str, block_number: int) -> None:
+        """
+        Undoes the changes made by the events of the given contract after block_number. Called by the
+        store when it rolls back those events.
+        """
+        connection = self.store.connection
+        entries = connection.execute(
+            "SELECT rowid, subject_token_id, slot, previous FROM equipped_items_journal"
+            " WHERE address = ? AND block_number > ?"
+            " ORDER BY block_number DESC, log_index DESC, rowid DESC",
+            (address.lower(), block_number),
+        ).fetchall()
+        for rowid, subject_token_id, slot, previous in entries:
+            key = (address.lower(), subject_token_id, slot)
+            if previous is None:
+                connection.execute(
+                    "DELETE FROM equipped_items"
+                    " WHERE address = ? AND subject_token_id = ? AND slot = ?",
+                    key,
+                )
+            else:
+                connection.execute(
+                    "INSERT OR REPLACE INTO equipped_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    key + tuple(json.loads(previous)),
+                )
+            connection.execute(
+                "DELETE FROM equipped_items_journal WHERE rowid = ?", (rowid,)
+            )
+
+        cursor = self.cursor(address)
+        if cursor is not None and cursor[0] > block_number:
+            last = connection.execute(
+                "SELECT block_number, log_index FROM events"
+                f" WHERE address = ? AND event IN ({', '.join('?' for _ in ITEM_EVENTS)})"
+                " AND block_number <= ? ORDER BY block_number DESC, log_index DESC LIMIT 1",
+                [address.lower()] + ITEM_EVENTS + [block_number],
+            ).fetchone()
+            if last is None:
+                connection.execute(
+                    "DELETE FROM view_cursors WHERE view = ? AND address = ?",
+                    (VIEW_NAME, address.lower()),
+                )
+            else:
+                connection.execute(
+                    "INSERT OR REPLACE INTO view_cursors VALUES (?, ?, ?, ?)",
+                    (VIEW_NAME, address.lower(), last[0], last[1]),
+                )
+
+    def equipped(
+        self, address: str, subject_token_id: int
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Returns the items equipped on the given subject token, by slot.
+        """
+        with self.store.lock:
+            rows = self.store.connection.execute(
+                "SELECT slot, item_type, item_address, item_token_id, amount"
+                " FROM equipped_items WHERE address = ? AND subject_token_id = ?",
+                (address.lower(), str(subject_token_id)),
+            ).fetchall()
+        return {
+            int(row[0]): equipped_record(row)
+            for row in sorted(rows, key=lambda row: int(row[0]))
+        }
+
+    def equipped_item(
+        self, address: str, subject_token_id: int, slot: int
+    ) -> Optional[Dict[str, Any]]:
+        return self.equipped(address, subject_token_id).get(slot)
+
+    def subject_token_ids(self, address: str) -> List[int]:
+        """
+        Returns the subject tokens which have at least one item equipped.
+        """
+        with self.store.lock:
+            rows = self.store.connection.execute(
+                "SELECT DISTINCT subject_token_id FROM equipped_items WHERE address = ?",
+                (address.lower(),),
+            ).fetchall()
+        return sorted(int(row[0]) for row in rows)
+
+    def holders(
+        self, address: str, item_address: str, item_token_id: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the (subject token, slot) pairs the given item is equipped in, with the amount equipped.
+        """
+        query = (
+            "SELECT subject_token_id, slot, amount FROM equipped_items"
+            " WHERE address = ? AND item_address = ?"
+        )
+        parameters: List[Any] = [address.lower(), to_checksum_address(item_address)]
+        if item_token_id is not None:
+            query += " AND item_token_id = ?"
+            parameters.append(str(item_token_id))
+        with self.store.lock:
+            rows = self.store.connection.execute(query, parameters).fetchall()
+        for subject_token_id, slot, amount in sorted(
+            rows, key=lambda row: (int(row[0]), int(row[1]))
+        ):
+            yield {
+                "subject_token_id": int(subject_token_id),
+                "slot": int(slot),
+                "amount": int(amount),
+            }
+
+    def verify(
+        self,
+        inventory_contract: InventoryFacet.InventoryFacet,
+        subject_token_ids: Optional[Sequence[int]] = None,
+        sample_size: int = 100,
+        multicall_contract: Optional[Multicall2.Multicall2] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Compares the view with getAllEquippedItems for a random sample of sample_size of the given
+        subject tokens (default: the subject tokens with items equipped according to the view), at the
+        block up to which the store has indexed the contract. Returns the slots which differ:
+            {"subject_token_id": ..., "slot": ..., "view": <item or None>, "chain": <item or None>}
+        """
+        address = inventory_contract.address
+        block_number = self.store.cursor(address)
+        if block_number is None:
+            raise ValueError(f"Contract {address} has not been indexed")
+        self.update(address)
+
+        if subject_token_ids is None:
+            subject_token_ids = self.subject_token_ids(address)
+        subject_token_ids = list(subject_token_ids)
+        if len(subject_token_ids) > sample_size:
+            subject_token_ids = sorted(random.sample(subject_token_ids, sample_size))
+
+        num_slots = inventory_contract.num_slots(block_number=block_number)
+        slots = list(range(1, num_slots + 1))
+        if multicall_contract is not None:
+            records = list(
+                multicall.bulk_equipped_items(
+                    inventory_contract,
+                    multicall_contract,
+                    subject_token_ids,
+                    slots,
+                    block_number=block_number,
+                )
+            )
+        else:
+            items = rpc_batch.batched_map(
+                lambda subject_token_id: inventory_contract.get_all_equipped_items(
+                    subject_token_id, slots, block_number=block_number
+                ),
+                subject_token_ids,
+            )
+            records = [
+                {
+                    "subject_token_id": subject_token_id,
+                    "equipped": {
+                        slot: multicall.item_record(item)
+                        for slot, item in zip(slots, subject_items)
+                        if item[0] != 0
+                    },
+                }
+                for subject_token_id, subject_items in zip(subject_token_ids, items)
+            ]
+
+        mismatches = []
+        for record in records:
+            if "error" in record:
+                raise ValueError(
+                    f"Could not read subject token {record['subject_token_id']}: {record['error']}"
+                )
+            subject_token_id = record["subject_token_id"]
+            chain_items = record["equipped"]
+            view_items = self.equipped(address, subject_token_id)
+            for slot in sorted(set(chain_items) | set(view_items)):
+                if chain_items.get(slot) != view_items.get(slot):
+                    mismatches.append(
+                        {
+                            "subject_token_id": subject_token_id,
+                            "slot": slot,
+                            "view": view_items.get(slot),
+                            "chain": chain_items.get(slot),
+                        }
+                    )
+        return mismatches
@@ -0,0 +1,312 @@
+"""
+Append-only columnar archive of the ItemEquipped and ItemUnequipped events of an Inventory contract.
+
+Analytics over the history of an Inventory (who equipped what, item churn per slot, amounts over time)
+should not have to go back to the chain or decode JSON for every run. EventArchive stores the events in
+segments, one directory per appended batch, with one fixed-width NumPy column file (.npy) per field:
+
+    event            u1          0 for ItemEquipped, 1 for ItemUnequipped
+    block_number     u8
+    log_index        u4
+    subjectTokenId   u8 x 4      uint256, as 4 limbs (see log_columns)
+    slot             u8 x 4
+    itemType         u8
+    itemAddress      S20         raw address bytes
+    itemTokenId      u8 x 4
+    amount           u8 x 4
+    sender           S20         equippedBy / unequippedBy
+
+Rows are sorted by (block_number, log_index) within and across segments. index.json lists the segments
+with the block range and number of rows of each, so scans skip the segments outside the blocks they
+ask for. Column files are memory-mapped: a scan filtered by slot or item address only reads the
+columns it filters on, and then the rows which match from the other columns, instead of loading whole
+segments.
+
+Segments are never modified once written. A new segment is written to a temporary directory and
+renamed into place before the index is replaced, so an interrupted append leaves the archive as it
+was.
+
+Requires numpy: pip install "game7ctl[numpy]"
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from . import log_columns
+from .inventory_events import ITEM_EVENTS
+from .log_columns import np
+
+COLUMNS = [
+    ("event", "u1"),
+    ("block_number", "u8"),
+    ("log_index", "u4"),
+    ("subjectTokenId", ("u8", (4,))),
+    ("slot", ("u8", (4,))),
+    ("itemType", "u8"),
+    ("itemAddress", "S20"),
+    ("itemTokenId", ("u8", (4,))),
+    ("amount", ("u8", (4,))),
+    ("sender", "S20"),
+]
+
+SENDER_ARGUMENTS = {"ItemEquipped": "equippedBy", "ItemUnequipped": "unequippedBy"}
+
+INDEX_FILE = "index.json"
+FORMAT_VERSION = 1
+
+
+def archive_dtype(columns: Optional[Sequence[str]] = None) -> Any:
+    return np.dtype(
+        [(name, dtype) for name, dtype in COLUMNS if columns is None or name in columns]
+    )
+
+
+def rows_from_arrays(arrays: Dict[str, Any]) -> Any:
+    """
+    Converts the ItemEquipped and ItemUnequipped arrays returned by log_columns.decode_logs_by_event
+    into archive rows, sorted by (block_number, log_index).
+    """
+    parts = []
+    for event_code, event_name in enumerate(ITEM_EVENTS):
+        array = arrays.get(event_name)
+        if array is None or not len(array):
+            continue
+        rows = np.empty(len(array), dtype=archive_dtype())
+        rows["event"] = event_code
+        rows["itemType"] = log_columns.narrow(array["itemType"])
+        rows["sender"] = array[SENDER_ARGUMENTS[event_name]]
+        for name in [
+            "block_number",
+            "log_index",
+            "subjectTokenId",
+            "slot",
+            "itemAddress",
+            "itemTokenId",
+            "amount",
+        ]:
+            rows[name] = array[name]
+        parts.append(rows)
+    if not parts:
+        return np.empty(0, dtype=archive_dtype())
+    rows = np.concatenate(parts)
+    return rows[np.lexsort((rows["log_index"], rows["block_number"]))]
+
+
+def rows_from_events(events: Sequence[Dict[str, Any]]) -> Any:
+    """
+    Converts decoded ItemEquipped and ItemUnequipped events (as logs.decode_log and EventStore.events
+    return them) into archive rows, in the order they are given in. Other events are skipped.
+    """
+    events = [event for event in events if event["event"] in ITEM_EVENTS]
+    rows = np.empty(len(events), dtype=archive_dtype())
+    if not events:
+        return rows
+    rows["event"] = [ITEM_EVENTS.index(event["event"]) for event in events]
+    rows["block_number"] = [event["blockNumber"] for event in events]
+    rows["log_index"] = [event["logIndex"] for event in events]
+    rows["itemType"] = [event["args"]["itemType"] for event in events]
+    for name in ["subjectTokenId", "slot", "itemTokenId", "amount"]:
+        rows[name] = log_columns.from_ints([event["args"][name] for event in events])
+    rows["itemAddress"] = log_columns.raw_addresses(
+        [event["args"]["itemAddress"] for event in events]
+    )
+    rows["sender"] = log_columns.raw_addresses(
+        [event["args"][SENDER_ARGUMENTS[event["event"]]] for event in events]
+    )
+    return rows
+
+
+class EventArchive:
+    def __init__(self, path: str) -> None:
+        """
+        Opens the archive in the given directory, creating it if it does not exist.
+        """
+        if np is None:
+            raise ImportError(
+                'The event archive requires numpy: pip install "game7ctl[numpy]"'
+            )
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        index_path = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path) as ifp:
+                index = json.load(ifp)
+            if index["version"] != FORMAT_VERSION:
+                raise ValueError(
+                    f"Archive {path} has format version {index['version']}, expected {FORMAT_VERSION}"
+                )
+            self.segments: List[Dict[str, Any]] = index["segments"]
+        else:
+            self.segments = []
+
+    def to_block(self) -> Optional[int]:
+        """
+        Returns the last block the archive covers, or None if it is empty.
+        """
+        return self.segments[-1]["to_block"] if self.segments else None
+
+    def num_rows(self) -> int:
+        return sum(segment["rows"] for segment in self.segments)
+
+    def _write_index(self) -> None:
+        index_path = os.path.join(self.path, INDEX_FILE)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path, suffix=".tmp", delete=False
+        ) as ofp:
+            json.dump({"version": FORMAT_VERSION, "segments": self.segments}, ofp)
+        os.replace(ofp.name, index_path)
+
+    def append(self, rows: Any, from_block: int, to_block: int) -> None:
+        """
+        Appends a segment with the rows of the events emitted from from_block to to_block (inclusive),
+        sorted by (block_number, log_index). The segment must start after the last block the archive
+        covers. Empty segments are recorded in the index (so that the archive knows which blocks it
+        covers) but do not get a directory.
+        """
+        last_block = self.to_block()
+        if last_block is not None and from_block <= last_block:
+            raise ValueError(
+                f"Archive already covers blocks up to {last_block}, cannot append from {from_block}"
+            )
+        if from_block > to_block:
+            raise ValueError(f"Invalid block range: {from_block} to {to_block}")
+        if len(rows) and (
+            rows["block_number"][0] < from_block or rows["block_number"][-1] > to_block
+        ):
+            raise ValueError("Rows are outside of the block range of the segment")
+
+        segment: Dict[str, Any] = {
+            "from_block": from_block,
+            "to_block": to_block,
+            "rows": len(rows),
+            "directory": None,
+        }
+        if len(rows):
+            directory = f"segment-{from_block:012d}-{to_block:012d}"
+            temp_directory = tempfile.mkdtemp(dir=self.path, suffix=".tmp")
+            try:
+                for name, _ in COLUMNS:
+                    np.save(
+                        os.path.join(temp_directory, f"{name}.npy"),
+                        np.ascontiguousarray(rows[name]),
+                    )
+                target = os.path.join(self.path, directory)
+                # Left behind by an append which was interrupted before it wrote the index.
+                if os.path.exists(target):
+                    shutil.rmtree(target)
+                os.rename(temp_directory, target)
+            except BaseException:
+                shutil.rmtree(temp_directory, ignore_errors=True)
+                raise
+            segment["directory"] = directory
+        self.segments.append(segment)
+        self._write_index()
+
+    def _column(self, segment: Dict[str, Any], name: str) -> Any:
+        return np.load(
+            os.path.join(self.path, segment["directory"], f"{name}.npy"),
+            mmap_mode="r",
+        )
+
+    def scan(
+        self,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        slot: Optional[int] = None,
+        item_address: Optional[str] = None,
+        subject_token_id: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Iterator[Any]:
+        """
+        Yields, for every segment with matching rows, a structured array of the given columns (default:
+        all of them) of the rows in the given block range which match every given filter.
+        """
+        filters: List[Any] = []
+        if slot is not None:
+            filters.append(("slot", log_columns.from_ints([slot])[0]))
+        if subject_token_id is not None:
+            filters.append(
+                ("subjectTokenId", log_columns.from_ints([subject_token_id])[0])
+            )
+        if item_address is not None:
+            filters.append(
+                ("itemAddress", log_columns.raw_addresses([item_address])[0])
+            )
+        dtype = archive_dtype(columns)
+
+        for segment in self.segments:
+            if not segment["rows"]:
+                continue
+            if from_block is not None and segment["to_block"] < from_block:
+                continue
+            if to_block is not None and segment["from_block"] > to_block:
+                continue
+
+            mask = np.ones(segment["rows"], dtype=bool)
+            if (from_block is not None and segment["from_block"] < from_block) or (
+                to_block is not None and segment["to_block"] > to_block
+            ):
+                block_numbers = self._column(segment, "block_number")
+                if from_block is not None:
+                    mask &= block_numbers >= from_block
+                if to_block is not None:
+                    mask &= block_numbers <= to_block
+            for name, value in filters:
+                column = self._column(segment, name)
+                if column.ndim > 1:
+                    mask &= (column == value).all(axis=1)
+                else:
+                    mask &= column == value
+            indices = np.flatnonzero(mask)
+            if not len(indices):
+                continue
+
+            result = np.empty(len(indices), dtype=dtype)
+            for name in dtype.names:
+                result[name] = self._column(segment, name)[indices]
+            yield result
+
+    def read(self, **filters: Any) -> Any:
+        """
+        Returns the rows scan yields for the given filters as a single array.
+        """
+        parts = list(self.scan(**filters))
+        if not parts:
+            return np.empty(0, dtype=archive_dtype(filters.get("columns")))
+        return np.concatenate(parts)
+
+
+def archive_store(
+    archive: EventArchive,
+    store: Any,
+    address: str,
+    to_block: Optional[int] = None,
+    start_block: int = 0,
+) -> Dict[str, Any]:
+    """
+    Appends the ItemEquipped and ItemUnequipped events of the contract at address which an EventStore
+    has indexed after the last block the archive covers (or from start_block, for an empty archive)
+    up to to_block (default: the store's cursor) to the archive, as a single segment.
+
+    Segments cannot be changed once they are written, so to_block should be far enough behind the head
+    of the chain that the blocks it archives will not be reorganized.
+    """
+    cursor = store.cursor(address)
+    if cursor is None:
+        raise ValueError(f"Contract {address} has not been indexed")
+    if to_block is None or to_block > cursor:
+        to_block = cursor
+    last_block = archive.to_block()
+    from_block = start_block if last_block is None else last_block + 1
+    if from_block > to_block:
+        return {"from_block": from_block, "to_block": to_block, "rows": 0}
+    rows = rows_from_events(
+        list(
+            store.events(address, ITEM_EVENTS, from_block=from_block, to_block=to_block)
+        )
+    )
+    archive.append(rows, from_block, to_block)
+    return {"from_block": from_block, "to_block": to_block, "rows": len(rows)}
@@ -0,0 +1,244 @@
+"""
+Typed queries for Inventory events, filtered on the node.
+
+eth_getLogs can filter logs on the values of their indexed arguments, so that a node only returns the
+logs of, say, one subject token, instead of every ItemEquipped log for the tooling to filter in Python.
+EventType compiles filters on the indexed arguments of an event into the topics of an eth_getLogs
+filter. A filter value can be a single value, or a list of values to match any of:
+
+    events = event_query.InventoryEvents(web3, inventory_address, start_block=deployment_block)
+    events.query(event_query.ItemEquipped, subject_token_id=42, item_address=[sword, shield])
+
+Indexed arguments by event:
+- ItemEquipped, ItemUnequipped: subject_token_id, slot, item_address
+- ItemMarkedAsEquippableInSlot: slot, item_type, item_address
+- SlotCreated: creator, slot; NewSlotTypeAdded: creator, slot_type; BackpackAdded: creator, tool_id
+- NewSlotURI: slot_id; SlotTypeAdded: creator, slot_id, slot_type
+- AdministratorDesignated: admin_terminus_address, admin_terminus_pool_id
+- ContractAddressDesignated: contract_address
+
+Filtering on an argument which is not indexed raises a ValueError, since the node cannot do it.
+"""
+
+import functools
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from eth_utils import keccak, to_checksum_address
+
+from . import abi, inventory_events, logs
+
+try:
+    from eth_abi import encode as encode_abi
+except ImportError:
+    # eth-abi<4
+    from eth_abi import encode_abi  # type: ignore
+
+
+class EventType:
+    def __init__(self, event_abi: Dict[str, Any]) -> None:
+        self.abi = event_abi
+        self.name: str = event_abi["name"]
+        self.topic = logs.event_topic(event_abi)
+        # Indexed arguments in the order of their topics, by the snake_case form of their names.
+        self.indexed: Dict[str, Dict[str, Any]] = {
+            abi.camel_to_snake(item["name"]): item
+            for item in event_abi["inputs"]
+            if item["indexed"]
+        }
+        self.arguments = {
+            abi.camel_to_snake(item["name"]): item for item in event_abi["inputs"]
+        }
+
+    def __repr__(self) -> str:
+        return f"EventType({self.name})"
+
+    def argument(self, name: str) -> Dict[str, Any]:
+        """
+        Returns the ABI of the indexed argument with the given name (in snake_case or as in the ABI).
+        """
+        key = name if name in self.arguments else abi.camel_to_snake(name)
+        if key not in self.arguments:
+            raise ValueError(f"{self.name} has no argument {name}")
+        if key not in self.indexed:
+            raise ValueError(
+                f"Argument {name} of {self.name} is not indexed, so logs cannot be filtered on it"
+            )
+        return self.indexed[key]
+
+    def encode_topic(self, item: Dict[str, Any], value: Any) -> str:
+        """
+        Encodes a value of an indexed argument as the topic it is logged as.
+        """
+        abi_type = abi.abi_input_signature(item)
+        if abi_type == "string":
+            return "0x" + keccak(text=value).hex()
+        if abi_type == "bytes":
+            return "0x" + keccak(logs.to_bytes(value)).hex()
+        if abi_type.endswith(("]", ")")):
+            raise ValueError(
+                f"Cannot filter on argument {item['name']} of {self.name} of type {abi_type}"
+            )
+        if abi_type == "address":
+            value = to_checksum_address(value)
+        return "0x" + encode_abi([abi_type], [value]).hex()
+
+    def topics(self, **filters: Any) -> List[Optional[Union[str, List[str]]]]:
+        """
+        Compiles filters on indexed arguments into the topics which follow the event topic in an
+        eth_getLogs filter. Lists (or tuples, or sets) of values match any of them. None matches any
+        value.
+        """
+        values: Dict[str, Any] = {}
+        for name, value in filters.items():
+            item = self.argument(name)
+            if value is not None:
+                values[item["name"]] = value
+
+        topics: List[Optional[Union[str, List[str]]]] = []
+        for item in self.indexed.values():
+            value = values.get(item["name"])
+            if value is None:
+                topics.append(None)
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                topics.append(sorted({self.encode_topic(item, v) for v in value}))
+            else:
+                topics.append(self.encode_topic(item, value))
+        while topics and topics[-1] is None:
+            topics.pop()
+        return topics
+
+
+AdministratorDesignated = EventType(inventory_events.ADMINISTRATOR_DESIGNATED_ABI)
+ContractAddressDesignated = EventType(inventory_events.CONTRACT_ADDRESS_DESIGNATED_ABI)
+SlotCreated = EventType(inventory_events.SLOT_CREATED_ABI)
+ItemMarkedAsEquippableInSlot = EventType(
+    inventory_events.ITEM_MARKED_AS_EQUIPPABLE_IN_SLOT_ABI
+)
+ItemEquipped = EventType(inventory_events.ITEM_EQUIPPED_ABI)
+ItemUnequipped = EventType(inventory_events.ITEM_UNEQUIPPED_ABI)
+NewSlotTypeAdded = EventType(inventory_events.NEW_SLOT_TYPE_ADDED_ABI)
+BackpackAdded = EventType(inventory_events.BACKPACK_ADDED_ABI)
+NewSlotURI = EventType(inventory_events.NEW_SLOT_URI_ABI)
+SlotTypeAdded = EventType(inventory_events.SLOT_TYPE_ADDED_ABI)
+
+EVENT_TYPES = {
+    event_type.name: event_type
+    for event_type in [
+        AdministratorDesignated,
+        ContractAddressDesignated,
+        SlotCreated,
+        ItemMarkedAsEquippableInSlot,
+        ItemEquipped,
+        ItemUnequipped,
+        NewSlotTypeAdded,
+        BackpackAdded,
+        NewSlotURI,
+        SlotTypeAdded,
+    ]
+}
+
+
+def query(
+    web3_client: Any,
+    event_type: EventType,
+    address: Optional[str],
+    from_block: int,
+    to_block: int,
+    chunk_size: int = logs.DEFAULT_CHUNK_SIZE,
+    max_workers: int = 1,
+    **filters: Any,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the decoded logs of the given event emitted by the contract at address (or by any contract,
+    if address is None) from from_block to to_block (inclusive) whose indexed arguments match the
+    filters, in the order in which they were emitted. The range is fetched in chunks of chunk_size
+    blocks, max_workers at a time (see logs.iter_chunks).
+    """
+    fetch = functools.partial(logs.fetch_logs, topics=event_type.topics(**filters))
+    return logs.iter_logs(
+        web3_client,
+        address,
+        [event_type.abi],
+        from_block,
+        to_block,
+        chunk_size=chunk_size,
+        max_workers=max_workers,
+        fetch=fetch,
+    )
+
+
+class InventoryEvents:
+    def __init__(
+        self,
+        web3_client: Any,
+        address: str,
+        start_block: int = 0,
+        chunk_size: int = logs.DEFAULT_CHUNK_SIZE,
+        max_workers: int = 1,
+    ) -> None:
+        """
+        Queries the events of the Inventory contract at address. Queries start from start_block (e.g.
+        the deployment block of the contract) unless they are given a from_block.
+        """
+        self.web3_client = web3_client
+        self.address = address
+        self.start_block = start_block
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    def query(
+        self,
+        event_type: Union[EventType, str],
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        **filters: Any,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the events of the given type (or name) whose indexed arguments match the filters,
+        emitted from from_block (default: start_block) to to_block (default: the latest block).
+        """
+        if isinstance(event_type, str):
+            event_type = EVENT_TYPES[event_type]
+        if from_block is None:
+            from_block = self.start_block
+        if to_block is None:
+            to_block = self.web3_client.eth.block_number
+        return list(
+            query(
+                self.web3_client,
+                event_type,
+                self.address,
+                from_block,
+                to_block,
+                chunk_size=self.chunk_size,
+                max_workers=self.max_workers,
+                **filters,
+            )
+        )
+
+
+def parse_filter_value(item: Dict[str, Any], raw_value: str) -> Any:
+    """
+    Parses a filter value given on the command line for the indexed argument with the given ABI.
+    """
+    abi_type = item["type"]
+    if abi_type.startswith(("uint", "int")):
+        return int(raw_value, 0)
+    if abi_type == "bool":
+        return raw_value.lower() in ("1", "true", "yes")
+    return raw_value
+
+
+def parse_filters(event_type: EventType, raw_filters: Sequence[str]) -> Dict[str, Any]:
+    """
+    Parses filters given as name=value or name=value1,value2,... (any of the values).
+    """
+    filters: Dict[str, Any] = {}
+    for raw_filter in raw_filters:
+        name, separator, raw_values = raw_filter.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid filter (expected name=value): {raw_filter}")
+        item = event_type.argument(name)
+        values = [parse_filter_value(item, value) for value in raw_values.split(",")]
+        filters[name] = values[0] if len(values) == 1 else values
+    return filters
@@ -0,0 +1,214 @@
+"""
+Reconstruction of the items equipped on an Inventory's subject tokens at past blocks.
+
+Reading what was equipped at a past block from the chain takes an archive node and a getAllEquippedItems
+call per subject token. EquipmentHistory answers it from the events an EventStore has indexed (see
+indexer) instead, by folding the ItemEquipped and ItemUnequipped events up to the block into the state
+of every slot, with the same semantics as EquippedView (see equipped_view).
+
+So that a reconstruction does not have to replay the whole history, update_checkpoints writes a
+snapshot of the full state every checkpoint_interval blocks into the store's database (zlib-compressed
+JSON). state_at starts from the latest checkpoint at or before the block it is asked about and only
+replays the events after it. Checkpoints are only written for blocks which the store can no longer
+roll back because of a reorg, and are dropped along with the events if it rolls back past them anyway.
+
+From the command line:
+    game7ctl inventory equipped-at --db events.sqlite --address <inventory> --block <block> --token-range 1:100
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import defaults
+from .indexer import EventStore
+from .inventory_events import ITEM_EVENTS, fold_item_event
+
+DEFAULT_CHECKPOINT_INTERVAL = defaults.CHECKPOINT_INTERVAL
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS equipped_checkpoints (
+    address TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    state BLOB NOT NULL,
+    PRIMARY KEY (address, block_number)
+);
+"""
+
+# (subject token ID, slot) -> {"item_type": ..., "item_address": ..., "item_token_id": ..., "amount": ...}
+EquippedState = Dict[Tuple[int, int], Dict[str, Any]]
+
+
+def apply_item_event(state: EquippedState, event: Dict[str, Any]) -> None:
+    """
+    Applies a decoded ItemEquipped or ItemUnequipped event to an in-memory state.
+    """
+    args = event["args"]
+    key = (args["subjectTokenId"], args["slot"])
+    item = fold_item_event(state.get(key), event)
+    if item is None:
+        state.pop(key, None)
+    else:
+        state[key] = item
+
+
+def encode_state(state: EquippedState) -> bytes:
+    rows = [
+        [
+            subject_token_id,
+            slot,
+            item["item_type"],
+            item["item_address"],
+            item["item_token_id"],
+            item["amount"],
+        ]
+        for (subject_token_id, slot), item in sorted(state.items())
+    ]
+    return zlib.compress(json.dumps(rows, separators=(",", ":")).encode())
+
+
+def decode_state(data: bytes) -> EquippedState:
+    state = {}
+    for row in json.loads(zlib.decompress(data)):
+        subject_token_id, slot, item_type, item_address, item_token_id, amount = row
+        state[(subject_token_id, slot)] = {
+            "item_type": item_type,
+            "item_address": item_address,
+            "item_token_id": item_token_id,
+            "amount": amount,
+        }
+    return state
+
+
+class EquipmentHistory:
+    def __init__(
+        self,
+        store: EventStore,
+        address: str,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    ) -> None:
+        if checkpoint_interval < 1:
+            raise ValueError("Checkpoint interval must be at least 1")
+        self.store = store
+        self.address = address
+        self.checkpoint_interval = checkpoint_interval
+        with self.store.lock:
+            self.store.connection.executescript(SCHEMA)
+        self.store.add_rollback_hook(self.rollback)
+
+    def checkpoint(
+        self, block_number: Optional[int] = None
+    ) -> Tuple[Optional[int], EquippedState]:
+        """
+        Returns the block of the latest checkpoint at or before block_number (default: the latest
+        checkpoint) and the state it holds, or (None, {}) if there is none.
+        """
+        query = "SELECT block_number, state FROM equipped_checkpoints WHERE address = ?"
+        parameters: List[Any] = [self.address.lower()]
+        if block_number is not None:
+            query += " AND block_number <= ?"
+            parameters.append(block_number)
+        query += " ORDER BY block_number DESC LIMIT 1"
+        with self.store.lock:
+            row = self.store.connection.execute(query, parameters).fetchone()
+        if row is None:
+            return None, {}
+        return row[0], decode_state(row[1])
+
+    def checkpoint_blocks(self) -> List[int]:
+        with self.store.lock:
+            rows = self.store.connection.execute(
+                "SELECT block_number FROM equipped_checkpoints WHERE address = ?"
+                " ORDER BY block_number",
+                (self.address.lower(),),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def update_checkpoints(self, to_block: Optional[int] = None) -> int:
+        """
+        Writes the checkpoints which are missing between the latest one and to_block (default: the
+        store's cursor for the contract), at every multiple of checkpoint_interval. Returns the number of
+        checkpoints written.
+
+        Checkpoints are not written for blocks which the store could still roll back because of a reorg,
+        that is after the oldest block it keeps the hash of.
+        """
+        cursor = self.store.cursor(self.address)
+        if cursor is None:
+            return 0
+        if to_block is None or to_block > cursor:
+            to_block = cursor
+        block_hashes = self.store.block_hashes(self.address)
+        if block_hashes:
+            to_block = min(to_block, block_hashes[-1][0])
+        from_block, state = self.checkpoint()
+        # Checkpoints are only ever written at multiples of the interval.
+        next_checkpoint = (from_block or 0) + self.checkpoint_interval
+        if next_checkpoint > to_block:
+            return 0
+
+        events = self.store.events(
+            self.address,
+            ITEM_EVENTS,
+            from_block=None if from_block is None else from_block + 1,
+            to_block=to_block,
+        )
+        rows = []
+        for event in events:
+            while event["blockNumber"] > next_checkpoint:
+                rows.append((next_checkpoint, encode_state(state)))
+                next_checkpoint += self.checkpoint_interval
+            apply_item_event(state, event)
+        while next_checkpoint <= to_block:
+            rows.append((next_checkpoint, encode_state(state)))
+            next_checkpoint += self.checkpoint_interval
+
+        with self.store.lock, self.store.connection:
+            self.store.connection.executemany(
+                "INSERT OR REPLACE INTO equipped_checkpoints VALUES (?, ?, ?)",
+                [(self.address.lower(), block, data) for block, data in rows],
+            )
+        return len(rows)
+
+    def rollback(self, address: str, block_number: int) -> None:
+        """
+        Drops the checkpoints after block_number. Called by the store when it rolls back the events
+        after block_number.
+        """
+        if address.lower() != self.address.lower():
+            return
+        self.store.connection.execute(
+            "DELETE FROM equipped_checkpoints WHERE address = ? AND block_number > ?",
+            (address.lower(), block_number),
+        )
+
+    def state_at(
+        self, block_number: int, subject_token_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, Dict[int, Dict[str, Any]]]:
+        """
+        Returns the items equipped on the given subject tokens (default: every subject token with an
+        item equipped) at the end of the given block, by subject token and slot. Subject tokens without
+        items equipped are left out.
+        """
+        cursor = self.store.cursor(self.address)
+        if cursor is None or block_number > cursor:
+            raise ValueError(
+                f"Block {block_number} has not been indexed for {self.address} (indexed up to {cursor})"
+            )
+        wanted = None if subject_token_ids is None else set(subject_token_ids)
+        checkpoint_block, state = self.checkpoint(block_number)
+        if wanted is not None:
+            state = {key: item for key, item in state.items() if key[0] in wanted}
+        for event in self.store.events(
+            self.address,
+            ITEM_EVENTS,
+            from_block=None if checkpoint_block is None else checkpoint_block + 1,
+            to_block=block_number,
+        ):
+            if wanted is None or event["args"]["subjectTokenId"] in wanted:
+                apply_item_event(state, event)
+
+        result: Dict[int, Dict[int, Dict[str, Any]]] = {}
+        for (subject_token_id, slot), item in sorted(state.items()):
+            result.setdefault(subject_token_id, {})[slot] = item
+        return result
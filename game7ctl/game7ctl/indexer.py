@@ -0,0 +1,451 @@
+"""
+Resumable, incremental indexer for Inventory events.
+
+index_events ingests the events emitted by an Inventory contract into an SQLite EventStore, one
+eth_getLogs range ("chunk") at a time. The events of each chunk are written in the same transaction as
+the indexer's cursor (the last block it has indexed), so an interrupted run resumes from the last chunk
+it completed, without gaps or duplicates.
+
+Chunk sizes adapt to the node: a chunk which fails (because it returned too many logs, the response was
+too large or the request timed out) is halved and retried, and the chunk size grows while chunks come
+back with fewer than target_logs logs and shrinks when they come back with more.
+
+With max_workers > 1, chunks are fetched in parallel (see logs.iter_chunks) and stored in block order as
+they arrive, so the cursor still only ever moves past complete chunks. Every response and failure is fed
+back to the chunker, so chunks are sized from the responses to the chunks before them as they are issued.
+
+Blocks close to the head of the chain can be reorganized away after they have been indexed. sync keeps
+the hashes of the indexed blocks in the last reorg_depth blocks it has indexed (the ends of chunks, and
+the blocks with events in them), and compares them with the chain before every run. If they differ, the
+store is rolled back to the last block whose hash still matches, along with any views derived from it
+(see EventStore.add_rollback_hook), and the blocks after it are indexed again. Alternatively, blocks
+can be left out until they have enough confirmations on top of them to be considered final.
+
+From the command line:
+    game7ctl inventory index-events --network <network> --address <inventory> --db events.sqlite
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import defaults, inventory_events, logs
+
+DEFAULT_INITIAL_CHUNK_SIZE = defaults.INDEXER_INITIAL_CHUNK_SIZE
+DEFAULT_MAX_CHUNK_SIZE = defaults.INDEXER_MAX_CHUNK_SIZE
+DEFAULT_TARGET_LOGS = defaults.INDEXER_TARGET_LOGS
+
+DEFAULT_REORG_DEPTH = defaults.REORG_DEPTH
+
+# Number of times a single-block chunk is retried before the indexer gives up.
+MAX_SINGLE_BLOCK_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    address TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (address, block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_by_name ON events (address, event, block_number);
+CREATE TABLE IF NOT EXISTS cursors (
+    address TEXT PRIMARY KEY,
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS block_hashes (
+    address TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    PRIMARY KEY (address, block_number)
+);
+"""
+
+RollbackHook = Callable[[str, int], None]
+
+
+class ReorgTooDeep(Exception):
+    """
+    Raised when none of the block hashes an EventStore keeps for a contract match the chain any more.
+    """
+
+
+class EventStore:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self.lock = threading.RLock()
+        self.rollback_hooks: List[RollbackHook] = []
+
+    def __enter__(self) -> "EventStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def cursor(self, address: str) -> Optional[int]:
+        """
+        Returns the last block indexed for the given contract, or None if it has not been indexed.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT block_number FROM cursors WHERE address = ?", (address.lower(),)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def add_events(
+        self,
+        address: str,
+        events: Sequence[Dict[str, Any]],
+        to_block: int,
+        block_hashes: Optional[Dict[int, str]] = None,
+        keep_hashes_from: Optional[int] = None,
+    ) -> None:
+        """
+        Stores the events decoded from a chunk of logs ending at to_block and moves the cursor of the
+        contract to to_block, atomically. The given block hashes are stored with them, and the hashes of
+        blocks before keep_hashes_from are dropped.
+        """
+        rows = [
+            (
+                address.lower(),
+                event["blockNumber"],
+                event["logIndex"],
+                event["blockHash"],
+                event["transactionHash"],
+                event["event"],
+                json.dumps(event["args"]),
+            )
+            for event in events
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cursors (address, block_number) VALUES (?, ?)",
+                (address.lower(), to_block),
+            )
+            if block_hashes:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO block_hashes VALUES (?, ?, ?)",
+                    [
+                        (address.lower(), block_number, block_hash)
+                        for block_number, block_hash in block_hashes.items()
+                    ],
+                )
+            if keep_hashes_from is not None:
+                self.connection.execute(
+                    "DELETE FROM block_hashes WHERE address = ? AND block_number < ?",
+                    (address.lower(), keep_hashes_from),
+                )
+
+    def block_hashes(self, address: str) -> List[Tuple[int, str]]:
+        """
+        Returns the (block number, block hash) pairs kept for the given contract, latest first.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT block_number, block_hash FROM block_hashes WHERE address = ?"
+                " ORDER BY block_number DESC",
+                (address.lower(),),
+            ).fetchall()
+
+    def add_rollback_hook(self, hook: RollbackHook) -> None:
+        """
+        Registers a function to call with (address, block_number) when the events of the contract at
+        address after block_number are rolled back. Hooks are called in the transaction which removes
+        the events, so they should only use the store's connection.
+        """
+        self.rollback_hooks.append(hook)
+
+    def rollback(self, address: str, block_number: int) -> int:
+        """
+        Removes the events and block hashes of the given contract after block_number, moves its cursor
+        back to block_number and calls the rollback hooks, atomically. Returns the number of events
+        removed.
+        """
+        with self.lock, self.connection:
+            removed = self.connection.execute(
+                "DELETE FROM events WHERE address = ? AND block_number > ?",
+                (address.lower(), block_number),
+            ).rowcount
+            self.connection.execute(
+                "DELETE FROM block_hashes WHERE address = ? AND block_number > ?",
+                (address.lower(), block_number),
+            )
+            self.connection.execute(
+                "UPDATE cursors SET block_number = ? WHERE address = ? AND block_number > ?",
+                (block_number, address.lower(), block_number),
+            )
+            for hook in self.rollback_hooks:
+                hook(address, block_number)
+        return removed
+
+    def events(
+        self,
+        address: str,
+        event_names: Optional[Sequence[str]] = None,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the stored events of the given contract in the order in which they were emitted, in the
+        same form as logs.decode_log returns them.
+        """
+        query = (
+            "SELECT block_number, log_index, block_hash, transaction_hash, event, args"
+            " FROM events WHERE address = ?"
+        )
+        parameters: List[Any] = [address.lower()]
+        if event_names is not None:
+            query += f" AND event IN ({', '.join('?' for _ in event_names)})"
+            parameters.extend(event_names)
+        if from_block is not None:
+            query += " AND block_number >= ?"
+            parameters.append(from_block)
+        if to_block is not None:
+            query += " AND block_number <= ?"
+            parameters.append(to_block)
+        query += " ORDER BY block_number, log_index"
+        with self.lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+        for block_number, log_index, block_hash, transaction_hash, name, args in rows:
+            yield {
+                "event": name,
+                "args": json.loads(args),
+                "address": address,
+                "blockNumber": block_number,
+                "blockHash": block_hash,
+                "transactionHash": transaction_hash,
+                "logIndex": log_index,
+            }
+
+    def count(self, address: str) -> int:
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM events WHERE address = ?", (address.lower(),)
+            ).fetchone()[0]
+
+
+class AdaptiveChunker:
+    def __init__(
+        self,
+        initial_size: int = DEFAULT_INITIAL_CHUNK_SIZE,
+        max_size: int = DEFAULT_MAX_CHUNK_SIZE,
+        target_logs: int = DEFAULT_TARGET_LOGS,
+    ) -> None:
+        """
+        Chunk sizes are numbers of blocks, between 1 and max_size.
+        """
+        if initial_size < 1 or max_size < 1:
+            raise ValueError("Chunk sizes must be at least 1")
+        self.size = min(initial_size, max_size)
+        self.max_size = max_size
+        self.target_logs = target_logs
+
+    def succeeded(self, num_logs: int) -> None:
+        if num_logs > self.target_logs:
+            self.size = max(1, self.size // 2)
+        elif num_logs < self.target_logs // 2:
+            self.size = min(self.max_size, self.size * 2)
+
+    def failed(self) -> None:
+        self.size = max(1, self.size // 2)
+
+
+def index_events(
+    store: EventStore,
+    web3_client: Any,
+    address: str,
+    from_block: int,
+    to_block: int,
+    chunker: Optional[AdaptiveChunker] = None,
+    event_abis: Sequence[Dict[str, Any]] = inventory_events.EVENT_ABIS,
+    fetch: Callable[..., List[Dict[str, Any]]] = logs.fetch_logs,
+    max_workers: int = 1,
+    reorg_depth: int = 0,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Indexes the events of the contract at address from from_block to to_block (inclusive). Yields a
+    progress record for every chunk once it has been stored:
+        {"from_block": ..., "to_block": ..., "events": ..., "chunk_size": ...}
+
+    If reorg_depth is positive, the hashes of the indexed blocks in the last reorg_depth blocks up to
+    to_block are kept in the store, for sync to check for reorgs against.
+    """
+    if chunker is None:
+        chunker = AdaptiveChunker()
+    keep_hashes_from = to_block - reorg_depth + 1 if reorg_depth > 0 else None
+
+    def store_chunk(events: List[Dict[str, Any]], end: int) -> None:
+        block_hashes = None
+        if keep_hashes_from is not None:
+            block_hashes = tail_block_hashes(web3_client, events, end, keep_hashes_from)
+        store.add_events(address, events, end, block_hashes, keep_hashes_from)
+
+    if max_workers > 1:
+        for start, end, events in logs.iter_chunks(
+            web3_client,
+            address,
+            event_abis,
+            from_block,
+            to_block,
+            max_workers=max_workers,
+            fetch=fetch,
+            chunker=chunker,
+        ):
+            store_chunk(events, end)
+            yield {
+                "from_block": start,
+                "to_block": end,
+                "events": len(events),
+                "chunk_size": end - start + 1,
+            }
+        return
+    start = from_block
+    single_block_failures = 0
+    while start <= to_block:
+        end = min(to_block, start + chunker.size - 1)
+        try:
+            events = fetch(web3_client, address, event_abis, start, end)
+        except Exception:
+            if end == start:
+                single_block_failures += 1
+                if single_block_failures >= MAX_SINGLE_BLOCK_ATTEMPTS:
+                    raise
+            chunker.failed()
+            continue
+        single_block_failures = 0
+        store_chunk(events, end)
+        chunker.succeeded(len(events))
+        yield {
+            "from_block": start,
+            "to_block": end,
+            "events": len(events),
+            "chunk_size": end - start + 1,
+        }
+        start = end + 1
+
+
+def tail_block_hashes(
+    web3_client: Any, events: Sequence[Dict[str, Any]], end: int, keep_from: int
+) -> Dict[int, str]:
+    """
+    Returns the hashes of the blocks from keep_from on which a chunk of events ending at end covers:
+    the blocks the events were emitted in, and the last block of the chunk.
+    """
+    block_hashes = {
+        event["blockNumber"]: event["blockHash"]
+        for event in events
+        if event["blockNumber"] >= keep_from
+    }
+    if end >= keep_from and end not in block_hashes:
+        block_hashes[end] = logs.to_hex(web3_client.eth.get_block(end)["hash"])
+    return block_hashes
+
+
+def find_fork(store: EventStore, web3_client: Any, address: str) -> Optional[int]:
+    """
+    Compares the block hashes kept for the contract at address with the chain. Returns None if the
+    latest of them still matches (or none are kept), and otherwise the latest block whose hash does,
+    after which the indexed events are no longer valid.
+    """
+    block_hashes = store.block_hashes(address)
+    if not block_hashes:
+        return None
+    head = web3_client.eth.block_number
+    for i, (block_number, block_hash) in enumerate(block_hashes):
+        if block_number <= head and block_hash == logs.to_hex(
+            web3_client.eth.get_block(block_number)["hash"]
+        ):
+            return None if i == 0 else block_number
+    raise ReorgTooDeep(
+        f"None of the {len(block_hashes)} block hashes kept for {address} (blocks "
+        f"{block_hashes[-1][0]} to {block_hashes[0][0]}) are on the chain any more. Index the "
+        "contract again into a new database, or with a larger reorg depth."
+    )
+
+
+def sync(
+    store: EventStore,
+    web3_client: Any,
+    address: str,
+    start_block: int = 0,
+    confirmations: int = 0,
+    chunker: Optional[AdaptiveChunker] = None,
+    max_workers: int = 1,
+    reorg_depth: int = DEFAULT_REORG_DEPTH,
+    fetch: Callable[..., List[Dict[str, Any]]] = logs.fetch_logs,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Indexes the events of the contract at address from where the store's cursor left off (or from
+    start_block, if the contract has not been indexed) up to the block confirmations blocks behind
+    the latest one.
+
+    If the chain has been reorganized since the last run, the store is first rolled back to the block
+    find_fork returns, and a record is yielded for the rollback:
+        {"rolled_back_to": ..., "events_removed": ..., "events": 0, "chunk_size": 0}
+    """
+    if reorg_depth > 0:
+        fork = find_fork(store, web3_client, address)
+        if fork is not None:
+            yield {
+                "rolled_back_to": fork,
+                "events_removed": store.rollback(address, fork),
+                "events": 0,
+                "chunk_size": 0,
+            }
+    cursor = store.cursor(address)
+    from_block = start_block if cursor is None else cursor + 1
+    to_block = web3_client.eth.block_number - confirmations
+    yield from index_events(
+        store,
+        web3_client,
+        address,
+        from_block,
+        to_block,
+        chunker,
+        fetch=fetch,
+        max_workers=max_workers,
+        reorg_depth=reorg_depth,
+    )
+
+
+def follow(
+    store: EventStore,
+    web3_client: Any,
+    address: str,
+    start_block: int = 0,
+    confirmations: int = 0,
+    poll_interval: float = 5.0,
+    chunker: Optional[AdaptiveChunker] = None,
+    max_workers: int = 1,
+    reorg_depth: int = DEFAULT_REORG_DEPTH,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Like sync, but keeps indexing new blocks as they are produced, polling every poll_interval seconds.
+    """
+    if chunker is None:
+        chunker = AdaptiveChunker()
+    while True:
+        yield from sync(
+            store,
+            web3_client,
+            address,
+            start_block,
+            confirmations,
+            chunker,
+            max_workers,
+            reorg_depth,
+        )
+        time.sleep(poll_interval)
@@ -0,0 +1,1185 @@
+"""
+Inventory operations which go beyond the generated InventoryFacet interface.
+
+The game7ctl inventory command is the generated InventoryFacet command-line interface extended with the
+subcommands defined in this module:
+- run-batch: runs a sequence of InventoryFacet reads and writes from a JSONL manifest in one process
+- bulk-equipped: reads the equipped items of many subject tokens through aggregated Multicall2 calls
+- slot-catalog: reads every slot and slot type name in bulk (see slot_catalog)
+- index-events: indexes the Inventory's events into a local SQLite database (see indexer)
+- equipped: reads the items equipped on subject tokens from the indexed events (see equipped_view)
+- verify-equipped: spot-checks the indexed equipped items against the chain
+- equipped-at: reconstructs the items equipped on subject tokens at a past block (see history)
+- archive-events: appends indexed ItemEquipped/ItemUnequipped events to a columnar archive (see
+  event_archive)
+- archived-events: reads events from a columnar archive, filtered by block range, slot or item
+- query-events: reads events from the chain, filtered on their indexed arguments by the node (see
+  event_query)
+- apply: brings slots, slot types and item eligibility to the state declared in a YAML manifest,
+  submitting only the writes which change something (see provisioning)
+- watch: streams new events as NDJSON to stdout or a Unix socket as they are emitted (see watch)
+- allocate-backpacks: adds a backpack to many subject tokens with pipelined transactions, checkpointing
+  progress so that it can be resumed (see backpacks)
+
+Every subcommand which reads the Inventory at a given block (those with a --block-number argument)
+also takes --read-cache-db, an SQLite file in which the results of its reads at fixed blocks persist
+across runs (see read_cache).
+
+The modules which implement the subcommands are only imported by their handlers, so that building the
+parser does not import all of them (and numpy, yaml, websockets, ...) whichever subcommand is run. The
+defaults shown in the help of their arguments come from the defaults module.
+"""
+
+import argparse
+import functools
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from brownie import network, web3
+from tqdm import tqdm
+
+from . import InventoryFacet, defaults, inventory_events
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    return str(value)
+
+
+def handle_run_batch(args: argparse.Namespace) -> None:
+    from . import batch
+    from .transactions import TransactionPipeline
+
+    skip_lines: Optional[Set[int]] = None
+    if args.resume:
+        if args.outfile is None:
+            raise ValueError("--resume requires --outfile")
+        skip_lines = batch.completed_lines(args.outfile)
+
+    with open(args.file, "r") as ifp:
+        operations = batch.read_manifest(
+            ifp, start_line=args.start_line, skip_lines=skip_lines
+        )
+
+    network.connect(args.network)
+    transaction_config = InventoryFacet.get_transaction_config(args)
+    # Brownie reports every transaction on stdout, which is where the results go by default.
+    transaction_config["silent"] = True
+    if args.gas_limit is not None:
+        transaction_config["gas_limit"] = args.gas_limit
+
+    pipeline: Optional[TransactionPipeline] = None
+    if args.max_in_flight > 1:
+        pipeline = TransactionPipeline(
+            transaction_config["from"],
+            max_in_flight=args.max_in_flight,
+            transaction_config=transaction_config,
+            start_nonce=transaction_config.get("nonce"),
+        )
+
+    if args.outfile is None:
+        ofp = sys.stdout
+    else:
+        # Results of a resumed batch are appended to the results of the runs before it.
+        resuming = args.resume or args.start_line > 1
+        ofp = open(args.outfile, "a" if resuming else "w")
+
+    failed_lines: List[int] = []
+    try:
+        for record in batch.run_batch(
+            operations,
+            transaction_config,
+            default_address=args.address,
+            continue_on_error=args.continue_on_error,
+            pipeline=pipeline,
+        ):
+            if record["status"] == "error":
+                failed_lines.append(record["line"])
+            print(json.dumps(record, default=json_default), file=ofp, flush=True)
+    finally:
+        if pipeline is not None:
+            pipeline.close()
+        if ofp is not sys.stdout:
+            ofp.close()
+
+    if failed_lines:
+        resume_hint = (
+            "--resume"
+            if args.outfile is not None
+            else f"--start-line {failed_lines[0]}"
+        )
+        print(
+            f"Operations failed on lines: {', '.join(map(str, failed_lines))}\n"
+            f"Resume with: {resume_hint}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def handle_apply(args: argparse.Namespace) -> None:
+    from . import Multicall2, provisioning, rpc_batch
+    from .transactions import TransactionPipeline
+
+    manifest = provisioning.load_manifest(args.manifest)
+    network.connect(args.network)
+    inventory = InventoryFacet.InventoryFacet(args.address)
+    multicall_contract = None
+    if args.multicall_address is not None:
+        multicall_contract = Multicall2.Multicall2(args.multicall_address)
+
+    with rpc_batch.batched_calls_if_supported():
+        state = provisioning.read_state(inventory, manifest, multicall_contract)
+    changes = provisioning.plan_changes(manifest, state)
+    summary: Dict[str, Any] = {
+        "block_number": state.block_number,
+        "changes": len(changes),
+        "transactions": 0,
+        "gas_used": 0,
+    }
+    if args.dry_run or not changes:
+        for number, change in enumerate(changes, start=1):
+            print(
+                json.dumps(
+                    {"line": number, "op": change.op, "args": change.args},
+                    default=json_default,
+                )
+            )
+        print(json.dumps(summary), file=sys.stderr)
+        return
+
+    transaction_config = InventoryFacet.get_transaction_config(args)
+    # Brownie reports every transaction on stdout, which is where the results go.
+    transaction_config["silent"] = True
+    if args.gas_limit is not None:
+        transaction_config["gas_limit"] = args.gas_limit
+    pipeline: Optional[TransactionPipeline] = None
+    if args.max_in_flight > 1:
+        pipeline = TransactionPipeline(
+            transaction_config["from"],
+            max_in_flight=args.max_in_flight,
+            transaction_config=transaction_config,
+            start_nonce=transaction_config.get("nonce"),
+        )
+
+    failed = False
+    try:
+        for record in provisioning.apply_changes(
+            changes,
+            provisioning.new_slot_ids(state, changes),
+            transaction_config,
+            args.address,
+            pipeline=pipeline,
+        ):
+            if "tx_hash" in record:
+                summary["transactions"] += 1
+                summary["gas_used"] += record.get("gas_used") or 0
+            failed = failed or record["status"] == "error"
+            print(json.dumps(record, default=json_default), flush=True)
+    finally:
+        if pipeline is not None:
+            pipeline.close()
+    print(json.dumps(summary), file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+def handle_allocate_backpacks(args: argparse.Namespace) -> None:
+    from . import Multicall2, backpacks, rpc_batch
+    from .transactions import TransactionPipeline
+
+    if args.token_range is not None:
+        subject_token_ids = list(args.token_range)
+    else:
+        subject_token_ids = backpacks.read_subject_token_ids(args.tokens_file)
+    completed = backpacks.completed_subject_tokens(args.checkpoint)
+    remaining = [
+        subject_token_id
+        for subject_token_id in subject_token_ids
+        if subject_token_id not in completed
+    ]
+
+    network.connect(args.network)
+    inventory = InventoryFacet.InventoryFacet(args.address)
+    multicall_contract = Multicall2.Multicall2(args.multicall_address)
+    transaction_config = InventoryFacet.get_transaction_config(args)
+    transaction_config["silent"] = True
+    if args.gas_limit is not None:
+        transaction_config["gas_limit"] = args.gas_limit
+
+    stats = backpacks.AllocationStats()
+    start_time = time.time()
+    pipeline = TransactionPipeline(
+        transaction_config["from"],
+        max_in_flight=args.max_in_flight,
+        transaction_config=transaction_config,
+        start_nonce=transaction_config.get("nonce"),
+    )
+    try:
+        with open(args.checkpoint, "a") as checkpoint, tqdm(
+            total=len(remaining), unit="token", file=sys.stderr, disable=args.quiet
+        ) as progress_bar, rpc_batch.batched_calls_if_supported():
+            try:
+                for record in backpacks.allocate_backpacks(
+                    inventory,
+                    multicall_contract,
+                    pipeline,
+                    remaining,
+                    args.slot_qty,
+                    args.slot_type,
+                    args.slot_uri,
+                    batch_size=args.batch_size,
+                ):
+                    # Flushed per record, so that a run which is stopped resumes after the last one.
+                    print(
+                        json.dumps(record, default=json_default),
+                        file=checkpoint,
+                        flush=True,
+                    )
+                    stats.add(record)
+                    progress_bar.update(1)
+                    progress_bar.set_postfix(
+                        allocated=stats.counts["ok"],
+                        skipped=stats.counts["skipped"],
+                        failed=stats.counts["error"],
+                    )
+            except KeyboardInterrupt:
+                # Transactions which are still pending are not recorded, and are checked again on resume.
+                pass
+    finally:
+        pipeline.close()
+
+    summary = {
+        "subject_tokens": len(subject_token_ids),
+        "already_completed": len(subject_token_ids) - len(remaining),
+        **stats.summary(time.time() - start_time),
+    }
+    print(json.dumps(summary))
+    if stats.counts["error"]:
+        sys.exit(1)
+
+
+def token_range_argument_type(raw_value: str) -> range:
+    """
+    Parses a range of token IDs given as "A:B", which includes both A and B.
+    """
+    first, separator, last = raw_value.partition(":")
+    try:
+        if not separator:
+            return range(int(raw_value), int(raw_value) + 1)
+        token_range = range(int(first), int(last) + 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid token range: {raw_value}")
+    if not token_range:
+        raise argparse.ArgumentTypeError(f"Empty token range: {raw_value}")
+    return token_range
+
+
+def handle_bulk_equipped(args: argparse.Namespace) -> None:
+    from . import Multicall2, multicall, rpc_batch
+
+    network.connect(args.network)
+    inventory = InventoryFacet.InventoryFacet(args.address)
+    multicall_contract = Multicall2.Multicall2(args.multicall_address)
+
+    block_number = multicall.resolve_block_number(
+        "latest" if args.block_number is None else args.block_number
+    )
+    slots = args.slots
+    if slots is None:
+        slots = list(range(1, inventory.num_slots(block_number=block_number) + 1))
+    subject_token_ids = list(args.token_range)
+
+    records = multicall.bulk_equipped_items(
+        inventory,
+        multicall_contract,
+        subject_token_ids,
+        slots,
+        block_number=block_number,
+        batch_size=args.batch_size,
+    )
+    if args.subject_slots:
+        subject_slots = multicall.bulk_subject_token_slots(
+            inventory,
+            multicall_contract,
+            subject_token_ids,
+            block_number=block_number,
+            batch_size=args.batch_size,
+        )
+        records = (
+            {**record, "subject_slots": subject_slot_record.get("slots")}
+            for record, subject_slot_record in zip(records, subject_slots)
+        )
+
+    ofp = sys.stdout if args.outfile is None else open(args.outfile, "w")
+    try:
+        with rpc_batch.batched_calls_if_supported():
+            for record in records:
+                print(json.dumps(record, default=json_default), file=ofp)
+    finally:
+        if ofp is not sys.stdout:
+            ofp.close()
+
+
+def handle_slot_catalog(args: argparse.Namespace) -> None:
+    from . import Multicall2, rpc_batch
+    from .slot_catalog import SlotCatalog
+
+    network.connect(args.network)
+    inventory = InventoryFacet.InventoryFacet(args.address)
+    multicall_contract = None
+    if args.multicall_address is not None:
+        multicall_contract = Multicall2.Multicall2(args.multicall_address)
+
+    catalog = SlotCatalog(inventory, multicall_contract)
+    with rpc_batch.batched_calls_if_supported():
+        catalog.load(args.block_number)
+
+    result = {
+        "block_number": catalog.block_number,
+        "slots": [slot._asdict() for slot in catalog.slots()],
+        "slot_types": catalog.slot_type_names(),
+    }
+    print(json.dumps(result))
+
+
+def handle_index_events(args: argparse.Namespace) -> None:
+    from . import equipped_view, indexer
+
+    network.connect(args.network)
+    chunker = indexer.AdaptiveChunker(
+        initial_size=args.chunk_size,
+        max_size=args.max_chunk_size,
+        target_logs=args.target_logs,
+    )
+    with indexer.EventStore(args.db) as store:
+        # The view has to be attached to the store before it is synced, so that it is rolled back
+        # along with the events if the chain has been reorganized.
+        view = equipped_view.EquippedView(store)
+        if args.follow:
+            progress = indexer.follow(
+                store,
+                web3,
+                args.address,
+                start_block=args.start_block,
+                confirmations=args.confirmations,
+                poll_interval=args.poll_interval,
+                chunker=chunker,
+                max_workers=args.workers,
+                reorg_depth=args.reorg_depth,
+            )
+        else:
+            progress = indexer.sync(
+                store,
+                web3,
+                args.address,
+                start_block=args.start_block,
+                confirmations=args.confirmations,
+                chunker=chunker,
+                max_workers=args.workers,
+                reorg_depth=args.reorg_depth,
+            )
+        num_events = 0
+        rollbacks = []
+        with tqdm(unit="block", file=sys.stderr, disable=args.quiet) as progress_bar:
+            try:
+                for record in progress:
+                    if "rolled_back_to" in record:
+                        rollbacks.append(record)
+                        progress_bar.write(
+                            f"Chain reorganized: rolled back to block {record['rolled_back_to']}, "
+                            f"removing {record['events_removed']} events"
+                        )
+                        continue
+                    num_events += record["events"]
+                    progress_bar.update(record["chunk_size"])
+                    progress_bar.set_postfix(
+                        block=record["to_block"],
+                        events=num_events,
+                        chunk_size=chunker.size,
+                    )
+            except KeyboardInterrupt:
+                # Every chunk is stored with its cursor, so nothing indexed so far is lost.
+                pass
+        result = {
+            "cursor": store.cursor(args.address),
+            "events_indexed": num_events,
+            "events_stored": store.count(args.address),
+            "rollbacks": rollbacks,
+            "equipped_view_updates": view.update(args.address),
+        }
+    print(json.dumps(result))
+
+
+def handle_equipped(args: argparse.Namespace) -> None:
+    from . import equipped_view, indexer
+
+    with indexer.EventStore(args.db) as store:
+        view = equipped_view.EquippedView(store)
+        view.update(args.address)
+        if args.item_address is not None:
+            for record in view.holders(
+                args.address, args.item_address, args.item_token_id
+            ):
+                print(json.dumps(record))
+            return
+        subject_token_ids = args.token_range
+        if subject_token_ids is None:
+            subject_token_ids = view.subject_token_ids(args.address)
+        for subject_token_id in subject_token_ids:
+            record = {
+                "subject_token_id": subject_token_id,
+                "block_number": store.cursor(args.address),
+                "equipped": view.equipped(args.address, subject_token_id),
+            }
+            print(json.dumps(record))
+
+
+def handle_equipped_at(args: argparse.Namespace) -> None:
+    from . import history, indexer
+
+    with indexer.EventStore(args.db) as store:
+        equipment_history = history.EquipmentHistory(
+            store, args.address, args.checkpoint_interval
+        )
+        equipment_history.update_checkpoints()
+        state = equipment_history.state_at(args.block, args.token_range)
+    subject_token_ids = args.token_range
+    if subject_token_ids is None:
+        subject_token_ids = sorted(state)
+    for subject_token_id in subject_token_ids:
+        record = {
+            "subject_token_id": subject_token_id,
+            "block_number": args.block,
+            "equipped": state.get(subject_token_id, {}),
+        }
+        print(json.dumps(record))
+
+
+def handle_verify_equipped(args: argparse.Namespace) -> None:
+    from . import Multicall2, equipped_view, indexer, rpc_batch
+
+    network.connect(args.network)
+    inventory_contract = InventoryFacet.InventoryFacet(args.address)
+    multicall_contract = None
+    if args.multicall_address is not None:
+        multicall_contract = Multicall2.Multicall2(args.multicall_address)
+    subject_token_ids = None if args.token_range is None else list(args.token_range)
+
+    with indexer.EventStore(args.db) as store:
+        with rpc_batch.batched_calls_if_supported():
+            mismatches = equipped_view.EquippedView(store).verify(
+                inventory_contract,
+                subject_token_ids,
+                sample_size=args.sample_size,
+                multicall_contract=multicall_contract,
+            )
+    for mismatch in mismatches:
+        print(json.dumps(mismatch))
+    if mismatches:
+        print(
+            f"{len(mismatches)} slots differ between the view and the chain",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def handle_archive_events(args: argparse.Namespace) -> None:
+    from . import event_archive, indexer
+
+    archive = event_archive.EventArchive(args.archive)
+    with indexer.EventStore(args.db) as store:
+        cursor = store.cursor(args.address)
+        to_block = None if cursor is None else cursor - args.confirmations
+        result = event_archive.archive_store(
+            archive, store, args.address, to_block, start_block=args.start_block
+        )
+    result["archive_rows"] = archive.num_rows()
+    print(json.dumps(result))
+
+
+def handle_archived_events(args: argparse.Namespace) -> None:
+    from . import event_archive, log_columns
+
+    archive = event_archive.EventArchive(args.archive)
+    for rows in archive.scan(
+        from_block=args.from_block,
+        to_block=args.to_block,
+        slot=args.slot,
+        item_address=args.item_address,
+        subject_token_id=args.subject_token_id,
+    ):
+        columns = {
+            "subjectTokenId": log_columns.to_ints(rows["subjectTokenId"]),
+            "slot": log_columns.to_ints(rows["slot"]),
+            "itemAddress": log_columns.checksum_addresses(rows["itemAddress"]),
+            "itemTokenId": log_columns.to_ints(rows["itemTokenId"]),
+            "amount": log_columns.to_ints(rows["amount"]),
+            "sender": log_columns.checksum_addresses(rows["sender"]),
+        }
+        for i, row in enumerate(rows):
+            record = {
+                "event": event_archive.ITEM_EVENTS[row["event"]],
+                "block_number": int(row["block_number"]),
+                "log_index": int(row["log_index"]),
+                "itemType": int(row["itemType"]),
+            }
+            record.update({name: values[i] for name, values in columns.items()})
+            print(json.dumps(record))
+
+
+def handle_query_events(args: argparse.Namespace) -> None:
+    from . import event_query
+
+    network.connect(args.network)
+    event_type = event_query.EVENT_TYPES[args.event]
+    filters = event_query.parse_filters(event_type, args.where)
+    to_block = web3.eth.block_number if args.to_block is None else args.to_block
+    for event in event_query.query(
+        web3,
+        event_type,
+        args.address,
+        args.from_block,
+        to_block,
+        chunk_size=args.chunk_size,
+        max_workers=args.workers,
+        **filters,
+    ):
+        print(json.dumps(event))
+
+
+def handle_watch(args: argparse.Namespace) -> None:
+    from . import watch
+
+    network.connect(args.network)
+    ws_url = args.ws_url
+    if ws_url is None:
+        endpoint_uri = getattr(web3.provider, "endpoint_uri", None)
+        if endpoint_uri is not None and endpoint_uri.startswith(("ws://", "wss://")):
+            ws_url = endpoint_uri
+    spill_path = args.spill_file
+    if args.policy == "spill" and spill_path is None:
+        spill_path = f"watch-{args.address.lower()}.spill.ndjson"
+    queue = watch.EventQueue(args.queue_size, args.policy, spill_path)
+    output = sys.stdout if args.socket is None else watch.UnixSocketOutput(args.socket)
+    try:
+        stats = watch.watch(
+            web3,
+            args.address,
+            output,
+            from_block=args.from_block,
+            ws_url=ws_url,
+            confirmations=args.confirmations,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+            queue=queue,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(json.dumps(stats), file=sys.stderr)
+
+
+def subcommands_of(parser: argparse.ArgumentParser) -> argparse._SubParsersAction:
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return action
+    raise ValueError("Parser has no subcommands")
+
+
+def read_cache_handler(
+    handler: Callable[[argparse.Namespace], None],
+) -> Callable[[argparse.Namespace], None]:
+    """
+    Wraps a command handler so that the reads it makes go through the database given by
+    --read-cache-db, if any.
+    """
+
+    @functools.wraps(handler)
+    def handle(args: argparse.Namespace) -> None:
+        if args.read_cache_db is None:
+            handler(args)
+            return
+        from . import read_cache
+
+        cache = read_cache.ReadCache(database=args.read_cache_db)
+        with cache, read_cache.cached_reads(cache):
+            handler(args)
+
+    return handle
+
+
+def add_read_cache_arguments(subcommands: argparse._SubParsersAction) -> None:
+    """
+    Adds --read-cache-db to every subcommand with a --block-number argument.
+    """
+    for command_parser in subcommands.choices.values():
+        if "--block-number" not in command_parser._option_string_actions:
+            continue
+        command_parser.add_argument(
+            "--read-cache-db",
+            required=False,
+            default=None,
+            help="(Optional) path to an SQLite file in which to persist the results of reads at fixed blocks across runs",
+        )
+        command_parser.set_defaults(
+            func=read_cache_handler(command_parser.get_default("func"))
+        )
+
+
+def generate_cli() -> argparse.ArgumentParser:
+    parser = InventoryFacet.generate_cli()
+    subcommands = subcommands_of(parser)
+
+    run_batch_parser = subcommands.add_parser(
+        "run-batch",
+        help="Run a batch of InventoryFacet operations from a JSONL manifest",
+        description='Run a batch of InventoryFacet operations from a JSONL manifest in a single process, with a single connection and signer. Each line of the manifest is an operation of the form {"op": "create_slot", "args": {...}}. Writes one JSON result per operation.',
+    )
+    InventoryFacet.add_default_arguments(run_batch_parser, True)
+    run_batch_parser.add_argument(
+        "--file", required=True, help="Path to JSONL manifest of operations"
+    )
+    run_batch_parser.add_argument(
+        "-o",
+        "--outfile",
+        required=False,
+        default=None,
+        help="(Optional) file to write results to as JSONL (default: stdout)",
+    )
+    run_batch_parser.add_argument(
+        "--start-line",
+        type=int,
+        default=1,
+        help="Manifest line to start from, e.g. to resume a batch after a failure (default: 1)",
+    )
+    run_batch_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the operations recorded as successful in --outfile",
+    )
+    run_batch_parser.add_argument(
+        "--continue-on-error",
+        action="store_true",
+        help="Record failed operations and carry on with the rest of the batch instead of stopping",
+    )
+    run_batch_parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=1,
+        help="Number of transactions to keep pending at once (default: 1, wait for each transaction before submitting the next)",
+    )
+    run_batch_parser.add_argument(
+        "--gas-limit",
+        type=int,
+        default=None,
+        help="Gas limit for every transaction. Skips gas estimation, which can fail for transactions that depend on pending ones when --max-in-flight is above 1.",
+    )
+    run_batch_parser.set_defaults(func=handle_run_batch)
+
+    bulk_equipped_parser = subcommands.add_parser(
+        "bulk-equipped",
+        help="Read the equipped items of a range of subject tokens",
+        description="Read the equipped items of a range of subject tokens, aggregating the getAllEquippedItems calls for many subject tokens into each eth_call through a Multicall2 contract. Writes one JSON record per subject token.",
+    )
+    InventoryFacet.add_default_arguments(bulk_equipped_parser, False)
+    bulk_equipped_parser.add_argument(
+        "--multicall-address",
+        required=True,
+        help="Address of Multicall2 contract (deploy one to local chains with: game7ctl multicall deploy)",
+    )
+    bulk_equipped_parser.add_argument(
+        "--token-range",
+        required=True,
+        type=token_range_argument_type,
+        help="Subject token IDs to read, as A:B (both included) or a single token ID",
+    )
+    bulk_equipped_parser.add_argument(
+        "--slots",
+        nargs="+",
+        type=int,
+        default=None,
+        help="Slots to read (default: every slot created on the Inventory)",
+    )
+    bulk_equipped_parser.add_argument(
+        "--subject-slots",
+        action="store_true",
+        help="Also read the slots added to each subject token (costs one eth_call per subject token, as only the owner of a subject token may read its slots)",
+    )
+    bulk_equipped_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=defaults.MULTICALL_BATCH_SIZE,
+        help=f"Number of calls to aggregate into each eth_call (default: {defaults.MULTICALL_BATCH_SIZE})",
+    )
+    bulk_equipped_parser.add_argument(
+        "-o",
+        "--outfile",
+        required=False,
+        default=None,
+        help="(Optional) file to write results to as JSONL (default: stdout)",
+    )
+    bulk_equipped_parser.set_defaults(func=handle_bulk_equipped)
+
+    slot_catalog_parser = subcommands.add_parser(
+        "slot-catalog",
+        help="Read every slot on the Inventory and the names of their slot types",
+        description="Read every slot on the Inventory and the names of their slot types in bulk, through a Multicall2 contract if one is given and through batched JSON-RPC calls otherwise",
+    )
+    InventoryFacet.add_default_arguments(slot_catalog_parser, False)
+    slot_catalog_parser.add_argument(
+        "--multicall-address",
+        required=False,
+        default=None,
+        help="(Optional) address of Multicall2 contract to aggregate reads through",
+    )
+    slot_catalog_parser.set_defaults(func=handle_slot_catalog)
+
+    index_events_parser = subcommands.add_parser(
+        "index-events",
+        help="Index the Inventory's events into a local SQLite database",
+        description="Index the events emitted by the Inventory into a local SQLite database. Resumes from where the previous run on the same database left off. eth_getLogs ranges are sized adaptively from the number of logs they return and from the errors the node answers with.",
+    )
+    index_events_parser.add_argument(
+        "--network", required=True, help="Name of brownie network to connect to"
+    )
+    index_events_parser.add_argument(
+        "--address", required=True, help="Address of the Inventory contract"
+    )
+    index_events_parser.add_argument(
+        "--db", required=True, help="Path to the SQLite database to index events into"
+    )
+    index_events_parser.add_argument(
+        "--start-block",
+        type=int,
+        default=0,
+        help="Block to start from if the Inventory has not been indexed into the database yet, e.g. its deployment block (default: 0)",
+    )
+    index_events_parser.add_argument(
+        "--confirmations",
+        type=int,
+        default=0,
+        help="Only index blocks with at least this many blocks on top of them (default: 0)",
+    )
+    index_events_parser.add_argument(
+        "--reorg-depth",
+        type=int,
+        default=defaults.REORG_DEPTH,
+        help=f"Number of most recently indexed blocks to keep block hashes for, to detect and roll back chain reorganizations with. Reorganizations deeper than this cannot be recovered from. 0 disables reorg detection, which is only safe with enough --confirmations (default: {defaults.REORG_DEPTH})",
+    )
+    index_events_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=defaults.INDEXER_INITIAL_CHUNK_SIZE,
+        help=f"Number of blocks in the first eth_getLogs range (default: {defaults.INDEXER_INITIAL_CHUNK_SIZE})",
+    )
+    index_events_parser.add_argument(
+        "--max-chunk-size",
+        type=int,
+        default=defaults.INDEXER_MAX_CHUNK_SIZE,
+        help=f"Maximum number of blocks in an eth_getLogs range (default: {defaults.INDEXER_MAX_CHUNK_SIZE})",
+    )
+    index_events_parser.add_argument(
+        "--target-logs",
+        type=int,
+        default=defaults.INDEXER_TARGET_LOGS,
+        help=f"Number of logs to aim for per eth_getLogs range (default: {defaults.INDEXER_TARGET_LOGS})",
+    )
+    index_events_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of eth_getLogs requests to make in parallel. With more than 1 worker, ranges keep the size given by --chunk-size and are only split when the node fails to answer for them (default: 1)",
+    )
+    index_events_parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep indexing new blocks as they are produced",
+    )
+    index_events_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between polls for new blocks with --follow (default: 5)",
+    )
+    index_events_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not show progress"
+    )
+    index_events_parser.set_defaults(func=handle_index_events)
+
+    equipped_parser = subcommands.add_parser(
+        "equipped",
+        help="Read equipped items from a database built by index-events",
+        description="Read the items equipped on subject tokens, or the subject tokens an item is equipped on, from a database built by index-events, without making any RPC calls. Writes one JSON record per subject token (or per slot, with --item-address).",
+    )
+    equipped_parser.add_argument(
+        "--address", required=True, help="Address of the Inventory contract"
+    )
+    equipped_parser.add_argument(
+        "--db", required=True, help="Path to the database built by index-events"
+    )
+    equipped_parser.add_argument(
+        "--token-range",
+        type=token_range_argument_type,
+        default=None,
+        help="Subject token IDs to read, as A:B (both included) or a single token ID (default: every subject token with items equipped)",
+    )
+    equipped_parser.add_argument(
+        "--item-address",
+        default=None,
+        help="List where the item from this contract is equipped instead",
+    )
+    equipped_parser.add_argument(
+        "--item-token-id",
+        type=int,
+        default=None,
+        help="With --item-address, only list where the item with this token ID is equipped",
+    )
+    equipped_parser.set_defaults(func=handle_equipped)
+
+    equipped_at_parser = subcommands.add_parser(
+        "equipped-at",
+        help="Reconstruct equipped items at a past block from index-events",
+        description="Reconstruct the items equipped on subject tokens at the end of a past block from a database built by index-events, without an archive node. Writes checkpoints of the full state every --checkpoint-interval blocks into the database as it goes, so that later reconstructions only replay the events after the nearest checkpoint. Writes one JSON record per subject token.",
+    )
+    equipped_at_parser.add_argument(
+        "--address", required=True, help="Address of the Inventory contract"
+    )
+    equipped_at_parser.add_argument(
+        "--db", required=True, help="Path to the database built by index-events"
+    )
+    equipped_at_parser.add_argument(
+        "--block", required=True, type=int, help="Block to reconstruct the state at"
+    )
+    equipped_at_parser.add_argument(
+        "--token-range",
+        type=token_range_argument_type,
+        default=None,
+        help="Subject token IDs to read, as A:B (both included) or a single token ID (default: every subject token with items equipped at the block)",
+    )
+    equipped_at_parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=defaults.CHECKPOINT_INTERVAL,
+        help=f"Number of blocks between checkpoints (default: {defaults.CHECKPOINT_INTERVAL})",
+    )
+    equipped_at_parser.set_defaults(func=handle_equipped_at)
+
+    verify_equipped_parser = subcommands.add_parser(
+        "verify-equipped",
+        help="Spot-check equipped items from index-events against the chain",
+        description="Compare the items equipped on a random sample of subject tokens according to a database built by index-events against getAllEquippedItems, at the last block indexed. Writes one JSON record per slot which differs and exits with status 1 if any do.",
+    )
+    verify_equipped_parser.add_argument(
+        "--network", required=True, help="Name of brownie network to connect to"
+    )
+    verify_equipped_parser.add_argument(
+        "--address", required=True, help="Address of the Inventory contract"
+    )
+    verify_equipped_parser.add_argument(
+        "--db", required=True, help="Path to the database built by index-events"
+    )
+    verify_equipped_parser.add_argument(
+        "--token-range",
+        type=token_range_argument_type,
+        default=None,
+        help="Subject token IDs to sample from, as A:B (both included) or a single token ID (default: every subject token with items equipped)",
+    )
+    verify_equipped_parser.add_argument(
+        "--sample-size",
+        type=int,
+        default=100,
+        help="Number of subject tokens to check (default: 100)",
+    )
+    verify_equipped_parser.add_argument(
+        "--multicall-address",
+        required=False,
+        default=None,
+        help="(Optional) address of Multicall2 contract to aggregate reads through",
+    )
+    verify_equipped_parser.set_defaults(func=handle_verify_equipped)
+
+    archive_events_parser = subcommands.add_parser(
+        "archive-events",
+        help="Append indexed equip events to a columnar archive",
+        description="Append the ItemEquipped and ItemUnequipped events which index-events has stored since the last block in the archive to a columnar archive, as a new segment. Only blocks with at least --confirmations blocks on top of the last indexed block are archived, since archived segments are never changed. Requires numpy.",
+    )
+    archive_events_parser.add_argument(
+        "--address", required=True, help="Address of the Inventory contract"
+    )
+    archive_events_parser.add_argument(
+        "--db", required=True, help="Path to the database built by index-events"
+    )
+    archive_events_parser.add_argument(
+        "--archive", required=True, help="Directory of the archive"
+    )
+    archive_events_parser.add_argument(
+        "--confirmations",
+        type=int,
+        default=defaults.REORG_DEPTH,
+        help=f"Number of indexed blocks to leave out of the archive, so that blocks which may still be reorganized are not archived (default: {defaults.REORG_DEPTH})",
+    )
+    archive_events_parser.add_argument(
+        "--start-block",
+        type=int,
+        default=0,
+        help="First block of the archive, if it is empty (default: 0)",
+    )
+    archive_events_parser.set_defaults(func=handle_archive_events)
+
+    archived_events_parser = subcommands.add_parser(
+        "archived-events",
+        help="Read equip events from a columnar archive",
+        description="Read ItemEquipped and ItemUnequipped events from an archive built by archive-events, filtered by block range, slot, item address or subject token. Writes one JSON record per event. Requires numpy.",
+    )
+    archived_events_parser.add_argument(
+        "--archive", required=True, help="Directory of the archive"
+    )
+    archived_events_parser.add_argument(
+        "--from-block", type=int, default=None, help="First block to read events from"
+    )
+    archived_events_parser.add_argument(
+        "--to-block", type=int, default=None, help="Last block to read events from"
+    )
+    archived_events_parser.add_argument(
+        "--slot", type=int, default=None, help="Only read events in this slot"
+    )
+    archived_events_parser.add_argument(
+        "--item-address",
+        default=None,
+        help="Only read events of items from this contract",
+    )
+    archived_events_parser.add_argument(
+        "--subject-token-id",
+        type=int,
+        default=None,
+        help="Only read events on this subject token",
+    )
+    archived_events_parser.set_defaults(func=handle_archived_events)
+
+    query_events_parser = subcommands.add_parser(
+        "query-events",
+        help="Read events from the chain, filtered on their indexed arguments",
+        description="Read the events of one type emitted by the Inventory from the chain. Filters on indexed arguments are sent to the node with the eth_getLogs requests, so only the matching logs are transferred. Writes one JSON record per event.",
+    )
+    query_events_parser.add_argument(
+        "--network", required=True, help="Name of brownie network to connect to"
+    )
+    query_events_parser.add_argument(
+        "--address", required=True, help="Address of the Inventory contract"
+    )
+    query_events_parser.add_argument(
+        "--event",
+        required=True,
+        choices=sorted(abi["name"] for abi in inventory_events.EVENT_ABIS),
+        help="Event to read",
+    )
+    query_events_parser.add_argument(
+        "--where",
+        nargs="*",
+        default=[],
+        help="Filters on indexed arguments, as name=value or name=value1,value2,... to match any of the values, e.g. subject_token_id=42 item_address=0x...,0x...",
+    )
+    query_events_parser.add_argument(
+        "--from-block",
+        type=int,
+        default=0,
+        help="First block to read events from, e.g. the Inventory's deployment block (default: 0)",
+    )
+    query_events_parser.add_argument(
+        "--to-block",
+        type=int,
+        default=None,
+        help="Last block to read events from (default: the latest block)",
+    )
+    query_events_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=defaults.LOGS_CHUNK_SIZE,
+        help=f"Number of blocks per eth_getLogs request (default: {defaults.LOGS_CHUNK_SIZE})",
+    )
+    query_events_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of eth_getLogs requests to make in parallel (default: 1)",
+    )
+    query_events_parser.set_defaults(func=handle_query_events)
+
+    apply_parser = subcommands.add_parser(
+        "apply",
+        help="Bring slots, slot types and item eligibility to the state declared in a manifest",
+        description="Read the slots, slot types and item eligibility which a YAML manifest declares from the Inventory in bulk, and make only the writes needed to bring it to the declared state. Applying a manifest which the Inventory already matches makes no transactions. Writes one JSON result per change, and a summary to stderr.",
+    )
+    InventoryFacet.add_default_arguments(apply_parser, True)
+    apply_parser.add_argument(
+        "--manifest", required=True, help="Path to the YAML (or JSON) manifest"
+    )
+    apply_parser.add_argument(
+        "--multicall-address",
+        default=None,
+        help="Address of a Multicall2 contract to aggregate reads through (default: batched JSON-RPC calls)",
+    )
+    apply_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the changes without making them",
+    )
+    apply_parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=16,
+        help="Number of transactions to keep pending at once (default: 16)",
+    )
+    apply_parser.add_argument(
+        "--gas-limit",
+        type=int,
+        default=None,
+        help="Gas limit for every transaction, instead of estimating it",
+    )
+    apply_parser.set_defaults(func=handle_apply)
+
+    watch_parser = subcommands.add_parser(
+        "watch",
+        help="Stream new events as NDJSON as they are emitted",
+        description="Tail the events emitted by the Inventory and write them, decoded, as NDJSON to stdout or to a Unix socket. Uses a log subscription when the node is reachable over a websocket, and adaptive eth_getLogs polling otherwise. Events wait for a slow consumer in a bounded queue, and --policy decides what happens to new events when it is full.",
+    )
+    watch_parser.add_argument(
+        "--network", required=True, help="Name of brownie network to connect to"
+    )
+    watch_parser.add_argument(
+        "--address", required=True, help="Address of the Inventory contract"
+    )
+    watch_parser.add_argument(
+        "--from-block",
+        type=int,
+        default=None,
+        help="Block to start from, to replay past events first (default: the next block)",
+    )
+    watch_parser.add_argument(
+        "--ws-url",
+        default=None,
+        help="Websocket URL of the node to subscribe to logs on (default: the network's URL, if it is a websocket URL; otherwise events are polled for)",
+    )
+    watch_parser.add_argument(
+        "--socket",
+        default=None,
+        help="Path of a Unix socket to write events to, instead of stdout. Reconnects when the socket's server restarts",
+    )
+    watch_parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=defaults.WATCH_QUEUE_SIZE,
+        help=f"Number of events to hold in memory for a slow consumer (default: {defaults.WATCH_QUEUE_SIZE})",
+    )
+    watch_parser.add_argument(
+        "--policy",
+        choices=defaults.WATCH_POLICIES,
+        default="block",
+        help="What to do with new events when the queue is full: block (wait for the consumer), drop (drop them and send an EventsDropped record instead) or spill (write them to --spill-file) (default: block)",
+    )
+    watch_parser.add_argument(
+        "--spill-file",
+        default=None,
+        help="File to spill events to with --policy spill (default: watch-<address>.spill.ndjson in the current directory)",
+    )
+    watch_parser.add_argument(
+        "--confirmations",
+        type=int,
+        default=0,
+        help="When polling, only read blocks with at least this many blocks on top of them (default: 0)",
+    )
+    watch_parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=defaults.WATCH_MIN_INTERVAL,
+        help=f"Seconds between polls while new blocks keep coming (default: {defaults.WATCH_MIN_INTERVAL})",
+    )
+    watch_parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=defaults.WATCH_MAX_INTERVAL,
+        help=f"Longest number of seconds between polls, which they back off to while there are no new blocks (default: {defaults.WATCH_MAX_INTERVAL})",
+    )
+    watch_parser.set_defaults(func=handle_watch)
+
+    allocate_backpacks_parser = subcommands.add_parser(
+        "allocate-backpacks",
+        help="Add a backpack to many subject tokens",
+        description="Give every subject token in a range or list the same backpack, skipping subject tokens which already have its slots (and only adding the missing slots to those which have some). Keeps many transactions pending at once, appends a JSON record per subject token to a checkpoint file, and skips the subject tokens which the checkpoint file records as done when it is run again. Prints the totals, throughput and gas used at the end.",
+    )
+    InventoryFacet.add_default_arguments(allocate_backpacks_parser, True)
+    allocate_backpacks_parser.add_argument(
+        "--multicall-address",
+        required=True,
+        help="Address of a Multicall2 contract to read the owners of the subject tokens through",
+    )
+    subject_tokens_group = allocate_backpacks_parser.add_mutually_exclusive_group(
+        required=True
+    )
+    subject_tokens_group.add_argument(
+        "--token-range",
+        type=token_range_argument_type,
+        default=None,
+        help="Subject token IDs to allocate backpacks to, as A:B (inclusive)",
+    )
+    subject_tokens_group.add_argument(
+        "--tokens-file",
+        default=None,
+        help="File with the subject token IDs to allocate backpacks to, one per line",
+    )
+    allocate_backpacks_parser.add_argument(
+        "--slot-qty",
+        type=int,
+        required=True,
+        help="Number of slots in the backpack",
+    )
+    allocate_backpacks_parser.add_argument(
+        "--slot-type", type=int, required=True, help="Slot type of the backpack's slots"
+    )
+    allocate_backpacks_parser.add_argument(
+        "--slot-uri", default="", help="URI of the backpack's slots (default: empty)"
+    )
+    allocate_backpacks_parser.add_argument(
+        "--checkpoint",
+        required=True,
+        help="JSONL file to append a record per subject token to, and to resume from",
+    )
+    allocate_backpacks_parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=16,
+        help="Number of transactions to keep pending at once (default: 16)",
+    )
+    allocate_backpacks_parser.add_argument(
+        "--gas-limit",
+        type=int,
+        default=None,
+        help="Gas limit for every transaction, instead of estimating it",
+    )
+    allocate_backpacks_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=defaults.BACKPACK_BATCH_SIZE,
+        help=f"Number of subject tokens to read the slots of at a time (default: {defaults.BACKPACK_BATCH_SIZE})",
+    )
+    allocate_backpacks_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not show progress"
+    )
+    allocate_backpacks_parser.set_defaults(func=handle_allocate_backpacks)
+
+    add_read_cache_arguments(subcommands)
+
+    return parser
+
+
+def main() -> None:
+    parser = generate_cli()
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Any, Dict, Optional
+
 ADMINISTRATOR_DESIGNATED_ABI = {
     "anonymous": False,
     "inputs": [
@@ -186,3 +188,141 @@ ITEM_UNEQUIPPED_ABI = {
     "name": "ItemUnequipped",
     "type": "event",
 }
+
+NEW_SLOT_TYPE_ADDED_ABI = {
+    "anonymous": False,
+    "inputs": [
+        {
+            "indexed": True,
+            "internalType": "address",
+            "name": "creator",
+            "type": "address",
+        },
+        {
+            "indexed": True,
+            "internalType": "uint256",
+            "name": "slotType",
+            "type": "uint256",
+        },
+        {
+            "indexed": False,
+            "internalType": "string",
+            "name": "slotTypeName",
+            "type": "string",
+        },
+    ],
+    "name": "NewSlotTypeAdded",
+    "type": "event",
+}
+
+BACKPACK_ADDED_ABI = {
+    "anonymous": False,
+    "inputs": [
+        {
+            "indexed": True,
+            "internalType": "address",
+            "name": "creator",
+            "type": "address",
+        },
+        {
+            "indexed": True,
+            "internalType": "uint256",
+            "name": "toSubjectTokenId",
+            "type": "uint256",
+        },
+        {
+            "indexed": True,
+            "internalType": "uint256",
+            "name": "slotQuantity",
+            "type": "uint256",
+        },
+    ],
+    "name": "BackpackAdded",
+    "type": "event",
+}
+
+NEW_SLOT_URI_ABI = {
+    "anonymous": False,
+    "inputs": [
+        {
+            "indexed": True,
+            "internalType": "uint256",
+            "name": "slotId",
+            "type": "uint256",
+        }
+    ],
+    "name": "NewSlotURI",
+    "type": "event",
+}
+
+SLOT_TYPE_ADDED_ABI = {
+    "anonymous": False,
+    "inputs": [
+        {
+            "indexed": True,
+            "internalType": "address",
+            "name": "creator",
+            "type": "address",
+        },
+        {
+            "indexed": True,
+            "internalType": "uint256",
+            "name": "slotId",
+            "type": "uint256",
+        },
+        {
+            "indexed": True,
+            "internalType": "uint256",
+            "name": "slotType",
+            "type": "uint256",
+        },
+    ],
+    "name": "SlotTypeAdded",
+    "type": "event",
+}
+
+# Every event the Inventory emits.
+EVENT_ABIS = [
+    ADMINISTRATOR_DESIGNATED_ABI,
+    CONTRACT_ADDRESS_DESIGNATED_ABI,
+    SLOT_CREATED_ABI,
+    ITEM_MARKED_AS_EQUIPPABLE_IN_SLOT_ABI,
+    ITEM_EQUIPPED_ABI,
+    ITEM_UNEQUIPPED_ABI,
+    NEW_SLOT_TYPE_ADDED_ABI,
+    BACKPACK_ADDED_ABI,
+    NEW_SLOT_URI_ABI,
+    SLOT_TYPE_ADDED_ABI,
+]
+
+# Events which change the items equipped on subject tokens, in the order of their codes in event archives
+# (see event_archive).
+ITEM_EVENTS = [ITEM_EQUIPPED_ABI["name"], ITEM_UNEQUIPPED_ABI["name"]]
+
+
+def fold_item_event(
+    item: Optional[Dict[str, Any]], event: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Returns the item in a slot after a decoded ItemEquipped or ItemUnequipped event on it, given the
+    item in the slot before it, with the semantics of the EquippedItems mapping in LibInventory:
+    - ItemEquipped replaces whatever is in the slot (equip unequips the previous item first, which emits
+      an ItemUnequipped event of its own)
+    - ItemUnequipped reduces the amount in the slot, and empties the slot when the amount reaches 0
+
+    Items are dicts with item_type, item_address, item_token_id and amount, and None is an empty slot.
+    """
+    args = event["args"]
+    if event["event"] == "ItemEquipped":
+        return {
+            "item_type": args["itemType"],
+            "item_address": args["itemAddress"],
+            "item_token_id": args["itemTokenId"],
+            "amount": args["amount"],
+        }
+    if event["event"] == "ItemUnequipped":
+        if item is None:
+            return None
+        amount = item["amount"] - args["amount"]
+        return None if amount <= 0 else dict(item, amount=amount)
+    return item
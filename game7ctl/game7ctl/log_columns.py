@@ -0,0 +1,285 @@
+"""
+Bulk decoding of event logs into NumPy structured arrays.
+
+logs.decode_log decodes one log at a time through eth-abi, which dominates the cost of replaying large
+numbers of logs. Events whose arguments are all static, single-word types (uintN, intN, address, bool,
+bytesN) have a fixed layout: every log of the event has the same number of topics and data words, and
+every argument sits at a fixed offset in them. decode_logs concatenates the topics and data of a batch
+of logs into a single buffer and reads it as a NumPy structured array with one row per log and one
+field per argument, without decoding any log on its own.
+
+Field types:
+- uint8 to uint64, bool: the matching NumPy integer (or boolean) type
+- int8 to int64: int64
+- address: 20-byte strings (S20) of the raw address bytes (see checksum_addresses)
+- bytes1 to bytes32: byte strings of that length
+- uint256 and every other integer wider than 64 bits: 4 uint64 limbs, most significant first (see
+  to_ints and narrow)
+
+Every array also has the fields block_number, log_index, block_hash and transaction_hash.
+
+NumPy drops trailing zero bytes from the byte strings it reads out of S fields. Pad them back (with
+ljust) before using them as raw bytes.
+
+    array = log_columns.decode_logs(inventory_events.ITEM_EQUIPPED_ABI, raw_logs)
+    amounts = log_columns.narrow(array["amount"])
+
+Requires numpy: pip install "game7ctl[numpy]"
+"""
+
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple, Union
+
+from eth_utils import to_checksum_address
+
+from . import logs
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore
+
+WORD_SIZE = 32
+
+# Metadata which precedes the argument words of each log in the buffer: the block hash and the
+# transaction hash.
+METADATA_FIELDS = [("block_hash", "S32", 0), ("transaction_hash", "S32", WORD_SIZE)]
+
+
+class Field(NamedTuple):
+    name: str
+    abi_type: str
+    # Index of the word the argument is stored in: topics (after the event topic) first, then data.
+    word: int
+    dtype: str
+    # Offset of the value inside its word.
+    offset: int
+
+
+class EventLayout(NamedTuple):
+    name: str
+    topic: str
+    num_topics: int
+    num_data_words: int
+    fields: List[Field]
+
+
+def field_type(abi_type: str) -> Tuple[Any, int]:
+    """
+    Returns the NumPy dtype of a field of the given ABI type, and the offset of its value inside its
+    32-byte word.
+    """
+    if abi_type == "address":
+        return "S20", 12
+    if abi_type == "bool":
+        return "?", 31
+    if abi_type.startswith("bytes") and abi_type != "bytes":
+        size = int(abi_type[len("bytes") :])
+        return f"S{size}", 0
+    for prefix, signed in (("uint", False), ("int", True)):
+        if abi_type.startswith(prefix):
+            bits = int(abi_type[len(prefix) :] or 256)
+            if bits > 64:
+                if signed:
+                    break
+                return (">u8", (4,)), 0
+            if signed:
+                # Signed values are sign-extended to the whole word, so the last 8 bytes hold the value
+                # in two's complement.
+                return ">i8", 24
+            size = next(size for size in (1, 2, 4, 8) if size * 8 >= bits)
+            return f">u{size}", WORD_SIZE - size
+    raise ValueError(
+        f"Arguments of type {abi_type} do not have a fixed 32-byte layout that can be decoded in bulk"
+    )
+
+
+def event_layout(event_abi: Dict[str, Any]) -> EventLayout:
+    """
+    Derives the layout of the logs of an event from its ABI. Raises ValueError if an argument of the
+    event is not a static, single-word type.
+    """
+    inputs = event_abi["inputs"]
+    indexed_inputs = [item for item in inputs if item["indexed"]]
+    data_inputs = [item for item in inputs if not item["indexed"]]
+    fields = []
+    for word, item in enumerate(indexed_inputs + data_inputs):
+        dtype, offset = field_type(item["type"])
+        fields.append(Field(item["name"], item["type"], word, dtype, offset))
+    return EventLayout(
+        event_abi["name"],
+        logs.event_topic(event_abi),
+        len(indexed_inputs) + 1,
+        len(data_inputs),
+        # Fields in the order of the event's arguments.
+        sorted(
+            fields,
+            key=lambda field: [item["name"] for item in inputs].index(field.name),
+        ),
+    )
+
+
+def layout_dtype(layout: EventLayout) -> Any:
+    """
+    Returns the structured dtype which reads one log of the given layout out of the buffer built by
+    decode_logs.
+    """
+    metadata_size = len(METADATA_FIELDS) * WORD_SIZE
+    names = [name for name, _, _ in METADATA_FIELDS]
+    formats: List[Any] = [dtype for _, dtype, _ in METADATA_FIELDS]
+    offsets = [offset for _, _, offset in METADATA_FIELDS]
+    for field in layout.fields:
+        names.append(field.name)
+        formats.append(field.dtype)
+        offsets.append(metadata_size + field.word * WORD_SIZE + field.offset)
+    return np.dtype(
+        {
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": metadata_size
+            + (layout.num_topics - 1 + layout.num_data_words) * WORD_SIZE,
+        }
+    )
+
+
+def native_dtype(dtype: Any) -> Any:
+    dtype = np.dtype(dtype)
+    if dtype.subdtype is not None:
+        base, shape = dtype.subdtype
+        return np.dtype((base.newbyteorder("="), shape))
+    return dtype.newbyteorder("=")
+
+
+def hex_string(value: Union[str, bytes]) -> str:
+    if isinstance(value, str):
+        return value[2:] if value.startswith("0x") else value
+    return bytes(value).hex()
+
+
+def decode_logs(
+    event_abi: Union[Dict[str, Any], EventLayout], raw_logs: Sequence[Dict[str, Any]]
+) -> Any:
+    """
+    Decodes raw logs (as returned by eth_getLogs) which were all emitted by the event with the given
+    ABI (or layout) into a structured array, in one pass. Raises ValueError if any of the logs does not
+    have the event's layout.
+    """
+    if np is None:
+        raise ImportError(
+            'Bulk log decoding requires numpy: pip install "game7ctl[numpy]"'
+        )
+    layout = (
+        event_abi if isinstance(event_abi, EventLayout) else event_layout(event_abi)
+    )
+    dtype = layout_dtype(layout)
+
+    hex_parts = []
+    for log in raw_logs:
+        topics = log["topics"]
+        if len(topics) != layout.num_topics:
+            raise ValueError(
+                f"Log {log.get('transactionHash')}:{log.get('logIndex')} has {len(topics)} topics, "
+                f"expected {layout.num_topics} for {layout.name}"
+            )
+        hex_parts.append(hex_string(log["blockHash"]))
+        hex_parts.append(hex_string(log["transactionHash"]))
+        hex_parts.extend(hex_string(topic) for topic in topics[1:])
+        hex_parts.append(hex_string(log["data"]))
+    buffer = bytes.fromhex("".join(hex_parts))
+    if len(buffer) != len(raw_logs) * dtype.itemsize:
+        raise ValueError(
+            f"Logs do not have the layout of {layout.name}: expected {dtype.itemsize} bytes per log"
+        )
+
+    columns = np.frombuffer(buffer, dtype=dtype)
+    result_dtype = np.dtype(
+        [("block_number", "u8"), ("log_index", "u4")]
+        + [
+            (name, native_dtype(columns.dtype.fields[name][0]))
+            for name in columns.dtype.names
+        ]
+    )
+    result = np.empty(len(raw_logs), dtype=result_dtype)
+    result["block_number"] = [logs.to_int(log["blockNumber"]) for log in raw_logs]
+    result["log_index"] = [logs.to_int(log["logIndex"]) for log in raw_logs]
+    for name in columns.dtype.names:
+        result[name] = columns[name]
+    return result
+
+
+def decode_logs_by_event(
+    event_abis: Sequence[Dict[str, Any]], raw_logs: Sequence[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Splits raw logs by their event topic and decodes the logs of each of the given events with
+    decode_logs. Returns a structured array for every event with at least one log, by event name. Logs
+    of other events are skipped. Raises ValueError if any of the events does not have a fixed layout.
+    """
+    layouts = {}
+    for event_abi in event_abis:
+        layout = event_layout(event_abi)
+        layouts[layout.topic] = layout
+    logs_by_topic: Dict[str, List[Dict[str, Any]]] = {}
+    for log in raw_logs:
+        if not log["topics"]:
+            continue
+        topic = logs.to_hex(log["topics"][0]).lower()
+        if topic in layouts:
+            logs_by_topic.setdefault(topic, []).append(log)
+    return {
+        layouts[topic].name: decode_logs(layouts[topic], topic_logs)
+        for topic, topic_logs in logs_by_topic.items()
+    }
+
+
+def to_ints(column: Any) -> List[int]:
+    """
+    Converts a column of 4-limb integers (uint256 and other wide integers) to Python integers.
+    """
+    limbs = column.astype(object)
+    return list(
+        (limbs[:, 0] << 192) | (limbs[:, 1] << 128) | (limbs[:, 2] << 64) | limbs[:, 3]
+    )
+
+
+def from_ints(values: Sequence[int]) -> Any:
+    """
+    Converts unsigned Python integers of up to 256 bits to a column of 4-limb integers.
+    """
+    mask = 2**64 - 1
+    return np.array(
+        [
+            [
+                (value >> 192) & mask,
+                (value >> 128) & mask,
+                (value >> 64) & mask,
+                value & mask,
+            ]
+            for value in values
+        ],
+        dtype="u8",
+    ).reshape(len(values), 4)
+
+
+def narrow(column: Any) -> Any:
+    """
+    Converts a column of 4-limb integers to a uint64 array. Raises OverflowError if any of its values
+    does not fit into 64 bits.
+    """
+    if column[:, :3].any():
+        raise OverflowError("Column has values which do not fit into 64 bits")
+    return column[:, 3].astype("u8")
+
+
+def raw_addresses(addresses: Sequence[str]) -> Any:
+    """
+    Converts address strings to a column of raw addresses.
+    """
+    return np.array([bytes.fromhex(address[2:]) for address in addresses], dtype="S20")
+
+
+def checksum_addresses(column: Any) -> List[str]:
+    """
+    Converts a column of raw addresses to checksummed address strings.
+    """
+    return [to_checksum_address(value.ljust(20, b"\0")) for value in column]
@@ -0,0 +1,314 @@
+"""
+Fetching and decoding of contract event logs.
+
+Decoded events are dictionaries of the same shape as the ones moonworm produces:
+    {
+        "event": <event name>,
+        "args": {<argument name>: <value>, ...},
+        "address": <address of the emitting contract>,
+        "blockNumber": ...,
+        "blockHash": ...,
+        "transactionHash": ...,
+        "logIndex": ...,
+    }
+
+fetch_logs makes a single eth_getLogs request. iter_logs fetches long block ranges in chunks on a pool
+of worker threads, splits chunks which the node refuses to answer (most nodes cap the number of logs or
+the size of an eth_getLogs response), and yields the decoded events in the order in which they were
+emitted while later chunks are still being fetched.
+"""
+
+import collections
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from eth_utils import to_checksum_address
+
+from . import abi, defaults
+
+try:
+    from eth_abi import decode as decode_abi
+except ImportError:
+    # eth-abi<4
+    from eth_abi import decode_abi  # type: ignore
+
+
+def to_bytes(value: Union[str, bytes]) -> bytes:
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    return bytes(value)
+
+
+def to_hex(value: Union[str, bytes]) -> str:
+    if isinstance(value, str):
+        return value if value.startswith("0x") else "0x" + value
+    return "0x" + bytes(value).hex()
+
+
+def to_int(value: Union[str, int]) -> int:
+    if isinstance(value, str):
+        return int(value, 16)
+    return value
+
+
+def event_topic(event_abi: Dict[str, Any]) -> str:
+    topic = abi.encode_event_topic(event_abi)
+    assert topic is not None
+    return "0x" + topic.replace("0x", "")
+
+
+def events_by_topic(event_abis: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {event_topic(event_abi): event_abi for event_abi in event_abis}
+
+
+def decode_value(abi_type: str, value: Any) -> Any:
+    if abi_type == "address":
+        return to_checksum_address(value)
+    if abi_type.endswith("]") and isinstance(value, (list, tuple)):
+        element_type = abi_type[: abi_type.rindex("[")]
+        return [decode_value(element_type, element) for element in value]
+    return value
+
+
+def decode_log(event_abi: Dict[str, Any], log: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decodes a raw log (as returned by eth_getLogs) emitted by an event with the given ABI.
+
+    Indexed arguments of dynamic types (strings, bytes, arrays, structs) are only stored as their
+    hashes, so they are decoded to the hex string of the hash.
+    """
+    topics = [to_bytes(topic) for topic in log["topics"]]
+    inputs = event_abi["inputs"]
+    indexed_inputs = [item for item in inputs if item["indexed"]]
+    data_inputs = [item for item in inputs if not item["indexed"]]
+
+    data_values = decode_abi(
+        [abi.abi_input_signature(item) for item in data_inputs], to_bytes(log["data"])
+    )
+    values_by_name: Dict[str, Any] = {
+        item["name"]: decode_value(item["type"], value)
+        for item, value in zip(data_inputs, data_values)
+    }
+    for item, topic in zip(indexed_inputs, topics[1:]):
+        abi_type = abi.abi_input_signature(item)
+        if abi_type in ("string", "bytes") or abi_type.endswith(("]", ")")):
+            values_by_name[item["name"]] = to_hex(topic)
+        else:
+            values_by_name[item["name"]] = decode_value(
+                item["type"], decode_abi([abi_type], topic)[0]
+            )
+
+    return {
+        "event": event_abi["name"],
+        "args": {item["name"]: values_by_name[item["name"]] for item in inputs},
+        "address": to_checksum_address(log["address"]),
+        "blockNumber": to_int(log["blockNumber"]),
+        "blockHash": to_hex(log["blockHash"]),
+        "transactionHash": to_hex(log["transactionHash"]),
+        "logIndex": to_int(log["logIndex"]),
+    }
+
+
+def fetch_logs(
+    web3_client: Any,
+    address: Optional[str],
+    event_abis: Sequence[Dict[str, Any]],
+    from_block: int,
+    to_block: int,
+    topics: Optional[Sequence[Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches the logs of the given events emitted by the contract at address (or by any contract, if
+    address is None) between from_block and to_block (inclusive) with a single eth_getLogs request, and
+    returns them decoded, in the order in which they were emitted.
+
+    topics filters the logs on their indexed arguments on the node, in the eth_getLogs format: one entry
+    per topic after the event topic, each None (any value), a topic or a list of topics (any of them).
+    """
+    abis_by_topic = events_by_topic(event_abis)
+    log_filter: Dict[str, Any] = {
+        "fromBlock": from_block,
+        "toBlock": to_block,
+        "topics": [list(abis_by_topic)] + list(topics or []),
+    }
+    if address is not None:
+        log_filter["address"] = to_checksum_address(address)
+    raw_logs = web3_client.eth.get_logs(log_filter)
+
+    events = []
+    for log in raw_logs:
+        if not log["topics"]:
+            continue
+        event_abi = abis_by_topic.get(to_hex(log["topics"][0]))
+        if event_abi is not None:
+            events.append(decode_log(event_abi, log))
+    events.sort(key=lambda event: (event["blockNumber"], event["logIndex"]))
+    return events
+
+
+DEFAULT_CHUNK_SIZE = defaults.LOGS_CHUNK_SIZE
+DEFAULT_MAX_WORKERS = 8
+
+# Number of times a single-block range is retried before a fetch gives up.
+MAX_SINGLE_BLOCK_ATTEMPTS = 3
+
+
+def fetch_range(
+    fetch: Callable[..., List[Dict[str, Any]]],
+    web3_client: Any,
+    address: Optional[str],
+    event_abis: Sequence[Dict[str, Any]],
+    from_block: int,
+    to_block: int,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches the logs from from_block to to_block with fetch, halving the range every time the node
+    fails to answer for it.
+    """
+    attempts = 0
+    while True:
+        try:
+            return fetch(web3_client, address, event_abis, from_block, to_block)
+        except Exception:
+            if from_block < to_block:
+                break
+            attempts += 1
+            if attempts >= MAX_SINGLE_BLOCK_ATTEMPTS:
+                raise
+    middle = (from_block + to_block) // 2
+    return fetch_range(
+        fetch, web3_client, address, event_abis, from_block, middle
+    ) + fetch_range(fetch, web3_client, address, event_abis, middle + 1, to_block)
+
+
+def iter_chunks(
+    web3_client: Any,
+    address: Optional[str],
+    event_abis: Sequence[Dict[str, Any]],
+    from_block: int,
+    to_block: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    fetch: Callable[..., List[Dict[str, Any]]] = fetch_logs,
+    chunker: Optional[Any] = None,
+) -> Iterator[Tuple[int, int, List[Dict[str, Any]]]]:
+    """
+    Fetches the logs between from_block and to_block (inclusive) in chunks of chunk_size blocks, with up
+    to max_workers eth_getLogs requests in flight, and yields (chunk from_block, chunk to_block, events)
+    for every chunk, in block order. A chunk is yielded as soon as it and every chunk before it have been
+    fetched.
+
+    If a chunker (e.g. indexer.AdaptiveChunker) is given, chunks are chunker.size blocks long instead,
+    as of when they are issued, and the chunker is told the number of logs in every eth_getLogs response
+    (succeeded) for ranges at least chunker.size blocks long, and about every request the node fails
+    to answer (failed).
+
+    At most 2 * max_workers chunks are fetched ahead of the consumer, so a slow consumer does not cause
+    the whole range to be buffered in memory. Closing the generator cancels the chunks which have not been
+    fetched yet.
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+
+    fetch_chunk = fetch
+    if chunker is not None:
+        chunker_lock = threading.Lock()
+
+        def fetch_chunk(
+            web3_client: Any,
+            address: Optional[str],
+            event_abis: Sequence[Dict[str, Any]],
+            from_block: int,
+            to_block: int,
+        ) -> List[Dict[str, Any]]:
+            try:
+                events = fetch(web3_client, address, event_abis, from_block, to_block)
+            except Exception:
+                with chunker_lock:
+                    chunker.failed()
+                raise
+            with chunker_lock:
+                # The halves of a range the node refused say nothing about larger ranges, so they do not
+                # grow the chunks again.
+                if to_block - from_block + 1 >= chunker.size:
+                    chunker.succeeded(len(events))
+            return events
+
+    def ranges() -> Iterator[Tuple[int, int]]:
+        start = from_block
+        while start <= to_block:
+            size = chunk_size if chunker is None else chunker.size
+            end = min(to_block, start + size - 1)
+            yield start, end
+            start = end + 1
+
+    pending: Deque[Tuple[int, int, "Future[List[Dict[str, Any]]]"]] = (
+        collections.deque()
+    )
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for start, end in ranges():
+            pending.append(
+                (
+                    start,
+                    end,
+                    executor.submit(
+                        fetch_range,
+                        fetch_chunk,
+                        web3_client,
+                        address,
+                        event_abis,
+                        start,
+                        end,
+                    ),
+                )
+            )
+            if len(pending) >= 2 * max_workers:
+                start, end, future = pending.popleft()
+                yield start, end, future.result()
+        while pending:
+            start, end, future = pending.popleft()
+            yield start, end, future.result()
+    finally:
+        for _, _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_logs(
+    web3_client: Any,
+    address: Optional[str],
+    event_abis: Sequence[Dict[str, Any]],
+    from_block: int,
+    to_block: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    fetch: Callable[..., List[Dict[str, Any]]] = fetch_logs,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the decoded logs between from_block and to_block (inclusive), fetched in parallel chunks as
+    with iter_chunks, in (blockNumber, logIndex) order.
+    """
+    for _, _, events in iter_chunks(
+        web3_client,
+        address,
+        event_abis,
+        from_block,
+        to_block,
+        chunk_size,
+        max_workers,
+        fetch,
+    ):
+        yield from events
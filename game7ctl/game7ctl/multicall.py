@@ -0,0 +1,236 @@
+"""
+Aggregated contract reads through a Multicall2 contract.
+
+Every read method on the generated wrappers costs one eth_call. try_aggregate packs many calls into a
+single Multicall2.tryAggregate call (or a few, batch_size calls at a time) and decodes the results as they
+come back.
+
+bulk_equipped_items and bulk_subject_token_slots use it to read the items equipped on, and the slots
+added to, many subject tokens at once.
+
+Multicall2 is deployed on most public networks. For local chains, deploy contracts/utils/Multicall2.sol
+with: game7ctl multicall deploy
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from brownie import web3
+
+from . import InventoryFacet, MockERC721, Multicall2, defaults, rpc_batch
+
+DEFAULT_BATCH_SIZE = defaults.MULTICALL_BATCH_SIZE
+
+# Selector of the Error(string) error which Solidity uses for require and revert messages.
+ERROR_SELECTOR = bytes.fromhex("08c379a0")
+
+
+class Call(NamedTuple):
+    """
+    A contract read to aggregate. function is a brownie contract method (e.g.
+    inventory.contract.getAllEquippedItems), which knows how to encode its inputs and decode its outputs.
+    """
+
+    target: str
+    function: Any
+    args: Tuple[Any, ...] = ()
+
+
+class CallResult(NamedTuple):
+    success: bool
+    # The decoded return value if the call succeeded, its revert reason otherwise.
+    value: Any
+
+
+def revert_reason(return_data: bytes) -> str:
+    if return_data[:4] != ERROR_SELECTOR:
+        return "0x" + bytes(return_data).hex()
+    length = int.from_bytes(return_data[36:68], "big")
+    return bytes(return_data[68 : 68 + length]).decode("utf-8", errors="replace")
+
+
+def resolve_block_number(block_number: Union[str, int] = "latest") -> int:
+    """
+    Aggregated reads which need more than one call are all made at the same block, so that they
+    observe a consistent state.
+    """
+    if block_number == "latest":
+        return web3.eth.block_number
+    return int(block_number)
+
+
+def chunks(calls: Sequence[Call], batch_size: int) -> Iterator[Sequence[Call]]:
+    for start in range(0, len(calls), batch_size):
+        yield calls[start : start + batch_size]
+
+
+def try_aggregate(
+    multicall: Multicall2.Multicall2,
+    calls: Sequence[Call],
+    block_number: Union[str, int] = "latest",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    decode: bool = True,
+) -> List[CallResult]:
+    """
+    Makes the given calls through Multicall2.tryAggregate, batch_size calls per eth_call, and returns
+    their results in order. A call which reverts does not affect the others.
+
+    If decode is False, successful results are left as raw return data.
+    """
+    multicall.assert_contract_is_instantiated()
+    results: List[CallResult] = []
+    for chunk in chunks(calls, batch_size):
+        encoded = [
+            (call.target, call.function.encode_input(*call.args)) for call in chunk
+        ]
+        raw_results = multicall.contract.tryAggregate.call(
+            False, encoded, block_identifier=block_number
+        )
+        for call, (success, return_data) in zip(chunk, raw_results):
+            if not success:
+                value = revert_reason(return_data)
+            elif decode:
+                value = call.function.decode_output(return_data)
+            else:
+                value = return_data
+            results.append(CallResult(success, value))
+    return results
+
+
+def aggregate_function(
+    multicall: Multicall2.Multicall2,
+    target: str,
+    function: Callable,
+    args_list: Sequence[Tuple[Any, ...]],
+    block_number: Union[str, int] = "latest",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[CallResult]:
+    """
+    Calls the same contract method once for every tuple of arguments in args_list.
+    """
+    calls = [Call(target, function, tuple(args)) for args in args_list]
+    return try_aggregate(multicall, calls, block_number, batch_size)
+
+
+def item_record(item: Tuple[int, str, int, int]) -> Dict[str, Any]:
+    item_type, item_address, item_token_id, amount = item
+    return {
+        "item_type": item_type,
+        "item_address": item_address,
+        "item_token_id": item_token_id,
+        "amount": amount,
+    }
+
+
+def bulk_equipped_items(
+    inventory: InventoryFacet.InventoryFacet,
+    multicall_contract: Multicall2.Multicall2,
+    subject_token_ids: Sequence[int],
+    slots: Sequence[int],
+    block_number: Union[str, int] = "latest",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Reads the items equipped in the given slots of each of the given subject tokens with one
+    getAllEquippedItems call per subject token, aggregated through Multicall2. All calls are made at
+    the same block.
+
+    Yields one record per subject token, in order:
+        {"subject_token_id": ..., "block_number": ..., "equipped": {<slot>: <item>, ...}}
+    Slots with nothing equipped in them are left out. If the call for a subject token fails, its
+    record has an "error" instead of "equipped".
+    """
+    inventory.assert_contract_is_instantiated()
+    block_number = resolve_block_number(block_number)
+    results = aggregate_function(
+        multicall_contract,
+        inventory.address,
+        inventory.contract.getAllEquippedItems,
+        [(subject_token_id, list(slots)) for subject_token_id in subject_token_ids],
+        block_number=block_number,
+        batch_size=batch_size,
+    )
+    for subject_token_id, result in zip(subject_token_ids, results):
+        record: Dict[str, Any] = {
+            "subject_token_id": subject_token_id,
+            "block_number": block_number,
+        }
+        if result.success:
+            record["equipped"] = {
+                slot: item_record(item)
+                for slot, item in zip(slots, result.value)
+                if item[0] != 0
+            }
+        else:
+            record["error"] = result.value
+        yield record
+
+
+def slot_record(slot: Tuple[str, int, bool, int]) -> Dict[str, Any]:
+    slot_uri, slot_type, unequippable, slot_id = slot
+    return {
+        "slot_id": slot_id,
+        "slot_type": slot_type,
+        "slot_uri": slot_uri,
+        "unequippable": unequippable,
+    }
+
+
+def bulk_subject_token_slots(
+    inventory: InventoryFacet.InventoryFacet,
+    multicall_contract: Multicall2.Multicall2,
+    subject_token_ids: Sequence[int],
+    block_number: Union[str, int] = "latest",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Reads the slots added to each of the given subject tokens (e.g. by backpacks).
+
+    getSubjectTokenSlots only answers calls made by the owner of the subject token, so it cannot be
+    called through Multicall2. The owners of all the subject tokens are read through Multicall2, after
+    which getSubjectTokenSlots is called once per subject token on behalf of its owner. Those calls are
+    batched at the JSON-RPC level if they are made inside rpc_batch.batched_calls.
+
+    Yields one record per subject token, in order:
+        {"subject_token_id": ..., "block_number": ..., "owner": ..., "slots": [...]}
+    """
+    inventory.assert_contract_is_instantiated()
+    block_number = resolve_block_number(block_number)
+    subject = MockERC721.MockERC721(inventory.subject(block_number=block_number))
+    owners = aggregate_function(
+        multicall_contract,
+        subject.address,
+        subject.contract.ownerOf,
+        [(subject_token_id,) for subject_token_id in subject_token_ids],
+        block_number=block_number,
+        batch_size=batch_size,
+    )
+
+    def subject_token_slots(subject_token_id: int, owner: CallResult) -> Dict[str, Any]:
+        if not owner.success:
+            return {"error": owner.value}
+        try:
+            slots = inventory.contract.getSubjectTokenSlots.call(
+                subject_token_id, {"from": owner.value}, block_identifier=block_number
+            )
+        except Exception as e:
+            return {"owner": owner.value, "error": str(e)}
+        return {"owner": owner.value, "slots": [slot_record(slot) for slot in slots]}
+
+    # The calls are made concurrently so that they can share JSON-RPC batches (see rpc_batch).
+    results = rpc_batch.batched_map(subject_token_slots, subject_token_ids, owners)
+    for subject_token_id, result in zip(subject_token_ids, results):
+        yield {
+            "subject_token_id": subject_token_id,
+            "block_number": block_number,
+            **result,
+        }
@@ -0,0 +1,396 @@
+"""
+Declarative provisioning of the slots, slot types and item eligibility of an Inventory.
+
+A provisioning manifest (YAML, or JSON) declares the state an Inventory should be in:
+
+    slot_types:
+      1: Weapon
+      2: Armor
+    slots:
+      - slot: 1
+        slot_type: 1
+        uri: https://example.com/slots/1.json
+        unequippable: false
+        items:
+          - item_type: 20
+            item_address: "0x..."
+            max_amount: 10
+          - item_type: 1155
+            item_address: "0x..."
+            pool_id: 3
+            max_amount: 1
+
+read_state reads the parts of the on-chain state the manifest declares in bulk, at a single block: every
+slot (with SlotCatalog), the names of the declared slot types and maxAmountOfItemInSlot for the
+declared items. plan_changes compares the two and returns the writes which bring the Inventory to the
+declared state, so applying a manifest which the Inventory already matches takes no transactions:
+- create_slot_type for slot types which are missing or have another name
+- create_slot for slots whose IDs are after the last slot on the Inventory. createSlot numbers slots
+  consecutively, so these IDs must follow on from it without gaps.
+- assign_slot_type, set_slot_uri and set_slot_unequippable for existing slots which differ
+- mark_item_as_equippable_in_slot for items whose maximum amount differs (max_amount 0 makes an item
+  ineligible again)
+
+apply_changes makes those writes (see batch.run_batch).
+
+Slots, slot types and items which the manifest does not mention are left as they are. slot_type,
+uri and unequippable default to 1, "" and false for new slots, and are only compared on existing slots
+if they are given. item_type is 20, 721 or 1155, pool_id is only given for 1155 items and
+max_amount is at most 1 for 721 items. Quote item addresses: YAML reads unquoted 0x... values as numbers. They are
+converted back to addresses, but quoting keeps the manifest unambiguous.
+
+From the command line:
+    game7ctl inventory apply --network <network> --address <inventory> --sender <keystore> --manifest season.yaml
+"""
+
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import yaml
+from brownie import web3
+from eth_utils import to_checksum_address
+
+from . import InventoryFacet, Multicall2
+from .batch import BatchOperation, run_batch
+from .slot_catalog import Slot, SlotCatalog, bulk_read
+from .transactions import TransactionPipeline
+
+# Item types the Inventory accepts: ERC20, ERC721 and ERC1155 tokens.
+ITEM_TYPES = [20, 721, 1155]
+
+
+class ItemSpec(NamedTuple):
+    item_type: int
+    item_address: str
+    item_pool_id: int
+    max_amount: int
+
+    @property
+    def key(self) -> Tuple[int, str, int]:
+        return (self.item_type, self.item_address, self.item_pool_id)
+
+
+class SlotSpec(NamedTuple):
+    slot_id: int
+    slot_type: Optional[int]
+    slot_uri: Optional[str]
+    unequippable: Optional[bool]
+    items: List[ItemSpec]
+
+
+class Manifest(NamedTuple):
+    slot_types: Dict[int, str]
+    slots: List[SlotSpec]
+
+
+class ChainState(NamedTuple):
+    block_number: int
+    slots: Dict[int, Slot]
+    slot_type_names: Dict[int, str]
+    # (slot, item type, item address, pool ID) -> maxAmountOfItemInSlot, for the declared items on slots
+    # which exist.
+    max_amounts: Dict[Tuple[int, int, str, int], int]
+
+
+class Change(NamedTuple):
+    """
+    A write to the Inventory: the name of an InventoryFacet wrapper method and its keyword arguments.
+    """
+
+    op: str
+    args: Dict[str, Any]
+
+
+def parse_address(value: Any, context: str) -> str:
+    if isinstance(value, int):
+        # Unquoted hex in YAML.
+        value = f"0x{value:040x}"
+    try:
+        return to_checksum_address(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{context}: invalid address: {value}")
+
+
+def parse_int(spec: Dict[str, Any], key: str, context: str, default: Any = None) -> Any:
+    value = spec.get(key, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"{context}: {key} must be a non-negative integer")
+    return value
+
+
+def parse_manifest(spec: Any) -> Manifest:
+    """
+    Validates a manifest loaded from YAML or JSON.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Manifest must be a mapping with slot_types and/or slots")
+    unknown_keys = set(spec) - {"slot_types", "slots"}
+    if unknown_keys:
+        raise ValueError(f"Unknown manifest keys: {', '.join(sorted(unknown_keys))}")
+
+    slot_types: Dict[int, str] = {}
+    for raw_slot_type, name in (spec.get("slot_types") or {}).items():
+        try:
+            slot_type = int(raw_slot_type)
+        except ValueError:
+            raise ValueError(f"Slot type {raw_slot_type}: must be an integer")
+        if slot_type < 1:
+            raise ValueError(f"Slot type {slot_type}: must be at least 1")
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"Slot type {slot_type}: name must be a non-empty string")
+        slot_types[slot_type] = name
+
+    slots: List[SlotSpec] = []
+    slot_ids = set()
+    for index, slot_spec in enumerate(spec.get("slots") or []):
+        context = f"Slot {index + 1}"
+        if not isinstance(slot_spec, dict):
+            raise ValueError(f"{context}: must be a mapping")
+        slot_id = parse_int(slot_spec, "slot", context)
+        if slot_id is None or slot_id < 1:
+            raise ValueError(f"{context}: slot must be a slot ID, starting from 1")
+        context = f"Slot {slot_id}"
+        if slot_id in slot_ids:
+            raise ValueError(f"{context}: declared more than once")
+        slot_ids.add(slot_id)
+        slot_type = parse_int(slot_spec, "slot_type", context)
+        if slot_type == 0:
+            raise ValueError(f"{context}: slot_type must be at least 1")
+        slot_uri = slot_spec.get("uri")
+        if slot_uri is not None and not isinstance(slot_uri, str):
+            raise ValueError(f"{context}: uri must be a string")
+        unequippable = slot_spec.get("unequippable")
+        if unequippable is not None and not isinstance(unequippable, bool):
+            raise ValueError(f"{context}: unequippable must be true or false")
+
+        items: List[ItemSpec] = []
+        item_keys = set()
+        for item_spec in slot_spec.get("items") or []:
+            if not isinstance(item_spec, dict):
+                raise ValueError(f"{context}: items must be mappings")
+            item_type = parse_int(item_spec, "item_type", context)
+            max_amount = parse_int(item_spec, "max_amount", context)
+            if item_type is None or max_amount is None:
+                raise ValueError(
+                    f"{context}: items must have an item_type and a max_amount"
+                )
+            if item_type not in ITEM_TYPES:
+                raise ValueError(
+                    f"{context}: item_type must be one of {', '.join(map(str, ITEM_TYPES))}"
+                )
+            item = ItemSpec(
+                item_type,
+                parse_address(item_spec.get("item_address"), context),
+                parse_int(item_spec, "pool_id", context, default=0),
+                max_amount,
+            )
+            if item_type != 1155 and item.item_pool_id != 0:
+                raise ValueError(
+                    f"{context}: pool_id can only be given for items with item_type 1155"
+                )
+            if item_type == 721 and max_amount > 1:
+                raise ValueError(
+                    f"{context}: max_amount must be at most 1 for items with item_type 721"
+                )
+            if item.key in item_keys:
+                raise ValueError(f"{context}: item {item.key} declared more than once")
+            item_keys.add(item.key)
+            items.append(item)
+        slots.append(SlotSpec(slot_id, slot_type, slot_uri, unequippable, items))
+
+    slots.sort(key=lambda slot: slot.slot_id)
+    return Manifest(slot_types, slots)
+
+
+def load_manifest(path: str) -> Manifest:
+    with open(path, "r") as ifp:
+        return parse_manifest(yaml.safe_load(ifp))
+
+
+def read_state(
+    inventory: InventoryFacet.InventoryFacet,
+    manifest: Manifest,
+    multicall_contract: Optional[Multicall2.Multicall2] = None,
+    block_number: Optional[int] = None,
+) -> ChainState:
+    """
+    Reads the state of the Inventory which the manifest declares, at the given block (default: the
+    latest one). Reads are aggregated through multicall_contract if it is given, and made concurrently
+    (to share JSON-RPC batches inside rpc_batch.batched_calls) otherwise.
+    """
+    if block_number is None:
+        block_number = web3.eth.block_number
+    catalog = SlotCatalog(inventory, multicall_contract, track_unequippable=False)
+    catalog.load(block_number)
+    slots = {slot.slot_id: slot for slot in catalog.slots()}
+
+    slot_types = sorted(manifest.slot_types)
+    slot_type_names = {}
+    if slot_types:
+        names = bulk_read(
+            inventory,
+            multicall_contract,
+            inventory.contract.getSlotType,
+            inventory.get_slot_type,
+            [(slot_type,) for slot_type in slot_types],
+            block_number,
+        )
+        slot_type_names = dict(zip(slot_types, names))
+
+    item_keys = [
+        (slot.slot_id, *item.key)
+        for slot in manifest.slots
+        if slot.slot_id in slots
+        for item in slot.items
+    ]
+    max_amounts = {}
+    if item_keys:
+        amounts = bulk_read(
+            inventory,
+            multicall_contract,
+            inventory.contract.maxAmountOfItemInSlot,
+            inventory.max_amount_of_item_in_slot,
+            item_keys,
+            block_number,
+        )
+        max_amounts = dict(zip(item_keys, amounts))
+    return ChainState(block_number, slots, slot_type_names, max_amounts)
+
+
+def plan_changes(manifest: Manifest, state: ChainState) -> List[Change]:
+    """
+    Returns the writes which bring the Inventory from the given state to the one the manifest
+    declares, in the order they have to be made in: slot types, new slots, changes to existing slots and
+    then item eligibility. Raises ValueError if the IDs of the new slots do not follow on from the last
+    slot on the Inventory.
+    """
+    changes: List[Change] = []
+    for slot_type, name in sorted(manifest.slot_types.items()):
+        if state.slot_type_names.get(slot_type) != name:
+            changes.append(
+                Change(
+                    "create_slot_type", {"slot_type": slot_type, "slot_type_name": name}
+                )
+            )
+
+    num_slots = max(state.slots, default=0)
+    next_slot_id = num_slots + 1
+    for slot in manifest.slots:
+        if slot.slot_id <= num_slots:
+            continue
+        if slot.slot_id != next_slot_id:
+            raise ValueError(
+                f"Slot {slot.slot_id} cannot be created: the Inventory has {num_slots} slots, so the "
+                f"next slot it creates is {next_slot_id}"
+            )
+        changes.append(
+            Change(
+                "create_slot",
+                {
+                    "unequippable": bool(slot.unequippable),
+                    "slot_type": 1 if slot.slot_type is None else slot.slot_type,
+                    "slot_uri": slot.slot_uri or "",
+                },
+            )
+        )
+        next_slot_id += 1
+
+    for slot in manifest.slots:
+        current = state.slots.get(slot.slot_id)
+        if current is None:
+            continue
+        if slot.slot_type is not None and slot.slot_type != current.slot_type:
+            changes.append(
+                Change(
+                    "assign_slot_type",
+                    {"slot": slot.slot_id, "slot_type": slot.slot_type},
+                )
+            )
+        if slot.slot_uri is not None and slot.slot_uri != current.slot_uri:
+            changes.append(
+                Change(
+                    "set_slot_uri",
+                    {"new_slot_uri": slot.slot_uri, "slot_id": slot.slot_id},
+                )
+            )
+        if slot.unequippable is not None and slot.unequippable != current.unequippable:
+            changes.append(
+                Change(
+                    "set_slot_unequippable",
+                    {"unquippable": slot.unequippable, "slot_id": slot.slot_id},
+                )
+            )
+
+    for slot in manifest.slots:
+        for item in slot.items:
+            current_amount = state.max_amounts.get((slot.slot_id, *item.key), 0)
+            if item.max_amount != current_amount:
+                changes.append(
+                    Change(
+                        "mark_item_as_equippable_in_slot",
+                        {
+                            "slot": slot.slot_id,
+                            "item_type": item.item_type,
+                            "item_address": item.item_address,
+                            "item_pool_id": item.item_pool_id,
+                            "max_amount": item.max_amount,
+                        },
+                    )
+                )
+    return changes
+
+
+def new_slot_ids(state: ChainState, changes: List[Change]) -> List[int]:
+    """
+    Returns the IDs which the slots created by the given changes get, if nothing else creates slots
+    in the meantime.
+    """
+    num_slots = max(state.slots, default=0)
+    num_created = sum(1 for change in changes if change.op == "create_slot")
+    return list(range(num_slots + 1, num_slots + num_created + 1))
+
+
+def apply_changes(
+    changes: Sequence[Change],
+    expected_slot_ids: Sequence[int],
+    transaction_config: Dict[str, Any],
+    address: str,
+    pipeline: Optional[TransactionPipeline] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Makes the writes planned by plan_changes with run_batch and yields their records, with
+    "line" set to the number of the change in the plan (starting at 1).
+
+    The slots are created first, and the rest of the changes (which may refer to them) are only made
+    once all of them have succeeded and the IDs in their SlotCreated events are expected_slot_ids.
+    Stops at the first failure.
+    """
+    operations = [
+        BatchOperation(line=number, op=change.op, args=change.args)
+        for number, change in enumerate(changes, start=1)
+    ]
+    creations = [operation for operation in operations if operation.op == "create_slot"]
+    created_slot_ids: List[int] = []
+    for record in run_batch(
+        creations, transaction_config, default_address=address, pipeline=pipeline
+    ):
+        yield record
+        if record["status"] != "ok":
+            return
+        created_slot_ids.extend(
+            event["args"]["slot"]
+            for event in record["events"]
+            if event["name"] == "SlotCreated"
+        )
+    if created_slot_ids != list(expected_slot_ids):
+        raise ValueError(
+            f"Slots were created with IDs {created_slot_ids} instead of {list(expected_slot_ids)}, "
+            "probably by someone else at the same time. Fix the manifest and apply it again."
+        )
+    yield from run_batch(
+        [operation for operation in operations if operation.op != "create_slot"],
+        transaction_config,
+        default_address=address,
+        pipeline=pipeline,
+    )
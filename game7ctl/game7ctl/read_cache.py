@@ -0,0 +1,336 @@
+"""
+Block-pinned cache for contract reads.
+
+The result of a read method (get_equipped_item, get_slot_by_id, get_subject_token_slots, ...) at a
+fixed block never changes. ReadCache memoizes read results keyed by contract address, method, arguments
+and block, in two tiers:
+- an in-memory LRU cache holding at most max_entries results
+- optionally, an SQLite database which persists results across game7ctl runs. Results are stored in it
+  as JSON (see encode_result), so results which are not made of ints, strings, bytes, booleans, lists
+  and tuples are only cached in memory. Results read back from the database are plain Python values -
+  tuples instead of brownie ReturnValues, for example.
+
+Blocks are identified by their hash rather than their number, so that results cached against a
+development chain which has since been restarted, or against a block which has since been reorganized
+away, are never returned.
+
+Reads against "latest" (and other block tags) are not pinned to a block. By default they bypass the
+cache. If latest_ttl is positive, their results are kept in memory for that many seconds.
+
+Reads are cached either on a single contract:
+    inventory = read_cache.CachedContract(InventoryFacet.InventoryFacet(address), cache)
+or on every instance of the generated wrappers for the duration of a context:
+    with read_cache.cached_reads(cache):
+        ...
+"""
+
+import contextlib
+import functools
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from brownie import web3
+
+from . import (
+    DiamondLoupeFacet,
+    InventoryFacet,
+    MockERC20,
+    MockERC721,
+    Multicall2,
+    TerminusFacet,
+)
+
+DEFAULT_MAX_ENTRIES = 10000
+
+# Wrapper classes whose read methods cached_reads caches by default.
+WRAPPER_CLASSES = [
+    DiamondLoupeFacet.DiamondLoupeFacet,
+    InventoryFacet.InventoryFacet,
+    MockERC20.MockERC20,
+    MockERC721.MockERC721,
+    Multicall2.Multicall2,
+    TerminusFacet.TerminusFacet,
+]
+
+# Results written to the database are committed in groups of this size.
+COMMIT_INTERVAL = 100
+
+
+def key_default(value: Any) -> str:
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    return str(value)
+
+
+def encode_result(value: Any) -> Any:
+    """
+    Converts the result of a read into a value which json.dumps can serialize and decode_result can
+    restore. Bytes and tuples are tagged, as JSON has no types for them.
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, bytes):
+        return {"bytes": "0x" + value.hex()}
+    if isinstance(value, tuple):
+        return {"tuple": [encode_result(item) for item in value]}
+    if isinstance(value, list):
+        return [encode_result(item) for item in value]
+    raise TypeError(f"Cannot store results of type {type(value).__name__}")
+
+
+def decode_result(value: Any) -> Any:
+    if isinstance(value, list):
+        return [decode_result(item) for item in value]
+    if isinstance(value, dict):
+        if "bytes" in value:
+            return bytes.fromhex(value["bytes"][2:])
+        return tuple(decode_result(item) for item in value["tuple"])
+    return value
+
+
+def pinned_block_number(block_number: Union[str, int, None]) -> Optional[int]:
+    """
+    Returns the block number a read is pinned to, or None for block tags such as "latest".
+    """
+    if isinstance(block_number, int):
+        return block_number
+    if isinstance(block_number, str):
+        try:
+            return int(block_number, 0)
+        except ValueError:
+            return None
+    return None
+
+
+def chain_block_hash(block_number: int) -> str:
+    block_hash = web3.eth.get_block(block_number)["hash"]
+    return "0x" + bytes(block_hash).hex()
+
+
+class ReadCache:
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        database: Optional[str] = None,
+        latest_ttl: float = 0.0,
+        block_hash: Callable[[int], str] = chain_block_hash,
+    ) -> None:
+        """
+        database is the path of an SQLite file for the persistent tier (default: memory only).
+        block_hash resolves block numbers to block hashes - it is looked up once per block number.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.latest_ttl = latest_ttl
+        self.block_hash = block_hash
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0}
+
+        self._lock = threading.Lock()
+        # key -> (value, expiry time, or None for results pinned to a block)
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._block_hashes: "OrderedDict[int, str]" = OrderedDict()
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._uncommitted = 0
+        if database is not None:
+            self._db = sqlite3.connect(database, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS reads (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def __enter__(self) -> "ReadCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.commit()
+                self._db.close()
+                self._db = None
+
+    def clear(self) -> None:
+        """
+        Empties the in-memory tier. The database is left as it is.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._block_hashes.clear()
+
+    def _resolve_block_hash(self, block_number: int) -> str:
+        with self._lock:
+            block_hash = self._block_hashes.get(block_number)
+        if block_hash is None:
+            block_hash = self.block_hash(block_number)
+            with self._lock:
+                self._block_hashes[block_number] = block_hash
+                if len(self._block_hashes) > self.max_entries:
+                    self._block_hashes.popitem(last=False)
+        return block_hash
+
+    def _remember(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def call(
+        self,
+        address: str,
+        method_name: str,
+        args: List[Any],
+        block_number: Union[str, int, None],
+        read: Callable[[], Any],
+    ) -> Any:
+        """
+        Returns the cached result of the given read, or makes it by calling read() and caches its
+        result. Reads which revert are not cached.
+        """
+        pinned = pinned_block_number(block_number)
+        if pinned is None and self.latest_ttl <= 0:
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return read()
+
+        block = self._resolve_block_hash(pinned) if pinned is not None else "latest"
+        key = json.dumps(
+            [address.lower(), method_name, args, block], default=key_default
+        )
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > now):
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[0]
+
+            if pinned is not None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM reads WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value = decode_result(json.loads(row[0]))
+                    self._remember(key, value, None)
+                    self.stats["disk_hits"] += 1
+                    return value
+
+            self.stats["misses"] += 1
+
+        value = read()
+
+        with self._lock:
+            if pinned is None:
+                self._remember(key, value, time.monotonic() + self.latest_ttl)
+                return value
+            self._remember(key, value, None)
+            if self._db is not None:
+                try:
+                    data = json.dumps(encode_result(value), separators=(",", ":"))
+                except TypeError:
+                    return value
+                self._db.execute(
+                    "INSERT OR REPLACE INTO reads (key, value) VALUES (?, ?)",
+                    (key, data),
+                )
+                self._uncommitted += 1
+                if self._uncommitted >= COMMIT_INTERVAL:
+                    self._db.commit()
+                    self._uncommitted = 0
+        return value
+
+
+def is_read_method(method: Any) -> bool:
+    return "block_number" in inspect.signature(method).parameters
+
+
+def cached_read_method(cache: ReadCache, name: str, method: Any) -> Any:
+    """
+    Wraps a read method of a generated wrapper class so that its results go through the given cache.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def cached_method(self: Any, *args: Any, **kwargs: Any) -> Any:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        del arguments["self"]
+        block_number = arguments.pop("block_number")
+        self.assert_contract_is_instantiated()
+        return cache.call(
+            self.address,
+            name,
+            list(arguments.values()),
+            block_number,
+            lambda: method(self, *args, **kwargs),
+        )
+
+    return cached_method
+
+
+class CachedContract:
+    """
+    Wraps an instance of a generated wrapper class. Its read methods go through the given cache, all
+    its other attributes are those of the wrapped contract.
+    """
+
+    def __init__(self, contract: Any, cache: ReadCache) -> None:
+        self.contract = contract
+        self.cache = cache
+        self._methods: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.contract, name)
+        if name.startswith("_") or not inspect.ismethod(attribute):
+            return attribute
+        if not is_read_method(attribute):
+            return attribute
+        method = self._methods.get(name)
+        if method is None:
+            unbound = getattr(type(self.contract), name)
+            method = cached_read_method(self.cache, name, unbound)
+            self._methods[name] = method
+        return functools.partial(method, self.contract)
+
+
+@contextlib.contextmanager
+def cached_reads(
+    cache: ReadCache, wrapper_classes: Optional[List[Type[Any]]] = None
+) -> Iterator[ReadCache]:
+    """
+    Routes the read methods of every instance of the given wrapper classes (default: WRAPPER_CLASSES)
+    through the cache for the duration of the context.
+    """
+    if wrapper_classes is None:
+        wrapper_classes = WRAPPER_CLASSES
+    originals: List[Tuple[Type[Any], str, Any]] = []
+    for wrapper_class in wrapper_classes:
+        for name, member in list(vars(wrapper_class).items()):
+            if name.startswith("_") or not inspect.isfunction(member):
+                continue
+            if not is_read_method(member):
+                continue
+            originals.append((wrapper_class, name, member))
+            setattr(wrapper_class, name, cached_read_method(cache, name, member))
+    try:
+        yield cache
+    finally:
+        for wrapper_class, name, original in originals:
+            setattr(wrapper_class, name, original)
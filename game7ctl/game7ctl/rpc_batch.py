@@ -0,0 +1,277 @@
+"""
+JSON-RPC batch transport for read-only calls.
+
+Every read method on the generated wrappers (get_slot_by_id, get_slot_uri, terminus_pool_supply, ...)
+makes its own HTTP request to the node. BatchingProvider sits in front of brownie's HTTP provider and
+collects the read-only requests (eth_call and friends) made by all threads into JSON-RPC batches: a batch
+is sent once it holds max_batch_size requests, or flush_interval seconds after its first request,
+whichever comes first. The results are handed back to the threads which made the requests. All other
+requests go straight to the original provider.
+
+The wrappers are used unchanged. Batching pays off when many reads are in flight at once, so reads are
+issued from several threads, e.g. with batched_map:
+
+    with rpc_batch.batched_calls(max_batch_size=100):
+        uris = rpc_batch.batched_map(inventory.get_slot_uri, range(1, num_slots + 1))
+"""
+
+import contextlib
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import requests
+from brownie import web3
+from web3.providers import HTTPProvider
+from web3.providers.base import JSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+# Read-only methods which are batched. Everything else (in particular, anything involving transactions
+# or nonces) is sent on its own, in order.
+BATCHED_METHODS = [
+    "eth_call",
+    "eth_getBalance",
+    "eth_getCode",
+    "eth_getStorageAt",
+]
+
+DEFAULT_MAX_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 0.005
+
+# Number of threads batched_map calls from by default when no BatchingProvider is active.
+DEFAULT_MAP_WORKERS = 8
+
+
+def hex_bytes(value: Any) -> str:
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    raise TypeError(f"Cannot serialize {type(value).__name__} to JSON")
+
+
+class BatchingProvider(JSONBaseProvider):
+    def __init__(
+        self,
+        provider: HTTPProvider,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_concurrent_batches: int = 4,
+        timeout: float = 30.0,
+    ) -> None:
+        """
+        provider is the HTTP provider to batch requests for. Batches are sent with its request kwargs
+        (headers, auth, timeout, ...), and timeout only applies if it does not set one. Up to
+        max_concurrent_batches batches are in flight at once.
+        """
+        if not isinstance(provider, HTTPProvider):
+            raise ValueError("JSON-RPC batching is only supported for HTTP providers")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        super().__init__()
+        self.provider = provider
+        self.endpoint_uri = provider.endpoint_uri
+        self.max_batch_size = max_batch_size
+        self.max_concurrent_batches = max_concurrent_batches
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.stats = {"requests": 0, "batches": 0, "largest_batch": 0}
+
+        self._session = requests.Session()
+        self._ids = itertools.count()
+        self._queue: List[Tuple[Dict[str, Any], Future]] = []
+        self._first_queued_at = 0.0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._senders = ThreadPoolExecutor(max_workers=max_concurrent_batches)
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def isConnected(self) -> bool:
+        return self.provider.isConnected()
+
+    def is_connected(self, *args: Any, **kwargs: Any) -> bool:
+        return self.provider.is_connected(*args, **kwargs)
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if method not in BATCHED_METHODS:
+            return self.provider.make_request(method, params)
+        return self.submit(method, params).result()
+
+    def submit(self, method: str, params: Any) -> Future:
+        """
+        Queues a request for the next batch and returns a future for its response.
+        """
+        request = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+            "id": next(self._ids),
+        }
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Provider is closed")
+            if not self._queue:
+                self._first_queued_at = time.monotonic()
+            self._queue.append((request, future))
+            self._condition.notify_all()
+        return future
+
+    def flush(self) -> None:
+        """
+        Sends everything which is queued right away, in batches of at most max_batch_size requests,
+        and waits for their responses.
+        """
+        sent = []
+        with self._condition:
+            while self._queue:
+                batch = self._take_batch(self.max_batch_size)
+                sent.append(self._senders.submit(self._send, batch))
+        wait(sent)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._flusher.join()
+        self._senders.shutdown(wait=True)
+        self._session.close()
+
+    def _take_batch(self, size: int) -> List[Tuple[Dict[str, Any], Future]]:
+        batch = self._queue[:size]
+        del self._queue[:size]
+        if self._queue:
+            self._first_queued_at = time.monotonic()
+        return batch
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                deadline = self._first_queued_at + self.flush_interval
+                while (
+                    len(self._queue) < self.max_batch_size
+                    and not self._closed
+                    and time.monotonic() < deadline
+                ):
+                    self._condition.wait(deadline - time.monotonic())
+                batch = self._take_batch(self.max_batch_size)
+            self._senders.submit(self._send, batch)
+
+    def _send(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        with self._condition:
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+        request_kwargs = {"timeout": self.timeout, **self.provider.get_request_kwargs()}
+        request_kwargs["headers"] = {
+            "Content-Type": "application/json",
+            **request_kwargs.get("headers", {}),
+        }
+        try:
+            response = self._session.post(
+                self.endpoint_uri,
+                data=json.dumps([request for request, _ in batch], default=hex_bytes),
+                **request_kwargs,
+            )
+            response.raise_for_status()
+            responses = response.json()
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        if not isinstance(responses, list):
+            # The node does not support batches: it answers a batch with a single error.
+            self._send_individually(batch)
+            return
+
+        responses_by_id = {item.get("id"): item for item in responses}
+        for request, future in batch:
+            item = responses_by_id.get(request["id"])
+            if item is None:
+                future.set_exception(
+                    ValueError(f"No response to JSON-RPC request {request['id']}")
+                )
+            else:
+                future.set_result(item)
+
+    def _send_individually(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        for request, future in batch:
+            try:
+                future.set_result(
+                    self.provider.make_request(request["method"], request["params"])
+                )
+            except Exception as e:
+                future.set_exception(e)
+
+
+@contextlib.contextmanager
+def batched_calls(
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    max_concurrent_batches: int = 4,
+) -> Iterator[BatchingProvider]:
+    """
+    Routes the read-only requests which brownie makes to the connected network through a
+    BatchingProvider for the duration of the context.
+    """
+    original_provider = web3.provider
+    provider = BatchingProvider(
+        original_provider,
+        max_batch_size=max_batch_size,
+        flush_interval=flush_interval,
+        max_concurrent_batches=max_concurrent_batches,
+    )
+    web3.provider = provider
+    try:
+        yield provider
+    finally:
+        web3.provider = original_provider
+        provider.close()
+
+
+def batched_calls_if_supported(**kwargs: Any) -> ContextManager[Any]:
+    """
+    Like batched_calls, but does nothing if the connected network is not served over HTTP.
+    """
+    if isinstance(web3.provider, HTTPProvider):
+        return batched_calls(**kwargs)
+    return contextlib.nullcontext()
+
+
+def batched_map(
+    function: Callable[..., Any],
+    *iterables: Iterable[Any],
+    max_workers: Optional[int] = None,
+) -> List[Any]:
+    """
+    Calls function (e.g. a wrapper read method) on the items of the given iterables from a pool of
+    threads, so that the calls can be batched together, and returns the results in order. By default,
+    there are as many threads as the active BatchingProvider puts requests in a batch (or
+    DEFAULT_MAP_WORKERS if none is active), and no more threads than calls.
+    """
+    arguments = list(zip(*iterables))
+    if max_workers is None:
+        max_workers = DEFAULT_MAP_WORKERS
+        if isinstance(web3.provider, BatchingProvider):
+            max_workers = web3.provider.max_batch_size
+        max_workers = max(1, min(len(arguments), max_workers))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda args: function(*args), arguments))
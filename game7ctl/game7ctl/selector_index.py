@@ -0,0 +1,185 @@
+"""
+Persistent index of function selectors and event topics for the contracts in a brownie project.
+
+For every build artifact, the index maps:
+- function signature (e.g. "numSlots()") -> 4 byte selector
+- event signature (e.g. "SlotCreated(address,uint256,bool,uint256)") -> topic0
+
+The index is stored next to the brownie build directory (build/selector_index.json). Entries are keyed
+by the SHA256 hash of the artifact they were computed from, so selectors are only recomputed for
+artifacts which have actually changed since the index was written. Artifacts whose modification time
+and size are unchanged are trusted without being read at all.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from . import abi, artifacts
+
+INDEX_VERSION = 1
+INDEX_FILENAME = "selector_index.json"
+
+
+def function_name(signature: str) -> str:
+    """
+    Returns the name of the function (or event) with the given signature.
+    """
+    return signature.split("(", 1)[0]
+
+
+def artifact_hash(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as ifp:
+        for chunk in iter(lambda: ifp.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def index_entry(path: str, content_hash: str) -> Dict[str, Any]:
+    """
+    Computes the index entry for the build artifact at the given path.
+    """
+    stat = os.stat(path)
+    contract_abi = artifacts.CACHE.abi(path)
+    if contract_abi is None:
+        contract_abi = []
+
+    functions: Dict[str, str] = {}
+    events: Dict[str, str] = {}
+    for item in contract_abi:
+        if item["type"] == "function":
+            functions[abi.abi_function_signature(item)] = abi.encode_function_signature(
+                item
+            )
+        elif item["type"] == "event":
+            events[abi.abi_function_signature(item)] = abi.encode_event_topic(item)
+
+    return {
+        "hash": content_hash,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "functions": functions,
+        "events": events,
+    }
+
+
+class SelectorIndex:
+    def __init__(self, contracts: Dict[str, Dict[str, Any]]) -> None:
+        self.contracts = contracts
+        self._topics: Dict[str, str] = {}
+        for entry in contracts.values():
+            for signature, topic in entry["events"].items():
+                self._topics[signature] = topic
+
+    def functions(self, contract_name: str) -> Dict[str, str]:
+        """
+        Returns a dictionary mapping function signatures to selectors for the given contract, in the
+        order in which the functions appear in the contract ABI. Unknown contracts have no functions.
+        """
+        return self.contracts.get(contract_name, {}).get("functions", {})
+
+    def events(self, contract_name: str) -> Dict[str, str]:
+        """
+        Returns a dictionary mapping event signatures to topics for the given contract.
+        """
+        return self.contracts.get(contract_name, {}).get("events", {})
+
+    def selector(self, contract_name: str, signature: str) -> Optional[str]:
+        return self.functions(contract_name).get(signature)
+
+    def topic(self, event_signature: str) -> Optional[str]:
+        """
+        Returns the topic for the given event signature, if any contract in the project emits it.
+        """
+        return self._topics.get(event_signature)
+
+
+def index_path(project_dir: str) -> str:
+    return os.path.join(project_dir, "build", INDEX_FILENAME)
+
+
+def read_index(path: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path, "r") as ifp:
+            stored = json.load(ifp)
+    except (IOError, ValueError):
+        return {}
+
+    if stored.get("version") != INDEX_VERSION:
+        return {}
+    return stored.get("contracts", {})
+
+
+def write_index(path: str, contracts: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Writes the index atomically, so that concurrent game7ctl processes never see a partial index.
+    """
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as ofp:
+        json.dump({"version": INDEX_VERSION, "contracts": contracts}, ofp)
+    os.replace(temporary_path, path)
+
+
+def build_index(project_dir: str) -> SelectorIndex:
+    """
+    Loads the persisted index for the given brownie project, brings it up to date with the build
+    artifacts currently on disk, and writes it back if anything changed.
+    """
+    path = index_path(project_dir)
+    stored = read_index(path)
+
+    build_files = glob.glob(os.path.join(project_dir, "build", "contracts", "*.json"))
+    contracts: Dict[str, Dict[str, Any]] = {}
+    modified = False
+
+    for filepath in build_files:
+        contract_name, _ = os.path.splitext(os.path.basename(filepath))
+        entry = stored.get(contract_name)
+        stat = os.stat(filepath)
+
+        if (
+            entry is not None
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            contracts[contract_name] = entry
+            continue
+
+        content_hash = artifact_hash(filepath)
+        if entry is not None and entry["hash"] == content_hash:
+            # Touched but not modified (e.g. by a brownie compile which produced identical output).
+            entry = {**entry, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        else:
+            entry = index_entry(filepath, content_hash)
+        contracts[contract_name] = entry
+        modified = True
+
+    if set(stored) - set(contracts):
+        modified = True
+
+    if modified and os.path.isdir(os.path.dirname(path)):
+        write_index(path, contracts)
+
+    return SelectorIndex(contracts)
+
+
+_INDEXES: Dict[str, SelectorIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def load(project_dir: str, refresh: bool = False) -> SelectorIndex:
+    """
+    Returns the selector index for the given brownie project. The index is built (or validated) once per
+    process; pass refresh=True to check the build artifacts again (e.g. after recompiling).
+    """
+    project_dir = os.path.abspath(project_dir)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(project_dir)
+        if index is None or refresh:
+            index = build_index(project_dir)
+            _INDEXES[project_dir] = index
+        return index
@@ -0,0 +1,336 @@
+"""
+Long-lived game7ctl sessions.
+
+Every game7ctl command connects to a network, decrypts the sender's keystore, loads ABIs and builds
+contract objects before it does any real work. A session runs many commands in one process and keeps
+all of that warm between them:
+- game7ctl shell reads commands from stdin, one per line
+- game7ctl serve accepts commands over a Unix socket, one per line, and replies with one JSON object
+  per command: {"status": <exit status>, "stdout": "...", "stderr": "..."}
+
+Commands use exactly the same syntax as on the command line, without the leading "game7ctl".
+
+The command handlers themselves are unchanged. While a session is active, it routes brownie's
+network.connect, accounts.load and Contract.from_abi through its own idempotent, caching versions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shlex
+import socketserver
+import sys
+import traceback
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from brownie import Contract, network
+
+from . import cli
+
+# Commands which manage sessions and cannot be run from inside one.
+SESSION_COMMANDS = ["shell", "serve"]
+
+EXIT_COMMANDS = ["exit", "quit"]
+
+
+class Session:
+    def __init__(self, allow_password_prompt: bool = True) -> None:
+        """
+        If allow_password_prompt is False, loading a keystore which has not been unlocked in this
+        session without providing its password raises an error instead of prompting for the password.
+        """
+        self.allow_password_prompt = allow_password_prompt
+        self._signers: Dict[str, Any] = {}
+        self._contracts: Dict[Tuple[Optional[str], str, str], Contract] = {}
+        self._parsers: Dict[Optional[str], argparse.ArgumentParser] = {}
+        self._originals: Dict[str, Any] = {}
+
+    def connect(
+        self, network_name: Optional[str] = None, launch_rpc: bool = True
+    ) -> None:
+        """
+        Connects to the given brownie network unless the session is already connected to it.
+        """
+        if network.is_connected():
+            if network_name is None or network.show_active() == network_name:
+                return
+            network.disconnect(kill_rpc=False)
+            self._contracts.clear()
+        self._originals["connect"](network_name, launch_rpc)
+
+    def load_signer(
+        self, filename: Optional[str] = None, password: Optional[str] = None
+    ) -> Any:
+        """
+        Decrypts the given keystore once per session. Later loads of the same keystore return the
+        unlocked account without decrypting it again.
+        """
+        if filename is not None and filename in self._signers:
+            return self._signers[filename]
+        if filename is not None and password is None and not self.allow_password_prompt:
+            raise ValueError(
+                f"Keystore {filename} has not been unlocked in this session. Provide --password."
+            )
+        signer = self._originals["load"](filename, password)
+        if filename is not None:
+            self._signers[filename] = signer
+        return signer
+
+    def contract_from_abi(
+        self, name: str, address: str, abi: List[Dict[str, Any]], *args, **kwargs
+    ) -> Contract:
+        """
+        Returns a contract object for the given address, reusing the one built earlier in this
+        session on the same network.
+        """
+        key = (network.show_active(), name, address)
+        contract = self._contracts.get(key)
+        if contract is None:
+            contract = self._originals["from_abi"](name, address, abi, *args, **kwargs)
+            self._contracts[key] = contract
+        return contract
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["Session"]:
+        """
+        Routes brownie's connection, keystore and contract loading through this session for the
+        duration of the context.
+        """
+        self._originals = {
+            "connect": network.connect,
+            "load": network.accounts.load,
+            "from_abi": Contract.from_abi,
+        }
+        original_from_abi = Contract.__dict__["from_abi"]
+        network.connect = self.connect
+        network.accounts.load = self.load_signer
+        Contract.from_abi = self.contract_from_abi
+        try:
+            yield self
+        finally:
+            network.connect = self._originals["connect"]
+            del network.accounts.load
+            Contract.from_abi = original_from_abi
+
+    def parser(self, argv: List[str]) -> argparse.ArgumentParser:
+        """
+        Returns the game7ctl argument parser for the given command, building it once per subcommand.
+        """
+        selected = cli.selected_subcommand(argv)
+        parser = self._parsers.get(selected)
+        if parser is None:
+            parser = cli.generate_cli(argv)
+            self._parsers[selected] = parser
+        return parser
+
+    def execute(self, argv: List[str]) -> int:
+        """
+        Runs a single game7ctl command in this session. Returns its exit status.
+        """
+        if cli.selected_subcommand(argv) in SESSION_COMMANDS:
+            print(f"error: {argv[0]} cannot be run inside a session", file=sys.stderr)
+            return 2
+        try:
+            args = self.parser(argv).parse_args(argv)
+            args.func(args)
+        except SystemExit as e:
+            if e.code is None:
+                return 0
+            return e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            if os.environ.get("GAME7CTL_DEBUG"):
+                traceback.print_exc()
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    def execute_line(self, line: str) -> Optional[int]:
+        """
+        Runs the command on the given line. Returns None for blank lines and comments.
+        """
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        if not argv:
+            return None
+        return self.execute(argv)
+
+
+def preload(session: Session, args: argparse.Namespace) -> None:
+    if args.network is not None:
+        session.connect(args.network)
+    if args.sender is not None:
+        session.load_signer(args.sender, args.password)
+
+
+def run_shell(session: Session, lines: TextIO, prompt: Optional[str] = None) -> int:
+    """
+    Runs commands from the given lines until they run out or an exit command is read. Returns the exit
+    status of the last command.
+    """
+    status = 0
+    while True:
+        if prompt is not None:
+            print(prompt, end="", flush=True)
+        line = lines.readline()
+        if not line:
+            break
+        if line.strip() in EXIT_COMMANDS:
+            break
+        result = session.execute_line(line)
+        if result is not None:
+            status = result
+    return status
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        session: Session = self.server.session  # type: ignore
+        for raw_line in self.rfile:
+            line = raw_line.decode("utf-8")
+            if line.strip() in EXIT_COMMANDS:
+                break
+            stdout = io.StringIO()
+            stderr = io.StringIO()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                status = session.execute_line(line)
+            if status is None:
+                continue
+            response = {
+                "status": status,
+                "stdout": stdout.getvalue(),
+                "stderr": stderr.getvalue(),
+            }
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class CommandServer(socketserver.UnixStreamServer):
+    # Commands are handled one at a time: brownie's network state is not thread-safe.
+    def __init__(self, socket_path: str, session: Session) -> None:
+        self.session = session
+        super().__init__(socket_path, CommandHandler)
+
+
+def serve(session: Session, socket_path: str) -> None:
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    # The socket gives access to unlocked signers, so only the owner may connect to it.
+    old_umask = os.umask(0o177)
+    try:
+        server = CommandServer(socket_path, session)
+    finally:
+        os.umask(old_umask)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+
+
+@contextlib.contextmanager
+def session_read_cache(args: argparse.Namespace) -> Iterator[None]:
+    """
+    Caches contract reads for the lifetime of the session if --read-cache or --read-cache-db is given.
+    """
+    if not args.read_cache and args.read_cache_db is None:
+        yield
+        return
+
+    from . import read_cache
+
+    cache = read_cache.ReadCache(
+        max_entries=args.read_cache_size,
+        database=args.read_cache_db,
+        latest_ttl=args.latest_ttl,
+    )
+    with cache, read_cache.cached_reads(cache):
+        yield
+
+
+def handle_shell(args: argparse.Namespace) -> None:
+    session = Session()
+    with session.activate(), session_read_cache(args):
+        preload(session, args)
+        prompt = "game7ctl> " if sys.stdin.isatty() else None
+        status = run_shell(session, sys.stdin, prompt)
+    sys.exit(status)
+
+
+def handle_serve(args: argparse.Namespace) -> None:
+    session = Session(allow_password_prompt=False)
+    with session.activate(), session_read_cache(args):
+        preload(session, args)
+        serve(session, args.socket)
+
+
+def add_session_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--network",
+        required=False,
+        default=None,
+        help="Name of brownie network to connect to when the session starts",
+    )
+    parser.add_argument(
+        "--sender",
+        required=False,
+        default=None,
+        help="Path to keystore file to unlock when the session starts",
+    )
+    parser.add_argument(
+        "--password",
+        required=False,
+        help="Password to keystore file (if you do not provide it, you will be prompted for it)",
+    )
+    parser.add_argument(
+        "--read-cache",
+        action="store_true",
+        help="Cache the results of contract reads at fixed blocks for the lifetime of the session",
+    )
+    parser.add_argument(
+        "--read-cache-db",
+        required=False,
+        default=None,
+        help="Path to an SQLite file in which to persist cached reads across sessions (implies --read-cache)",
+    )
+    parser.add_argument(
+        "--read-cache-size",
+        type=int,
+        default=10000,
+        help="Maximum number of reads to cache in memory (default: 10000)",
+    )
+    parser.add_argument(
+        "--latest-ttl",
+        type=float,
+        default=0.0,
+        help='Number of seconds to cache reads against "latest" for (default: 0, do not cache them)',
+    )
+
+
+def generate_shell_cli() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run game7ctl commands read from stdin (one per line) in a single session"
+    )
+    add_session_arguments(parser)
+    parser.set_defaults(func=handle_shell)
+    return parser
+
+
+def generate_serve_cli() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Serve game7ctl commands over a Unix socket (one per line) in a single session"
+    )
+    add_session_arguments(parser)
+    parser.add_argument(
+        "--socket",
+        required=True,
+        help="Path at which to create the Unix socket",
+    )
+    parser.set_defaults(func=handle_serve)
+    return parser
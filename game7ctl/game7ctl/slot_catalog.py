@@ -0,0 +1,335 @@
+"""
+In-memory catalog of the slots defined on an Inventory contract.
+
+Resolving slot metadata through the wrappers costs one RPC per slot and attribute (get_slot_by_id,
+get_slot_uri, get_slot_type, slot_is_unequippable). SlotCatalog loads every slot, and the names of the
+slot types they use, in bulk once and answers lookups from memory. refresh (or the polling thread
+started by start) keeps it current from the Inventory's logs:
+- SlotCreated adds a slot
+- NewSlotURI marks the URI of a slot as changed (the event does not carry the URI, so it is re-read)
+- SlotTypeAdded changes the type of a slot
+- NewSlotTypeAdded names a slot type
+
+setSlotUnequippable does not emit an event. Unless track_unequippable is False, every refresh which
+finds new blocks re-reads the unequippable flags of all slots, which is a single call if the catalog
+has a Multicall2 contract to aggregate its reads through.
+
+The catalog remembers the hash of the block it reflects. If a refresh finds that block is no longer on
+the chain, the events applied to the catalog may have been reorganized away, so it is loaded again from
+scratch. Refreshes can also be held back by a number of confirmations, so that the catalog only reflects
+blocks which are unlikely to be reorganized.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from brownie import web3
+
+from . import InventoryFacet, Multicall2, inventory_events, logs, multicall, rpc_batch
+
+CATALOG_EVENT_ABIS = [
+    inventory_events.SLOT_CREATED_ABI,
+    inventory_events.NEW_SLOT_URI_ABI,
+    inventory_events.SLOT_TYPE_ADDED_ABI,
+    inventory_events.NEW_SLOT_TYPE_ADDED_ABI,
+]
+
+
+class Slot(NamedTuple):
+    slot_id: int
+    slot_type: int
+    slot_uri: str
+    unequippable: bool
+
+
+def apply_catalog_event(
+    slots: Dict[int, Slot], slot_type_names: Dict[int, str], event: Dict[str, Any]
+) -> Set[int]:
+    args = event["args"]
+    if event["event"] == "SlotCreated":
+        slot_id = args["slot"]
+        # The URI is not part of the event. It is filled in when the slot is re-read.
+        slots[slot_id] = Slot(slot_id, args["slotType"], "", args["unequippable"])
+        return {slot_id}
+    if event["event"] == "NewSlotURI":
+        if args["slotId"] in slots:
+            return {args["slotId"]}
+    elif event["event"] == "SlotTypeAdded":
+        # assignSlotType does not check that the slot exists. Slots which do not exist yet get their
+        # type from SlotCreated once they are created.
+        slot = slots.get(args["slotId"])
+        if slot is not None:
+            slots[slot.slot_id] = slot._replace(slot_type=args["slotType"])
+    elif event["event"] == "NewSlotTypeAdded":
+        slot_type_names[args["slotType"]] = args["slotTypeName"]
+    return set()
+
+
+def bulk_read(
+    inventory: InventoryFacet.InventoryFacet,
+    multicall_contract: Optional[Multicall2.Multicall2],
+    function: Any,
+    method: Any,
+    args_list: List[tuple],
+    block_number: int,
+) -> List[Any]:
+    """
+    Calls a view function of the Inventory once for every tuple of arguments in args_list, at the
+    given block. function is the brownie contract function (e.g. inventory.contract.getSlotType) and
+    method the wrapper method (e.g. inventory.get_slot_type).
+
+    If multicall_contract is given, the calls are aggregated through it, and a call which fails raises
+    a ValueError. Otherwise they are made concurrently, so that they can share JSON-RPC batches inside
+    rpc_batch.batched_calls.
+    """
+    if multicall_contract is not None:
+        results = multicall.aggregate_function(
+            multicall_contract,
+            inventory.address,
+            function,
+            args_list,
+            block_number=block_number,
+        )
+        for result in results:
+            if not result.success:
+                raise ValueError(f"Aggregated read failed: {result.value}")
+        return [result.value for result in results]
+    return rpc_batch.batched_map(
+        lambda args: method(*args, block_number=block_number), args_list
+    )
+
+
+class SlotCatalog:
+    def __init__(
+        self,
+        inventory: InventoryFacet.InventoryFacet,
+        multicall_contract: Optional[Multicall2.Multicall2] = None,
+        track_unequippable: bool = True,
+        confirmations: int = 0,
+    ) -> None:
+        """
+        If multicall_contract is given, bulk reads are aggregated through it. Otherwise they are made
+        concurrently, so that they can share JSON-RPC batches inside rpc_batch.batched_calls.
+
+        Unless they are given a block, load and refresh bring the catalog up to the block confirmations
+        blocks behind the latest one.
+        """
+        inventory.assert_contract_is_instantiated()
+        self.inventory = inventory
+        self.multicall_contract = multicall_contract
+        self.track_unequippable = track_unequippable
+        self.confirmations = confirmations
+        # The block up to which (inclusive) the catalog reflects the state of the contract, and its hash.
+        self.block_number: Optional[int] = None
+        self.block_hash: Optional[str] = None
+
+        self._lock = threading.RLock()
+        self._slots: Dict[int, Slot] = {}
+        self._slot_type_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+
+    def _read(
+        self, function: Any, method: Any, args_list: List[tuple], block_number: int
+    ) -> List[Any]:
+        return bulk_read(
+            self.inventory,
+            self.multicall_contract,
+            function,
+            method,
+            args_list,
+            block_number,
+        )
+
+    def _read_slots(self, slot_ids: List[int], block_number: int) -> List[Slot]:
+        raw_slots = self._read(
+            self.inventory.contract.getSlotById,
+            self.inventory.get_slot_by_id,
+            [(slot_id,) for slot_id in slot_ids],
+            block_number,
+        )
+        return [
+            Slot(slot_id, slot_type, slot_uri, unequippable)
+            for slot_id, (slot_uri, slot_type, unequippable, _) in zip(
+                slot_ids, raw_slots
+            )
+        ]
+
+    def _read_slot_type_names(
+        self, slot_types: Iterable[int], block_number: int
+    ) -> Dict[int, str]:
+        slot_types = sorted(slot_types)
+        names = self._read(
+            self.inventory.contract.getSlotType,
+            self.inventory.get_slot_type,
+            [(slot_type,) for slot_type in slot_types],
+            block_number,
+        )
+        return dict(zip(slot_types, names))
+
+    def _target_block(self) -> int:
+        return web3.eth.block_number - self.confirmations
+
+    def load(self, block_number: Optional[int] = None) -> None:
+        """
+        Loads every slot and the names of the slot types they use as of the given block (default: the
+        latest confirmed block).
+        """
+        if block_number is None:
+            block_number = self._target_block()
+        block_hash = logs.to_hex(web3.eth.get_block(block_number)["hash"])
+        num_slots = self.inventory.num_slots(block_number=block_number)
+        slots = self._read_slots(list(range(1, num_slots + 1)), block_number)
+        slot_type_names = self._read_slot_type_names(
+            {slot.slot_type for slot in slots}, block_number
+        )
+        with self._lock:
+            self._slots = {slot.slot_id: slot for slot in slots}
+            self._slot_type_names = slot_type_names
+            self.block_number = block_number
+            self.block_hash = block_hash
+
+    def apply_event(self, event: Dict[str, Any]) -> Set[int]:
+        """
+        Applies a decoded SlotCreated, NewSlotURI, SlotTypeAdded or NewSlotTypeAdded event to the
+        catalog. Returns the IDs of the slots whose URIs have to be re-read because of it.
+        """
+        with self._lock:
+            return apply_catalog_event(self._slots, self._slot_type_names, event)
+
+    def refresh(self, to_block: Optional[int] = None) -> int:
+        """
+        Brings the catalog up to date with the given block (default: the latest confirmed block) by
+        applying the events emitted since the block it reflects. Returns the number of events applied.
+        If the block the catalog reflects has been reorganized away, the catalog is loaded again
+        instead, and 0 is returned.
+
+        The update is built on a copy of the catalog, so lookups made while it is in progress see the
+        catalog as of the previous block.
+        """
+        if self.block_number is None:
+            self.load(to_block)
+            return 0
+        if to_block is None:
+            to_block = self._target_block()
+        if to_block < self.block_number or self.block_hash != logs.to_hex(
+            web3.eth.get_block(self.block_number)["hash"]
+        ):
+            self.load(to_block)
+            return 0
+        if to_block == self.block_number:
+            return 0
+
+        to_block_hash = logs.to_hex(web3.eth.get_block(to_block)["hash"])
+        events = logs.fetch_logs(
+            web3,
+            self.inventory.address,
+            CATALOG_EVENT_ABIS,
+            self.block_number + 1,
+            to_block,
+        )
+        with self._lock:
+            slots = dict(self._slots)
+            slot_type_names = dict(self._slot_type_names)
+        stale_uris: Set[int] = set()
+        for event in events:
+            stale_uris |= apply_catalog_event(slots, slot_type_names, event)
+
+        if stale_uris:
+            slot_ids = sorted(stale_uris)
+            uris = self._read(
+                self.inventory.contract.getSlotURI,
+                self.inventory.get_slot_uri,
+                [(slot_id,) for slot_id in slot_ids],
+                to_block,
+            )
+            for slot_id, slot_uri in zip(slot_ids, uris):
+                slots[slot_id] = slots[slot_id]._replace(slot_uri=slot_uri)
+
+        if self.track_unequippable and slots:
+            slot_ids = sorted(slots)
+            flags = self._read(
+                self.inventory.contract.slotIsUnequippable,
+                self.inventory.slot_is_unequippable,
+                [(slot_id,) for slot_id in slot_ids],
+                to_block,
+            )
+            for slot_id, unequippable in zip(slot_ids, flags):
+                slots[slot_id] = slots[slot_id]._replace(unequippable=unequippable)
+
+        unnamed_types = {
+            slot.slot_type
+            for slot in slots.values()
+            if slot.slot_type not in slot_type_names
+        }
+        if unnamed_types:
+            slot_type_names.update(self._read_slot_type_names(unnamed_types, to_block))
+
+        with self._lock:
+            self._slots = slots
+            self._slot_type_names = slot_type_names
+            self.block_number = to_block
+            self.block_hash = to_block_hash
+        return len(events)
+
+    def start(self, poll_interval: float = 5.0) -> None:
+        """
+        Refreshes the catalog every poll_interval seconds in a background thread until stop is called.
+        """
+        if self._poller is not None:
+            raise RuntimeError("Slot catalog is already being refreshed")
+        if self.block_number is None:
+            self.load()
+        self._stop.clear()
+
+        def poll() -> None:
+            while not self._stop.wait(poll_interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    # Transient RPC errors: the next poll picks up from the same block.
+                    pass
+
+        self._poller = threading.Thread(target=poll, daemon=True)
+        self._poller.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._poller is not None:
+            self._poller.join()
+            self._poller = None
+
+    def num_slots(self) -> int:
+        with self._lock:
+            return len(self._slots)
+
+    def slot(self, slot_id: int) -> Slot:
+        with self._lock:
+            slot = self._slots.get(slot_id)
+        if slot is None:
+            raise KeyError(f"Slot {slot_id} does not exist")
+        return slot
+
+    def slots(self) -> List[Slot]:
+        with self._lock:
+            return [self._slots[slot_id] for slot_id in sorted(self._slots)]
+
+    def slot_uri(self, slot_id: int) -> str:
+        return self.slot(slot_id).slot_uri
+
+    def slot_type(self, slot_id: int) -> int:
+        return self.slot(slot_id).slot_type
+
+    def slot_is_unequippable(self, slot_id: int) -> bool:
+        return self.slot(slot_id).unequippable
+
+    def slot_type_name(self, slot_type: int) -> str:
+        """
+        Returns the name of the given slot type, or an empty string if it has not been named.
+        """
+        with self._lock:
+            return self._slot_type_names.get(slot_type, "")
+
+    def slot_type_names(self) -> Dict[int, str]:
+        with self._lock:
+            return dict(self._slot_type_names)
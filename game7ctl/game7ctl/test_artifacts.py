@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+
+from . import artifacts
+
+
+class ArtifactCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.build_directory = tempfile.TemporaryDirectory()
+        self.cache = artifacts.ArtifactCache()
+        self.path = self.write_artifact(
+            "Token", {"abi": [{"type": "function", "name": "a"}], "bytecode": "6080"}
+        )
+
+    def tearDown(self) -> None:
+        self.build_directory.cleanup()
+
+    def write_artifact(self, contract_name, build, mtime_ns=None):
+        path = os.path.join(self.build_directory.name, f"{contract_name}.json")
+        with open(path, "w") as ofp:
+            json.dump(build, ofp)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def test_artifact_is_parsed_once(self):
+        abi_0 = self.cache.abi(self.path)
+        abi_1 = self.cache.abi(self.path)
+        self.assertIs(abi_0, abi_1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_parsed_build_serves_abi_and_bytecode(self):
+        build = self.cache.build(self.path)
+        self.assertIs(self.cache.abi(self.path), build["abi"])
+        self.assertEqual(self.cache.bytecode(self.path), "6080")
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_modified_artifact_is_reloaded(self):
+        self.assertEqual(self.cache.abi(self.path)[0]["name"], "a")
+        stat = os.stat(self.path)
+        self.write_artifact(
+            "Token",
+            {"abi": [{"type": "function", "name": "bb"}]},
+            mtime_ns=stat.st_mtime_ns + 1_000_000_000,
+        )
+        self.assertEqual(self.cache.abi(self.path)[0]["name"], "bb")
+        self.assertIsNone(self.cache.bytecode(self.path))
+
+    def test_invalidate(self):
+        self.cache.abi(self.path)
+        self.cache.invalidate(self.path)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.cache.abi(self.path)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_missing_artifact(self):
+        with self.assertRaises(IOError):
+            artifacts.get_abi(self.build_directory.name, "Missing")
+
+    def test_missing_abi(self):
+        self.write_artifact("NoABI", {"bytecode": "6080"})
+        with self.assertRaises(ValueError):
+            artifacts.get_abi(self.build_directory.name, "NoABI")
+
+
+class LoadKeysTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.build_directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.build_directory.cleanup()
+
+    def test_load_keys_matches_json(self):
+        build = {
+            "ast": {"nodes": [{"src": '{["]}', "id": 1}, [], {}], "name": "x"},
+            "abi": [{"type": "event", "name": "E", "inputs": []}],
+            "bytecode": "6080",
+            "deployedBytecode": "",
+            "optimizer": {"enabled": True, "runs": 200},
+            "source": 'contract C { string s = "}"; }',
+            "sourceMap": None,
+        }
+        path = os.path.join(self.build_directory.name, "C.json")
+        for indent in [None, 4]:
+            with open(path, "w") as ofp:
+                json.dump(build, ofp, indent=indent)
+            for keys in [["abi"], ["source", "sourceMap"], ["optimizer", "missing"]]:
+                self.assertEqual(
+                    artifacts.load_keys(path, keys),
+                    {key: build[key] for key in keys if key in build},
+                )
+
+    def test_load_build_directory(self):
+        for contract_name in ["A", "B"]:
+            path = os.path.join(self.build_directory.name, f"{contract_name}.json")
+            with open(path, "w") as ofp:
+                json.dump({"abi": [contract_name], "ast": {"a": [1, 2]}}, ofp)
+
+        self.assertEqual(
+            artifacts.load_build_directory(self.build_directory.name),
+            {"A": {"abi": ["A"]}, "B": {"abi": ["B"]}},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
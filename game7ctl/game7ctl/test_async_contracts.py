@@ -0,0 +1,120 @@
+import asyncio
+import inspect
+import unittest
+
+from brownie import chain
+
+from . import abi, async_contracts
+from .test_inventory import InventoryTestCase
+
+
+class CamelToSnakeTests(unittest.TestCase):
+    def test_camel_to_snake(self):
+        self.assertEqual(abi.camel_to_snake("getSlotURI"), "get_slot_uri")
+        self.assertEqual(abi.camel_to_snake("isApprovedForAll"), "is_approved_for_all")
+        self.assertEqual(abi.camel_to_snake("onERC721Received"), "on_erc721_received")
+
+
+class AsyncWrapperClassTests(unittest.TestCase):
+    def test_deploy_takes_constructor_arguments(self):
+        self.assertEqual(
+            list(inspect.signature(async_contracts.AsyncMockERC20.deploy).parameters),
+            ["self", "name", "symbol", "transaction_config"],
+        )
+        self.assertEqual(
+            list(inspect.signature(async_contracts.AsyncMockERC721.deploy).parameters),
+            ["self", "transaction_config"],
+        )
+
+
+@unittest.skipIf(async_contracts.aiohttp is None, "aiohttp is not installed")
+class AsyncWrapperTests(InventoryTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.nft.mint(cls.player.address, 1, cls.owner_tx_config)
+        cls.inventory.create_slot(False, 1, "async", {"from": cls.admin})
+
+    def run_async(self, function):
+        async def run():
+            async with async_contracts.AsyncJSONRPCClient.for_active_network(
+                max_concurrency=8
+            ) as client:
+                return await function(client)
+
+        return asyncio.run(run())
+
+    def test_reads_match_synchronous_wrappers(self):
+        async def reads(client):
+            inventory = async_contracts.AsyncInventoryFacet(
+                self.inventory.address, client
+            )
+            terminus = async_contracts.AsyncTerminusFacet(self.terminus.address, client)
+            nft = async_contracts.AsyncMockERC721(self.nft.address, client)
+            payment_token = async_contracts.AsyncMockERC20(
+                self.payment_token.address, client
+            )
+            return await asyncio.gather(
+                inventory.admin_terminus_info(),
+                inventory.num_slots(),
+                inventory.get_slot_uri(1),
+                inventory.get_slot_by_id(1),
+                inventory.get_equipped_item(1, 1),
+                terminus.total_pools(),
+                nft.owner_of(1),
+                payment_token.balance_of(self.owner.address),
+            )
+
+        results = self.run_async(reads)
+        self.assertEqual(
+            results,
+            [
+                tuple(self.inventory.admin_terminus_info()),
+                self.inventory.num_slots(),
+                self.inventory.get_slot_uri(1),
+                tuple(self.inventory.get_slot_by_id(1)),
+                tuple(self.inventory.get_equipped_item(1, 1)),
+                self.terminus.total_pools(),
+                self.nft.owner_of(1),
+                self.payment_token.balance_of(self.owner.address),
+            ],
+        )
+
+    def test_reads_at_block(self):
+        block_number = len(chain) - 1
+        self.inventory.create_slot(False, 1, "async_later", {"from": self.admin})
+
+        async def reads(client):
+            inventory = async_contracts.AsyncInventoryFacet(
+                self.inventory.address, client
+            )
+            return await asyncio.gather(
+                inventory.num_slots(block_number=block_number), inventory.num_slots()
+            )
+
+        before, after = self.run_async(reads)
+        self.assertEqual(before + 1, after)
+
+    def test_writes_go_through_synchronous_wrapper(self):
+        async def write(client):
+            inventory = async_contracts.AsyncInventoryFacet(
+                self.inventory.address, client
+            )
+            await inventory.create_slot(False, 1, "async_write", {"from": self.admin})
+            return await inventory.get_slot_uri(await inventory.num_slots())
+
+        self.assertEqual(self.run_async(write), "async_write")
+
+    def test_deploy_with_constructor_arguments(self):
+        async def deploy(client):
+            token = async_contracts.AsyncMockERC20(None, client)
+            await token.deploy("Async token", "ASYNC", self.owner_tx_config)
+            return token.address, await token.name(), await token.symbol()
+
+        address, name, symbol = self.run_async(deploy)
+        self.assertIsNotNone(address)
+        self.assertEqual((name, symbol), ("Async token", "ASYNC"))
+
+
+if __name__ == "__main__":
+    unittest.main()
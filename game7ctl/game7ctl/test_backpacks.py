@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import unittest
+
+from . import Multicall2, backpacks
+from .test_inventory import InventoryTestCase
+from .transactions import TransactionPipeline
+
+
+class CheckpointTests(unittest.TestCase):
+    def test_completed_subject_tokens(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_path = os.path.join(temp_dir, "backpacks.jsonl")
+            self.assertEqual(backpacks.completed_subject_tokens(checkpoint_path), set())
+            with open(checkpoint_path, "w") as ofp:
+                for record in [
+                    {"subject_token_id": 1, "status": "ok"},
+                    {"subject_token_id": 2, "status": "skipped"},
+                    {"subject_token_id": 3, "status": "error"},
+                ]:
+                    print(json.dumps(record), file=ofp)
+                ofp.write('{"subject_token_id": 4, "sta')
+            self.assertEqual(
+                backpacks.completed_subject_tokens(checkpoint_path), {1, 2}
+            )
+
+    def test_backpack_slots(self):
+        slots = [
+            {"slot_id": 1, "slot_type": 2},
+            {"slot_id": 2, "slot_type": 3},
+            {"slot_id": 3, "slot_type": 2},
+        ]
+        self.assertEqual(backpacks.backpack_slots(slots, 2), 2)
+        self.assertEqual(backpacks.backpack_slots(slots, 4), 0)
+
+    def test_stats(self):
+        stats = backpacks.AllocationStats()
+        stats.add({"status": "ok", "tx_hash": "0x1", "gas_used": 100})
+        stats.add({"status": "error", "tx_hash": "0x2", "gas_used": 50})
+        stats.add({"status": "skipped"})
+        summary = stats.summary(2.0)
+        self.assertEqual(
+            (summary["allocated"], summary["skipped"], summary["failed"]), (1, 1, 1)
+        )
+        self.assertEqual(summary["transactions"], 2)
+        self.assertEqual(summary["gas_used"], 150)
+        self.assertEqual(summary["average_gas_used"], 75)
+        self.assertEqual(summary["transactions_per_second"], 1.0)
+
+
+class AllocateBackpacksTests(InventoryTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.multicall = Multicall2.Multicall2(None)
+        cls.multicall.deploy(cls.owner_tx_config)
+
+    def test_allocate_backpacks(self):
+        subject_token_ids = []
+        for _ in range(4):
+            subject_token_id = self.nft.total_supply()
+            self.nft.mint(self.player.address, subject_token_id, {"from": self.owner})
+            subject_token_ids.append(subject_token_id)
+        # The first subject token already has one of the backpack's slots.
+        self.inventory.add_backpack_to_subject(
+            1, subject_token_ids[0], 5, "backpack", {"from": self.admin}
+        )
+
+        with TransactionPipeline(self.admin, max_in_flight=4) as pipeline:
+            records = list(
+                backpacks.allocate_backpacks(
+                    self.inventory,
+                    self.multicall,
+                    pipeline,
+                    subject_token_ids,
+                    2,
+                    5,
+                    "backpack",
+                    batch_size=3,
+                )
+            )
+        self.assertEqual(
+            sorted(
+                (record["subject_token_id"], record["status"]) for record in records
+            ),
+            [(subject_token_id, "ok") for subject_token_id in subject_token_ids],
+        )
+        slots_added = {
+            record["subject_token_id"]: record["slots_added"] for record in records
+        }
+        self.assertEqual(
+            slots_added,
+            {**dict.fromkeys(subject_token_ids, 2), subject_token_ids[0]: 1},
+        )
+        for subject_token_id in subject_token_ids:
+            slots = self.inventory.contract.getSubjectTokenSlots.call(
+                subject_token_id, {"from": self.player}
+            )
+            self.assertEqual(len(slots), 2)
+
+        with TransactionPipeline(self.admin, max_in_flight=4) as pipeline:
+            records = list(
+                backpacks.allocate_backpacks(
+                    self.inventory,
+                    self.multicall,
+                    pipeline,
+                    subject_token_ids,
+                    2,
+                    5,
+                    "backpack",
+                )
+            )
+        self.assertEqual(
+            [record["status"] for record in records],
+            ["skipped"] * len(subject_token_ids),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
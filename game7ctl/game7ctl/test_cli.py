@@ -0,0 +1,147 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from . import cli
+
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget (in seconds) for importing game7ctl.cli and rendering the top-level help, on top of the time
+# it takes to start the Python interpreter. Can be overridden for slow CI machines.
+STARTUP_BUDGET_SECONDS = float(
+    os.environ.get("GAME7CTL_STARTUP_BUDGET_SECONDS", "0.25")
+)
+
+# Modules which must not be imported unless the subcommand that needs them is selected.
+HEAVY_MODULES = [
+    "brownie",
+    "web3",
+    "game7ctl.dao",
+    "game7ctl.InventoryFacet",
+    "game7ctl.inventory",
+    "game7ctl.TerminusFacet",
+]
+
+# Modules which must not be imported by the inventory subcommand unless the inventory subcommand that
+# needs them is selected.
+INVENTORY_FEATURE_MODULES = [
+    "game7ctl.backpacks",
+    "game7ctl.batch",
+    "game7ctl.equipped_view",
+    "game7ctl.event_archive",
+    "game7ctl.event_query",
+    "game7ctl.history",
+    "game7ctl.indexer",
+    "game7ctl.log_columns",
+    "game7ctl.multicall",
+    "game7ctl.provisioning",
+    "game7ctl.read_cache",
+    "game7ctl.rpc_batch",
+    "game7ctl.slot_catalog",
+    "game7ctl.watch",
+]
+
+HAS_BROWNIE = importlib.util.find_spec("brownie") is not None
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=PACKAGE_PARENT,
+        check=True,
+        capture_output=True,
+    )
+
+
+def imported_modules(*argv: str) -> set:
+    """
+    Returns the modules imported by running game7ctl with the given arguments in a fresh interpreter.
+    """
+    code = (
+        "import contextlib, io, json, sys\n"
+        "from game7ctl import cli\n"
+        "sys.argv = ['game7ctl', *sys.argv[1:]]\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    try:\n"
+        "        cli.main()\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    return set(json.loads(run_python(code, *argv).stdout))
+
+
+def cold_seconds(code: str) -> float:
+    """
+    Returns the best of three wall-clock timings of running the given code in a fresh interpreter.
+    """
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        run_python(code)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class CLIStartupTests(unittest.TestCase):
+    def test_help_does_not_import_subcommand_modules(self):
+        imported = imported_modules("--help")
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, imported)
+
+    @unittest.skipUnless(HAS_BROWNIE, "the inventory subcommand requires brownie")
+    def test_inventory_does_not_import_feature_modules(self):
+        imported = imported_modules("inventory", "num-slots", "--help")
+        self.assertIn("game7ctl.inventory", imported)
+        for module in INVENTORY_FEATURE_MODULES:
+            self.assertNotIn(module, imported)
+
+    def test_help_lists_all_subcommands(self):
+        parser = cli.generate_cli(["--help"])
+        help_text = parser.format_help()
+        for cmd_name in cli.SUBCOMMANDS:
+            self.assertIn(cmd_name, help_text)
+
+    def test_selected_subcommand(self):
+        self.assertEqual(
+            cli.selected_subcommand(["inventory", "num-slots"]), "inventory"
+        )
+        self.assertEqual(cli.selected_subcommand(["-h"]), None)
+        self.assertEqual(cli.selected_subcommand(["unknown"]), None)
+
+    def test_cold_startup_budget(self):
+        interpreter_seconds = cold_seconds("pass")
+        cli_seconds = cold_seconds(
+            "import sys\n"
+            "from game7ctl import cli\n"
+            "cli.generate_cli(['--help']).format_help()\n"
+        )
+        self.assertLess(
+            cli_seconds - interpreter_seconds,
+            STARTUP_BUDGET_SECONDS,
+            f"Cold startup took {cli_seconds - interpreter_seconds:.3f}s over interpreter startup",
+        )
+
+    @unittest.skipUnless(HAS_BROWNIE, "the inventory subcommand requires brownie")
+    def test_inventory_cold_startup_budget(self):
+        # brownie and the generated InventoryFacet interface are needed by every inventory subcommand,
+        # so the budget only covers what the inventory module adds on top of them.
+        interface_seconds = cold_seconds("from game7ctl import InventoryFacet")
+        inventory_seconds = cold_seconds(
+            "from game7ctl import cli\n"
+            "parser = cli.generate_cli(['inventory', 'num-slots', '--help'])\n"
+            "parser.format_help()\n"
+        )
+        self.assertLess(
+            inventory_seconds - interface_seconds,
+            STARTUP_BUDGET_SECONDS,
+            f"Cold startup of the inventory subcommand took {inventory_seconds - interface_seconds:.3f}s over importing InventoryFacet",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+import os
+import tempfile
+import unittest
+
+from brownie import chain, web3
+
+from . import indexer
+from .equipped_view import EquippedView
+from .test_inventory import MAX_UINT, InventoryTestCase
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+ITEM_ADDRESS = "0x0000000000000000000000000000000000000002"
+OTHER_ITEM_ADDRESS = "0x0000000000000000000000000000000000000003"
+
+
+def item_event(
+    name, block_number, subject_token_id, slot, item_address, amount, log_index=0
+):
+    return {
+        "event": name,
+        "args": {
+            "subjectTokenId": subject_token_id,
+            "slot": slot,
+            "itemType": 20,
+            "itemAddress": item_address,
+            "itemTokenId": 0,
+            "amount": amount,
+        },
+        "address": ADDRESS,
+        "blockNumber": block_number,
+        "blockHash": f"0x{block_number:064x}",
+        "transactionHash": f"0x{block_number:064x}",
+        "logIndex": log_index,
+    }
+
+
+class EquippedViewTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = indexer.EventStore(os.path.join(self.temp_dir.name, "events.db"))
+        self.view = EquippedView(self.store)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_equip_and_unequip(self):
+        self.store.add_events(
+            ADDRESS,
+            [
+                item_event("ItemEquipped", 1, 1, 1, ITEM_ADDRESS, 10),
+                item_event("ItemEquipped", 2, 2, 1, ITEM_ADDRESS, 2**200),
+                item_event("ItemUnequipped", 3, 1, 1, ITEM_ADDRESS, 4),
+            ],
+            3,
+        )
+        self.assertEqual(self.view.update(ADDRESS), 3)
+        self.assertEqual(self.view.equipped_item(ADDRESS, 1, 1)["amount"], 6)
+        self.assertEqual(self.view.equipped_item(ADDRESS, 2, 1)["amount"], 2**200)
+        self.assertEqual(self.view.cursor(ADDRESS), (3, 0))
+
+        # Equipping an occupied slot unequips the previous item first, then replaces it.
+        self.store.add_events(
+            ADDRESS,
+            [
+                item_event("ItemUnequipped", 4, 1, 1, ITEM_ADDRESS, 6),
+                item_event("ItemEquipped", 5, 1, 1, OTHER_ITEM_ADDRESS, 3),
+                item_event("ItemUnequipped", 6, 2, 1, ITEM_ADDRESS, 2**200),
+            ],
+            6,
+        )
+        self.assertEqual(self.view.update(ADDRESS), 3)
+        self.assertEqual(self.view.update(ADDRESS), 0)
+        self.assertEqual(
+            self.view.equipped(ADDRESS, 1),
+            {
+                1: {
+                    "item_type": 20,
+                    "item_address": OTHER_ITEM_ADDRESS,
+                    "item_token_id": 0,
+                    "amount": 3,
+                }
+            },
+        )
+        # Unequipping the whole amount empties the slot.
+        self.assertEqual(self.view.equipped(ADDRESS, 2), {})
+        self.assertEqual(self.view.subject_token_ids(ADDRESS), [1])
+        self.assertEqual(
+            list(self.view.holders(ADDRESS, OTHER_ITEM_ADDRESS)),
+            [{"subject_token_id": 1, "slot": 1, "amount": 3}],
+        )
+        self.assertEqual(list(self.view.holders(ADDRESS, ITEM_ADDRESS)), [])
+
+    def test_rollback(self):
+        # Journal entries are only kept while the store keeps block hashes to detect reorgs with.
+        block_hashes = {1: f"0x{1:064x}"}
+        self.store.add_events(
+            ADDRESS,
+            [
+                item_event("ItemEquipped", 1, 1, 1, ITEM_ADDRESS, 10),
+                item_event("ItemEquipped", 1, 2, 1, ITEM_ADDRESS, 5, log_index=1),
+            ],
+            1,
+            block_hashes,
+        )
+        self.view.update(ADDRESS)
+        self.store.add_events(
+            ADDRESS,
+            [
+                item_event("ItemUnequipped", 2, 1, 1, ITEM_ADDRESS, 4),
+                item_event("ItemUnequipped", 3, 2, 1, ITEM_ADDRESS, 5),
+                item_event("ItemEquipped", 3, 3, 1, OTHER_ITEM_ADDRESS, 1, log_index=1),
+            ],
+            3,
+        )
+        self.view.update(ADDRESS)
+        self.assertEqual(self.view.subject_token_ids(ADDRESS), [1, 3])
+
+        self.assertEqual(self.store.rollback(ADDRESS, 1), 3)
+        self.assertEqual(self.store.cursor(ADDRESS), 1)
+        self.assertEqual(self.view.cursor(ADDRESS), (1, 1))
+        self.assertEqual(self.view.subject_token_ids(ADDRESS), [1, 2])
+        self.assertEqual(self.view.equipped_item(ADDRESS, 1, 1)["amount"], 10)
+        self.assertEqual(self.view.equipped_item(ADDRESS, 2, 1)["amount"], 5)
+
+        # The events on the new branch are applied on top of the rolled back state.
+        self.store.add_events(
+            ADDRESS, [item_event("ItemUnequipped", 2, 2, 1, ITEM_ADDRESS, 1)], 2
+        )
+        self.assertEqual(self.view.update(ADDRESS), 1)
+        self.assertEqual(self.view.equipped_item(ADDRESS, 2, 1)["amount"], 4)
+        self.assertEqual(self.view.equipped_item(ADDRESS, 1, 1)["amount"], 10)
+
+
+class EquippedViewChainTests(InventoryTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.inventory.create_slot(True, 1, "view", {"from": cls.admin})
+        cls.slot = cls.inventory.num_slots()
+        cls.inventory.mark_item_as_equippable_in_slot(
+            cls.slot, 20, cls.payment_token.address, 0, 10, {"from": cls.admin}
+        )
+        cls.payment_token.mint(cls.player.address, 1000, cls.owner_tx_config)
+        cls.payment_token.approve(cls.inventory.address, MAX_UINT, {"from": cls.player})
+
+        cls.subject_token_ids = []
+        for _ in range(3):
+            subject_token_id = cls.nft.total_supply()
+            cls.nft.mint(cls.player.address, subject_token_id, cls.owner_tx_config)
+            cls.subject_token_ids.append(subject_token_id)
+
+    def test_reorg(self):
+        first, second, _ = self.subject_token_ids
+        item = (20, self.payment_token.address, 0)
+        address = self.inventory.address
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with indexer.EventStore(os.path.join(temp_dir, "events.db")) as store:
+                view = EquippedView(store)
+                list(
+                    indexer.sync(
+                        store, web3, address, start_block=self.predeployment_block
+                    )
+                )
+                chain.snapshot()
+                self.inventory.equip(first, self.slot, *item, 4, {"from": self.player})
+                list(indexer.sync(store, web3, address))
+                view.update(address)
+                self.assertEqual(
+                    view.equipped_item(address, first, self.slot)["amount"], 4
+                )
+
+                # Replace the block the item was equipped in with one on another branch.
+                chain.revert()
+                self.inventory.equip(second, self.slot, *item, 2, {"from": self.player})
+                progress = list(indexer.sync(store, web3, address))
+                self.assertEqual(
+                    [
+                        record["rolled_back_to"]
+                        for record in progress
+                        if "rolled_back_to" in record
+                    ],
+                    [web3.eth.block_number - 1],
+                )
+                view.update(address)
+                self.assertIsNone(view.equipped_item(address, first, self.slot))
+                self.assertEqual(
+                    view.equipped_item(address, second, self.slot)["amount"], 2
+                )
+                self.assertEqual(
+                    view.verify(self.inventory, subject_token_ids=[first, second]), []
+                )
+
+    def test_view_matches_chain(self):
+        first, second, third = self.subject_token_ids
+        item = (20, self.payment_token.address, 0)
+        self.inventory.equip(first, self.slot, *item, 5, {"from": self.player})
+        self.inventory.equip(second, self.slot, *item, 7, {"from": self.player})
+        self.inventory.equip(second, self.slot, *item, 3, {"from": self.player})
+        self.inventory.unequip(first, self.slot, False, 2, {"from": self.player})
+        self.inventory.equip(third, self.slot, *item, 1, {"from": self.player})
+        self.inventory.unequip(third, self.slot, True, 0, {"from": self.player})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with indexer.EventStore(os.path.join(temp_dir, "events.db")) as store:
+                list(
+                    indexer.sync(
+                        store,
+                        web3,
+                        self.inventory.address,
+                        start_block=self.predeployment_block,
+                    )
+                )
+                view = EquippedView(store)
+                view.update(self.inventory.address)
+                address = self.inventory.address
+                self.assertEqual(
+                    view.equipped_item(address, first, self.slot)["amount"], 3
+                )
+                self.assertEqual(
+                    view.equipped_item(address, second, self.slot)["amount"], 3
+                )
+                self.assertEqual(view.equipped(address, third), {})
+                self.assertEqual(
+                    view.verify(
+                        self.inventory, subject_token_ids=self.subject_token_ids
+                    ),
+                    [],
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import tempfile
+import unittest
+
+from . import event_archive, indexer, log_columns
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+ITEM_ADDRESSES = [
+    "0x00000000000000000000000000000000000000A0",
+    "0x00000000000000000000000000000000000000B0",
+]
+PLAYER = "0x00000000000000000000000000000000000000C0"
+
+
+def item_event(block_number, log_index, slot, item_address, amount, equipped=True):
+    name = "ItemEquipped" if equipped else "ItemUnequipped"
+    return {
+        "event": name,
+        "args": {
+            "subjectTokenId": 2**255 + block_number,
+            "slot": slot,
+            "itemType": 20,
+            "itemAddress": item_address,
+            "itemTokenId": 0,
+            "amount": amount,
+            event_archive.SENDER_ARGUMENTS[name]: PLAYER,
+        },
+        "address": ADDRESS,
+        "blockNumber": block_number,
+        "blockHash": f"0x{block_number:064x}",
+        "transactionHash": f"0x{block_number:064x}",
+        "logIndex": log_index,
+    }
+
+
+@unittest.skipIf(log_columns.np is None, "numpy is not installed")
+class EventArchiveTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "archive")
+        self.store = indexer.EventStore(os.path.join(self.temp_dir.name, "events.db"))
+        self.events = [
+            item_event(
+                block_number,
+                log_index,
+                slot=block_number % 3 + 1,
+                item_address=ITEM_ADDRESSES[log_index % 2],
+                amount=block_number * 10 + log_index,
+                equipped=log_index == 0,
+            )
+            for block_number in range(1, 31)
+            for log_index in range(2)
+        ]
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def archive_in_segments(self):
+        archive = event_archive.EventArchive(self.path)
+        for to_block in [10, 20, 30]:
+            self.store.add_events(
+                ADDRESS,
+                [
+                    event
+                    for event in self.events
+                    if to_block - 10 < event["blockNumber"] <= to_block
+                ],
+                to_block,
+            )
+            event_archive.archive_store(archive, self.store, ADDRESS)
+        return archive
+
+    def test_append_and_reopen(self):
+        archive = self.archive_in_segments()
+        self.assertEqual(
+            [
+                (segment["from_block"], segment["to_block"])
+                for segment in archive.segments
+            ],
+            [(0, 10), (11, 20), (21, 30)],
+        )
+        self.assertEqual(
+            event_archive.archive_store(archive, self.store, ADDRESS)["rows"], 0
+        )
+
+        archive = event_archive.EventArchive(self.path)
+        self.assertEqual(archive.to_block(), 30)
+        rows = archive.read()
+        self.assertEqual(len(rows), len(self.events))
+        self.assertEqual(
+            list(zip(rows["block_number"], rows["log_index"])),
+            [(event["blockNumber"], event["logIndex"]) for event in self.events],
+        )
+        self.assertEqual(
+            log_columns.to_ints(rows["subjectTokenId"]),
+            [event["args"]["subjectTokenId"] for event in self.events],
+        )
+        self.assertEqual(
+            log_columns.checksum_addresses(rows["sender"]), [PLAYER] * len(self.events)
+        )
+        self.assertEqual(list(rows["event"]), [0, 1] * 30)
+
+        with self.assertRaises(ValueError):
+            archive.append(event_archive.rows_from_events(self.events[:1]), 30, 31)
+
+    def test_filters(self):
+        archive = self.archive_in_segments()
+        rows = archive.read(
+            from_block=5,
+            to_block=25,
+            slot=2,
+            item_address=ITEM_ADDRESSES[1].lower(),
+            columns=["block_number", "amount"],
+        )
+        expected = [
+            event
+            for event in self.events
+            if 5 <= event["blockNumber"] <= 25
+            and event["args"]["slot"] == 2
+            and event["args"]["itemAddress"] == ITEM_ADDRESSES[1]
+        ]
+        self.assertTrue(expected)
+        self.assertEqual(rows.dtype.names, ("block_number", "amount"))
+        self.assertEqual(
+            list(rows["block_number"]), [event["blockNumber"] for event in expected]
+        )
+        self.assertEqual(
+            log_columns.to_ints(rows["amount"]),
+            [event["args"]["amount"] for event in expected],
+        )
+
+        # Segments outside of the block range are not read at all.
+        self.assertEqual(len(list(archive.scan(from_block=21))), 1)
+        self.assertEqual(len(archive.read(subject_token_id=2**255 + 7)), 2)
+        self.assertEqual(len(archive.read(slot=4)), 0)
+
+    def test_rows_from_arrays_matches_rows_from_events(self):
+        arrays = {
+            name: self.rows_as_decoded_array(name) for name in event_archive.ITEM_EVENTS
+        }
+        from_arrays = event_archive.rows_from_arrays(arrays)
+        from_events = event_archive.rows_from_events(self.events)
+        self.assertEqual(from_arrays.tobytes(), from_events.tobytes())
+
+    def rows_as_decoded_array(self, event_name):
+        # The arrays log_columns.decode_logs returns for the events of the given name.
+        events = [event for event in self.events if event["event"] == event_name]
+        sender = event_archive.SENDER_ARGUMENTS[event_name]
+        array = log_columns.np.empty(
+            len(events),
+            dtype=[
+                ("block_number", "u8"),
+                ("log_index", "u4"),
+                ("subjectTokenId", "u8", (4,)),
+                ("slot", "u8", (4,)),
+                ("itemType", "u8", (4,)),
+                ("itemAddress", "S20"),
+                ("itemTokenId", "u8", (4,)),
+                ("amount", "u8", (4,)),
+                (sender, "S20"),
+            ],
+        )
+        array["block_number"] = [event["blockNumber"] for event in events]
+        array["log_index"] = [event["logIndex"] for event in events]
+        for name in ["subjectTokenId", "slot", "itemType", "itemTokenId", "amount"]:
+            array[name] = log_columns.from_ints(
+                [event["args"][name] for event in events]
+            )
+        for name in ["itemAddress", sender]:
+            array[name] = log_columns.raw_addresses(
+                [event["args"][name] for event in events]
+            )
+        return array
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+
+from brownie import web3
+
+from . import event_query, logs
+from .test_inventory import MAX_UINT, InventoryTestCase
+
+ITEM_ADDRESS = "0x00000000000000000000000000000000000000aa"
+OTHER_ITEM_ADDRESS = "0x00000000000000000000000000000000000000bb"
+
+
+def word(value):
+    return "0x" + value.to_bytes(32, "big").hex()
+
+
+class FakeEth:
+    def __init__(self):
+        self.filters = []
+
+    def get_logs(self, log_filter):
+        self.filters.append(log_filter)
+        return []
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+class EventTypeTests(unittest.TestCase):
+    def test_indexed_arguments(self):
+        self.assertEqual(
+            list(event_query.ItemEquipped.indexed),
+            ["subject_token_id", "slot", "item_address"],
+        )
+        self.assertEqual(
+            list(event_query.ItemMarkedAsEquippableInSlot.indexed),
+            ["slot", "item_type", "item_address"],
+        )
+        self.assertIs(
+            event_query.EVENT_TYPES["ItemUnequipped"], event_query.ItemUnequipped
+        )
+
+    def test_topics(self):
+        self.assertEqual(
+            event_query.ItemEquipped.topics(
+                subject_token_id=42, item_address=ITEM_ADDRESS
+            ),
+            [word(42), None, word(0xAA)],
+        )
+        # Trailing wildcards are left out, and ABI names work as well as snake_case ones.
+        self.assertEqual(event_query.ItemEquipped.topics(subjectTokenId=7), [word(7)])
+        self.assertEqual(event_query.ItemEquipped.topics(slot=None), [])
+
+    def test_or_lists(self):
+        self.assertEqual(
+            event_query.ItemUnequipped.topics(
+                slot=[3, 1, 3], item_address=(OTHER_ITEM_ADDRESS, ITEM_ADDRESS)
+            ),
+            [None, [word(1), word(3)], [word(0xAA), word(0xBB)]],
+        )
+
+    def test_invalid_filters(self):
+        with self.assertRaises(ValueError):
+            event_query.ItemEquipped.topics(amount=1)
+        with self.assertRaises(ValueError):
+            event_query.ItemEquipped.topics(no_such_argument=1)
+
+    def test_query_sends_topics(self):
+        fake_web3 = FakeWeb3()
+        list(
+            event_query.query(
+                fake_web3,
+                event_query.ItemEquipped,
+                ITEM_ADDRESS,
+                0,
+                2999,
+                chunk_size=2000,
+                subject_token_id=[1, 2],
+            )
+        )
+        self.assertEqual(len(fake_web3.eth.filters), 2)
+        for log_filter in fake_web3.eth.filters:
+            self.assertEqual(
+                log_filter["topics"],
+                [[event_query.ItemEquipped.topic], [word(1), word(2)]],
+            )
+
+    def test_parse_filters(self):
+        self.assertEqual(
+            event_query.parse_filters(
+                event_query.ItemEquipped,
+                [
+                    "subject_token_id=0x10",
+                    f"item_address={ITEM_ADDRESS},{OTHER_ITEM_ADDRESS}",
+                ],
+            ),
+            {
+                "subject_token_id": 16,
+                "item_address": [ITEM_ADDRESS, OTHER_ITEM_ADDRESS],
+            },
+        )
+        with self.assertRaises(ValueError):
+            event_query.parse_filters(event_query.ItemEquipped, ["slot"])
+
+
+class EventQueryChainTests(InventoryTestCase):
+    def test_filtered_query_matches_python_filter(self):
+        self.inventory.create_slot(True, 1, "queries", {"from": self.admin})
+        slot = self.inventory.num_slots()
+        self.inventory.mark_item_as_equippable_in_slot(
+            slot, 20, self.payment_token.address, 0, 10, {"from": self.admin}
+        )
+        self.payment_token.mint(self.player.address, 100, self.owner_tx_config)
+        self.payment_token.approve(
+            self.inventory.address, MAX_UINT, {"from": self.player}
+        )
+        subject_token_ids = []
+        for _ in range(3):
+            subject_token_id = self.nft.total_supply()
+            self.nft.mint(self.player.address, subject_token_id, self.owner_tx_config)
+            subject_token_ids.append(subject_token_id)
+            self.inventory.equip(
+                subject_token_id,
+                slot,
+                20,
+                self.payment_token.address,
+                0,
+                2,
+                {"from": self.player},
+            )
+
+        to_block = web3.eth.block_number
+        events = event_query.InventoryEvents(
+            web3, self.inventory.address, start_block=self.predeployment_block
+        )
+        all_events = events.query(event_query.ItemEquipped, to_block=to_block)
+        wanted = subject_token_ids[:2]
+        filtered = events.query(
+            event_query.ItemEquipped,
+            to_block=to_block,
+            subject_token_id=wanted,
+            item_address=self.payment_token.address,
+        )
+        self.assertEqual(len(filtered), 2)
+        self.assertEqual(
+            filtered,
+            [
+                event
+                for event in all_events
+                if event["args"]["subjectTokenId"] in wanted
+                and event["args"]["itemAddress"] == self.payment_token.address
+            ],
+        )
+
+        unfiltered = list(
+            logs.iter_logs(
+                web3,
+                self.inventory.address,
+                [event_query.ItemEquipped.abi],
+                self.predeployment_block,
+                to_block,
+                max_workers=1,
+            )
+        )
+        self.assertEqual(unfiltered, all_events)
+
+
+if __name__ == "__main__":
+    unittest.main()
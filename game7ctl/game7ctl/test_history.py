@@ -0,0 +1,162 @@
+import os
+import random
+import tempfile
+import unittest
+
+from brownie import web3
+
+from . import indexer, multicall
+from .history import EquipmentHistory, apply_item_event
+from .test_inventory import MAX_UINT, InventoryTestCase
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+ITEM_ADDRESS = "0x0000000000000000000000000000000000000002"
+
+
+def random_events(num_blocks, seed=0):
+    rng = random.Random(seed)
+    events = []
+    for block_number in range(1, num_blocks + 1):
+        for log_index in range(rng.randint(0, 3)):
+            name = rng.choice(["ItemEquipped", "ItemUnequipped"])
+            events.append(
+                {
+                    "event": name,
+                    "args": {
+                        "subjectTokenId": rng.randint(1, 5),
+                        "slot": rng.randint(1, 3),
+                        "itemType": 20,
+                        "itemAddress": ITEM_ADDRESS,
+                        "itemTokenId": 0,
+                        "amount": rng.randint(1, 10),
+                    },
+                    "address": ADDRESS,
+                    "blockNumber": block_number,
+                    "blockHash": f"0x{block_number:064x}",
+                    "transactionHash": f"0x{block_number:064x}",
+                    "logIndex": log_index,
+                }
+            )
+    return events
+
+
+def replay(events, block_number):
+    state = {}
+    for event in events:
+        if event["blockNumber"] <= block_number:
+            apply_item_event(state, event)
+    result = {}
+    for (subject_token_id, slot), item in sorted(state.items()):
+        result.setdefault(subject_token_id, {})[slot] = item
+    return result
+
+
+class EquipmentHistoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = indexer.EventStore(os.path.join(self.temp_dir.name, "events.db"))
+        self.events = random_events(500)
+        self.store.add_events(ADDRESS, self.events, 500)
+        self.history = EquipmentHistory(self.store, ADDRESS, checkpoint_interval=50)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_state_at_matches_replay(self):
+        self.assertEqual(self.history.update_checkpoints(), 10)
+        self.assertEqual(self.history.checkpoint_blocks(), list(range(50, 501, 50)))
+        self.assertEqual(self.history.update_checkpoints(), 0)
+        for block_number in [0, 1, 49, 50, 51, 237, 499, 500]:
+            self.assertEqual(
+                self.history.state_at(block_number), replay(self.events, block_number)
+            )
+        expected = replay(self.events, 321)
+        self.assertEqual(
+            self.history.state_at(321, [2, 4]),
+            {
+                subject_token_id: slots
+                for subject_token_id, slots in expected.items()
+                if subject_token_id in (2, 4)
+            },
+        )
+        with self.assertRaises(ValueError):
+            self.history.state_at(501)
+
+    def test_checkpoints_stay_out_of_reorg_window(self):
+        block_hashes = {480: f"0x{480:064x}", 500: f"0x{500:064x}"}
+        self.store.add_events(ADDRESS, [], 500, block_hashes)
+        self.history.update_checkpoints()
+        self.assertEqual(self.history.checkpoint_blocks()[-1], 450)
+
+        self.store.rollback(ADDRESS, 420)
+        self.assertEqual(self.history.checkpoint_blocks()[-1], 400)
+        self.assertEqual(self.history.state_at(420), replay(self.events, 420))
+
+
+class EquipmentHistoryChainTests(InventoryTestCase):
+    def test_matches_chain_at_past_blocks(self):
+        self.inventory.create_slot(True, 1, "history", {"from": self.admin})
+        slot = self.inventory.num_slots()
+        self.inventory.mark_item_as_equippable_in_slot(
+            slot, 20, self.payment_token.address, 0, 10, {"from": self.admin}
+        )
+        self.payment_token.mint(self.player.address, 100, self.owner_tx_config)
+        self.payment_token.approve(
+            self.inventory.address, MAX_UINT, {"from": self.player}
+        )
+        subject_token_id = self.nft.total_supply()
+        self.nft.mint(self.player.address, subject_token_id, self.owner_tx_config)
+
+        blocks = []
+        for amount in [5, 8]:
+            tx_receipt = self.inventory.equip(
+                subject_token_id,
+                slot,
+                20,
+                self.payment_token.address,
+                0,
+                amount,
+                {"from": self.player},
+            )
+            blocks.append(tx_receipt.block_number)
+        tx_receipt = self.inventory.unequip(
+            subject_token_id, slot, False, 3, {"from": self.player}
+        )
+        blocks.append(tx_receipt.block_number)
+        tx_receipt = self.inventory.unequip(
+            subject_token_id, slot, True, 0, {"from": self.player}
+        )
+        blocks.append(tx_receipt.block_number)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with indexer.EventStore(os.path.join(temp_dir, "events.db")) as store:
+                list(
+                    indexer.sync(
+                        store,
+                        web3,
+                        self.inventory.address,
+                        start_block=self.predeployment_block,
+                    )
+                )
+                history = EquipmentHistory(
+                    store, self.inventory.address, checkpoint_interval=2
+                )
+                history.update_checkpoints(to_block=blocks[1])
+                for block_number in [blocks[0] - 1] + blocks:
+                    state = history.state_at(block_number, [subject_token_id])
+                    chain_item = self.inventory.get_equipped_item(
+                        subject_token_id, slot, block_number=block_number
+                    )
+                    expected = (
+                        {}
+                        if chain_item[0] == 0
+                        else {
+                            subject_token_id: {slot: multicall.item_record(chain_item)}
+                        }
+                    )
+                    self.assertEqual(state, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,367 @@
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+
+from brownie import web3
+
+from . import indexer, logs
+from .test_inventory import InventoryTestCase
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+
+
+class FakeNode:
+    """
+    Serves one event per block and rejects ranges of more than max_range blocks, like nodes which cap
+    the size of eth_getLogs responses.
+    """
+
+    def __init__(self, max_range: int, max_delay: float = 0) -> None:
+        self.max_range = max_range
+        self.max_delay = max_delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def fetch(self, web3_client, address, event_abis, from_block, to_block):
+        with self.lock:
+            self.requests.append((from_block, to_block))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Random delays make later ranges come back before earlier ones.
+            time.sleep(random.uniform(0, self.max_delay))
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        if to_block - from_block + 1 > self.max_range:
+            raise ValueError("query returned more than 10000 results")
+        return [
+            {
+                "event": "SlotCreated",
+                "args": {"slot": block_number},
+                "address": address,
+                "blockNumber": block_number,
+                "blockHash": f"0x{block_number:064x}",
+                "transactionHash": f"0x{block_number:064x}",
+                "logIndex": 0,
+            }
+            for block_number in range(from_block, to_block + 1)
+        ]
+
+
+class FakeChain:
+    """
+    web3 client stand-in with a chain of blocks whose hashes are given by the branch they were produced
+    on.
+    """
+
+    def __init__(self, head: int) -> None:
+        self.block_number = head
+        self.branches = {}
+        self.eth = self
+
+    def block_hash(self, block_number):
+        return f"0x{self.branches.get(block_number, 0):02x}{block_number:062x}"
+
+    def get_block(self, block_number):
+        return {"hash": self.block_hash(block_number)}
+
+    def reorganize(self, from_block, head):
+        for block_number in range(from_block, head + 1):
+            self.branches[block_number] = self.branches.get(block_number, 0) + 1
+        self.block_number = head
+
+    def fetch(self, web3_client, address, event_abis, from_block, to_block):
+        return [
+            {
+                "event": "SlotCreated",
+                "args": {"slot": block_number},
+                "address": address,
+                "blockNumber": block_number,
+                "blockHash": self.block_hash(block_number),
+                "transactionHash": self.block_hash(block_number),
+                "logIndex": 0,
+            }
+            for block_number in range(from_block, to_block + 1)
+            if block_number % 10 == 1
+        ]
+
+
+class IndexEventsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = indexer.EventStore(os.path.join(self.temp_dir.name, "events.db"))
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def index(self, node, from_block, to_block, chunker):
+        return list(
+            indexer.index_events(
+                self.store,
+                None,
+                ADDRESS,
+                from_block,
+                to_block,
+                chunker,
+                fetch=node.fetch,
+            )
+        )
+
+    def test_failed_chunks_are_split(self):
+        node = FakeNode(max_range=10)
+        chunker = indexer.AdaptiveChunker(initial_size=64, target_logs=1000)
+        progress = self.index(node, 1, 100, chunker)
+
+        self.assertEqual(sum(record["events"] for record in progress), 100)
+        self.assertTrue(all(record["chunk_size"] <= 10 for record in progress))
+        self.assertEqual(self.store.cursor(ADDRESS), 100)
+        self.assertEqual(
+            [event["args"]["slot"] for event in self.store.events(ADDRESS)],
+            list(range(1, 101)),
+        )
+
+    def test_chunks_adapt_to_number_of_logs(self):
+        node = FakeNode(max_range=1000)
+        chunker = indexer.AdaptiveChunker(initial_size=4, target_logs=40)
+        progress = self.index(node, 1, 200, chunker)
+        sizes = [record["chunk_size"] for record in progress]
+        # Sizes double while chunks return fewer than half the target, then stay put.
+        self.assertEqual(sizes[:5], [4, 8, 16, 32, 32])
+
+        chunker = indexer.AdaptiveChunker(initial_size=100, target_logs=40)
+        self.index(node, 201, 300, chunker)
+        self.assertEqual(chunker.size, 50)
+
+    def test_resumes_from_cursor(self):
+        node = FakeNode(max_range=1000)
+        self.index(node, 1, 50, indexer.AdaptiveChunker(initial_size=20))
+        self.assertEqual(self.store.cursor(ADDRESS), 50)
+        self.assertIsNone(
+            self.store.cursor("0x0000000000000000000000000000000000000002")
+        )
+
+        # Re-indexing a range does not duplicate events.
+        self.index(node, 41, 60, indexer.AdaptiveChunker(initial_size=20))
+        self.assertEqual(self.store.count(ADDRESS), 60)
+
+    def test_gives_up_on_single_block_failures(self):
+        node = FakeNode(max_range=0)
+        with self.assertRaises(ValueError):
+            self.index(node, 1, 10, indexer.AdaptiveChunker(initial_size=8))
+        self.assertIsNone(self.store.cursor(ADDRESS))
+
+
+class ReorgTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = indexer.EventStore(os.path.join(self.temp_dir.name, "events.db"))
+        self.chain = FakeChain(head=100)
+        self.rollbacks = []
+        self.store.add_rollback_hook(
+            lambda address, block_number: self.rollbacks.append(block_number)
+        )
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def sync(self, reorg_depth=20):
+        progress = indexer.sync(
+            self.store,
+            self.chain,
+            ADDRESS,
+            start_block=1,
+            chunker=indexer.AdaptiveChunker(initial_size=15),
+            reorg_depth=reorg_depth,
+            fetch=self.chain.fetch,
+        )
+        return [
+            record["rolled_back_to"]
+            for record in progress
+            if "rolled_back_to" in record
+        ]
+
+    def assert_matches_chain(self):
+        self.assertEqual(
+            [
+                (event["blockNumber"], event["blockHash"])
+                for event in self.store.events(ADDRESS)
+            ],
+            [
+                (block_number, self.chain.block_hash(block_number))
+                for block_number in range(1, self.chain.block_number + 1, 10)
+            ],
+        )
+
+    def test_reorg_is_rolled_back(self):
+        self.assertEqual(self.sync(), [])
+        self.assertTrue(
+            all(
+                block_number > 80
+                for block_number, _ in self.store.block_hashes(ADDRESS)
+            )
+        )
+        self.assertEqual(self.sync(), [])
+
+        # Blocks from 95 on are replaced. Block 91 (which has an event) is the last one known to match.
+        self.chain.reorganize(95, 105)
+        self.assertEqual(self.sync(), [91])
+        self.assertEqual(self.rollbacks, [91])
+        self.assertEqual(self.store.cursor(ADDRESS), 105)
+        self.assertEqual(
+            self.store.block_hashes(ADDRESS)[0], (105, self.chain.block_hash(105))
+        )
+        self.assert_matches_chain()
+
+        # The new branch is shorter than the old one.
+        self.chain.reorganize(100, 102)
+        self.assertEqual(self.sync(), [91])
+        self.assert_matches_chain()
+
+    def test_reorg_deeper_than_tail(self):
+        self.sync(reorg_depth=5)
+        self.chain.reorganize(50, 120)
+        with self.assertRaises(indexer.ReorgTooDeep):
+            indexer.find_fork(self.store, self.chain, ADDRESS)
+
+
+class ParallelFetchTests(unittest.TestCase):
+    def test_logs_are_yielded_in_order(self):
+        node = FakeNode(max_range=7, max_delay=0.01)
+        events = list(
+            logs.iter_logs(
+                None,
+                ADDRESS,
+                [],
+                1,
+                300,
+                chunk_size=20,
+                max_workers=4,
+                fetch=node.fetch,
+            )
+        )
+        self.assertEqual(
+            [event["blockNumber"] for event in events], list(range(1, 301))
+        )
+        # Ranges the node refused were split until it answered.
+        self.assertTrue(any(end - start + 1 > 7 for start, end in node.requests))
+        self.assertLessEqual(node.max_in_flight, 4)
+
+    def test_single_block_failures_are_raised(self):
+        node = FakeNode(max_range=0)
+        with self.assertRaises(ValueError):
+            list(
+                logs.iter_logs(None, ADDRESS, [], 1, 10, chunk_size=4, fetch=node.fetch)
+            )
+
+    def test_parallel_indexing(self):
+        node = FakeNode(max_range=15, max_delay=0.01)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with indexer.EventStore(os.path.join(temp_dir, "events.db")) as store:
+                progress = list(
+                    indexer.index_events(
+                        store,
+                        None,
+                        ADDRESS,
+                        1,
+                        400,
+                        indexer.AdaptiveChunker(initial_size=25),
+                        fetch=node.fetch,
+                        max_workers=4,
+                    )
+                )
+                # Chunks shrink once the node refuses them, but still cover every block once.
+                self.assertEqual(progress[0]["from_block"], 1)
+                for previous, record in zip(progress, progress[1:]):
+                    self.assertEqual(record["from_block"], previous["to_block"] + 1)
+                self.assertEqual(progress[-1]["to_block"], 400)
+                self.assertLess(
+                    min(record["chunk_size"] for record in progress[:-1]), 25
+                )
+                self.assertEqual(store.cursor(ADDRESS), 400)
+                self.assertEqual(
+                    [event["blockNumber"] for event in store.events(ADDRESS)],
+                    list(range(1, 401)),
+                )
+
+    def test_parallel_chunks_adapt(self):
+        node = FakeNode(max_range=1000)
+        chunker = indexer.AdaptiveChunker(initial_size=4, target_logs=40)
+        chunks = list(
+            logs.iter_chunks(
+                None,
+                ADDRESS,
+                [],
+                1,
+                400,
+                max_workers=4,
+                fetch=node.fetch,
+                chunker=chunker,
+            )
+        )
+        self.assertEqual(chunks[0][:2], (1, 4))
+        self.assertGreater(max(end - start + 1 for start, end, _ in chunks), 4)
+
+        node = FakeNode(max_range=15)
+        chunker = indexer.AdaptiveChunker(initial_size=64, target_logs=1000)
+        chunks = list(
+            logs.iter_chunks(
+                None,
+                ADDRESS,
+                [],
+                1,
+                400,
+                max_workers=4,
+                fetch=node.fetch,
+                chunker=chunker,
+            )
+        )
+        self.assertLess(chunker.size, 64)
+        self.assertLess(chunks[-1][1] - chunks[-1][0] + 1, 64)
+        self.assertEqual(
+            [event["blockNumber"] for _, _, events in chunks for event in events],
+            list(range(1, 401)),
+        )
+
+
+class IndexInventoryEventsTests(InventoryTestCase):
+    def test_sync(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with indexer.EventStore(os.path.join(temp_dir, "events.db")) as store:
+                list(
+                    indexer.sync(
+                        store,
+                        web3,
+                        self.inventory.address,
+                        start_block=self.predeployment_block,
+                    )
+                )
+                names = [
+                    event["event"] for event in store.events(self.inventory.address)
+                ]
+                self.assertIn("AdministratorDesignated", names)
+                self.assertIn("ContractAddressDesignated", names)
+                self.assertEqual(
+                    store.cursor(self.inventory.address), web3.eth.block_number
+                )
+
+                self.inventory.create_slot(False, 1, "indexed", {"from": self.admin})
+                progress = list(indexer.sync(store, web3, self.inventory.address))
+                self.assertEqual(sum(record["events"] for record in progress), 1)
+                slot_created = list(
+                    store.events(self.inventory.address, event_names=["SlotCreated"])
+                )[-1]
+                self.assertEqual(
+                    slot_created["args"]["slot"], self.inventory.num_slots()
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+
+from brownie import web3
+
+from . import inventory_events, log_columns, logs
+from .test_inventory import MAX_UINT, InventoryTestCase
+
+try:
+    from eth_abi import encode as encode_abi
+except ImportError:
+    # eth-abi<4
+    from eth_abi import encode_abi  # type: ignore
+
+
+def word(abi_type, value):
+    return "0x" + encode_abi([abi_type], [value]).hex()
+
+
+class LayoutTests(unittest.TestCase):
+    def test_field_types(self):
+        self.assertEqual(log_columns.field_type("address"), ("S20", 12))
+        self.assertEqual(log_columns.field_type("bool"), ("?", 31))
+        self.assertEqual(log_columns.field_type("uint8"), (">u1", 31))
+        self.assertEqual(log_columns.field_type("uint24"), (">u4", 28))
+        self.assertEqual(log_columns.field_type("int32"), (">i8", 24))
+        self.assertEqual(log_columns.field_type("uint256"), ((">u8", (4,)), 0))
+        self.assertEqual(log_columns.field_type("bytes4"), ("S4", 0))
+        for abi_type in ["string", "bytes", "uint256[]", "int128"]:
+            with self.assertRaises(ValueError):
+                log_columns.field_type(abi_type)
+
+    def test_event_layout(self):
+        layout = log_columns.event_layout(inventory_events.ITEM_EQUIPPED_ABI)
+        self.assertEqual(layout.num_topics, 4)
+        self.assertEqual(layout.num_data_words, 4)
+        self.assertEqual(
+            [(field.name, field.word) for field in layout.fields],
+            [
+                ("subjectTokenId", 0),
+                ("slot", 1),
+                ("itemType", 3),
+                ("itemAddress", 2),
+                ("itemTokenId", 4),
+                ("amount", 5),
+                ("equippedBy", 6),
+            ],
+        )
+        with self.assertRaises(ValueError):
+            log_columns.event_layout(inventory_events.NEW_SLOT_TYPE_ADDED_ABI)
+
+
+@unittest.skipIf(log_columns.np is None, "numpy is not installed")
+class DecodeLogsTests(unittest.TestCase):
+    def raw_log(self, subject_token_id, item_address, amount, block_number):
+        return {
+            "address": "0x" + "11" * 20,
+            "topics": [
+                logs.event_topic(inventory_events.ITEM_UNEQUIPPED_ABI),
+                word("uint256", subject_token_id),
+                word("uint256", 3),
+                word("address", item_address),
+            ],
+            "data": "0x"
+            + encode_abi(
+                ["uint256", "uint256", "uint256", "address"],
+                [1155, 2**255 + 7, amount, "0x" + "22" * 20],
+            ).hex(),
+            "blockNumber": hex(block_number),
+            "blockHash": "0x" + "ab" * 31 + "00",
+            "transactionHash": "0x" + f"{block_number:064x}",
+            "logIndex": "0x0",
+        }
+
+    def test_matches_decode_log(self):
+        raw_logs = [
+            self.raw_log(MAX_UINT, "0x" + "00" * 19 + "01", 10, 100),
+            self.raw_log(0, "0x" + "fe" * 20, 2**64 - 1, 101),
+        ]
+        array = log_columns.decode_logs(inventory_events.ITEM_UNEQUIPPED_ABI, raw_logs)
+        events = [
+            logs.decode_log(inventory_events.ITEM_UNEQUIPPED_ABI, log)
+            for log in raw_logs
+        ]
+        self.assertEqual(len(array), 2)
+        self.assertEqual(list(array["block_number"]), [100, 101])
+        for name in ["subjectTokenId", "slot", "itemType", "itemTokenId", "amount"]:
+            self.assertEqual(
+                log_columns.to_ints(array[name]),
+                [event["args"][name] for event in events],
+            )
+        for name in ["itemAddress", "unequippedBy"]:
+            self.assertEqual(
+                log_columns.checksum_addresses(array[name]),
+                [event["args"][name] for event in events],
+            )
+        self.assertEqual(
+            ["0x" + value.ljust(32, b"\0").hex() for value in array["block_hash"]],
+            [event["blockHash"] for event in events],
+        )
+        self.assertEqual(list(log_columns.narrow(array["amount"])), [10, 2**64 - 1])
+        with self.assertRaises(OverflowError):
+            log_columns.narrow(array["itemTokenId"])
+
+    def test_rejects_other_layouts(self):
+        raw_log = self.raw_log(1, "0x" + "22" * 20, 1, 1)
+        raw_log["data"] = raw_log["data"][:-64]
+        with self.assertRaises(ValueError):
+            log_columns.decode_logs(inventory_events.ITEM_UNEQUIPPED_ABI, [raw_log])
+
+
+@unittest.skipIf(log_columns.np is None, "numpy is not installed")
+class DecodeInventoryLogsTests(InventoryTestCase):
+    def test_decode_logs_by_event(self):
+        subject_token_id = self.nft.total_supply()
+        self.nft.mint(self.player.address, subject_token_id, self.owner_tx_config)
+        self.inventory.create_slot(True, 1, "columns", {"from": self.admin})
+        slot = self.inventory.num_slots()
+        self.inventory.mark_item_as_equippable_in_slot(
+            slot, 20, self.payment_token.address, 0, 10, {"from": self.admin}
+        )
+        self.payment_token.mint(self.player.address, 10, self.owner_tx_config)
+        self.payment_token.approve(
+            self.inventory.address, MAX_UINT, {"from": self.player}
+        )
+        equip_receipt = self.inventory.equip(
+            subject_token_id,
+            slot,
+            20,
+            self.payment_token.address,
+            0,
+            6,
+            {"from": self.player},
+        )
+        self.inventory.unequip(subject_token_id, slot, False, 2, {"from": self.player})
+
+        raw_logs = web3.eth.get_logs(
+            {
+                "address": self.inventory.address,
+                "fromBlock": equip_receipt.block_number,
+                "toBlock": web3.eth.block_number,
+            }
+        )
+        arrays = log_columns.decode_logs_by_event(
+            [inventory_events.ITEM_EQUIPPED_ABI, inventory_events.ITEM_UNEQUIPPED_ABI],
+            raw_logs,
+        )
+        self.assertEqual(sorted(arrays), ["ItemEquipped", "ItemUnequipped"])
+        equipped = arrays["ItemEquipped"]
+        self.assertEqual(list(equipped["block_number"]), [equip_receipt.block_number])
+        self.assertEqual(
+            log_columns.to_ints(equipped["subjectTokenId"]), [subject_token_id]
+        )
+        self.assertEqual(list(log_columns.narrow(equipped["amount"])), [6])
+        self.assertEqual(
+            log_columns.checksum_addresses(equipped["equippedBy"]),
+            [self.player.address],
+        )
+        self.assertEqual(
+            list(log_columns.narrow(arrays["ItemUnequipped"]["amount"])), [2]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+
+from . import Multicall2, inventory, multicall
+from .test_inventory import MAX_UINT, InventoryTestCase
+
+
+class BulkReadTests(InventoryTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.multicall = Multicall2.Multicall2(None)
+        cls.multicall.deploy(cls.owner_tx_config)
+
+        cls.inventory.create_slot(False, 1, "bulk", {"from": cls.admin})
+        cls.slot = cls.inventory.num_slots()
+        cls.inventory.mark_item_as_equippable_in_slot(
+            cls.slot, 20, cls.payment_token.address, 0, 10, {"from": cls.admin}
+        )
+        cls.payment_token.mint(cls.player.address, 1000, cls.owner_tx_config)
+        cls.payment_token.approve(cls.inventory.address, MAX_UINT, {"from": cls.player})
+
+        # Every other subject token gets an amount of the ERC20 token equipped equal to its index.
+        cls.subject_token_ids = []
+        for i in range(6):
+            subject_token_id = cls.nft.total_supply()
+            cls.nft.mint(cls.player.address, subject_token_id, cls.owner_tx_config)
+            cls.subject_token_ids.append(subject_token_id)
+            if i % 2 == 1:
+                cls.inventory.equip(
+                    subject_token_id,
+                    cls.slot,
+                    20,
+                    cls.payment_token.address,
+                    0,
+                    i,
+                    {"from": cls.player},
+                )
+
+    def test_try_aggregate_matches_individual_calls(self):
+        calls = [
+            multicall.Call(
+                self.inventory.address,
+                self.inventory.contract.getEquippedItem,
+                (subject_token_id, self.slot),
+            )
+            for subject_token_id in self.subject_token_ids
+        ]
+        # A small batch size forces several aggregated calls.
+        results = multicall.try_aggregate(self.multicall, calls, batch_size=4)
+        self.assertEqual(
+            [result.value for result in results],
+            [
+                self.inventory.get_equipped_item(subject_token_id, self.slot)
+                for subject_token_id in self.subject_token_ids
+            ],
+        )
+
+    def test_failed_calls_do_not_affect_others(self):
+        missing_slot = self.inventory.num_slots() + 1
+        results = multicall.try_aggregate(
+            self.multicall,
+            [
+                multicall.Call(
+                    self.inventory.address,
+                    self.inventory.contract.getEquippedItem,
+                    (self.subject_token_ids[0], missing_slot),
+                ),
+                multicall.Call(
+                    self.inventory.address,
+                    self.inventory.contract.getEquippedItem,
+                    (self.subject_token_ids[1], self.slot),
+                ),
+            ],
+        )
+        self.assertFalse(results[0].success)
+        self.assertEqual(
+            results[0].value, "InventoryFacet.getEquippedItem: Slot does not exist"
+        )
+        self.assertTrue(results[1].success)
+
+    def test_bulk_equipped_items(self):
+        records = list(
+            multicall.bulk_equipped_items(
+                self.inventory,
+                self.multicall,
+                self.subject_token_ids,
+                [self.slot],
+                batch_size=4,
+            )
+        )
+        self.assertEqual(
+            [record["subject_token_id"] for record in records], self.subject_token_ids
+        )
+        for i, record in enumerate(records):
+            if i % 2 == 1:
+                self.assertEqual(
+                    record["equipped"],
+                    {
+                        self.slot: {
+                            "item_type": 20,
+                            "item_address": self.payment_token.address,
+                            "item_token_id": 0,
+                            "amount": i,
+                        }
+                    },
+                )
+            else:
+                self.assertEqual(record["equipped"], {})
+
+    def test_bulk_subject_token_slots(self):
+        subject_token_id = self.subject_token_ids[0]
+        self.inventory.add_backpack_to_subject(
+            2, subject_token_id, 1, "backpack", {"from": self.admin}
+        )
+        records = list(
+            multicall.bulk_subject_token_slots(
+                self.inventory, self.multicall, self.subject_token_ids[:2]
+            )
+        )
+        self.assertEqual(records[0]["owner"], self.player.address)
+        self.assertEqual(len(records[0]["slots"]), 2)
+        self.assertEqual(records[0]["slots"][0]["slot_uri"], "backpack")
+        self.assertEqual(records[1]["slots"], [])
+
+    def test_token_range_argument_type(self):
+        self.assertEqual(inventory.token_range_argument_type("3:5"), range(3, 6))
+        self.assertEqual(inventory.token_range_argument_type("7"), range(7, 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+import unittest
+
+import yaml
+
+from . import provisioning
+from .slot_catalog import Slot
+from .test_inventory import InventoryTestCase
+from .transactions import TransactionPipeline
+
+ITEM_ADDRESS = "0x00000000000000000000000000000000000000AA"
+
+MANIFEST = f"""
+slot_types:
+  1: Weapon
+  2: Armor
+slots:
+  - slot: 2
+    slot_type: 2
+    uri: armor
+    items:
+      - item_type: 1155
+        item_address: "{ITEM_ADDRESS}"
+        pool_id: 3
+        max_amount: 1
+  - slot: 1
+    slot_type: 1
+    uri: weapon
+    unequippable: true
+    items:
+      - item_type: 20
+        item_address: {ITEM_ADDRESS}
+        max_amount: 10
+"""
+
+
+class ManifestTests(unittest.TestCase):
+    def test_parse_manifest(self):
+        manifest = provisioning.parse_manifest(yaml.safe_load(MANIFEST))
+        self.assertEqual(manifest.slot_types, {1: "Weapon", 2: "Armor"})
+        self.assertEqual([slot.slot_id for slot in manifest.slots], [1, 2])
+        self.assertEqual(manifest.slots[0].unequippable, True)
+        self.assertIsNone(manifest.slots[1].unequippable)
+        # Unquoted addresses are read as numbers by YAML.
+        self.assertEqual(
+            manifest.slots[0].items,
+            [provisioning.ItemSpec(20, ITEM_ADDRESS, 0, 10)],
+        )
+        self.assertEqual(
+            manifest.slots[1].items,
+            [provisioning.ItemSpec(1155, ITEM_ADDRESS, 3, 1)],
+        )
+
+    def test_invalid_manifests(self):
+        invalid_specs = [
+            [],
+            {"slot_types": {1: "Weapon"}, "items": []},
+            {"slot_types": {0: "Weapon"}},
+            {"slot_types": {1: ""}},
+            {"slots": [{"slot_type": 1}]},
+            {"slots": [{"slot": 1}, {"slot": 1}]},
+            {"slots": [{"slot": 1, "unequippable": "no"}]},
+            {"slots": [{"slot": 1, "items": [{"item_type": 20, "max_amount": 1}]}]},
+            {
+                "slots": [
+                    {
+                        "slot": 1,
+                        "items": [{"item_type": 20, "item_address": ITEM_ADDRESS}],
+                    }
+                ]
+            },
+        ]
+        invalid_items = [
+            {"item_type": 1, "max_amount": 1},
+            {"item_type": 20, "pool_id": 3, "max_amount": 1},
+            {"item_type": 721, "pool_id": 3, "max_amount": 1},
+            {"item_type": 721, "max_amount": 2},
+        ]
+        for item in invalid_items:
+            invalid_specs.append(
+                {
+                    "slots": [
+                        {"slot": 1, "items": [{**item, "item_address": ITEM_ADDRESS}]}
+                    ]
+                }
+            )
+        for spec in invalid_specs:
+            with self.assertRaises(ValueError, msg=spec):
+                provisioning.parse_manifest(spec)
+
+    def test_plan_changes(self):
+        spec = yaml.safe_load(MANIFEST)
+        spec["slots"].append({"slot": 3, "uri": "ring"})
+        manifest = provisioning.parse_manifest(spec)
+        state = provisioning.ChainState(
+            block_number=100,
+            slots={
+                1: Slot(1, 1, "old weapon", True),
+                2: Slot(2, 2, "armor", False),
+            },
+            slot_type_names={1: "Weapon", 2: ""},
+            max_amounts={(1, 20, ITEM_ADDRESS, 0): 10, (2, 1155, ITEM_ADDRESS, 3): 5},
+        )
+        changes = provisioning.plan_changes(manifest, state)
+        self.assertEqual(
+            changes,
+            [
+                provisioning.Change(
+                    "create_slot_type", {"slot_type": 2, "slot_type_name": "Armor"}
+                ),
+                provisioning.Change(
+                    "create_slot",
+                    {"unequippable": False, "slot_type": 1, "slot_uri": "ring"},
+                ),
+                provisioning.Change(
+                    "set_slot_uri", {"new_slot_uri": "weapon", "slot_id": 1}
+                ),
+                provisioning.Change(
+                    "mark_item_as_equippable_in_slot",
+                    {
+                        "slot": 2,
+                        "item_type": 1155,
+                        "item_address": ITEM_ADDRESS,
+                        "item_pool_id": 3,
+                        "max_amount": 1,
+                    },
+                ),
+            ],
+        )
+        self.assertEqual(provisioning.new_slot_ids(state, changes), [3])
+
+    def test_new_slots_must_follow_on(self):
+        manifest = provisioning.parse_manifest({"slots": [{"slot": 3}]})
+        state = provisioning.ChainState(100, {1: Slot(1, 1, "", False)}, {}, {})
+        with self.assertRaises(ValueError):
+            provisioning.plan_changes(manifest, state)
+
+
+class ApplyTests(InventoryTestCase):
+    def test_apply_is_idempotent(self):
+        self.inventory.create_slot(False, 1, "existing", {"from": self.admin})
+        num_slots = self.inventory.num_slots()
+        manifest = provisioning.parse_manifest(
+            {
+                "slot_types": {7: "Provisioned"},
+                "slots": [
+                    {"slot": num_slots, "unequippable": True},
+                    {
+                        "slot": num_slots + 1,
+                        "slot_type": 7,
+                        "uri": "provisioned",
+                        "items": [
+                            {
+                                "item_type": 20,
+                                "item_address": self.payment_token.address,
+                                "max_amount": 10,
+                            }
+                        ],
+                    },
+                ],
+            }
+        )
+        state = provisioning.read_state(self.inventory, manifest)
+        changes = provisioning.plan_changes(manifest, state)
+        self.assertEqual(
+            [change.op for change in changes],
+            [
+                "create_slot_type",
+                "create_slot",
+                "set_slot_unequippable",
+                "mark_item_as_equippable_in_slot",
+            ],
+        )
+
+        with TransactionPipeline(self.admin, max_in_flight=4) as pipeline:
+            records = list(
+                provisioning.apply_changes(
+                    changes,
+                    provisioning.new_slot_ids(state, changes),
+                    {"from": self.admin},
+                    self.inventory.address,
+                    pipeline=pipeline,
+                )
+            )
+        self.assertEqual(
+            [record["status"] for record in records], ["ok"] * len(changes)
+        )
+        self.assertEqual(self.inventory.num_slots(), num_slots + 1)
+        self.assertTrue(self.inventory.slot_is_unequippable(num_slots))
+        self.assertEqual(self.inventory.get_slot_uri(num_slots + 1), "provisioned")
+        self.assertEqual(
+            self.inventory.max_amount_of_item_in_slot(
+                num_slots + 1, 20, self.payment_token.address, 0
+            ),
+            10,
+        )
+
+        state = provisioning.read_state(self.inventory, manifest)
+        self.assertEqual(provisioning.plan_changes(manifest, state), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from brownie import chain, network
+
+from . import InventoryFacet, inventory, read_cache
+from .test_inventory import InventoryTestCase
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+
+
+class Reads:
+    """
+    Stands in for a contract: counts how often each read is made.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def read(self, value):
+        def make_read():
+            self.count += 1
+            return value
+
+        return make_read
+
+
+class ReadCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.reads = Reads()
+
+    def new_cache(self, **kwargs) -> read_cache.ReadCache:
+        return read_cache.ReadCache(
+            block_hash=lambda block_number: f"hash_{block_number}", **kwargs
+        )
+
+    def test_pinned_reads_are_cached(self):
+        cache = self.new_cache()
+        for _ in range(3):
+            value = cache.call(ADDRESS, "num_slots", [], 10, self.reads.read(5))
+            self.assertEqual(value, 5)
+        self.assertEqual(self.reads.count, 1)
+        cache.call(ADDRESS, "num_slots", [], 11, self.reads.read(6))
+        cache.call(ADDRESS, "get_slot_uri", [1], 10, self.reads.read("a"))
+        self.assertEqual(self.reads.count, 3)
+        self.assertEqual(cache.stats["hits"], 2)
+
+    def test_latest_bypasses_cache(self):
+        cache = self.new_cache()
+        for _ in range(3):
+            cache.call(ADDRESS, "num_slots", [], "latest", self.reads.read(5))
+        self.assertEqual(self.reads.count, 3)
+        self.assertEqual(cache.stats["bypassed"], 3)
+        self.assertEqual(len(cache), 0)
+
+    def test_latest_ttl(self):
+        cache = self.new_cache(latest_ttl=60)
+        for _ in range(3):
+            cache.call(ADDRESS, "num_slots", [], "latest", self.reads.read(5))
+        self.assertEqual(self.reads.count, 1)
+
+    def test_lru_eviction(self):
+        cache = self.new_cache(max_entries=2)
+        cache.call(ADDRESS, "get_slot_uri", [1], 10, self.reads.read("a"))
+        cache.call(ADDRESS, "get_slot_uri", [2], 10, self.reads.read("b"))
+        # Touching slot 1 makes slot 2 the least recently used entry.
+        cache.call(ADDRESS, "get_slot_uri", [1], 10, self.reads.read("a"))
+        cache.call(ADDRESS, "get_slot_uri", [3], 10, self.reads.read("c"))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(self.reads.count, 3)
+        cache.call(ADDRESS, "get_slot_uri", [2], 10, self.reads.read("b"))
+        self.assertEqual(self.reads.count, 4)
+
+    def test_failed_reads_are_not_cached(self):
+        cache = self.new_cache()
+
+        def revert():
+            self.reads.count += 1
+            raise ValueError("reverted")
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cache.call(ADDRESS, "get_equipped_item", [1, 99], 10, revert)
+        self.assertEqual(self.reads.count, 2)
+
+    def test_database_persists_across_caches(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            database = os.path.join(temp_dir, "reads.sqlite")
+            with self.new_cache(database=database) as cache:
+                cache.call(ADDRESS, "get_slot_by_id", [1], 10, self.reads.read((1, 2)))
+            with self.new_cache(database=database) as cache:
+                value = cache.call(
+                    ADDRESS, "get_slot_by_id", [1], 10, self.reads.read(None)
+                )
+                self.assertEqual(cache.stats["disk_hits"], 1)
+        self.assertEqual(value, (1, 2))
+        self.assertEqual(self.reads.count, 1)
+
+    def test_database_stores_json(self):
+        result = (
+            [(1, "0x0000000000000000000000000000000000000002", 3, 4)],
+            b"\x01\xff",
+            True,
+            None,
+            "uri",
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            database = os.path.join(temp_dir, "reads.sqlite")
+            with self.new_cache(database=database) as cache:
+                cache.call(ADDRESS, "get_slot_by_id", [1], 10, self.reads.read(result))
+                # Results which cannot be stored as JSON are only cached in memory.
+                cache.call(ADDRESS, "get_slot_by_id", [2], 10, self.reads.read({1}))
+            connection = sqlite3.connect(database)
+            rows = connection.execute("SELECT value FROM reads").fetchall()
+            connection.close()
+            self.assertEqual(
+                [json.loads(value) for value, in rows],
+                [
+                    {
+                        "tuple": [
+                            [
+                                {
+                                    "tuple": [
+                                        1,
+                                        "0x0000000000000000000000000000000000000002",
+                                        3,
+                                        4,
+                                    ]
+                                }
+                            ],
+                            {"bytes": "0x01ff"},
+                            True,
+                            None,
+                            "uri",
+                        ]
+                    }
+                ],
+            )
+            with self.new_cache(database=database) as cache:
+                value = cache.call(
+                    ADDRESS, "get_slot_by_id", [1], 10, self.reads.read(None)
+                )
+        self.assertEqual(value, result)
+        self.assertEqual(self.reads.count, 2)
+
+    def test_encode_result(self):
+        class Wei(int):
+            pass
+
+        self.assertEqual(read_cache.encode_result(Wei(5)), 5)
+        self.assertIs(type(read_cache.encode_result(Wei(5))), int)
+        self.assertEqual(read_cache.decode_result(read_cache.encode_result([])), [])
+        self.assertEqual(read_cache.decode_result(read_cache.encode_result(())), ())
+        with self.assertRaises(TypeError):
+            read_cache.encode_result({"slot": 1})
+
+
+class CachedWrapperTests(InventoryTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.inventory.create_slot(False, 1, "cached", {"from": cls.admin})
+
+    def test_cached_contract(self):
+        block_number = len(chain) - 1
+        cache = read_cache.ReadCache()
+        inventory = read_cache.CachedContract(self.inventory, cache)
+        num_slots = inventory.num_slots(block_number=block_number)
+        self.inventory.create_slot(False, 1, "cached_later", {"from": self.admin})
+        self.assertEqual(inventory.num_slots(block_number=block_number), num_slots)
+        self.assertEqual(inventory.num_slots(), num_slots + 1)
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["bypassed"], 1)
+        self.assertEqual(inventory.address, self.inventory.address)
+
+    def test_cached_reads(self):
+        block_number = len(chain) - 1
+        original = InventoryFacet.InventoryFacet.get_slot_by_id
+        with read_cache.cached_reads(read_cache.ReadCache()) as cache:
+            inventory = InventoryFacet.InventoryFacet(self.inventory.address)
+            slot = inventory.get_slot_by_id(1, block_number)
+            self.assertEqual(inventory.get_slot_by_id(1, block_number), slot)
+            self.assertEqual(cache.stats["hits"], 1)
+        self.assertIs(InventoryFacet.InventoryFacet.get_slot_by_id, original)
+
+    def test_read_cache_db_argument(self):
+        block_number = len(chain) - 1
+        parser = inventory.generate_cli()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            database = os.path.join(temp_dir, "reads.sqlite")
+            args = parser.parse_args(
+                [
+                    "num-slots",
+                    "--network",
+                    network.show_active(),
+                    "--address",
+                    self.inventory.address,
+                    "--block-number",
+                    str(block_number),
+                    "--read-cache-db",
+                    database,
+                ]
+            )
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                args.func(args)
+            with read_cache.ReadCache(database=database) as cache:
+                num_slots = cache.call(
+                    self.inventory.address,
+                    "num_slots",
+                    [],
+                    block_number,
+                    lambda: self.fail("num_slots was not cached"),
+                )
+        self.assertEqual(stdout.getvalue().strip(), str(num_slots))
+        self.assertEqual(num_slots, self.inventory.num_slots(block_number=block_number))
+
+
+if __name__ == "__main__":
+    unittest.main()
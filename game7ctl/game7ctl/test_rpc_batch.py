@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from brownie import web3
+from web3.providers import HTTPProvider
+
+from . import rpc_batch
+from .test_inventory import InventoryTestCase
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """
+    Answers every JSON-RPC request with its first parameter. Records the size of each batch it receives
+    (1 for requests which were not batched) and its headers.
+    """
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if isinstance(body, list):
+            self.server.batch_sizes.append(len(body))  # type: ignore
+            if not self.server.supports_batches:  # type: ignore
+                response = {"jsonrpc": "2.0", "id": None, "error": {"code": -32600}}
+            else:
+                response = [self.answer(request) for request in body]
+        else:
+            self.server.batch_sizes.append(1)  # type: ignore
+            response = self.answer(body)
+        self.server.headers.append(dict(self.headers))  # type: ignore
+        data = json.dumps(response).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def answer(self, request):
+        return {"jsonrpc": "2.0", "id": request["id"], "result": request["params"][0]}
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class BatchingProviderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+        self.server.batch_sizes = []  # type: ignore
+        self.server.headers = []  # type: ignore
+        self.server.supports_batches = True  # type: ignore
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.http_provider = HTTPProvider(f"http://{host}:{port}")
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requests_are_batched_and_demultiplexed(self):
+        provider = rpc_batch.BatchingProvider(
+            self.http_provider, max_batch_size=4, flush_interval=0.5
+        )
+        try:
+            futures = [provider.submit("eth_call", [i]) for i in range(10)]
+            results = [future.result(timeout=5)["result"] for future in futures]
+        finally:
+            provider.close()
+        self.assertEqual(results, list(range(10)))
+        self.assertEqual(sorted(self.server.batch_sizes), [2, 4, 4])  # type: ignore
+        self.assertEqual(provider.stats["batches"], 3)
+
+    def test_batches_use_provider_request_kwargs(self):
+        host, port = self.server.server_address
+        http_provider = HTTPProvider(
+            f"http://{host}:{port}",
+            request_kwargs={"headers": {"Authorization": "Bearer key"}, "timeout": 5},
+        )
+        provider = rpc_batch.BatchingProvider(
+            http_provider, max_batch_size=2, flush_interval=0.5
+        )
+        try:
+            futures = [provider.submit("eth_call", [value]) for value in ["a", "b"]]
+            self.assertEqual(
+                [future.result(timeout=5)["result"] for future in futures], ["a", "b"]
+            )
+        finally:
+            provider.close()
+
+        self.assertEqual(self.server.batch_sizes, [2])  # type: ignore
+        headers = self.server.headers[0]  # type: ignore
+        self.assertEqual(headers["Authorization"], "Bearer key")
+        self.assertEqual(headers["Content-Type"], "application/json")
+
+    def test_flush_interval(self):
+        provider = rpc_batch.BatchingProvider(
+            self.http_provider, max_batch_size=100, flush_interval=0.01
+        )
+        try:
+            self.assertEqual(provider.make_request("eth_call", ["a"])["result"], "a")
+        finally:
+            provider.close()
+        self.assertEqual(self.server.batch_sizes, [1])  # type: ignore
+
+    def test_flush_splits_queue_into_batches(self):
+        provider = rpc_batch.BatchingProvider(
+            self.http_provider, max_batch_size=4, flush_interval=60
+        )
+        try:
+            futures = [provider.submit("eth_call", [i]) for i in range(10)]
+            provider.flush()
+            self.assertTrue(all(future.done() for future in futures))
+            results = [future.result()["result"] for future in futures]
+        finally:
+            provider.close()
+        self.assertEqual(results, list(range(10)))
+        self.assertEqual(sorted(self.server.batch_sizes), [2, 4, 4])  # type: ignore
+
+    def test_batched_map_workers(self):
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        def call(value):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return value
+
+        self.assertEqual(rpc_batch.batched_map(call, range(50)), list(range(50)))
+        self.assertLessEqual(max_running[0], rpc_batch.DEFAULT_MAP_WORKERS)
+
+        original_provider = web3.provider
+        provider = rpc_batch.BatchingProvider(self.http_provider, max_batch_size=3)
+        web3.provider = provider
+        max_running[0] = 0
+        try:
+            self.assertEqual(rpc_batch.batched_map(call, range(50)), list(range(50)))
+        finally:
+            web3.provider = original_provider
+            provider.close()
+        self.assertLessEqual(max_running[0], 3)
+
+    def test_other_methods_are_not_batched(self):
+        provider = rpc_batch.BatchingProvider(self.http_provider)
+        try:
+            response = provider.make_request("eth_sendRawTransaction", ["0x00"])
+        finally:
+            provider.close()
+        self.assertEqual(response["result"], "0x00")
+        self.assertEqual(provider.stats["requests"], 0)
+
+    def test_falls_back_to_individual_requests(self):
+        self.server.supports_batches = False  # type: ignore
+        provider = rpc_batch.BatchingProvider(
+            self.http_provider, max_batch_size=3, flush_interval=0.5
+        )
+        try:
+            futures = [provider.submit("eth_call", [i]) for i in range(3)]
+            results = [future.result(timeout=5)["result"] for future in futures]
+        finally:
+            provider.close()
+        self.assertEqual(results, [0, 1, 2])
+        self.assertEqual(self.server.batch_sizes, [3, 1, 1, 1])  # type: ignore
+
+
+class BatchedWrapperCallsTests(InventoryTestCase):
+    def test_wrapper_reads_are_batched(self):
+        for i in range(5):
+            self.inventory.create_slot(False, 1, f"batched_{i}", {"from": self.admin})
+        slots = list(range(1, self.inventory.num_slots() + 1))
+        expected = [self.inventory.get_slot_uri(slot) for slot in slots]
+
+        with rpc_batch.batched_calls(
+            max_batch_size=50, flush_interval=0.05
+        ) as provider:
+            uris = rpc_batch.batched_map(self.inventory.get_slot_uri, slots)
+
+        self.assertEqual(uris, expected)
+        self.assertEqual(provider.stats["requests"], len(slots))
+        self.assertLess(provider.stats["batches"], len(slots))
+
+
+if __name__ == "__main__":
+    unittest.main()
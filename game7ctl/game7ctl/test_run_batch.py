@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+import unittest
+
+from . import batch
+from .test_inventory import InventoryTestCase
+from .transactions import TransactionPipeline
+
+
+class ManifestTests(unittest.TestCase):
+    def test_read_manifest(self):
+        lines = [
+            '{"op": "create-slot", "args": {"unequippable": false, "slot_type": 1, "slot_uri": "a"}}\n',
+            "\n",
+            '{"op": "num_slots", "block_number": 10}\n',
+        ]
+        operations = batch.read_manifest(lines)
+        self.assertEqual([operation.line for operation in operations], [1, 3])
+        self.assertEqual(operations[0].op, "create_slot")
+        self.assertEqual(operations[0].kind, batch.WRITE)
+        self.assertEqual(operations[1].kind, batch.READ)
+        self.assertEqual(operations[1].block_number, 10)
+
+        self.assertEqual(len(batch.read_manifest(lines, start_line=2)), 1)
+
+    def test_invalid_manifest_lines(self):
+        invalid_lines = [
+            "not json",
+            '{"args": {}}',
+            '{"op": "deploy"}',
+            '{"op": "num_slots", "args": {"slot": 1}}',
+            '{"op": "get_slot_uri"}',
+            '{"op": "set_slot_uri", "args": {"new_slot_uri": "a", "slot_id": 1}, "block_number": 1}',
+        ]
+        for raw_line in invalid_lines:
+            with self.assertRaises(ValueError):
+                batch.read_manifest(['{"op": "num_slots"}', raw_line])
+
+    def test_completed_lines(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results_path = os.path.join(temp_dir, "results.jsonl")
+            self.assertEqual(batch.completed_lines(results_path), set())
+            with open(results_path, "w") as ofp:
+                ofp.write('{"line": 1, "op": "num_slots", "status": "ok"}\n')
+                ofp.write('{"line": 3, "op": "num_slots", "status": "error"}\n')
+                ofp.write('{"line": 4, "op": "num_slots", "status": "ok"}\n')
+                ofp.write('{"line": 5, "op": "num_s')
+            self.assertEqual(batch.completed_lines(results_path), {1, 4})
+
+            lines = ['{"op": "num_slots"}'] * 5
+            operations = batch.read_manifest(lines, skip_lines={1, 4})
+            self.assertEqual([operation.line for operation in operations], [2, 3, 5])
+
+
+class RunBatchTests(InventoryTestCase):
+    def test_run_batch(self):
+        num_slots_0 = self.inventory.num_slots()
+        manifest = [
+            json.dumps(
+                {
+                    "op": "create_slot",
+                    "args": {"unequippable": False, "slot_type": 1, "slot_uri": "a"},
+                }
+            ),
+            json.dumps(
+                {
+                    "op": "set-slot-uri",
+                    "args": {"new_slot_uri": "b", "slot_id": num_slots_0 + 1},
+                }
+            ),
+            json.dumps({"op": "num_slots"}),
+            json.dumps({"op": "get_slot_uri", "args": {"slot_id": num_slots_0 + 1}}),
+        ]
+
+        records = list(
+            batch.run_batch(
+                batch.read_manifest(manifest),
+                {"from": self.admin},
+                default_address=self.inventory.address,
+            )
+        )
+
+        self.assertEqual([record["status"] for record in records], ["ok"] * 4)
+        self.assertEqual(records[0]["tx_status"], 1)
+        self.assertEqual(
+            [event["name"] for event in records[0]["events"]], ["SlotCreated"]
+        )
+        self.assertEqual(records[1]["nonce"], records[0]["nonce"] + 1)
+        self.assertEqual(records[2]["result"], num_slots_0 + 1)
+        self.assertEqual(records[3]["result"], "b")
+
+    def test_run_batch_stops_at_first_failure(self):
+        manifest = [
+            json.dumps({"op": "num_slots"}),
+            json.dumps(
+                {
+                    "op": "create_slot",
+                    "args": {"unequippable": False, "slot_type": 1, "slot_uri": "a"},
+                }
+            ),
+            json.dumps({"op": "num_slots"}),
+        ]
+        operations = batch.read_manifest(manifest)
+
+        # random_person is not an administrator, so creating a slot fails.
+        records = list(
+            batch.run_batch(
+                operations,
+                {"from": self.random_person},
+                default_address=self.inventory.address,
+            )
+        )
+        self.assertEqual([record["line"] for record in records], [1, 2])
+        self.assertEqual(records[1]["status"], "error")
+
+        records = list(
+            batch.run_batch(
+                operations,
+                {"from": self.random_person},
+                default_address=self.inventory.address,
+                continue_on_error=True,
+            )
+        )
+        self.assertEqual(
+            [record["status"] for record in records], ["ok", "error", "ok"]
+        )
+
+    def test_run_batch_with_pipeline(self):
+        num_slots_0 = self.inventory.num_slots()
+        create_slot = json.dumps(
+            {
+                "op": "create_slot",
+                "args": {"unequippable": False, "slot_type": 1, "slot_uri": "a"},
+            }
+        )
+        manifest = [create_slot] * 5 + [json.dumps({"op": "num_slots"})]
+
+        with TransactionPipeline(self.admin, max_in_flight=3) as pipeline:
+            records = list(
+                batch.run_batch(
+                    batch.read_manifest(manifest),
+                    {"from": self.admin},
+                    default_address=self.inventory.address,
+                    pipeline=pipeline,
+                )
+            )
+
+        self.assertEqual([record["line"] for record in records], list(range(1, 7)))
+        self.assertEqual([record["status"] for record in records], ["ok"] * 6)
+        nonces = [record["nonce"] for record in records[:5]]
+        self.assertEqual(nonces, list(range(nonces[0], nonces[0] + 5)))
+        self.assertEqual(records[5]["result"], num_slots_0 + 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
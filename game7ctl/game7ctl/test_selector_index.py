@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+from . import abi, dao, selector_index
+
+PROJECT_DIRECTORY = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+SLOT_CREATED_ABI = {
+    "type": "event",
+    "name": "SlotCreated",
+    "anonymous": False,
+    "inputs": [
+        {"indexed": True, "name": "creator", "type": "address"},
+        {"indexed": True, "name": "slot", "type": "uint256"},
+    ],
+}
+
+
+def function_abi(name, *input_types):
+    return {
+        "type": "function",
+        "name": name,
+        "inputs": [
+            {"name": f"arg{i}", "type": input_type}
+            for i, input_type in enumerate(input_types)
+        ],
+        "outputs": [],
+        "stateMutability": "nonpayable",
+    }
+
+
+class SelectorIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.project_directory = tempfile.TemporaryDirectory()
+        self.project_dir = self.project_directory.name
+        os.makedirs(os.path.join(self.project_dir, "build", "contracts"))
+        self.path = self.write_artifact(
+            "Token",
+            [function_abi("transfer", "address", "uint256"), SLOT_CREATED_ABI],
+        )
+
+    def tearDown(self) -> None:
+        self.project_directory.cleanup()
+
+    def write_artifact(self, contract_name, contract_abi, mtime_ns=None):
+        path = os.path.join(
+            self.project_dir, "build", "contracts", f"{contract_name}.json"
+        )
+        with open(path, "w") as ofp:
+            json.dump({"abi": contract_abi}, ofp)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def stored_contracts(self):
+        return selector_index.read_index(selector_index.index_path(self.project_dir))
+
+    def tamper(self, contract_name):
+        """
+        Replaces the selectors stored for the given contract, so that tests can tell whether they were
+        recomputed.
+        """
+        contracts = self.stored_contracts()
+        contracts[contract_name]["functions"] = {"stale()": "00000000"}
+        selector_index.write_index(
+            selector_index.index_path(self.project_dir), contracts
+        )
+
+    def test_index_is_persisted(self):
+        index = selector_index.build_index(self.project_dir)
+        self.assertEqual(
+            index.functions("Token"),
+            {
+                "transfer(address,uint256)": abi.encode_function_signature(
+                    function_abi("transfer", "address", "uint256")
+                )
+            },
+        )
+        self.assertEqual(
+            index.topic("SlotCreated(address,uint256)"),
+            abi.encode_event_topic(SLOT_CREATED_ABI),
+        )
+        self.assertEqual(index.functions("Unknown"), {})
+
+        entry = self.stored_contracts()["Token"]
+        with open(self.path, "rb") as ifp:
+            self.assertEqual(entry["hash"], hashlib.sha256(ifp.read()).hexdigest())
+        self.assertEqual(entry["functions"], index.functions("Token"))
+
+    def test_unchanged_artifact_is_not_read(self):
+        selector_index.build_index(self.project_dir)
+        self.tamper("Token")
+        # Same modification time and size: the stored entry is trusted as it is.
+        index = selector_index.build_index(self.project_dir)
+        self.assertEqual(index.functions("Token"), {"stale()": "00000000"})
+
+    def test_touched_artifact_keeps_its_entry(self):
+        selector_index.build_index(self.project_dir)
+        self.tamper("Token")
+        stat = os.stat(self.path)
+        mtime_ns = stat.st_mtime_ns + 1_000_000_000
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+        # The hash is unchanged, so the selectors are not recomputed.
+        index = selector_index.build_index(self.project_dir)
+        self.assertEqual(index.functions("Token"), {"stale()": "00000000"})
+        self.assertEqual(self.stored_contracts()["Token"]["mtime_ns"], mtime_ns)
+
+    def test_recompiled_artifact_is_reindexed(self):
+        selector_index.build_index(self.project_dir)
+        self.tamper("Token")
+        stat = os.stat(self.path)
+        self.write_artifact(
+            "Token",
+            [function_abi("approve", "address", "uint256")],
+            mtime_ns=stat.st_mtime_ns + 1_000_000_000,
+        )
+
+        index = selector_index.build_index(self.project_dir)
+        self.assertEqual(list(index.functions("Token")), ["approve(address,uint256)"])
+        self.assertIsNone(index.topic("SlotCreated(address,uint256)"))
+        self.assertEqual(
+            self.stored_contracts()["Token"]["functions"], index.functions("Token")
+        )
+
+    def test_removed_artifact_is_dropped(self):
+        self.write_artifact("Other", [function_abi("other")])
+        selector_index.build_index(self.project_dir)
+        os.remove(self.path)
+        index = selector_index.build_index(self.project_dir)
+        self.assertEqual(index.functions("Token"), {})
+        self.assertEqual(list(self.stored_contracts()), ["Other"])
+
+    def test_index_of_another_version_is_rebuilt(self):
+        with open(selector_index.index_path(self.project_dir), "w") as ofp:
+            json.dump({"version": selector_index.INDEX_VERSION + 1}, ofp)
+        index = selector_index.build_index(self.project_dir)
+        self.assertIn("transfer(address,uint256)", index.functions("Token"))
+
+    def test_load_refresh(self):
+        index = selector_index.load(self.project_dir)
+        self.assertIs(selector_index.load(self.project_dir), index)
+        stat = os.stat(self.path)
+        self.write_artifact(
+            "Token",
+            [function_abi("approve", "address", "uint256")],
+            mtime_ns=stat.st_mtime_ns + 1_000_000_000,
+        )
+        self.assertIs(selector_index.load(self.project_dir), index)
+        refreshed = selector_index.load(self.project_dir, refresh=True)
+        self.assertEqual(
+            list(refreshed.functions("Token")), ["approve(address,uint256)"]
+        )
+
+
+def reference_facet_selectors(project_dir, facet_name, feature=None):
+    """
+    The selectors facet_cut resolved by encoding every function in the project ABIs directly, before
+    the selector index.
+    """
+    abis = abi.project_abis(project_dir)
+    facet_precedence = dao.FACET_PRECEDENCE
+    if feature is not None:
+        facet_precedence = dao.DIAMOND_FACET_PRECEDENCE + dao.FEATURE_FACETS[feature]
+
+    reserved_selectors = set()
+    for facet in facet_precedence:
+        facet_abi = abis.get(facet, [])
+        if facet == facet_name:
+            if feature is not None:
+                ignored_methods = dao.FEATURE_IGNORES[feature]["methods"]
+                for item in facet_abi:
+                    if item["type"] == "function" and item["name"] in ignored_methods:
+                        reserved_selectors.add(abi.encode_function_signature(item))
+            break
+        for item in facet_abi:
+            if item["type"] == "function":
+                reserved_selectors.add(abi.encode_function_signature(item))
+
+    return [
+        abi.encode_function_signature(item)
+        for item in abis.get(facet_name, [])
+        if item["type"] == "function"
+        and abi.encode_function_signature(item) not in reserved_selectors
+    ]
+
+
+class FacetSelectorTests(unittest.TestCase):
+    def assert_facet_selectors_match(self, project_dir):
+        for facet_name in dao.FACETS:
+            feature = dao.feature_from_facet_name(facet_name)
+            self.assertEqual(
+                dao.facet_selectors(
+                    facet_name, feature=feature, project_dir=project_dir
+                ),
+                reference_facet_selectors(project_dir, facet_name, feature),
+                msg=facet_name,
+            )
+
+    def test_facet_selectors_match_abi(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            build_directory = os.path.join(project_dir, "build", "contracts")
+            os.makedirs(build_directory)
+            facet_abis = {
+                "DiamondCutFacet": [function_abi("diamondCut", "bytes")],
+                "OwnershipFacet": [
+                    function_abi("owner"),
+                    function_abi("transferOwnership", "address"),
+                ],
+                "DiamondLoupeFacet": [function_abi("facets")],
+                "InventoryFacet": [
+                    function_abi("init", "address", "uint256"),
+                    # Reserved by OwnershipFacet.
+                    function_abi("owner"),
+                    function_abi("createSlot", "bool", "uint256", "string"),
+                    function_abi("numSlots"),
+                ],
+            }
+            for contract_name, contract_abi in facet_abis.items():
+                with open(
+                    os.path.join(build_directory, f"{contract_name}.json"), "w"
+                ) as ofp:
+                    json.dump({"abi": contract_abi}, ofp)
+
+            self.assert_facet_selectors_match(project_dir)
+            self.assertEqual(
+                dao.facet_selectors(
+                    "InventoryFacet",
+                    feature=dao.EngineFeatures.INVENTORY,
+                    project_dir=project_dir,
+                ),
+                [
+                    abi.encode_function_signature(item)
+                    for item in facet_abis["InventoryFacet"][2:]
+                ],
+            )
+
+    def test_build_artifact_selectors_match_abi(self):
+        if not os.path.isdir(os.path.join(PROJECT_DIRECTORY, "build", "contracts")):
+            self.skipTest("The smart contracts have not been compiled")
+        selector_index.load(PROJECT_DIRECTORY, refresh=True)
+        self.assert_facet_selectors_match(PROJECT_DIRECTORY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from brownie import Contract, accounts, network
+
+from . import session
+from .test_inventory import InventoryTestCase
+
+
+def count_calls(active_session: session.Session, name: str) -> list:
+    """
+    Records the calls which an active session makes to the original brownie function of the given name.
+    """
+    calls = []
+    original = active_session._originals[name]
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    active_session._originals[name] = counted
+    return calls
+
+
+class SessionExecuteTests(unittest.TestCase):
+    def test_invalid_lines(self):
+        active_session = session.Session()
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertIsNone(active_session.execute_line("   # comment"))
+            self.assertEqual(active_session.execute_line("shell"), 2)
+            self.assertEqual(active_session.execute_line('inventory "unclosed'), 2)
+            self.assertEqual(active_session.execute_line("no-such-command"), 2)
+        self.assertIn("shell cannot be run inside a session", stderr.getvalue())
+
+    def test_run_shell_stops_at_exit(self):
+        active_session = session.Session()
+        lines = io.StringIO("# comment\n\nshell\nexit\nno-such-command\n")
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(session.run_shell(active_session, lines), 2)
+        self.assertEqual(lines.readline(), "no-such-command\n")
+
+
+class SessionActivationTests(unittest.TestCase):
+    def test_patched_functions_are_restored_on_exit(self):
+        connect = network.connect
+        from_abi = Contract.__dict__["from_abi"]
+        active_session = session.Session()
+        with self.assertRaises(RuntimeError):
+            with active_session.activate():
+                self.assertEqual(network.connect, active_session.connect)
+                self.assertEqual(network.accounts.load, active_session.load_signer)
+                self.assertEqual(Contract.from_abi, active_session.contract_from_abi)
+                raise RuntimeError("command failed")
+        self.assertIs(network.connect, connect)
+        self.assertNotIn("load", vars(network.accounts))
+        self.assertIs(Contract.__dict__["from_abi"], from_abi)
+
+
+class SessionTests(InventoryTestCase):
+    def num_slots_command(self) -> str:
+        return (
+            f"inventory num-slots --network {network.show_active()} "
+            f"--address {self.inventory.address}"
+        )
+
+    def test_connect_is_idempotent(self):
+        active_session = session.Session()
+        with active_session.activate():
+            calls = count_calls(active_session, "connect")
+            network.connect(network.show_active())
+            network.connect()
+        self.assertEqual(calls, [])
+        self.assertTrue(network.is_connected())
+
+    def test_signer_is_decrypted_once(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            keystore = accounts.add().save(
+                os.path.join(temp_dir, "signer.json"), password="session"
+            )
+            active_session = session.Session(allow_password_prompt=False)
+            with active_session.activate():
+                calls = count_calls(active_session, "load")
+                signer = network.accounts.load(keystore, "session")
+                self.assertIs(network.accounts.load(keystore), signer)
+                with self.assertRaises(ValueError):
+                    network.accounts.load(os.path.join(temp_dir, "other.json"))
+        self.assertEqual(len(calls), 1)
+
+    def test_execute_line(self):
+        active_session = session.Session()
+        stdout = io.StringIO()
+        with active_session.activate(), contextlib.redirect_stdout(stdout):
+            statuses = [
+                active_session.execute_line(self.num_slots_command()),
+                active_session.execute_line(self.num_slots_command()),
+            ]
+        self.assertEqual(statuses, [0, 0])
+        num_slots = str(self.inventory.num_slots())
+        self.assertEqual(stdout.getvalue().split(), [num_slots, num_slots])
+        # Both commands used the same contract object.
+        self.assertEqual(len(active_session._contracts), 1)
+
+    def test_serve_round_trip(self):
+        active_session = session.Session(allow_password_prompt=False)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            socket_path = os.path.join(temp_dir, "game7ctl.sock")
+            with active_session.activate():
+                server = session.CommandServer(socket_path, active_session)
+                thread = threading.Thread(target=server.serve_forever)
+                thread.start()
+                try:
+                    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                        client.connect(socket_path)
+                        client.sendall(
+                            f"{self.num_slots_command()}\n# comment\nshell\nexit\n".encode(
+                                "utf-8"
+                            )
+                        )
+                        with client.makefile("rb") as replies:
+                            responses = [json.loads(line) for line in replies]
+                finally:
+                    server.shutdown()
+                    server.server_close()
+                    thread.join()
+
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(responses[0]["status"], 0)
+        self.assertEqual(
+            responses[0]["stdout"].strip(), str(self.inventory.num_slots())
+        )
+        self.assertEqual(responses[1]["status"], 2)
+        self.assertIn("cannot be run inside a session", responses[1]["stderr"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+from brownie import chain, web3
+
+from . import Multicall2, inventory_events, logs
+from .slot_catalog import Slot, SlotCatalog
+from .test_inventory import InventoryTestCase
+
+
+class SlotCatalogTests(InventoryTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.multicall = Multicall2.Multicall2(None)
+        cls.multicall.deploy(cls.owner_tx_config)
+
+        cls.inventory.create_slot_type(7, "weapon", {"from": cls.admin})
+        cls.inventory.create_slot(False, 7, "catalog_a", {"from": cls.admin})
+        cls.inventory.create_slot(True, 1, "catalog_b", {"from": cls.admin})
+
+    def assert_matches_chain(self, catalog: SlotCatalog) -> None:
+        num_slots = self.inventory.num_slots()
+        self.assertEqual(catalog.num_slots(), num_slots)
+        for slot_id in range(1, num_slots + 1):
+            slot_uri, slot_type, unequippable, _ = self.inventory.get_slot_by_id(
+                slot_id
+            )
+            self.assertEqual(
+                catalog.slot(slot_id), Slot(slot_id, slot_type, slot_uri, unequippable)
+            )
+            self.assertEqual(
+                catalog.slot_type_name(slot_type),
+                self.inventory.get_slot_type(slot_type),
+            )
+
+    def test_load(self):
+        for multicall_contract in [None, self.multicall]:
+            catalog = SlotCatalog(self.inventory, multicall_contract)
+            catalog.load()
+            self.assert_matches_chain(catalog)
+            self.assertEqual(catalog.block_number, web3.eth.block_number)
+
+    def test_refresh_applies_changes(self):
+        catalog = SlotCatalog(self.inventory, self.multicall)
+        catalog.load()
+        self.assertEqual(catalog.refresh(), 0)
+
+        self.inventory.create_slot(False, 1, "catalog_c", {"from": self.admin})
+        new_slot = self.inventory.num_slots()
+        self.inventory.set_slot_uri("catalog_c_2", new_slot, {"from": self.admin})
+        self.inventory.create_slot_type(8, "armor", {"from": self.admin})
+        self.inventory.assign_slot_type(new_slot, 8, {"from": self.admin})
+        self.inventory.set_slot_unequippable(True, 1, {"from": self.admin})
+
+        # Lookups are served from memory until the catalog is refreshed.
+        with self.assertRaises(KeyError):
+            catalog.slot(new_slot)
+
+        self.assertEqual(catalog.refresh(), 4)
+        self.assert_matches_chain(catalog)
+        self.assertEqual(catalog.slot_uri(new_slot), "catalog_c_2")
+        self.assertEqual(catalog.slot_type(new_slot), 8)
+        self.assertEqual(catalog.slot_type_name(8), "armor")
+        self.assertTrue(catalog.slot_is_unequippable(1))
+
+    def test_reorg_reloads_catalog(self):
+        catalog = SlotCatalog(self.inventory, self.multicall)
+        catalog.load()
+        chain.snapshot()
+        self.inventory.create_slot(False, 7, "catalog_reorg_a", {"from": self.admin})
+        self.assertEqual(catalog.refresh(), 1)
+        block_number = catalog.block_number
+
+        # The slot is created again, differently, on another branch.
+        chain.revert()
+        self.inventory.create_slot(True, 1, "catalog_reorg_b", {"from": self.admin})
+        self.assertEqual(web3.eth.block_number, block_number)
+        self.assertEqual(catalog.refresh(), 0)
+        self.assert_matches_chain(catalog)
+        self.assertEqual(catalog.slot_uri(catalog.num_slots()), "catalog_reorg_b")
+
+    def test_confirmations(self):
+        catalog = SlotCatalog(self.inventory, confirmations=1)
+        catalog.load()
+        self.assertEqual(catalog.block_number, web3.eth.block_number - 1)
+        num_slots = self.inventory.num_slots()
+        self.inventory.create_slot(
+            False, 1, "catalog_unconfirmed", {"from": self.admin}
+        )
+        catalog.refresh()
+        self.assertEqual(catalog.num_slots(), num_slots)
+        chain.mine(1)
+        catalog.refresh()
+        self.assertEqual(catalog.num_slots(), num_slots + 1)
+
+    def test_decoded_logs(self):
+        tx_receipt = self.inventory.create_slot(
+            True, 7, "catalog_logs", {"from": self.admin}
+        )
+        events = logs.fetch_logs(
+            web3,
+            self.inventory.address,
+            [inventory_events.SLOT_CREATED_ABI],
+            tx_receipt.block_number,
+            tx_receipt.block_number,
+        )
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["event"], "SlotCreated")
+        self.assertEqual(
+            events[0]["args"],
+            {
+                "creator": self.admin.address,
+                "slot": self.inventory.num_slots(),
+                "unequippable": True,
+                "slotType": 7,
+            },
+        )
+        self.assertEqual(events[0]["transactionHash"], tx_receipt.txid)
+
+
+if __name__ == "__main__":
+    unittest.main()
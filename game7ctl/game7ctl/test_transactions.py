@@ -0,0 +1,170 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .test_inventory import InventoryTestCase
+from .transactions import NonceManager, TransactionPipeline
+
+
+class NonceManagerTests(InventoryTestCase):
+    def test_reserve_and_release(self):
+        nonces = NonceManager(self.random_person.address, start=5)
+        self.assertEqual(nonces.reserve(), 5)
+        self.assertEqual(nonces.reserve(), 6)
+        self.assertFalse(nonces.release(5))
+        self.assertTrue(nonces.release(6))
+        self.assertEqual(nonces.next_nonce, 6)
+
+    def test_starts_from_pending_nonce(self):
+        nonces = NonceManager(self.admin.address)
+        self.assertEqual(nonces.next_nonce, self.admin.nonce)
+
+
+class TransactionPipelineTests(InventoryTestCase):
+    def test_pipelined_transactions_are_mined_in_nonce_order(self):
+        num_slots_0 = self.inventory.num_slots()
+        with TransactionPipeline(self.admin, max_in_flight=4) as pipeline:
+            futures = [
+                pipeline.submit(self.inventory.create_slot, False, 1, f"uri_{i}")
+                for i in range(10)
+            ]
+        receipts = [future.result() for future in futures]
+
+        self.assertEqual([receipt.status for receipt in receipts], [1] * 10)
+        nonces = [receipt.nonce for receipt in receipts]
+        self.assertEqual(nonces, list(range(nonces[0], nonces[0] + 10)))
+        self.assertEqual(pipeline.stats["confirmed"], 10)
+        self.assertEqual(self.inventory.num_slots(), num_slots_0 + 10)
+        self.assertEqual(self.inventory.get_slot_uri(num_slots_0 + 10), "uri_9")
+
+    def test_failed_submission_gives_back_its_nonce(self):
+        def fail(transaction_config):
+            raise ValueError("not broadcast")
+
+        with TransactionPipeline(self.admin, max_in_flight=2) as pipeline:
+            nonce = pipeline.nonces.next_nonce
+            failed = pipeline.submit(fail)
+            succeeded = pipeline.submit(self.inventory.create_slot, False, 1, "uri")
+
+        with self.assertRaises(ValueError):
+            failed.result()
+        self.assertEqual(succeeded.result().nonce, nonce)
+        self.assertEqual(pipeline.stats["failed"], 1)
+        self.assertEqual(pipeline.stats["gaps_filled"], 0)
+
+    def test_filled_gap_lets_later_transactions_through(self):
+        with TransactionPipeline(self.admin, max_in_flight=2) as pipeline:
+            # A nonce which was reserved but never used blocks every transaction after it.
+            gap = pipeline.nonces.reserve()
+            future = pipeline.submit(self.inventory.create_slot, False, 1, "uri")
+            pipeline._fill_gap(gap)
+
+        self.assertEqual(future.result().status, 1)
+        self.assertEqual(future.result().nonce, gap + 1)
+        self.assertEqual(pipeline.stats["gaps_filled"], 1)
+
+    def test_concurrent_submitters_respect_max_in_flight(self):
+        in_flight_at_send = []
+
+        with TransactionPipeline(self.admin, max_in_flight=2) as pipeline:
+
+            def create_slot(*args, transaction_config):
+                in_flight_at_send.append(len(pipeline._in_flight))
+                return self.inventory.create_slot(*args, transaction_config)
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                futures = list(
+                    executor.map(
+                        lambda i: pipeline.submit(create_slot, False, 1, f"uri_{i}"),
+                        range(16),
+                    )
+                )
+
+        self.assertEqual([future.result().status for future in futures], [1] * 16)
+        self.assertLess(max(in_flight_at_send), 2)
+
+    def test_dropped_transaction_fails_when_its_gap_cannot_be_filled(self):
+        class Receipt:
+            txid = "0x" + "ab" * 32
+
+        class Signer:
+            address = self.random_person.address
+
+            def transfer(self, *args, **kwargs):
+                raise ValueError("transaction underpriced")
+
+        def send(transaction_config):
+            return Receipt()
+
+        pipeline = TransactionPipeline(
+            Signer(), poll_interval=0.01, drop_timeout=0, max_retries=0
+        )
+        future = pipeline.submit(send)
+        # Returns instead of checking the dropped transaction again forever.
+        pipeline.close()
+
+        with self.assertRaisesRegex(RuntimeError, "dropped 1 times"):
+            future.result()
+        self.assertEqual(pipeline.stats["gap_fill_attempts"], 1)
+        self.assertEqual(pipeline.stats["gaps_filled"], 0)
+        self.assertEqual(pipeline.stats["failed"], 1)
+
+    def tracked_receipt(self, status=1, wait_errors=()):
+        """
+        Returns a stand-in for the receipt of a transaction which the node has mined, whose wait method
+        raises the given errors one after the other before it returns.
+        """
+        mined = self.inventory.create_slot(False, 1, "tracked", {"from": self.admin})
+        errors = list(wait_errors)
+
+        class Receipt:
+            txid = mined.txid
+
+            def __init__(self):
+                self.status = status
+
+            def wait(self, required_confs):
+                if errors:
+                    raise errors.pop(0)
+
+        return Receipt()
+
+    def test_reverted_transaction_counts_as_failed(self):
+        receipt = self.tracked_receipt(status=0)
+        with TransactionPipeline(self.random_person, poll_interval=0.01) as pipeline:
+            future = pipeline.submit(lambda transaction_config: receipt)
+
+        self.assertIs(future.result(), receipt)
+        self.assertEqual(pipeline.stats["confirmed"], 0)
+        self.assertEqual(pipeline.stats["failed"], 1)
+
+    def test_node_errors_are_retried(self):
+        receipt = self.tracked_receipt(
+            wait_errors=[
+                requests.exceptions.ConnectionError("connection reset"),
+                requests.exceptions.ReadTimeout("read timed out"),
+            ]
+        )
+        with TransactionPipeline(self.random_person, poll_interval=0.01) as pipeline:
+            future = pipeline.submit(lambda transaction_config: receipt)
+
+        self.assertIs(future.result(), receipt)
+        self.assertEqual(pipeline.stats["confirmed"], 1)
+        self.assertEqual(pipeline.stats["failed"], 0)
+
+    def test_unexpected_tracking_error_fails_transaction(self):
+        receipt = self.tracked_receipt(wait_errors=[KeyError("blockNumber")])
+        with self.assertLogs("game7ctl.transactions", level="ERROR"):
+            with TransactionPipeline(
+                self.random_person, poll_interval=0.01
+            ) as pipeline:
+                future = pipeline.submit(lambda transaction_config: receipt)
+
+        with self.assertRaises(KeyError):
+            future.result()
+        self.assertEqual(pipeline.stats["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
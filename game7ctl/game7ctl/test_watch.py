@@ -0,0 +1,332 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from . import inventory_events, logs, watch
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+CREATOR = "0x0000000000000000000000000000000000000002"
+
+
+def slot_created_event(block_number, log_index=0):
+    return {
+        "event": "SlotCreated",
+        "args": {"slot": block_number},
+        "address": ADDRESS,
+        "blockNumber": block_number,
+        "blockHash": f"0x{block_number:064x}",
+        "transactionHash": f"0x{block_number:064x}",
+        "logIndex": log_index,
+    }
+
+
+def raw_slot_created_log(block_number, log_index=0, removed=False):
+    """
+    Raw SlotCreated log, as eth_subscribe delivers it.
+    """
+    return {
+        "address": ADDRESS,
+        "topics": [
+            logs.event_topic(inventory_events.SLOT_CREATED_ABI),
+            "0x" + bytes.fromhex(CREATOR[2:]).rjust(32, b"\0").hex(),
+            f"0x{block_number:064x}",
+            f"0x{1:064x}",
+        ],
+        "data": f"0x{1:064x}",
+        "blockNumber": hex(block_number),
+        "blockHash": f"0x{block_number:064x}",
+        "transactionHash": f"0x{block_number:064x}",
+        "logIndex": hex(log_index),
+        "removed": removed,
+    }
+
+
+class FakeChain:
+    """
+    web3 client stand-in which serves one SlotCreated event per block.
+    """
+
+    def __init__(self, head):
+        self.block_number = head
+        self.eth = self
+        self.requests = []
+
+    def fetch(self, web3_client, address, event_abis, from_block, to_block):
+        self.requests.append((from_block, to_block))
+        return [
+            slot_created_event(block_number)
+            for block_number in range(from_block, min(to_block, self.block_number) + 1)
+        ]
+
+
+class EventQueueTests(unittest.TestCase):
+    def test_drop(self):
+        queue = watch.EventQueue(max_size=2, policy="drop")
+        for block_number in range(1, 6):
+            queue.put(slot_created_event(block_number))
+        self.assertEqual(queue.get(0)["blockNumber"], 1)
+        queue.put(slot_created_event(6))
+        self.assertEqual(
+            [queue.get(0) for _ in range(3)],
+            [
+                slot_created_event(2),
+                {
+                    "event": "EventsDropped",
+                    "count": 3,
+                    "from_block": 3,
+                    "to_block": 5,
+                },
+                slot_created_event(6),
+            ],
+        )
+        self.assertIsNone(queue.get(0))
+        self.assertEqual(queue.dropped, 3)
+
+    def test_spill_keeps_order(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spill_path = os.path.join(temp_dir, "spill.ndjson")
+            queue = watch.EventQueue(max_size=3, policy="spill", spill_path=spill_path)
+            for block_number in range(1, 11):
+                queue.put(slot_created_event(block_number))
+            received = [queue.get(0) for _ in range(5)]
+            for block_number in range(11, 16):
+                queue.put(slot_created_event(block_number))
+            queue.close()
+            while not queue.is_done():
+                received.append(queue.get(0))
+            self.assertEqual(
+                [event["blockNumber"] for event in received], list(range(1, 16))
+            )
+            self.assertEqual(queue.spilled, 12)
+            self.assertEqual(len(queue.events), 0)
+            queue.cleanup()
+            self.assertFalse(os.path.exists(spill_path))
+
+    def test_block(self):
+        queue = watch.EventQueue(max_size=2, policy="block")
+
+        def produce():
+            for block_number in range(1, 101):
+                queue.put(slot_created_event(block_number))
+            queue.close()
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        received = []
+        while not queue.is_done():
+            event = queue.get(1)
+            if event is not None:
+                received.append(event["blockNumber"])
+                self.assertLessEqual(len(queue.events), 2)
+        producer.join()
+        self.assertEqual(received, list(range(1, 101)))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            watch.EventQueue(policy="spill")
+        with self.assertRaises(ValueError):
+            watch.EventQueue(policy="retry")
+
+
+class PollingSourceTests(unittest.TestCase):
+    def test_polls_new_blocks(self):
+        chain = FakeChain(head=10)
+        source = watch.PollingSource(
+            chain,
+            ADDRESS,
+            from_block=5,
+            confirmations=2,
+            min_interval=0,
+            max_interval=0,
+            fetch=chain.fetch,
+        )
+        stop = threading.Event()
+        received = []
+        for event in source.events(stop):
+            received.append(event["blockNumber"])
+            if event["blockNumber"] == 8:
+                chain.block_number = 14
+            if event["blockNumber"] == 12:
+                stop.set()
+        self.assertEqual(received, list(range(5, 13)))
+        self.assertEqual(chain.requests, [(5, 8), (9, 12)])
+        self.assertEqual(source.next_block, 13)
+
+
+class SubscriptionSourceTests(unittest.TestCase):
+    def setUp(self) -> None:
+        if watch.websockets is None:
+            self.skipTest("websockets is not installed")
+        self.notifications = []
+        self.subscribe_error = None
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(self.serve())
+        port = list(self.server.sockets)[0].getsockname()[1]
+        self.ws_url = f"ws://127.0.0.1:{port}"
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self) -> None:
+        self.server.close()
+        asyncio.run_coroutine_threadsafe(self.server.wait_closed(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    async def serve(self):
+        return await watch.websockets.serve(self.handle, "127.0.0.1", 0)
+
+    async def handle(self, connection, *args):
+        self.connections += 1
+        request = json.loads(await connection.recv())
+        if self.subscribe_error is not None:
+            await connection.send(
+                json.dumps({"id": request["id"], "error": self.subscribe_error})
+            )
+            return
+        await connection.send(json.dumps({"id": request["id"], "result": "0x1"}))
+        if self.connections > 1:
+            await connection.wait_closed()
+            return
+        for log in self.notifications:
+            await connection.send(
+                json.dumps(
+                    {
+                        "method": "eth_subscription",
+                        "params": {"subscription": "0x1", "result": log},
+                    }
+                )
+            )
+        # Returning drops the first connection, so that the source has to resubscribe.
+
+    def test_subscription(self):
+        chain = FakeChain(head=3)
+        self.notifications = [
+            # Already delivered by the backfill.
+            raw_slot_created_log(3),
+            raw_slot_created_log(4),
+            # Block 4 is reorganized away and replaced.
+            raw_slot_created_log(4, removed=True),
+            raw_slot_created_log(4),
+            raw_slot_created_log(5),
+        ]
+        source = watch.SubscriptionSource(
+            self.ws_url, chain, ADDRESS, from_block=2, fetch=chain.fetch
+        )
+        stop = threading.Event()
+        received = []
+        for event in source.events(stop):
+            received.append((event["blockNumber"], event.get("removed", False)))
+            if len(received) == 6:
+                # Produced while the source is resubscribing.
+                chain.block_number = 6
+            if len(received) == 7:
+                stop.set()
+        self.assertEqual(
+            received,
+            [
+                (2, False),
+                (3, False),
+                (4, False),
+                (4, True),
+                (4, False),
+                (5, False),
+                (6, False),
+            ],
+        )
+        self.assertEqual(self.connections, 2)
+
+    def test_falls_back_to_polling(self):
+        self.subscribe_error = {"code": -32601, "message": "method not found"}
+        chain = FakeChain(head=3)
+        source = watch.SubscriptionSource(
+            self.ws_url, chain, ADDRESS, from_block=2, fetch=chain.fetch
+        )
+        with self.assertRaises(watch.SubscriptionUnavailable):
+            list(source.events(threading.Event()))
+
+
+class WatchTests(unittest.TestCase):
+    def test_watch_with_drop_policy(self):
+        chain = FakeChain(head=20)
+        stop = threading.Event()
+        lines = []
+        overrun = threading.Event()
+
+        class SlowOutput:
+            def write(self, data):
+                # Hold the first event until the source has overrun the queue with blocks 1 to 20.
+                overrun.wait()
+                lines.append(json.loads(data))
+                if lines[-1]["event"] == "EventsDropped":
+                    chain.block_number = 25
+                if lines[-1].get("blockNumber") == 25:
+                    stop.set()
+
+            def flush(self):
+                pass
+
+        queue = watch.EventQueue(max_size=5, policy="drop")
+
+        def wait_for_overrun():
+            while queue.dropped < 14:
+                stop.wait(0.01)
+            overrun.set()
+
+        waiter = threading.Thread(target=wait_for_overrun)
+        waiter.start()
+        stats = watch.watch(
+            chain,
+            ADDRESS,
+            SlowOutput(),
+            from_block=1,
+            min_interval=0.01,
+            max_interval=0.01,
+            queue=queue,
+            stop=stop,
+            fetch=chain.fetch,
+        )
+        waiter.join()
+        self.assertEqual(stats["source"], "polling")
+        self.assertIsNone(stats["error"])
+        # The consumer takes block 1 off the queue either before or after the source fills it.
+        num_delivered = 20 - stats["dropped"]
+        self.assertIn(num_delivered, [5, 6])
+        self.assertEqual(
+            [line.get("blockNumber") for line in lines],
+            list(range(1, num_delivered + 1)) + [None, 21, 22, 23, 24, 25],
+        )
+        self.assertEqual(
+            lines[num_delivered],
+            {
+                "event": "EventsDropped",
+                "count": stats["dropped"],
+                "from_block": num_delivered + 1,
+                "to_block": 20,
+            },
+        )
+
+
+class UnixSocketOutputTests(unittest.TestCase):
+    def test_writes_to_socket(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "events.sock")
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(path)
+            server.listen(1)
+            output = watch.UnixSocketOutput(path)
+            output.write('{"event": "SlotCreated"}\n')
+            connection, _ = server.accept()
+            self.assertEqual(connection.recv(1024), b'{"event": "SlotCreated"}\n')
+            connection.close()
+            output.close()
+            server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,401 @@
+"""
+Pipelined transaction submission.
+
+The generated wrappers (InventoryFacet, TerminusFacet, MockERC20, ...) wait for each transaction to be
+confirmed before they return, so a sequence of writes takes one block round-trip per transaction. A
+TransactionPipeline keeps up to max_in_flight transactions from a single signer pending at once:
+- nonces are assigned locally by a NonceManager instead of being read from the node for every transaction
+- write methods of the wrappers are called with required_confs=0, so they return as soon as the
+  transaction has been broadcast
+- a background thread tracks the receipts of all pending transactions and resolves their futures. Errors
+  talking to the node are retried on its next round, and any other error fails the transaction
+- transactions which disappear from the node before they are mined are resubmitted with the same nonce,
+  and nonces which can no longer be used by their transaction are filled with empty self-transfers so
+  that the transactions after them can still be mined
+
+settled_writes turns the futures of pipelined writes into result records (see receipt_record), in the
+order the writes were submitted in.
+
+Usage:
+    with TransactionPipeline(signer, max_in_flight=16) as pipeline:
+        futures = [pipeline.submit(inventory.create_slot, False, 1, uri) for uri in uris]
+    receipts = [future.result() for future in futures]
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Type
+
+import requests
+from brownie import web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+logger = logging.getLogger(__name__)
+
+# Errors talking to the node, which are transient as far as the pipeline is concerned: a transaction
+# whose receipt could not be checked because of them is checked again on the next round.
+NODE_ERRORS: Tuple[Type[Exception], ...] = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ConnectionError,
+    TimeoutError,
+    TimeExhausted,
+)
+
+
+class NonceManager:
+    """
+    Assigns consecutive nonces to the transactions of a single account without querying the node for
+    each one.
+    """
+
+    def __init__(self, address: str, start: Optional[int] = None) -> None:
+        self.address = address
+        self._lock = threading.Lock()
+        self._next = start if start is not None else self.pending_nonce()
+
+    def pending_nonce(self) -> int:
+        """
+        Nonce that the node would assign to the next transaction of the account.
+        """
+        return web3.eth.get_transaction_count(self.address, "pending")
+
+    def mined_nonce(self) -> int:
+        """
+        Number of transactions from the account which have been mined.
+        """
+        return web3.eth.get_transaction_count(self.address, "latest")
+
+    @property
+    def next_nonce(self) -> int:
+        with self._lock:
+            return self._next
+
+    def reserve(self) -> int:
+        with self._lock:
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def release(self, nonce: int) -> bool:
+        """
+        Gives back a nonce whose transaction was never broadcast. This is only possible if no nonce has
+        been reserved after it - otherwise it leaves a gap which has to be filled, and release returns
+        False.
+        """
+        with self._lock:
+            if nonce == self._next - 1:
+                self._next = nonce
+                return True
+            return False
+
+
+class PendingTransaction:
+    def __init__(
+        self, nonce: int, method: Callable, args: tuple, kwargs: Dict[str, Any]
+    ) -> None:
+        self.nonce = nonce
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.receipt: Any = None
+        self.submitted_at = 0.0
+        self.attempts = 0
+
+    @property
+    def txid(self) -> Optional[str]:
+        return None if self.receipt is None else self.receipt.txid
+
+
+class TransactionPipeline:
+    def __init__(
+        self,
+        signer: Any,
+        max_in_flight: int = 16,
+        transaction_config: Optional[Dict[str, Any]] = None,
+        start_nonce: Optional[int] = None,
+        poll_interval: float = 0.2,
+        drop_timeout: float = 120.0,
+        max_retries: int = 3,
+    ) -> None:
+        """
+        transaction_config holds the parameters (gas price, gas limit, ...) used for every transaction,
+        except for "from", "nonce" and "required_confs", which the pipeline sets itself.
+
+        A transaction which the node no longer knows about drop_timeout seconds after it was submitted is
+        considered dropped and resubmitted, at most max_retries times.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.signer = signer
+        self.max_in_flight = max_in_flight
+        self.transaction_config = {
+            key: value
+            for key, value in (transaction_config or {}).items()
+            if key not in ["from", "nonce", "required_confs"]
+        }
+        self.transaction_config.setdefault("silent", True)
+        self.poll_interval = poll_interval
+        self.drop_timeout = drop_timeout
+        self.max_retries = max_retries
+
+        self.nonces = NonceManager(signer.address, start=start_nonce)
+        self.stats = {
+            "submitted": 0,
+            "confirmed": 0,
+            "failed": 0,
+            "resubmitted": 0,
+            "gap_fill_attempts": 0,
+            "gaps_filled": 0,
+        }
+
+        self._in_flight: Dict[int, PendingTransaction] = {}
+        # Number of submissions which hold a place in the pipeline but have not been sent yet.
+        self._reserved = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._tracker = threading.Thread(target=self._track, daemon=True)
+        self._tracker.start()
+
+    def __enter__(self) -> "TransactionPipeline":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def submit(self, method: Callable, *args: Any, **kwargs: Any) -> Future:
+        """
+        Calls the given wrapper write method (e.g. inventory.create_slot) with the given arguments and a
+        transaction config from the pipeline. Blocks while max_in_flight transactions are pending.
+
+        Returns a future which resolves to the brownie TransactionReceipt once the transaction has been
+        mined (a receipt with status 0 if it reverted), or raises if it could not be submitted or mined.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Pipeline is closed")
+            while len(self._in_flight) + self._reserved >= self.max_in_flight:
+                self._condition.wait()
+            # Holds the place while the transaction is sent, so that concurrent submitters cannot take it.
+            self._reserved += 1
+
+        pending = PendingTransaction(self.nonces.reserve(), method, args, kwargs)
+        try:
+            self._send(pending)
+        except Exception as e:
+            with self._condition:
+                self._reserved -= 1
+                self._condition.notify_all()
+            self._abandon(pending, e)
+            return pending.future
+
+        with self._condition:
+            self._reserved -= 1
+            self._in_flight[pending.nonce] = pending
+            self.stats["submitted"] += 1
+            self._condition.notify_all()
+        return pending.future
+
+    def drain(self) -> None:
+        """
+        Waits until every submitted transaction has been mined or has failed.
+        """
+        with self._condition:
+            while self._in_flight or self._reserved:
+                self._condition.wait()
+
+    def close(self) -> None:
+        self.drain()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._tracker.join()
+
+    def _send(self, pending: PendingTransaction) -> None:
+        transaction_config = {
+            **self.transaction_config,
+            "from": self.signer,
+            "nonce": pending.nonce,
+            "required_confs": 0,
+        }
+        pending.attempts += 1
+        pending.receipt = pending.method(
+            *pending.args, **pending.kwargs, transaction_config=transaction_config
+        )
+        pending.submitted_at = time.monotonic()
+
+    def _abandon(self, pending: PendingTransaction, error: Exception) -> None:
+        """
+        Handles a transaction which could not be broadcast. Its nonce is either given back or, if the
+        node did receive a transaction with it or later nonces are already in use, filled.
+        """
+        try:
+            reached_node = self.nonces.pending_nonce() > pending.nonce
+            if not reached_node and not self.nonces.release(pending.nonce):
+                self._fill_gap(pending.nonce)
+        finally:
+            with self._condition:
+                self.stats["failed"] += 1
+            pending.future.set_exception(error)
+
+    def _fill_gap(self, nonce: int) -> None:
+        with self._condition:
+            self.stats["gap_fill_attempts"] += 1
+        self.signer.transfer(
+            self.signer,
+            0,
+            nonce=nonce,
+            required_confs=0,
+            silent=True,
+            gas_price=self.transaction_config.get("gas_price"),
+            max_fee=self.transaction_config.get("max_fee"),
+            priority_fee=self.transaction_config.get("priority_fee"),
+        )
+        with self._condition:
+            self.stats["gaps_filled"] += 1
+
+    def _complete(
+        self,
+        pending: PendingTransaction,
+        receipt: Any = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        # A transaction which was mined but reverted resolves to its receipt, but it did not succeed.
+        succeeded = error is None and receipt.status != 0
+        with self._condition:
+            self._in_flight.pop(pending.nonce, None)
+            self.stats["confirmed" if succeeded else "failed"] += 1
+            self._condition.notify_all()
+        if error is None:
+            pending.future.set_result(receipt)
+        else:
+            pending.future.set_exception(error)
+
+    def _check(self, pending: PendingTransaction) -> None:
+        try:
+            web3.eth.get_transaction_receipt(pending.txid)
+        except TransactionNotFound:
+            if time.monotonic() - pending.submitted_at > self.drop_timeout:
+                self._check_dropped(pending)
+            return
+        # The receipt returned by brownie for required_confs=0 is updated in the background, wait
+        # until it reflects the mined transaction.
+        pending.receipt.wait(1)
+        self._complete(pending, receipt=pending.receipt)
+
+    def _check_dropped(self, pending: PendingTransaction) -> None:
+        try:
+            web3.eth.get_transaction(pending.txid)
+            still_pending = True
+        except TransactionNotFound:
+            still_pending = False
+
+        if self.nonces.mined_nonce() > pending.nonce:
+            # Another transaction with the same nonce was mined instead.
+            self._complete(
+                pending,
+                error=RuntimeError(
+                    f"Transaction {pending.txid} was replaced by another transaction with nonce {pending.nonce}"
+                ),
+            )
+        elif still_pending:
+            pending.submitted_at = time.monotonic()
+        elif pending.attempts <= self.max_retries:
+            with self._condition:
+                self.stats["resubmitted"] += 1
+            try:
+                self._send(pending)
+            except Exception as e:
+                self._give_up(pending, e)
+        else:
+            self._give_up(
+                pending,
+                RuntimeError(
+                    f"Transaction with nonce {pending.nonce} was dropped {pending.attempts} times"
+                ),
+            )
+
+    def _give_up(self, pending: PendingTransaction, error: Exception) -> None:
+        """
+        Fails a transaction which cannot be mined, after filling its nonce so that the transactions after
+        it can be. The transaction fails even if its nonce cannot be filled, so that it is not checked
+        again forever - the transactions after it are then dropped in turn.
+        """
+        try:
+            self._fill_gap(pending.nonce)
+        finally:
+            self._complete(pending, error=error)
+
+    def _track(self) -> None:
+        while True:
+            with self._condition:
+                while not self._in_flight and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._in_flight:
+                    return
+                in_flight: List[PendingTransaction] = sorted(
+                    self._in_flight.values(), key=lambda pending: pending.nonce
+                )
+
+            for pending in in_flight:
+                try:
+                    self._check(pending)
+                except NODE_ERRORS:
+                    pass
+                except Exception as e:
+                    logger.exception(
+                        "Failed to track the transaction with nonce %d", pending.nonce
+                    )
+                    # The transaction may already have been failed by _give_up, whose gap fill raised.
+                    if not pending.future.done():
+                        self._complete(pending, error=e)
+
+            with self._condition:
+                if self._in_flight:
+                    self._condition.wait(self.poll_interval)
+
+
+def receipt_record(receipt: Any) -> Dict[str, Any]:
+    return {
+        "tx_hash": receipt.txid,
+        "block_number": receipt.block_number,
+        "nonce": receipt.nonce,
+        "gas_used": receipt.gas_used,
+        "tx_status": int(receipt.status),
+        "events": [
+            {"name": event.name, "args": dict(event.items())}
+            for event in receipt.events
+        ],
+    }
+
+
+def record_failure(record: Dict[str, Any], error: Exception) -> None:
+    record["status"] = "error"
+    record["error"] = str(error)
+    txid = getattr(error, "txid", None)
+    if txid is not None:
+        record["tx_hash"] = txid
+
+
+def settled_writes(
+    pending: Deque[Tuple[Dict[str, Any], Future]],
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the records of pipelined writes whose transactions have been mined or have failed, in
+    submission order, up to the first write which is still pending.
+    """
+    while pending and pending[0][1].done():
+        record, future = pending.popleft()
+        try:
+            record.update(receipt_record(future.result()))
+            if record["tx_status"] == 1:
+                record["status"] = "ok"
+            else:
+                record["status"] = "error"
+                record["error"] = "Transaction reverted"
+        except Exception as e:
+            record_failure(record, e)
+        yield record
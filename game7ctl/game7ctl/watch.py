@@ -0,0 +1,511 @@
+"""
+Live stream of the events emitted by an Inventory, for downstream consumers such as game servers.
+
+watch tails the events of an Inventory contract as they are emitted and writes them, decoded as by
+logs.decode_log, as NDJSON to stdout or to a Unix socket, so that a consumer is notified of equips as
+soon as they are mined instead of polling getEquippedItem.
+
+Events come from an eth_subscribe("logs") subscription (SubscriptionSource) when the node can be
+reached over a websocket, and otherwise from eth_getLogs polls (PollingSource) whose interval adapts to
+the chain: while new blocks keep coming, polls follow each other every min_interval seconds, and while
+they do not, the interval doubles up to max_interval. A subscription which is dropped is resubscribed,
+and the blocks it missed are backfilled with eth_getLogs. If the node does not support subscriptions,
+watch falls back to polling.
+
+The source and the output are decoupled by an EventQueue which holds at most max_size events in memory.
+When the consumer cannot keep up and the queue is full, its policy decides what happens to new events:
+- block: the source waits until there is space. The node may drop a subscription which is not read.
+- drop: new events are dropped. Once the consumer catches up, it is sent a record
+  {"event": "EventsDropped", "count": ..., "from_block": ..., "to_block": ...} in their place, so
+  that it knows to read the state of those blocks from the chain.
+- spill: new events are appended to a file on disk and read back, in order, as the consumer catches
+  up.
+
+A subscription delivers the logs of blocks which a reorg removed from the chain again, with
+"removed": true. Polling cannot tell, so when reorgs matter it should be run with confirmations.
+
+From the command line:
+    game7ctl inventory watch --network <network> --address <inventory> --socket /run/game/inventory.sock
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+)
+
+from eth_utils import to_checksum_address
+
+from . import defaults, inventory_events, logs
+
+try:
+    import websockets
+    import websockets.exceptions
+except ImportError:
+    websockets = None  # type: ignore
+
+POLICIES = defaults.WATCH_POLICIES
+
+DEFAULT_QUEUE_SIZE = defaults.WATCH_QUEUE_SIZE
+DEFAULT_MIN_INTERVAL = defaults.WATCH_MIN_INTERVAL
+DEFAULT_MAX_INTERVAL = defaults.WATCH_MAX_INTERVAL
+RECONNECT_INTERVAL = 1.0
+# Seconds a subscription waits for a message before checking whether it has been stopped.
+RECEIVE_TIMEOUT = 1.0
+
+
+class SubscriptionUnavailable(Exception):
+    """
+    Raised when a node does not accept log subscriptions.
+    """
+
+
+class EventQueue:
+    def __init__(
+        self,
+        max_size: int = DEFAULT_QUEUE_SIZE,
+        policy: str = "block",
+        spill_path: Optional[str] = None,
+    ) -> None:
+        """
+        Bounded queue of events between a source and a consumer, which applies the given slow-consumer
+        policy when it is full. The spill policy requires a spill_path to write events to.
+        """
+        if max_size < 1:
+            raise ValueError("Queue size must be at least 1")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy}, expected one of {POLICIES}")
+        if policy == "spill" and spill_path is None:
+            raise ValueError("The spill policy requires a spill file")
+        self.max_size = max_size
+        self.policy = policy
+        self.spill_path = spill_path
+        self.condition = threading.Condition()
+        self.events: Deque[Dict[str, Any]] = deque()
+        self.closed = False
+
+        self.dropped = 0
+        self.spilled = 0
+        # Events dropped since the last EventsDropped record.
+        self.pending_drop: Optional[Dict[str, Any]] = None
+
+        # Spilled events are read back through their own handle, in the order they were written.
+        self.spill_writer: Optional[TextIO] = None
+        self.spill_reader: Optional[TextIO] = None
+        self.spill_pending = 0
+
+    def put(self, event: Dict[str, Any]) -> None:
+        with self.condition:
+            if self.policy == "block":
+                while len(self.events) >= self.max_size and not self.closed:
+                    self.condition.wait()
+            elif self.policy == "drop" and len(self.events) >= self.max_size:
+                self._drop(event)
+                return
+            elif self.policy == "spill" and (
+                self.spill_pending or len(self.events) >= self.max_size
+            ):
+                # Once events are spilled, the following ones are spilled too until the consumer has
+                # read them all back, so that they stay in order.
+                self._spill(event)
+                self.condition.notify_all()
+                return
+            if self.pending_drop is not None:
+                self.events.append(self.pending_drop)
+                self.pending_drop = None
+            self.events.append(event)
+            self.condition.notify_all()
+
+    def _drop(self, event: Dict[str, Any]) -> None:
+        self.dropped += 1
+        block_number = event.get("blockNumber")
+        if self.pending_drop is None:
+            self.pending_drop = {
+                "event": "EventsDropped",
+                "count": 0,
+                "from_block": block_number,
+                "to_block": block_number,
+            }
+        self.pending_drop["count"] += 1
+        self.pending_drop["to_block"] = block_number
+
+    def _spill(self, event: Dict[str, Any]) -> None:
+        assert self.spill_path is not None
+        if self.spill_writer is None:
+            self.spill_writer = open(self.spill_path, "w")
+            self.spill_reader = open(self.spill_path, "r")
+        self.spill_writer.write(json.dumps(event) + "\n")
+        self.spill_writer.flush()
+        self.spill_pending += 1
+        self.spilled += 1
+
+    def _unspill(self) -> Dict[str, Any]:
+        assert self.spill_reader is not None and self.spill_writer is not None
+        event = json.loads(self.spill_reader.readline())
+        self.spill_pending -= 1
+        if not self.spill_pending:
+            # Start the file over once everything in it has been read back.
+            self.spill_writer.seek(0)
+            self.spill_writer.truncate()
+            self.spill_reader.seek(0)
+        return event
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the next event, waiting up to timeout seconds (or indefinitely, if timeout is None) for
+        one. Returns None if there is none by then, or if the queue is closed and empty.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while True:
+                if self.events:
+                    event = self.events.popleft()
+                    self.condition.notify_all()
+                    return event
+                if self.spill_pending:
+                    return self._unspill()
+                if self.pending_drop is not None:
+                    event, self.pending_drop = self.pending_drop, None
+                    return event
+                if self.closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def close(self) -> None:
+        """
+        Marks the end of the events. Consumers get the events which are still queued, and then None.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def is_done(self) -> bool:
+        with self.condition:
+            return (
+                self.closed
+                and not self.events
+                and not self.spill_pending
+                and self.pending_drop is None
+            )
+
+    def cleanup(self) -> None:
+        for spill_file in [self.spill_writer, self.spill_reader]:
+            if spill_file is not None:
+                spill_file.close()
+        if self.spill_writer is not None and self.spill_path is not None:
+            os.remove(self.spill_path)
+        self.spill_writer = None
+        self.spill_reader = None
+
+
+class PollingSource:
+    def __init__(
+        self,
+        web3_client: Any,
+        address: str,
+        from_block: int,
+        event_abis: Sequence[Dict[str, Any]] = inventory_events.EVENT_ABIS,
+        confirmations: int = 0,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        fetch: Callable[..., List[Dict[str, Any]]] = logs.fetch_logs,
+    ) -> None:
+        """
+        Polls for the events of the contract at address from from_block on. next_block is the first
+        block which has not been polled yet.
+        """
+        self.web3_client = web3_client
+        self.address = address
+        self.next_block = from_block
+        self.event_abis = event_abis
+        self.confirmations = confirmations
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.fetch = fetch
+
+    def events(self, stop: threading.Event) -> Iterator[Dict[str, Any]]:
+        interval = self.min_interval
+        while not stop.is_set():
+            try:
+                to_block = self.web3_client.eth.block_number - self.confirmations
+                if to_block >= self.next_block:
+                    for event in logs.iter_logs(
+                        self.web3_client,
+                        self.address,
+                        self.event_abis,
+                        self.next_block,
+                        to_block,
+                        max_workers=1,
+                        fetch=self.fetch,
+                    ):
+                        yield event
+                    self.next_block = to_block + 1
+                    interval = self.min_interval
+                else:
+                    interval = min(self.max_interval, interval * 2)
+            except Exception as e:
+                print(f"Polling failed, retrying: {e}", file=sys.stderr)
+                interval = min(self.max_interval, interval * 2)
+            stop.wait(interval)
+
+
+class SubscriptionSource:
+    def __init__(
+        self,
+        ws_url: str,
+        web3_client: Any,
+        address: str,
+        from_block: int,
+        event_abis: Sequence[Dict[str, Any]] = inventory_events.EVENT_ABIS,
+        fetch: Callable[..., List[Dict[str, Any]]] = logs.fetch_logs,
+    ) -> None:
+        """
+        Subscribes to the events of the contract at address on the node at ws_url. The blocks from
+        from_block up to the one the subscription starts at are backfilled with eth_getLogs through
+        web3_client. next_block is the first block whose events may not all have been delivered.
+        """
+        if websockets is None:
+            raise SubscriptionUnavailable("Log subscriptions require websockets")
+        self.ws_url = ws_url
+        self.web3_client = web3_client
+        self.address = address
+        self.next_block = from_block
+        self.event_abis = event_abis
+        self.fetch = fetch
+        # (blockNumber, logIndex) of the last event delivered, so that events delivered by both the
+        # backfill and the subscription are only delivered once.
+        self.last_position: Optional[Any] = None
+
+    def _deliver(self, event: Dict[str, Any]) -> bool:
+        position = (event["blockNumber"], event["logIndex"])
+        if event.get("removed"):
+            # The block is replaced, so the events logged in its place must be delivered again.
+            if self.last_position is not None:
+                self.last_position = min(
+                    self.last_position, (position[0], position[1] - 1)
+                )
+            self.next_block = min(self.next_block, position[0])
+            return True
+        if self.last_position is not None and position <= self.last_position:
+            return False
+        self.last_position = position
+        self.next_block = max(self.next_block, position[0])
+        return True
+
+    def _backfill(self) -> Iterator[Dict[str, Any]]:
+        head = self.web3_client.eth.block_number
+        if head < self.next_block:
+            return
+        for event in logs.iter_logs(
+            self.web3_client,
+            self.address,
+            self.event_abis,
+            self.next_block,
+            head,
+            max_workers=1,
+            fetch=self.fetch,
+        ):
+            if self._deliver(event):
+                yield event
+        self.next_block = head + 1
+
+    def events(self, stop: threading.Event) -> Iterator[Dict[str, Any]]:
+        abis_by_topic = logs.events_by_topic(self.event_abis)
+        subscribe_request = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "eth_subscribe",
+            "params": [
+                "logs",
+                {
+                    "address": to_checksum_address(self.address),
+                    "topics": [list(abis_by_topic)],
+                },
+            ],
+        }
+        loop = asyncio.new_event_loop()
+        try:
+            while not stop.is_set():
+                try:
+                    connection = loop.run_until_complete(
+                        websockets.connect(self.ws_url)
+                    )
+                except (
+                    OSError,
+                    asyncio.TimeoutError,
+                    websockets.exceptions.WebSocketException,
+                ):
+                    stop.wait(RECONNECT_INTERVAL)
+                    continue
+                try:
+                    loop.run_until_complete(
+                        connection.send(json.dumps(subscribe_request))
+                    )
+                    response = json.loads(loop.run_until_complete(connection.recv()))
+                    if "error" in response:
+                        raise SubscriptionUnavailable(response["error"])
+                    # Events emitted before the subscription started (or while it was down).
+                    yield from self._backfill()
+
+                    while not stop.is_set():
+                        try:
+                            message = loop.run_until_complete(
+                                asyncio.wait_for(connection.recv(), RECEIVE_TIMEOUT)
+                            )
+                        except asyncio.TimeoutError:
+                            continue
+                        log = json.loads(message).get("params", {}).get("result")
+                        if not log or not log.get("topics"):
+                            continue
+                        event_abi = abis_by_topic.get(logs.to_hex(log["topics"][0]))
+                        if event_abi is None:
+                            continue
+                        event = logs.decode_log(event_abi, log)
+                        if log.get("removed"):
+                            event["removed"] = True
+                        if self._deliver(event):
+                            yield event
+                except (OSError, websockets.exceptions.WebSocketException) as e:
+                    print(f"Subscription dropped, resubscribing: {e}", file=sys.stderr)
+                    stop.wait(RECONNECT_INTERVAL)
+                finally:
+                    loop.run_until_complete(connection.close())
+        finally:
+            loop.close()
+
+
+class UnixSocketOutput:
+    def __init__(self, path: str) -> None:
+        """
+        File-like output which writes to the Unix socket at path, (re)connecting to it as needed. Writes
+        wait while the socket cannot be connected to, so a consumer which restarts does not miss events.
+        """
+        self.path = path
+        self.connection: Optional[socket.socket] = None
+
+    def write(self, data: str) -> None:
+        while True:
+            if self.connection is None:
+                try:
+                    self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    self.connection.connect(self.path)
+                except OSError:
+                    self.close()
+                    time.sleep(RECONNECT_INTERVAL)
+                    continue
+            try:
+                self.connection.sendall(data.encode())
+                return
+            except OSError:
+                self.close()
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def watch(
+    web3_client: Any,
+    address: str,
+    output: Any,
+    from_block: Optional[int] = None,
+    ws_url: Optional[str] = None,
+    confirmations: int = 0,
+    min_interval: float = DEFAULT_MIN_INTERVAL,
+    max_interval: float = DEFAULT_MAX_INTERVAL,
+    queue: Optional[EventQueue] = None,
+    event_abis: Sequence[Dict[str, Any]] = inventory_events.EVENT_ABIS,
+    stop: Optional[threading.Event] = None,
+    fetch: Callable[..., List[Dict[str, Any]]] = logs.fetch_logs,
+) -> Dict[str, Any]:
+    """
+    Writes the events of the contract at address from from_block (default: the next block) on to
+    output as NDJSON, until stop is set (or the process is interrupted). Events are read from a
+    subscription on ws_url if it is given and the node supports them, and polled for otherwise.
+    Returns statistics about the run.
+    """
+    if queue is None:
+        queue = EventQueue()
+    if stop is None:
+        stop = threading.Event()
+    if from_block is None:
+        from_block = web3_client.eth.block_number + 1
+    stats: Dict[str, Any] = {"source": None, "events": 0, "error": None}
+
+    def produce() -> None:
+        next_block = from_block
+        try:
+            if ws_url is not None:
+                try:
+                    subscription = SubscriptionSource(
+                        ws_url, web3_client, address, next_block, event_abis, fetch
+                    )
+                    stats["source"] = "subscription"
+                    for event in subscription.events(stop):
+                        queue.put(event)
+                    return
+                except SubscriptionUnavailable as e:
+                    print(
+                        f"Log subscriptions are not available, polling instead: {e}",
+                        file=sys.stderr,
+                    )
+                    if stats["source"] == "subscription":
+                        next_block = subscription.next_block
+            stats["source"] = "polling"
+            polling = PollingSource(
+                web3_client,
+                address,
+                next_block,
+                event_abis,
+                confirmations=confirmations,
+                min_interval=min_interval,
+                max_interval=max_interval,
+                fetch=fetch,
+            )
+            for event in polling.events(stop):
+                queue.put(event)
+        except Exception as e:
+            stats["error"] = repr(e)
+        finally:
+            queue.close()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while not queue.is_done():
+            event = queue.get(timeout=RECEIVE_TIMEOUT)
+            if event is None:
+                continue
+            output.write(json.dumps(event) + "\n")
+            output.flush()
+            stats["events"] += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        queue.close()
+        producer.join(timeout=RECONNECT_INTERVAL + RECEIVE_TIMEOUT)
+        queue.cleanup()
+    stats.update(dropped=queue.dropped, spilled=queue.spilled)
+    return stats
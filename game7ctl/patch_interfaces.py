@@ -0,0 +1,75 @@
+"""
+Points Python interfaces generated by moonworm at game7ctl.artifacts.
+
+moonworm generates get_abi_json and contract_from_build so that they read build artifacts straight from
+disk, and create a new brownie Project on every deployment. This replaces them with versions which go
+through the process-wide artifact cache and the shared Project in game7ctl.artifacts. regen.bash runs
+it on every interface it generates, followed by black.
+
+Usage:
+    python patch_interfaces.py game7ctl/InventoryFacet.py [...]
+"""
+
+import re
+import sys
+
+ARTIFACTS_IMPORT = "from . import artifacts\n"
+
+LOADERS = """def get_abi_json(abi_name: str) -> List[Dict[str, Any]]:
+    return artifacts.get_abi(BUILD_DIRECTORY, abi_name)
+
+
+def contract_from_build(abi_name: str) -> ContractContainer:
+    # This is workaround because brownie currently doesn't support loading the same project multiple
+    # times. This causes problems when using multiple contracts from the same project in the same
+    # python project. The project is created on first use and shared for the rest of the process.
+    PROJECT = artifacts.get_project(PROJECT_DIRECTORY)
+
+    # The cached build object is shared, so brownie gets its own copy.
+    build = artifacts.get_build(BUILD_DIRECTORY, abi_name)
+
+    return ContractContainer(PROJECT, dict(build))
+
+
+"""
+
+
+def patch_interface(source: str) -> str:
+    if ARTIFACTS_IMPORT not in source:
+        # Only the replaced loaders used these imports.
+        source = source.replace("import json\n", "", 1)
+        source = source.replace("from pathlib import Path\n", "", 1)
+        source = source.replace(
+            "from brownie import Contract, network, project\n",
+            "from brownie import Contract, network\n",
+            1,
+        )
+        source = re.sub(
+            r"(from eth_typing\.evm import ChecksumAddress\n)\n*",
+            rf"\1\n{ARTIFACTS_IMPORT}\n",
+            source,
+            count=1,
+        )
+
+    source, num_replaced = re.subn(
+        r"^def get_abi_json\(.*?(?=^class )",
+        lambda _: LOADERS,
+        source,
+        count=1,
+        flags=re.MULTILINE | re.DOTALL,
+    )
+    if num_replaced != 1:
+        raise ValueError("Could not find get_abi_json and contract_from_build")
+    return source
+
+
+def main() -> None:
+    for path in sys.argv[1:]:
+        with open(path, "r") as ifp:
+            source = ifp.read()
+        with open(path, "w") as ofp:
+            ofp.write(patch_interface(source))
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,7 @@ IMPORTANT_CONTRACTS=( \
     "MockERC20" \
     "MockERC721" \
     "MockTerminus" \
+    "Multicall2" \
     "OwnershipFacet" \
 )
 
@@ -37,4 +38,6 @@ for contract_name in "${IMPORTANT_CONTRACTS[@]}"
 do
     echo "Regenerating Python interface for: $contract_name"
     moonworm generate-brownie -p .. -o game7ctl/ -n "$contract_name"
+    python patch_interfaces.py "game7ctl/$contract_name.py"
+    black -q "game7ctl/$contract_name.py"
 done
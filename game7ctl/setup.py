@@ -16,9 +16,11 @@ setup(
     name="game7ctl",
     version=VERSION,
     packages=find_packages(),
-    install_requires=["eth-brownie", "inspector-facet", "tqdm"],
+    install_requires=["eth-brownie", "inspector-facet", "pyyaml", "tqdm"],
     extras_require={
+        "async": ["aiohttp"],
         "dev": ["black", "isort", "moonworm>=0.6.2"],
+        "numpy": ["numpy"],
     },
     description="Development tools for Game7 smart contracts",
     long_description=long_description,